@@ -1210,6 +1210,9 @@ async function loadMessagesData() {
     const channelData = await fetchJson(CONFIG.jsonSources.privateChannel(i));
     cachedMessagesData[`channel-${i}`] = channelData;
   }
+  
+  // Load traffic recorded off the air (exported from data/rx_store.db)
+  cachedMessagesData.received = await fetchJson(CONFIG.jsonSources.receivedMessages);
 }
 
 /**
@@ -1236,6 +1239,23 @@ function renderMessagesView(container) {
     }
   }
   
+  // Add messages received off the air
+  if (cachedMessagesData.received?.messages) {
+    cachedMessagesData.received.messages.forEach(rx => {
+      const signal = rx.snr != null ? `SNR ${rx.snr} dB, RSSI ${rx.rssi} dBm` : 'no signal info';
+      const hops = rx.hops != null ? `${rx.hops} hop(s)` : 'hops unknown';
+      allMessages.push({
+        id: `rx-${rx.id}`,
+        title: `Received from ${rx.from_id || 'unknown'} (${signal}, ${hops})`,
+        body: rx.text,
+        priority: 'normal',
+        valid_from: rx.rx_at,
+        channel: rx.channel === 0 ? 'public' : `channel-${rx.channel}`,
+        channelNum: rx.channel
+      });
+    });
+  }
+  
   // Sort by timestamp
   allMessages.sort((a, b) => {
     const dateA = new Date(a.valid_from || 0);
@@ -32,7 +32,8 @@ const CONFIG = {
     publicBulletins: 'out/pr-mesh-bbs/bulletins.json',
     privateChannel: (n) => `out/pr-cybr-bbs/channel-${n}.json`,
     nodeStatus: 'data/status/nodes.json',
-    dashboardState: 'dashboard/state.json'
+    dashboardState: 'dashboard/state.json',
+    receivedMessages: 'dashboard/received.json'
   },
   
   // QR code asset paths
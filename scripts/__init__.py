@@ -5,6 +5,16 @@ This package contains the Python scripts for the PR-MESH-BBS and PR-CYBR-BBS sys
 
 Modules:
     meshtastic_client: Interface for Meshtastic device communication
+    mesh_fragment: Fragmentation and reassembly of oversized mesh messages
+    mesh_airtime: LoRa time-on-air estimates and duty-cycle pacing
+    tx_queue: Persistent priority queue for outgoing transmissions
+    tx_ledger: Ledger of broadcast messages for delta transmission
+    tx_checkpoint: Per-item progress of broadcasts for resuming
+    rx_store: Receive pipeline and store of inbound mesh traffic
+    mesh_txd: Resident transmit daemon owning the radio connection
+    mesh_sim: Simulated Meshtastic mesh for offline testing and benchmarks
+    mesh_compress: Dictionary-compressed wire format for mesh payloads
+    mesh_wire: Compact versioned binary schema for BBS payloads
     mailbox_crypto: Encryption/decryption for MAILB0X messages
     mailbox_ops: File operations for encrypted mailboxes
     pr_mesh_bbs_generate: Generator for public BBS content
@@ -3,7 +3,9 @@
 Dashboard State Exporter Script
 
 Reads BBS output files and generates a consolidated state.json file
-for the dashboard to consume.
+for the dashboard to consume. Traffic recorded by rx_store.py is
+summarized in state.json and its recent messages written to
+received.json next to it.
 
 Usage:
     python scripts/export_dashboard_state.py [--output OUTPUT]
@@ -13,10 +15,21 @@ import argparse
 import json
 import os
 import sys
+import time
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
+# Handle both package and standalone execution
+try:
+    from . import rx_store
+except ImportError:
+    import rx_store
+
+
+# Received messages exported for the dashboard's messages view
+RECEIVED_EXPORT_LIMIT = 200
+
 
 def get_env_or_default(key: str, default: Any = None) -> Any:
     """Get environment variable or return default."""
@@ -44,10 +57,46 @@ def count_items_in_json(data: dict | None, key: str = "bulletins") -> int:
     return 0
 
 
+def export_received(store_path: Path, output_path: Path) -> dict | None:
+    """
+    Summarize recorded traffic and write recent messages for the dashboard.
+    
+    Args:
+        store_path: Receive store database (see rx_store.py).
+        output_path: Path where received.json should be written.
+    
+    Returns:
+        Summary for state.json, or None if nothing has been recorded.
+    """
+    if not store_path.exists():
+        return None
+    
+    with rx_store.ReceiveStore(store_path) as store:
+        summary = store.summary(time.time() - 86400)
+        total = store.summary()
+        messages = store.recent(RECEIVED_EXPORT_LIMIT, text_only=True)
+    
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, "w") as f:
+        json.dump({"messages": [m.to_dict() for m in messages]}, f, indent=2)
+    
+    last_rx = total["last_rx"]
+    return {
+        "total": total["total"],
+        "last_rx": datetime.fromtimestamp(last_rx, timezone.utc).isoformat() if last_rx else None,
+        "last_24h": {
+            "total": summary["total"],
+            "channel_counts": {str(ch): count for ch, count in summary["channels"].items()},
+            "senders": len(summary["senders"])
+        }
+    }
+
+
 def export_dashboard_state(
     repo_root: Path,
     output_path: Path,
-    workflow_type: str | None = None
+    workflow_type: str | None = None,
+    rx_store_path: Path | None = None
 ) -> dict:
     """
     Generate the dashboard state file.
@@ -56,6 +105,7 @@ def export_dashboard_state(
         repo_root: Path to the repository root.
         output_path: Path where state.json should be written.
         workflow_type: Optional type of workflow that triggered this ('mesh', 'cybr', 'both').
+        rx_store_path: Receive store to summarize (default: data/rx_store.db).
     
     Returns:
         The generated state dictionary.
@@ -137,6 +187,14 @@ def export_dashboard_state(
         if run_id:
             state["cybr_private"]["last_run_id"] = int(run_id)
     
+    # Summarize received traffic, keeping the last summary if none was recorded here
+    received = export_received(
+        rx_store_path or repo_root / "data" / "rx_store.db",
+        output_path.parent / "received.json"
+    )
+    if received or "received" in existing_state:
+        state["received"] = received or existing_state["received"]
+    
     # Ensure output directory exists
     output_path.parent.mkdir(parents=True, exist_ok=True)
     
@@ -167,6 +225,12 @@ def main():
         default=None,
         help="Type of workflow that triggered this run"
     )
+    parser.add_argument(
+        "--rx-store",
+        type=Path,
+        default=repo_root / "data" / "rx_store.db",
+        help="Receive store to summarize (see rx_store.py)"
+    )
     parser.add_argument(
         "--verbose",
         "-v",
@@ -185,7 +249,8 @@ def main():
     state = export_dashboard_state(
         repo_root=repo_root,
         output_path=args.output,
-        workflow_type=args.workflow_type
+        workflow_type=args.workflow_type,
+        rx_store_path=args.rx_store
     )
     
     if args.verbose:
@@ -201,6 +266,8 @@ def main():
     
     print(f"  PR-MESH-BBS bulletins: {mesh_count}")
     print(f"  PR-CYBR-BBS items: {total_private} (across {len(channel_counts)} channels)")
+    if "received" in state:
+        print(f"  Received (24h): {state['received']['last_24h']['total']}")
     
     return 0
 
@@ -7,9 +7,20 @@ Used by the BBS agent/bot for managing user mailboxes.
 
 Usage:
     python scripts/mailbox_cli.py add --to <id> --from <id> --body "..." --passphrase "<pw>"
-    python scripts/mailbox_cli.py read --for <id> --passphrase "<pw>"
+    python scripts/mailbox_cli.py read --for <id> --passphrase "<pw>" [--limit N] [--since ISO] [--unread]
     python scripts/mailbox_cli.py list
     python scripts/mailbox_cli.py info --for <id>
+    python scripts/mailbox_cli.py verify --for <id> --passphrase "<pw>"
+    python scripts/mailbox_cli.py migrate --for <id> --passphrase "<pw>"
+    python scripts/mailbox_cli.py compact (--for <id> | --all) [--time-budget S]
+    python scripts/mailbox_cli.py --db <file> export
+    python scripts/mailbox_cli.py --db <file> import
+
+Storage:
+    --backend json (default) keeps one journal file per recipient in
+    --mailbox-dir; --backend sqlite keeps all mailboxes in --db.
+    export copies the JSON mailboxes into the SQLite database, import
+    copies them back.
 """
 
 import argparse
@@ -25,10 +36,16 @@ except ImportError:
     import mailbox_ops
 
 
+def get_store(args: argparse.Namespace) -> mailbox_ops.MailboxStore:
+    """Open the storage backend selected on the command line."""
+    if args.backend == "sqlite":
+        return mailbox_ops.open_store("sqlite", Path(args.db))
+    return mailbox_ops.open_store("json", Path(args.mailbox_dir))
+
+
 def cmd_add(args: argparse.Namespace) -> int:
     """Add a new encrypted message to a mailbox."""
-    mailbox_dir = Path(args.mailbox_dir)
-    mailbox_path = mailbox_ops.get_mailbox_path(args.to, mailbox_dir)
+    store = get_store(args)
     
     message = {
         "body": args.body,
@@ -42,15 +59,15 @@ def cmd_add(args: argparse.Namespace) -> int:
     }
     
     try:
-        msg_id = mailbox_ops.append_encrypted_message(
-            mailbox_path,
+        msg_id = store.append_message(
+            args.to,
             message,
             args.passphrase
         )
         print(f"Message added successfully.")
         print(f"  ID: {msg_id}")
         print(f"  To: {args.to}")
-        print(f"  Mailbox: {mailbox_path}")
+        print(f"  Mailbox: {store.location(args.to)}")
         return 0
         
     except Exception as e:
@@ -58,27 +75,41 @@ def cmd_add(args: argparse.Namespace) -> int:
         return 1
 
 
+def parse_since(value: str) -> datetime:
+    """Parse an ISO 8601 --since value for argparse."""
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid ISO 8601 timestamp: {value}")
+
+
 def cmd_read(args: argparse.Namespace) -> int:
-    """Read and decrypt all messages in a mailbox."""
-    mailbox_dir = Path(args.mailbox_dir)
+    """Read and decrypt messages in a mailbox, marking them read."""
+    store = get_store(args)
     recipient_id = getattr(args, "for")  # 'for' is a reserved keyword
-    mailbox_path = mailbox_ops.get_mailbox_path(recipient_id, mailbox_dir)
     
-    if not mailbox_path.exists():
+    if not store.exists(recipient_id):
         print(f"No mailbox found for: {recipient_id}")
         return 0
     
     try:
-        messages = mailbox_ops.decrypt_mailbox(mailbox_path, args.passphrase)
-        
-        if not messages:
-            print(f"Mailbox for {recipient_id} is empty.")
-            return 0
+        messages = store.iter_messages(
+            recipient_id,
+            args.passphrase,
+            since=args.since,
+            limit=args.limit,
+            newest_first=args.newest_first,
+            unread_only=args.unread,
+            workers=args.jobs
+        )
         
-        print(f"Mailbox for {recipient_id}: {len(messages)} message(s)")
-        print("=" * 50)
+        shown_ids = []
         
         for i, msg in enumerate(messages, 1):
+            if i == 1:
+                print(f"Mailbox for {recipient_id}:")
+                print("=" * 50)
+            
             print(f"\n--- Message {i} ---")
             print(f"ID: {msg['id']}")
             print(f"From: {msg['from']}")
@@ -90,6 +121,14 @@ def cmd_read(args: argparse.Namespace) -> int:
             
             print(f"\n{msg['body']}")
             print()
+            shown_ids.append(msg["id"])
+        
+        if not shown_ids:
+            print(f"No matching messages for {recipient_id}.")
+            return 0
+        
+        print(f"{len(shown_ids)} message(s) shown.")
+        store.mark_read(recipient_id, shown_ids)
         
         return 0
         
@@ -103,23 +142,21 @@ def cmd_read(args: argparse.Namespace) -> int:
 
 def cmd_list(args: argparse.Namespace) -> int:
     """List all mailboxes."""
-    mailbox_dir = Path(args.mailbox_dir)
+    store = get_store(args)
     
-    recipients = mailbox_ops.list_mailboxes(mailbox_dir)
+    mailboxes = store.list_info()
     
-    if not recipients:
+    if not mailboxes:
         print("No mailboxes found.")
         return 0
     
-    print(f"Mailboxes ({len(recipients)}):")
+    print(f"Mailboxes ({len(mailboxes)}):")
     
-    for recipient in recipients:
-        mailbox_path = mailbox_ops.get_mailbox_path(recipient, mailbox_dir)
-        info = mailbox_ops.get_mailbox_info(mailbox_path)
-        
+    for recipient, info in mailboxes.items():
         if info:
             count = info.get('message_count', 0)
-            print(f"  {recipient}: {count} message(s)")
+            unread = info.get('unread_count', 0)
+            print(f"  {recipient}: {count} message(s), {unread} unread")
         else:
             print(f"  {recipient}: (unable to read)")
     
@@ -128,11 +165,10 @@ def cmd_list(args: argparse.Namespace) -> int:
 
 def cmd_info(args: argparse.Namespace) -> int:
     """Get information about a mailbox without decrypting."""
-    mailbox_dir = Path(args.mailbox_dir)
+    store = get_store(args)
     recipient_id = getattr(args, "for")
-    mailbox_path = mailbox_ops.get_mailbox_path(recipient_id, mailbox_dir)
     
-    info = mailbox_ops.get_mailbox_info(mailbox_path)
+    info = store.info(recipient_id)
     
     if not info:
         print(f"No mailbox found for: {recipient_id}")
@@ -144,23 +180,25 @@ def cmd_info(args: argparse.Namespace) -> int:
     print(f"  Cipher: {info['cipher']}")
     print(f"  KDF: {info['kdf']}")
     print(f"  Messages: {info['message_count']}")
+    print(f"  Unread: {info['unread_count']}")
+    print(f"  Last message: {info['last_sent_at'] or '-'}")
+    print(f"  Size: {info['bytes']} bytes")
     
     return 0
 
 
 def cmd_delete(args: argparse.Namespace) -> int:
     """Delete a message from a mailbox."""
-    mailbox_dir = Path(args.mailbox_dir)
+    store = get_store(args)
     recipient_id = getattr(args, "for")
-    mailbox_path = mailbox_ops.get_mailbox_path(recipient_id, mailbox_dir)
     
-    if not mailbox_path.exists():
+    if not store.exists(recipient_id):
         print(f"No mailbox found for: {recipient_id}")
         return 1
     
     try:
-        deleted = mailbox_ops.delete_message(
-            mailbox_path,
+        deleted = store.delete_message(
+            recipient_id,
             args.message_id,
             args.passphrase
         )
@@ -177,11 +215,108 @@ def cmd_delete(args: argparse.Namespace) -> int:
         return 1
 
 
+def cmd_verify(args: argparse.Namespace) -> int:
+    """Check a passphrase against a mailbox without decrypting messages."""
+    store = get_store(args)
+    recipient_id = getattr(args, "for")
+    
+    if not store.exists(recipient_id):
+        print(f"No mailbox found for: {recipient_id}")
+        return 1
+    
+    try:
+        if store.verify_passphrase(recipient_id, args.passphrase):
+            print(f"Passphrase OK for: {recipient_id}")
+            return 0
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    
+    print("Error: Incorrect passphrase", file=sys.stderr)
+    return 1
+
+
+def cmd_migrate(args: argparse.Namespace) -> int:
+    """Upgrade a mailbox to the current format."""
+    store = get_store(args)
+    recipient_id = getattr(args, "for")
+    
+    if not store.exists(recipient_id):
+        print(f"No mailbox found for: {recipient_id}")
+        return 1
+    
+    try:
+        migrated = store.migrate(recipient_id, args.passphrase)
+        
+        if migrated:
+            print(f"Migrated {migrated} message(s) to version {mailbox_ops.MAILBOX_VERSION}.")
+        else:
+            print(f"Mailbox for {recipient_id} is up to date.")
+        return 0
+        
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+
+def cmd_compact(args: argparse.Namespace) -> int:
+    """Drop expired messages and reclaim space."""
+    store = get_store(args)
+    
+    if args.all:
+        result = mailbox_ops.compact_all(store, time_budget=args.time_budget)
+        print(
+            f"Compacted {result['processed']} mailbox(es): "
+            f"{result['expired']} expired message(s) dropped, "
+            f"{result['bytes_reclaimed']} bytes reclaimed."
+        )
+        if result["remaining"]:
+            print(f"{result['remaining']} mailbox(es) left for the next run.")
+        return 0
+    
+    recipient_id = getattr(args, "for")
+    
+    if not store.exists(recipient_id):
+        print(f"No mailbox found for: {recipient_id}")
+        return 1
+    
+    reclaimed = store.compact(recipient_id, expire=True)
+    print(f"Compacted {recipient_id}: {reclaimed} bytes reclaimed.")
+    return 0
+
+
+def cmd_export(args: argparse.Namespace) -> int:
+    """Copy JSON mailboxes into the SQLite database."""
+    with mailbox_ops.open_store("json", Path(args.mailbox_dir)) as source, \
+            mailbox_ops.open_store("sqlite", Path(args.db)) as dest:
+        copied = mailbox_ops.copy_mailboxes(source, dest, args.recipients or None)
+    
+    print(f"Exported {copied} mailbox(es) to {args.db}")
+    return 0
+
+
+def cmd_import(args: argparse.Namespace) -> int:
+    """Copy mailboxes from the SQLite database into JSON files."""
+    db_path = Path(args.db)
+    
+    if not db_path.exists():
+        print(f"Error: Database not found: {db_path}", file=sys.stderr)
+        return 1
+    
+    with mailbox_ops.open_store("sqlite", db_path) as source, \
+            mailbox_ops.open_store("json", Path(args.mailbox_dir)) as dest:
+        copied = mailbox_ops.copy_mailboxes(source, dest, args.recipients or None)
+    
+    print(f"Imported {copied} mailbox(es) into {args.mailbox_dir}")
+    return 0
+
+
 def main():
     """Main entry point."""
     script_dir = Path(__file__).parent
     repo_root = script_dir.parent
     default_mailbox_dir = repo_root / "data" / "mailboxes"
+    default_db = repo_root / "data" / "mailboxes.db"
     
     parser = argparse.ArgumentParser(
         description="MAILB0X CLI - Encrypted mailbox management"
@@ -192,6 +327,18 @@ def main():
         default=str(default_mailbox_dir),
         help="Directory containing mailbox files"
     )
+    parser.add_argument(
+        "--backend",
+        choices=sorted(mailbox_ops.STORE_BACKENDS),
+        default="json",
+        help="Mailbox storage backend"
+    )
+    parser.add_argument(
+        "--db",
+        type=str,
+        default=str(default_db),
+        help="SQLite database for the sqlite backend and export/import"
+    )
     
     subparsers = parser.add_subparsers(dest="command", help="Commands")
     
@@ -218,6 +365,32 @@ def main():
     read_parser = subparsers.add_parser("read", help="Read messages from a mailbox")
     read_parser.add_argument("--for", required=True, dest="for", help="Recipient ID")
     read_parser.add_argument("--passphrase", required=True, help="Decryption passphrase")
+    read_parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Worker processes for decrypting version 1 messages (0 = CPU count)"
+    )
+    read_parser.add_argument(
+        "--limit",
+        type=int,
+        help="Maximum number of messages to show"
+    )
+    read_parser.add_argument(
+        "--since",
+        type=parse_since,
+        help="Only messages sent at or after this ISO 8601 time"
+    )
+    read_parser.add_argument(
+        "--unread",
+        action="store_true",
+        help="Only messages not yet read"
+    )
+    read_parser.add_argument(
+        "--newest-first",
+        action="store_true",
+        help="Show the newest messages first"
+    )
     
     # List command
     list_parser = subparsers.add_parser("list", help="List all mailboxes")
@@ -235,6 +408,62 @@ def main():
     delete_parser.add_argument("--message-id", required=True, help="Message ID to delete")
     delete_parser.add_argument("--passphrase", required=True, help="Passphrase to verify access")
     
+    # Verify command
+    verify_parser = subparsers.add_parser(
+        "verify",
+        help="Check a passphrase without decrypting messages"
+    )
+    verify_parser.add_argument("--for", required=True, dest="for", help="Recipient ID")
+    verify_parser.add_argument("--passphrase", required=True, help="Passphrase to check")
+    
+    # Migrate command
+    migrate_parser = subparsers.add_parser(
+        "migrate",
+        help="Upgrade a mailbox to the current format"
+    )
+    migrate_parser.add_argument("--for", required=True, dest="for", help="Recipient ID")
+    migrate_parser.add_argument("--passphrase", required=True, help="Mailbox passphrase")
+    
+    # Compact command
+    compact_parser = subparsers.add_parser(
+        "compact",
+        help="Drop expired messages and reclaim space (no passphrase needed)"
+    )
+    compact_target = compact_parser.add_mutually_exclusive_group(required=True)
+    compact_target.add_argument("--for", dest="for", help="Recipient ID")
+    compact_target.add_argument(
+        "--all",
+        action="store_true",
+        help="Compact every mailbox, resuming where the last run stopped"
+    )
+    compact_parser.add_argument(
+        "--time-budget",
+        type=float,
+        help="With --all, stop after this many seconds"
+    )
+    
+    # Export / import commands
+    export_parser = subparsers.add_parser(
+        "export",
+        help="Copy JSON mailboxes into the SQLite database"
+    )
+    export_parser.add_argument(
+        "recipients",
+        nargs="*",
+        default=None,
+        help="Recipient IDs to copy (default: all)"
+    )
+    import_parser = subparsers.add_parser(
+        "import",
+        help="Copy mailboxes from the SQLite database into JSON files"
+    )
+    import_parser.add_argument(
+        "recipients",
+        nargs="*",
+        default=None,
+        help="Recipient IDs to copy (default: all)"
+    )
+    
     args = parser.parse_args()
     
     if not args.command:
@@ -247,7 +476,12 @@ def main():
         "read": cmd_read,
         "list": cmd_list,
         "info": cmd_info,
-        "delete": cmd_delete
+        "delete": cmd_delete,
+        "verify": cmd_verify,
+        "migrate": cmd_migrate,
+        "compact": cmd_compact,
+        "export": cmd_export,
+        "import": cmd_import
     }
     
     handler = commands.get(args.command)
@@ -5,17 +5,31 @@ Mailbox Cryptography Module
 Provides encryption and decryption functions for the MAILB0X system.
 Uses AES-256-GCM for authenticated encryption with Argon2id for key derivation.
 
+Version 2 mailboxes use a key hierarchy: one Argon2id run over the mailbox
+salt yields a master key, HKDF-SHA256 derives the key-encryption key (KEK)
+from it, and every message body is encrypted under its own random data key
+which is stored wrapped (AES-256-GCM) under the KEK.
+
 Security Notes:
 - Passphrases and derived keys are NEVER stored persistently
 - Each message uses a unique random nonce
 - Authentication tags are verified during decryption
+- Derived keys are held only in a bounded in-process cache with a TTL,
+  and are zeroized (best effort) when evicted
 """
 
 import base64
+import hashlib
+import hmac
 import secrets
+import threading
+import time
+from collections import OrderedDict
 from typing import NamedTuple
 
+from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 
 # Try to use argon2-cffi, fall back to cryptography's PBKDF2 if unavailable
 try:
@@ -23,7 +37,6 @@ try:
     ARGON2_AVAILABLE = True
 except ImportError:
     from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
-    from cryptography.hazmat.primitives import hashes
     ARGON2_AVAILABLE = False
 
 
@@ -40,6 +53,17 @@ ARGON2_PARALLELISM = 4
 # PBKDF2 parameters (fallback)
 PBKDF2_ITERATIONS = 600000
 
+# Derived-key cache defaults
+KEY_CACHE_MAX_ENTRIES = 64
+KEY_CACHE_TTL_SECONDS = 300.0
+
+# HKDF labels for sub-keys of a mailbox master key
+KEK_LABEL = b"mailb0x-v2-kek"
+CHECK_LABEL = b"mailb0x-v2-check"
+
+# Constant authenticated by a mailbox's key-check value
+KEY_CHECK_MESSAGE = b"MAILB0X passphrase check"
+
 
 class EncryptedPayload(NamedTuple):
     """Container for encrypted message components."""
@@ -104,6 +128,167 @@ def derive_key_from_passphrase(passphrase: str, salt: bytes) -> bytes:
         return kdf.derive(passphrase_bytes)
 
 
+def get_kdf_params() -> tuple:
+    """Return the KDF name and cost parameters currently in effect."""
+    if ARGON2_AVAILABLE:
+        return (
+            "argon2id",
+            ARGON2_TIME_COST,
+            ARGON2_MEMORY_COST,
+            ARGON2_PARALLELISM,
+            KEY_SIZE,
+        )
+    return ("pbkdf2-sha256", PBKDF2_ITERATIONS, KEY_SIZE)
+
+
+def get_kdf_memory_bytes() -> int:
+    """Return the memory reserved by one KDF run, in bytes."""
+    if ARGON2_AVAILABLE:
+        return ARGON2_MEMORY_COST * 1024
+    return 0
+
+
+def _zeroize(buffer: bytearray) -> None:
+    """Overwrite a key buffer in place."""
+    for i in range(len(buffer)):
+        buffer[i] = 0
+
+
+class KeyCache:
+    """
+    Bounded in-process cache of derived keys.
+    
+    Entries are keyed on (keyed SHA-256 digest of the passphrase, salt,
+    KDF params), so the passphrase itself is never held. The digest is
+    keyed with a per-cache random secret so it is useless outside this
+    process. Entries expire after ``ttl``
+    seconds and the least recently used entry is evicted once
+    ``max_entries`` is reached. Evicted keys are overwritten in place.
+    
+    Zeroization is best effort: callers receive immutable ``bytes``
+    copies which Python cannot wipe.
+    """
+    
+    def __init__(
+        self,
+        max_entries: int = KEY_CACHE_MAX_ENTRIES,
+        ttl: float = KEY_CACHE_TTL_SECONDS,
+        clock=time.monotonic
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: OrderedDict[tuple, tuple[bytearray, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._digest_key = secrets.token_bytes(32)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def make_key(self, passphrase: str, salt: bytes) -> tuple:
+        """Build the cache key for a passphrase/salt pair."""
+        digest = hmac.new(
+            self._digest_key,
+            passphrase.encode("utf-8"),
+            hashlib.sha256
+        ).digest()
+        return (digest, bytes(salt), get_kdf_params())
+    
+    def get(self, passphrase: str, salt: bytes) -> bytes | None:
+        """Return a cached key, or None on a miss or expired entry."""
+        cache_key = self.make_key(passphrase, salt)
+        
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            
+            if entry is not None and self._clock() - entry[1] > self.ttl:
+                self._evict(cache_key)
+                entry = None
+            
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(cache_key)
+            self.hits += 1
+            return bytes(entry[0])
+    
+    def put(self, passphrase: str, salt: bytes, key: bytes) -> None:
+        """Store a derived key, evicting the least recently used entries."""
+        if self.max_entries <= 0:
+            return
+        
+        cache_key = self.make_key(passphrase, salt)
+        
+        with self._lock:
+            if cache_key in self._entries:
+                self._evict(cache_key)
+            
+            self._entries[cache_key] = (bytearray(key), self._clock())
+            
+            while len(self._entries) > self.max_entries:
+                self._evict(next(iter(self._entries)))
+    
+    def clear(self) -> None:
+        """Zeroize and drop every cached key."""
+        with self._lock:
+            for cache_key in list(self._entries):
+                self._evict(cache_key)
+    
+    def stats(self) -> dict[str, int]:
+        """Return cache size and hit/miss/eviction counters."""
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def _evict(self, cache_key: tuple) -> None:
+        """Remove and zeroize one entry. Caller must hold the lock."""
+        buffer, _ = self._entries.pop(cache_key)
+        _zeroize(buffer)
+        self.evictions += 1
+
+
+# Process-wide cache used by encrypt_message/decrypt_message
+_key_cache = KeyCache()
+
+
+def get_key_cache() -> KeyCache:
+    """Return the process-wide derived-key cache."""
+    return _key_cache
+
+
+def get_cached_key(passphrase: str, salt: bytes) -> bytes:
+    """
+    Derive a key, reusing a cached derivation when available.
+    
+    Args:
+        passphrase: User-provided passphrase.
+        salt: Random salt bytes.
+    
+    Returns:
+        32-byte derived key.
+    
+    Raises:
+        ValueError: If passphrase is empty or salt is invalid.
+    """
+    if not passphrase:
+        raise ValueError("Passphrase cannot be empty")
+    
+    key = _key_cache.get(passphrase, salt)
+    if key is None:
+        key = derive_key_from_passphrase(passphrase, salt)
+        _key_cache.put(passphrase, salt, key)
+    
+    return key
+
+
 def encrypt_message(passphrase: str, plaintext: str) -> EncryptedPayload:
     """
     Encrypt a plaintext message using AES-256-GCM.
@@ -127,8 +312,8 @@ def encrypt_message(passphrase: str, plaintext: str) -> EncryptedPayload:
     salt = generate_salt()
     nonce = generate_nonce()
     
-    # Derive key from passphrase
-    key = derive_key_from_passphrase(passphrase, salt)
+    # Derive key from passphrase (cached so the message can be read back cheaply)
+    key = get_cached_key(passphrase, salt)
     
     # Encrypt using AES-GCM
     aesgcm = AESGCM(key)
@@ -162,8 +347,8 @@ def decrypt_message(
     if not passphrase:
         raise ValueError("Passphrase cannot be empty")
     
-    # Derive key from passphrase
-    key = derive_key_from_passphrase(passphrase, salt)
+    # Derive key from passphrase (reuses a cached derivation when possible)
+    key = get_cached_key(passphrase, salt)
     
     # Decrypt using AES-GCM
     aesgcm = AESGCM(key)
@@ -177,6 +362,217 @@ def decrypt_message(
         ) from e
 
 
+def derive_subkey(master_key: bytes, label: bytes) -> bytes:
+    """
+    Derive a purpose-bound 256-bit sub-key from a master key with HKDF-SHA256.
+    
+    Args:
+        master_key: Key produced by the passphrase KDF.
+        label: Context label that separates sub-keys.
+    
+    Returns:
+        32-byte sub-key.
+    """
+    hkdf = HKDF(
+        algorithm=hashes.SHA256(),
+        length=KEY_SIZE,
+        salt=None,
+        info=label,
+    )
+    return hkdf.derive(master_key)
+
+
+def derive_mailbox_kek(passphrase: str, salt: bytes) -> bytes:
+    """
+    Derive the key-encryption key for a version 2 mailbox.
+    
+    Runs the passphrase KDF once per (passphrase, salt); repeat calls are
+    served from the key cache.
+    
+    Args:
+        passphrase: Mailbox passphrase.
+        salt: Mailbox-level salt.
+    
+    Returns:
+        32-byte key-encryption key.
+    """
+    return derive_subkey(get_cached_key(passphrase, salt), KEK_LABEL)
+
+
+def compute_key_check(passphrase: str, salt: bytes) -> bytes:
+    """
+    Compute the key-check value that proves knowledge of a passphrase.
+    
+    The value is an HMAC-SHA256 of a fixed constant under a dedicated
+    sub-key of the mailbox master key, so storing it reveals nothing that
+    helps decrypt messages. Costs one (cached) KDF run.
+    
+    Args:
+        passphrase: Mailbox passphrase.
+        salt: Mailbox-level salt.
+    
+    Returns:
+        32-byte key-check value.
+    """
+    check_key = derive_subkey(get_cached_key(passphrase, salt), CHECK_LABEL)
+    return hmac.new(check_key, KEY_CHECK_MESSAGE, hashlib.sha256).digest()
+
+
+def verify_key_check(passphrase: str, salt: bytes, expected: bytes) -> bool:
+    """
+    Check a passphrase against a stored key-check value.
+    
+    Args:
+        passphrase: Passphrase to verify.
+        salt: Mailbox-level salt.
+        expected: Stored key-check value.
+    
+    Returns:
+        True if the passphrase matches.
+    """
+    return hmac.compare_digest(compute_key_check(passphrase, salt), expected)
+
+
+def generate_data_key() -> bytes:
+    """Generate a random per-message data key."""
+    return secrets.token_bytes(KEY_SIZE)
+
+
+def encrypt_with_kek(
+    kek: bytes,
+    plaintext: str,
+    associated_data: bytes | None = None
+) -> dict[str, bytes]:
+    """
+    Encrypt a message under a fresh data key wrapped by the KEK.
+    
+    Args:
+        kek: Mailbox key-encryption key.
+        plaintext: Message to encrypt.
+        associated_data: Optional data authenticated with the body
+            (e.g. the message ID).
+    
+    Returns:
+        Dictionary with nonce, ciphertext, wrapped_key and wrap_nonce.
+    
+    Raises:
+        ValueError: If plaintext is empty.
+    """
+    if not plaintext:
+        raise ValueError("Plaintext cannot be empty")
+    
+    data_key = generate_data_key()
+    nonce = generate_nonce()
+    ciphertext = AESGCM(data_key).encrypt(
+        nonce, plaintext.encode("utf-8"), associated_data
+    )
+    
+    wrap_nonce = generate_nonce()
+    wrapped_key = AESGCM(kek).encrypt(wrap_nonce, data_key, associated_data)
+    
+    return {
+        "nonce": nonce,
+        "ciphertext": ciphertext,
+        "wrapped_key": wrapped_key,
+        "wrap_nonce": wrap_nonce,
+    }
+
+
+def decrypt_with_kek(
+    kek: bytes,
+    nonce: bytes,
+    ciphertext: bytes,
+    wrapped_key: bytes,
+    wrap_nonce: bytes,
+    associated_data: bytes | None = None
+) -> str:
+    """
+    Unwrap a message's data key with the KEK and decrypt the body.
+    
+    Args:
+        kek: Mailbox key-encryption key.
+        nonce: Nonce used for the body.
+        ciphertext: Encrypted body with authentication tag.
+        wrapped_key: Data key encrypted under the KEK.
+        wrap_nonce: Nonce used to wrap the data key.
+        associated_data: Data authenticated at encryption time.
+    
+    Returns:
+        Decrypted plaintext string.
+    
+    Raises:
+        ValueError: If decryption fails (wrong passphrase or tampered data).
+    """
+    try:
+        data_key = AESGCM(kek).decrypt(wrap_nonce, wrapped_key, associated_data)
+        plaintext_bytes = AESGCM(data_key).decrypt(
+            nonce, ciphertext, associated_data
+        )
+        return plaintext_bytes.decode("utf-8")
+    except Exception as e:
+        raise ValueError(
+            "Decryption failed: incorrect passphrase or corrupted data"
+        ) from e
+
+
+def encrypt_with_kek_to_base64(
+    kek: bytes,
+    plaintext: str,
+    associated_data: bytes | None = None
+) -> dict[str, str]:
+    """
+    Encrypt a message under the KEK and return base64-encoded components.
+    
+    Args:
+        kek: Mailbox key-encryption key.
+        plaintext: Message to encrypt.
+        associated_data: Optional authenticated data.
+    
+    Returns:
+        Dictionary with base64-encoded iv, enc_body, wrapped_key and wrap_iv.
+    """
+    encrypted = encrypt_with_kek(kek, plaintext, associated_data)
+    
+    return {
+        "iv": base64.b64encode(encrypted["nonce"]).decode("ascii"),
+        "enc_body": base64.b64encode(encrypted["ciphertext"]).decode("ascii"),
+        "wrapped_key": base64.b64encode(encrypted["wrapped_key"]).decode("ascii"),
+        "wrap_iv": base64.b64encode(encrypted["wrap_nonce"]).decode("ascii"),
+    }
+
+
+def decrypt_with_kek_from_base64(
+    kek: bytes,
+    iv_b64: str,
+    enc_body_b64: str,
+    wrapped_key_b64: str,
+    wrap_iv_b64: str,
+    associated_data: bytes | None = None
+) -> str:
+    """
+    Decrypt a KEK-wrapped message from base64-encoded components.
+    
+    Args:
+        kek: Mailbox key-encryption key.
+        iv_b64: Base64-encoded body nonce.
+        enc_body_b64: Base64-encoded ciphertext.
+        wrapped_key_b64: Base64-encoded wrapped data key.
+        wrap_iv_b64: Base64-encoded wrap nonce.
+        associated_data: Data authenticated at encryption time.
+    
+    Returns:
+        Decrypted plaintext string.
+    """
+    return decrypt_with_kek(
+        kek,
+        base64.b64decode(iv_b64),
+        base64.b64decode(enc_body_b64),
+        base64.b64decode(wrapped_key_b64),
+        base64.b64decode(wrap_iv_b64),
+        associated_data
+    )
+
+
 def encrypt_to_base64(passphrase: str, plaintext: str) -> dict[str, str]:
     """
     Encrypt a message and return base64-encoded components.
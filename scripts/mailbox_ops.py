@@ -7,13 +7,59 @@ Handles loading, saving, and managing encrypted mailbox files.
 
 Mailbox files are stored in data/mailboxes/<recipient_id>.json
 Each message body is encrypted with the recipient's passphrase.
+
+Mailbox format versions:
+- Version 1: every message carries its own salt, so each message costs a
+  full passphrase KDF run to write and to read.
+- Version 2: the mailbox-level salt derives a single key-encryption key;
+  each message body is encrypted under a random data key stored wrapped
+  by that KEK. Reading or appending costs one KDF run per mailbox.
+
+Storage layout:
+Mailbox files are append-only JSON-lines journals. The first line is the
+mailbox header (version, cipher, kdf, salt); every following line is an
+entry: {"op": "add", "mail": {...}}, a tombstone {"op": "del", "id": "..."}
+or a read marker {"op": "read", "ids": [...], "at": "..."}. Appends and deletes write one line, and the
+journal is compacted once tombstoned entries outweigh live ones.
+Compaction can also drop messages whose metadata.ttl (seconds after
+sent_at) has passed; TTLs are plaintext, so no passphrase is needed. Legacy
+single-document JSON mailboxes are still read and are converted to a
+journal on their next write.
+
+Each journal has a small sidecar index (.<recipient_id>.json.idx) holding
+the header fields plus message count, unread count, last sent_at and
+file size, so mailbox info and listings never parse message records. The
+index records the journal size and mtime it describes; a stale or missing
+index is rebuilt from the journal.
+
+Concurrency:
+Writers take an exclusive advisory lock (fcntl.flock on a hidden
+.<recipient_id>.json.lock file) around every read-modify-write, so
+concurrent CLI/bot processes cannot lose messages. Whole-file rewrites go
+to a temporary file that is fsynced and renamed over the mailbox, so
+readers never see a truncated file. Readers take no lock, except that
+mailbox info takes the writer lock while it rebuilds a stale index.
 """
 
 import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
 import uuid
-from datetime import datetime, timezone
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
+
+# Advisory file locks are POSIX-only; without them writes are unlocked
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
 
 # Handle both package and standalone execution
 try:
@@ -25,6 +71,30 @@ except ImportError:
 # Default mailbox directory
 DEFAULT_MAILBOX_DIR = Path(__file__).parent.parent / "data" / "mailboxes"
 
+# Default database for the SQLite mailbox backend
+DEFAULT_SQLITE_PATH = Path(__file__).parent.parent / "data" / "mailboxes.db"
+
+# Mailbox format version written for new mailboxes
+MAILBOX_VERSION = 2
+
+# Memory that parallel decryption may reserve for concurrent KDF runs
+DEFAULT_DECRYPT_MEMORY_BUDGET = 256 * 1024 * 1024
+
+# Journal format marker stored in the header line
+JOURNAL_FORMAT = "mailb0x-journal"
+
+# Compact a journal once this many entries are dead and they outnumber
+# the live messages
+COMPACTION_MIN_GARBAGE = 16
+
+# File (next to the mailboxes) remembering where compact_all() stopped
+COMPACTION_CURSOR_NAME = ".compact-cursor"
+
+
+def sanitize_recipient_id(recipient_id: str) -> str:
+    """Replace characters that are unsafe in filenames and storage keys."""
+    return "".join(c if c.isalnum() or c in "-_" else "_" for c in recipient_id)
+
 
 def get_mailbox_path(recipient_id: str, mailbox_dir: Path | None = None) -> Path:
     """
@@ -40,9 +110,7 @@ def get_mailbox_path(recipient_id: str, mailbox_dir: Path | None = None) -> Path
     if mailbox_dir is None:
         mailbox_dir = DEFAULT_MAILBOX_DIR
     
-    # Sanitize recipient_id for filename
-    safe_id = "".join(c if c.isalnum() or c in "-_" else "_" for c in recipient_id)
-    return mailbox_dir / f"{safe_id}.json"
+    return mailbox_dir / f"{sanitize_recipient_id(recipient_id)}.json"
 
 
 def create_empty_mailbox(passphrase: str) -> dict[str, Any]:
@@ -55,22 +123,127 @@ def create_empty_mailbox(passphrase: str) -> dict[str, Any]:
     Returns:
         Dictionary with mailbox structure.
     """
-    # Generate a mailbox-level salt for future use
+    # Mailbox-level salt for deriving the key-encryption key
     salt = mailbox_crypto.generate_salt()
     
+    # Key-check value so the passphrase can be verified without messages
+    check = mailbox_crypto.compute_key_check(passphrase, salt)
+    
     return {
-        "version": 1,
+        "version": MAILBOX_VERSION,
         "cipher": mailbox_crypto.get_cipher_name(),
         "kdf": mailbox_crypto.get_kdf_name(),
         "salt": mailbox_crypto.base64.b64encode(salt).decode("ascii"),
+        "check": mailbox_crypto.base64.b64encode(check).decode("ascii"),
         "mail": []
     }
 
 
+def _dump_line(entry: dict[str, Any]) -> str:
+    """Serialize one journal line."""
+    return json.dumps(entry, separators=(",", ":")) + "\n"
+
+
+def read_mailbox_header(mailbox_path: Path) -> dict[str, Any] | None:
+    """
+    Read only the header line of a journal mailbox.
+    
+    Args:
+        mailbox_path: Path to the mailbox file.
+    
+    Returns:
+        Header dictionary, or None if the file is a legacy
+        single-document mailbox.
+    
+    Raises:
+        FileNotFoundError: If mailbox file doesn't exist.
+    """
+    with open(mailbox_path, "r") as f:
+        first_line = f.readline()
+    
+    try:
+        header = json.loads(first_line)
+    except json.JSONDecodeError:
+        return None
+    
+    if isinstance(header, dict) and header.get("format") == JOURNAL_FORMAT:
+        return header
+    
+    return None
+
+
+def _replay_journal(lines: list[str]) -> tuple[dict[str, Any], int]:
+    """
+    Rebuild a mailbox dictionary from journal lines.
+    
+    A torn final line (from a crash mid-append) is ignored.
+    
+    Returns:
+        Tuple of (mailbox dict, number of dead journal entries).
+    """
+    header = json.loads(lines[0])
+    mailbox = {k: v for k, v in header.items() if k != "format"}
+    mail: dict[str, dict[str, Any]] = {}
+    garbage = 0
+    
+    for line_no, line in enumerate(lines[1:], 2):
+        if not line.strip():
+            continue
+        
+        try:
+            entry = json.loads(line)
+        except json.JSONDecodeError:
+            if line_no == len(lines) and not line.endswith("\n"):
+                break
+            raise
+        
+        op = entry.get("op")
+        if op == "add":
+            record = entry["mail"]
+            if record["id"] in mail:
+                garbage += 1
+            mail[record["id"]] = record
+        elif op == "del":
+            if mail.pop(entry["id"], None) is not None:
+                garbage += 1
+            garbage += 1
+        elif op == "read":
+            for message_id in entry["ids"]:
+                if message_id in mail:
+                    mail[message_id]["read_at"] = entry["at"]
+            garbage += 1
+    
+    mailbox["mail"] = list(mail.values())
+    return mailbox, garbage
+
+
+def _load_mailbox_with_garbage(mailbox_path: Path) -> tuple[dict[str, Any], int]:
+    """Load a mailbox and count the dead entries in its journal."""
+    with open(mailbox_path, "r") as f:
+        content = f.read()
+    
+    lines = content.splitlines(keepends=True)
+    
+    if lines:
+        try:
+            header = json.loads(lines[0])
+        except json.JSONDecodeError:
+            header = None
+        
+        if isinstance(header, dict) and header.get("format") == JOURNAL_FORMAT:
+            return _replay_journal(lines)
+    
+    # Legacy single-document mailbox
+    return json.loads(content), 0
+
+
 def load_mailbox(mailbox_path: Path) -> dict[str, Any]:
     """
     Load a mailbox from file.
     
+    Journal mailboxes are replayed; legacy single-document files are
+    parsed as-is.
+    
     Args:
         mailbox_path: Path to the mailbox JSON file.
     
@@ -81,13 +254,82 @@ def load_mailbox(mailbox_path: Path) -> dict[str, Any]:
         FileNotFoundError: If mailbox file doesn't exist.
         json.JSONDecodeError: If mailbox file is invalid JSON.
     """
-    with open(mailbox_path, "r") as f:
-        return json.load(f)
+    mailbox, _ = _load_mailbox_with_garbage(mailbox_path)
+    return mailbox
+
+
+# Locks held by the current thread: lock path -> (file object, depth)
+_held_locks = threading.local()
+
+
+def get_lock_path(mailbox_path: Path) -> Path:
+    """Get the advisory lock file path for a mailbox file."""
+    return mailbox_path.with_name(f".{mailbox_path.name}.lock")
+
+
+@contextmanager
+def mailbox_lock(mailbox_path: Path) -> Iterator[None]:
+    """
+    Hold the exclusive writer lock for a mailbox.
+    
+    The lock is re-entrant within a thread, so locked operations can call
+    each other. Other threads and processes block until it is released.
+    A no-op where fcntl is unavailable.
+    
+    Args:
+        mailbox_path: Path to the mailbox file.
+    """
+    if not FCNTL_AVAILABLE:
+        yield
+        return
+    
+    held = getattr(_held_locks, "locks", None)
+    if held is None:
+        held = _held_locks.locks = {}
+    
+    lock_path = str(get_lock_path(mailbox_path))
+    
+    if lock_path in held:
+        lock_file, depth = held[lock_path]
+        held[lock_path] = (lock_file, depth + 1)
+    else:
+        mailbox_path.parent.mkdir(parents=True, exist_ok=True)
+        lock_file = open(lock_path, "a")
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        held[lock_path] = (lock_file, 1)
+    
+    try:
+        yield
+    finally:
+        lock_file, depth = held[lock_path]
+        if depth > 1:
+            held[lock_path] = (lock_file, depth - 1)
+        else:
+            del held[lock_path]
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            lock_file.close()
+
+
+def _fsync_directory(directory: Path) -> None:
+    """Persist a rename by syncing its directory (POSIX only)."""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
 
 
 def save_mailbox(mailbox_path: Path, mailbox: dict[str, Any]) -> None:
     """
-    Save a mailbox to file.
+    Save a mailbox to file as a compacted journal.
+    
+    The journal is written to a temporary file in the same directory,
+    fsynced and atomically renamed over the mailbox. Existing file
+    permissions are kept; new mailboxes are private to the owner. The
+    sidecar index is rewritten to match.
     
     Args:
         mailbox_path: Path to save the mailbox.
@@ -96,230 +338,1770 @@ def save_mailbox(mailbox_path: Path, mailbox: dict[str, Any]) -> None:
     # Ensure directory exists
     mailbox_path.parent.mkdir(parents=True, exist_ok=True)
     
-    with open(mailbox_path, "w") as f:
-        json.dump(mailbox, f, indent=2)
+    header = {"format": JOURNAL_FORMAT}
+    header.update({k: v for k, v in mailbox.items() if k != "mail"})
+    
+    fd, tmp_name = tempfile.mkstemp(
+        dir=mailbox_path.parent,
+        prefix=f".{mailbox_path.name}.",
+        suffix=".tmp"
+    )
+    
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(_dump_line(header))
+            for mail_record in mailbox.get("mail", []):
+                f.write(_dump_line({"op": "add", "mail": mail_record}))
+            f.flush()
+            os.fsync(f.fileno())
+        
+        if mailbox_path.exists():
+            os.chmod(tmp_name, mailbox_path.stat().st_mode & 0o7777)
+        
+        os.replace(tmp_name, mailbox_path)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+    
+    _fsync_directory(mailbox_path.parent)
+    write_mailbox_index(mailbox_path, summarize_mailbox(mailbox))
 
 
-def append_encrypted_message(
-    mailbox_path: Path,
-    message_dict: dict[str, Any],
-    passphrase: str
-) -> str:
+def append_journal_entry(mailbox_path: Path, entry: dict[str, Any]) -> None:
     """
-    Append an encrypted message to a mailbox.
+    Append a single entry to a journal mailbox and fsync it.
     
-    If the mailbox doesn't exist, it will be created.
-    The message body is encrypted using the provided passphrase.
+    Callers must hold the mailbox lock.
     
     Args:
-        mailbox_path: Path to the mailbox file.
-        message_dict: Message to add. Must contain:
-            - body: The message body (will be encrypted)
-            - from: Sender identifier
-            Optionally:
-            - metadata: Additional metadata dict
-        passphrase: Passphrase for encryption.
+        mailbox_path: Path to an existing journal mailbox.
+        entry: Journal entry to append.
+    """
+    with open(mailbox_path, "a") as f:
+        f.write(_dump_line(entry))
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def get_index_path(mailbox_path: Path) -> Path:
+    """Get the sidecar index path for a mailbox file."""
+    return mailbox_path.with_name(f".{mailbox_path.name}.idx")
+
+
+def summarize_mailbox(mailbox: dict[str, Any]) -> dict[str, Any]:
+    """
+    Summarize a mailbox using only plaintext fields.
+    
+    Args:
+        mailbox: Mailbox dictionary.
     
     Returns:
-        The message ID assigned to the new message.
+        Dictionary with version, cipher, kdf, message_count,
+        unread_count and last_sent_at.
+    """
+    mail_list = mailbox.get("mail", [])
+    sent_times = [_normalize_timestamp(m["sent_at"]) for m in mail_list]
     
-    Raises:
-        ValueError: If message_dict is missing required fields.
+    return {
+        "version": mailbox.get("version"),
+        "cipher": mailbox.get("cipher"),
+        "kdf": mailbox.get("kdf"),
+        "message_count": len(mail_list),
+        "unread_count": sum(1 for m in mail_list if not m.get("read_at")),
+        "last_sent_at": max(sent_times) if sent_times else None
+    }
+
+
+def write_mailbox_index(mailbox_path: Path, summary: dict[str, Any]) -> None:
     """
-    if "body" not in message_dict:
-        raise ValueError("Message must contain 'body' field")
-    if "from" not in message_dict:
-        raise ValueError("Message must contain 'from' field")
+    Write the sidecar index for a mailbox file.
     
-    # Load or create mailbox
-    if mailbox_path.exists():
-        mailbox = load_mailbox(mailbox_path)
-    else:
-        mailbox = create_empty_mailbox(passphrase)
+    The index is stamped with the mailbox's current size and mtime so a
+    later reader can tell whether it still describes the file. It is
+    renamed into place but not fsynced: a lost index is simply rebuilt.
+    Callers must hold the mailbox lock.
     
-    # Generate message ID
-    message_id = str(uuid.uuid4())
+    Args:
+        mailbox_path: Path to the mailbox file.
+        summary: Summary from summarize_mailbox().
+    """
+    stat = mailbox_path.stat()
+    index = {**summary, "bytes": stat.st_size, "mtime_ns": stat.st_mtime_ns}
     
-    # Encrypt the body
-    encrypted = mailbox_crypto.encrypt_to_base64(passphrase, message_dict["body"])
+    index_path = get_index_path(mailbox_path)
+    tmp_path = index_path.with_name(f"{index_path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps(index, separators=(",", ":")))
+    os.replace(tmp_path, index_path)
+
+
+def read_mailbox_index(mailbox_path: Path) -> dict[str, Any] | None:
+    """
+    Read a mailbox's sidecar index if it is current.
     
-    # Create mail record
-    mail_record = {
-        "id": message_id,
-        "enc_body": encrypted["enc_body"],
-        "iv": encrypted["iv"],
-        "salt": encrypted["salt"],  # Per-message salt
-        "sent_at": datetime.now(timezone.utc).isoformat(),
-        "from": message_dict["from"],
-        "metadata": message_dict.get("metadata", {})
-    }
+    Args:
+        mailbox_path: Path to the mailbox file.
     
-    # Append to mail list
-    mailbox["mail"].append(mail_record)
+    Returns:
+        Index dictionary, or None if it is missing, unreadable or stale.
+    """
+    try:
+        stat = mailbox_path.stat()
+        index = json.loads(get_index_path(mailbox_path).read_text())
+    except (OSError, json.JSONDecodeError):
+        return None
     
-    # Save mailbox
-    save_mailbox(mailbox_path, mailbox)
+    if index.get("bytes") != stat.st_size or index.get("mtime_ns") != stat.st_mtime_ns:
+        return None
     
-    return message_id
+    return index
 
 
-def decrypt_mailbox(
+def is_expired(mail_record: dict[str, Any], now: datetime | None = None) -> bool:
+    """
+    Check whether a mail record's TTL has passed.
+    
+    Args:
+        mail_record: Mail record with sent_at and optional metadata.ttl
+            (seconds; missing or 0 means the message never expires).
+        now: Reference time (defaults to the current time).
+    
+    Returns:
+        True if the message has expired.
+    """
+    ttl = mail_record.get("metadata", {}).get("ttl")
+    if not ttl:
+        return False
+    
+    if now is None:
+        now = datetime.now(timezone.utc)
+    
+    sent_at = datetime.fromisoformat(_normalize_timestamp(mail_record["sent_at"]))
+    return sent_at + timedelta(seconds=ttl) <= now
+
+
+def compact_mailbox(
     mailbox_path: Path,
-    passphrase: str
-) -> list[dict[str, Any]]:
+    expire: bool = False,
+    now: datetime | None = None
+) -> int:
     """
-    Decrypt all messages in a mailbox.
+    Rewrite a mailbox journal without dead entries.
     
     Args:
         mailbox_path: Path to the mailbox file.
-        passphrase: Passphrase for decryption.
+        expire: Also drop messages whose TTL has passed.
+        now: Reference time for expiry (defaults to the current time).
     
     Returns:
-        List of decrypted message dictionaries.
-        Each message includes all original fields with 'body' decrypted.
+        Number of bytes reclaimed.
     
     Raises:
         FileNotFoundError: If mailbox doesn't exist.
-        ValueError: If decryption fails.
     """
-    mailbox = load_mailbox(mailbox_path)
+    with mailbox_lock(mailbox_path):
+        size_before = mailbox_path.stat().st_size
+        mailbox, garbage = _load_mailbox_with_garbage(mailbox_path)
+        
+        if expire:
+            mail_list = mailbox.get("mail", [])
+            mailbox["mail"] = [m for m in mail_list if not is_expired(m, now)]
+            garbage += len(mail_list) - len(mailbox["mail"])
+            
+            # Sweeping many mailboxes: skip rewriting ones with nothing to drop
+            if garbage == 0 and read_mailbox_header(mailbox_path) is not None:
+                return 0
+        
+        save_mailbox(mailbox_path, mailbox)
+        return max(0, size_before - mailbox_path.stat().st_size)
+
+
+def get_mailbox_kek(mailbox: dict[str, Any], passphrase: str) -> bytes:
+    """
+    Derive the key-encryption key for a version 2 mailbox.
     
-    decrypted_messages = []
+    Args:
+        mailbox: Mailbox dictionary (only the header fields are used).
+        passphrase: Mailbox passphrase.
     
-    for mail_record in mailbox.get("mail", []):
-        try:
-            # Decrypt the body
-            plaintext = mailbox_crypto.decrypt_from_base64(
-                passphrase,
-                mail_record["salt"],
-                mail_record["iv"],
-                mail_record["enc_body"]
-            )
-            
-            # Create decrypted message
-            decrypted = {
-                "id": mail_record["id"],
-                "body": plaintext,
-                "sent_at": mail_record["sent_at"],
-                "from": mail_record["from"],
-                "metadata": mail_record.get("metadata", {})
-            }
-            
-            decrypted_messages.append(decrypted)
-            
-        except ValueError as e:
-            # Re-raise with message ID for debugging
-            raise ValueError(
-                f"Failed to decrypt message {mail_record.get('id', 'unknown')}: {e}"
-            ) from e
+    Returns:
+        32-byte key-encryption key.
+    
+    Raises:
+        ValueError: If the mailbox has no salt or the passphrase is empty.
+    """
+    if not mailbox.get("salt"):
+        raise ValueError("Mailbox has no salt")
     
-    return decrypted_messages
+    salt = mailbox_crypto.base64.b64decode(mailbox["salt"])
+    return mailbox_crypto.derive_mailbox_kek(passphrase, salt)
 
 
-def get_mailbox_info(mailbox_path: Path) -> dict[str, Any] | None:
+def check_header_passphrase(header: dict[str, Any], passphrase: str) -> bool | None:
     """
-    Get metadata about a mailbox without decrypting.
+    Verify a passphrase against a mailbox's stored key-check value.
+    
+    Costs one KDF run the first time per (passphrase, salt) and nothing
+    afterwards, since the derivation is cached.
     
     Args:
-        mailbox_path: Path to the mailbox file.
+        header: Mailbox header (or full mailbox) dictionary.
+        passphrase: Passphrase to verify.
     
     Returns:
-        Dictionary with mailbox info, or None if not found.
+        True or False, or None if the mailbox predates key-check values.
     """
-    if not mailbox_path.exists():
+    if not header.get("check") or not header.get("salt"):
         return None
     
-    mailbox = load_mailbox(mailbox_path)
-    
-    return {
-        "version": mailbox.get("version"),
-        "cipher": mailbox.get("cipher"),
-        "kdf": mailbox.get("kdf"),
-        "message_count": len(mailbox.get("mail", [])),
-        "path": str(mailbox_path)
-    }
+    return mailbox_crypto.verify_key_check(
+        passphrase,
+        mailbox_crypto.base64.b64decode(header["salt"]),
+        mailbox_crypto.base64.b64decode(header["check"])
+    )
 
 
-def list_mailboxes(mailbox_dir: Path | None = None) -> list[str]:
+def encrypt_mail_body(
+    mailbox: dict[str, Any],
+    message_id: str,
+    body: str,
+    passphrase: str,
+    kek: bytes | None = None
+) -> dict[str, str]:
     """
-    List all recipient IDs that have mailboxes.
+    Encrypt a message body in the record format of the mailbox's version.
     
     Args:
-        mailbox_dir: Optional override for mailbox directory.
+        mailbox: Mailbox dictionary the record will belong to.
+        message_id: ID of the message (authenticated in version 2).
+        body: Plaintext body.
+        passphrase: Mailbox passphrase.
+        kek: Optional pre-derived key-encryption key.
     
     Returns:
-        List of recipient IDs.
+        Dictionary of encrypted record fields.
     """
-    if mailbox_dir is None:
-        mailbox_dir = DEFAULT_MAILBOX_DIR
-    
-    if not mailbox_dir.exists():
-        return []
-    
-    recipients = []
-    for file in mailbox_dir.glob("*.json"):
-        # Remove .json extension to get recipient ID
-        recipients.append(file.stem)
+    if mailbox.get("version", 1) >= 2:
+        if kek is None:
+            kek = get_mailbox_kek(mailbox, passphrase)
+        return mailbox_crypto.encrypt_with_kek_to_base64(
+            kek, body, message_id.encode("utf-8")
+        )
     
-    return sorted(recipients)
+    # Version 1: per-message salt
+    return mailbox_crypto.encrypt_to_base64(passphrase, body)
 
 
-def delete_message(
-    mailbox_path: Path,
-    message_id: str,
-    passphrase: str
-) -> bool:
+def decrypt_mail_record(
+    mailbox: dict[str, Any],
+    mail_record: dict[str, Any],
+    passphrase: str,
+    kek: bytes | None = None
+) -> str:
     """
-    Delete a message from a mailbox.
+    Decrypt the body of a single mail record.
     
-    Requires passphrase to verify access before deletion.
+    Records written with a wrapped data key are decrypted with the mailbox
+    KEK; records carrying their own salt use the version 1 scheme.
     
     Args:
-        mailbox_path: Path to the mailbox file.
-        message_id: ID of the message to delete.
-        passphrase: Passphrase to verify access.
+        mailbox: Mailbox dictionary the record belongs to.
+        mail_record: Encrypted mail record.
+        passphrase: Mailbox passphrase.
+        kek: Optional pre-derived key-encryption key.
     
     Returns:
-        True if message was deleted, False if not found.
+        Decrypted body.
     
     Raises:
-        FileNotFoundError: If mailbox doesn't exist.
-        ValueError: If passphrase is incorrect.
+        ValueError: If decryption fails.
     """
-    mailbox = load_mailbox(mailbox_path)
+    if "wrapped_key" in mail_record:
+        if kek is None:
+            kek = get_mailbox_kek(mailbox, passphrase)
+        return mailbox_crypto.decrypt_with_kek_from_base64(
+            kek,
+            mail_record["iv"],
+            mail_record["enc_body"],
+            mail_record["wrapped_key"],
+            mail_record["wrap_iv"],
+            mail_record["id"].encode("utf-8")
+        )
     
-    # Find and verify we can decrypt at least one message
-    # (confirms passphrase is correct)
-    mail_list = mailbox.get("mail", [])
+    return mailbox_crypto.decrypt_from_base64(
+        passphrase,
+        mail_record["salt"],
+        mail_record["iv"],
+        mail_record["enc_body"]
+    )
+
+
+def build_mail_record(
+    mailbox: dict[str, Any],
+    message_dict: dict[str, Any],
+    passphrase: str
+) -> dict[str, Any]:
+    """
+    Validate a message and build its encrypted mail record.
     
-    if mail_list:
-        # Try to decrypt first message to verify passphrase
-        first = mail_list[0]
-        try:
-            mailbox_crypto.decrypt_from_base64(
-                passphrase,
-                first["salt"],
-                first["iv"],
-                first["enc_body"]
-            )
-        except ValueError:
-            raise ValueError("Incorrect passphrase")
+    Args:
+        mailbox: Mailbox (header fields suffice) the record will belong to.
+        message_dict: Message to add. Must contain:
+            - body: The message body (will be encrypted)
+            - from: Sender identifier
+            Optionally:
+            - metadata: Additional metadata dict
+            - sent_at: Send time (datetime or ISO 8601), defaults to now
+        passphrase: Passphrase for encryption.
     
-    # Find and remove the message
-    original_count = len(mail_list)
-    mailbox["mail"] = [m for m in mail_list if m.get("id") != message_id]
+    Returns:
+        Encrypted mail record with a new message ID.
     
-    if len(mailbox["mail"]) < original_count:
-        save_mailbox(mailbox_path, mailbox)
-        return True
+    Raises:
+        ValueError: If message_dict is missing required fields.
+    """
+    if "body" not in message_dict:
+        raise ValueError("Message must contain 'body' field")
+    if "from" not in message_dict:
+        raise ValueError("Message must contain 'from' field")
+    
+    # Generate message ID
+    message_id = str(uuid.uuid4())
+    
+    # Encrypt the body in the mailbox's record format
+    encrypted = encrypt_mail_body(
+        mailbox, message_id, message_dict["body"], passphrase
+    )
     
-    return False
+    return {
+        "id": message_id,
+        **encrypted,
+        "sent_at": _normalize_timestamp(
+            message_dict.get("sent_at") or datetime.now(timezone.utc)
+        ),
+        "from": message_dict["from"],
+        "metadata": message_dict.get("metadata", {})
+    }
 
 
-# For testing when run directly
-if __name__ == "__main__":
-    import tempfile
+def _decrypt_record_worker(
+    passphrase: str,
+    salt_b64: str,
+    iv_b64: str,
+    enc_body_b64: str
+) -> str:
+    """Decrypt one per-message-salt record in a worker process."""
+    return mailbox_crypto.decrypt_from_base64(
+        passphrase,
+        salt_b64,
+        iv_b64,
+        enc_body_b64
+    )
+
+
+def get_decrypt_workers(
+    requested: int | None,
+    record_count: int,
+    memory_budget: int = DEFAULT_DECRYPT_MEMORY_BUDGET
+) -> int:
+    """
+    Determine how many worker processes parallel decryption may use.
+    
+    Each concurrent KDF run reserves its full memory cost, so the worker
+    count is capped by the memory budget as well as the CPU count and the
+    number of records that need their own KDF run.
+    
+    Args:
+        requested: Requested worker count (None or 0 uses the CPU count).
+        record_count: Number of records needing a KDF run each.
+        memory_budget: Bytes available for concurrent KDF runs.
+    
+    Returns:
+        Worker count, at least 1.
+    """
+    workers = requested or os.cpu_count() or 1
+    
+    kdf_memory = mailbox_crypto.get_kdf_memory_bytes()
+    if kdf_memory:
+        workers = min(workers, memory_budget // kdf_memory)
+    
+    return max(1, min(workers, record_count))
+
+
+def decrypted_message(mail_record: dict[str, Any], plaintext: str) -> dict[str, Any]:
+    """Build the decrypted message dictionary for a mail record."""
+    return {
+        "id": mail_record["id"],
+        "body": plaintext,
+        "sent_at": mail_record["sent_at"],
+        "from": mail_record["from"],
+        "metadata": mail_record.get("metadata", {}),
+        "read_at": mail_record.get("read_at")
+    }
+
+
+def iter_mail_records(
+    mailbox: dict[str, Any],
+    mail_records: list[dict[str, Any]],
+    passphrase: str,
+    workers: int = 1,
+    memory_budget: int = DEFAULT_DECRYPT_MEMORY_BUDGET
+) -> Iterator[dict[str, Any]]:
+    """
+    Lazily decrypt mail records belonging to a mailbox.
+    
+    Each record is decrypted only when the caller asks for it. Records that
+    carry their own salt (version 1) need a full KDF run each; with
+    ``workers`` > 1 those runs are fanned out to a process pool.
+    Wrapped-key records share one KEK and are decrypted in this process.
+    Message order is preserved, and the first failing message (in mailbox
+    order) is reported.
+    
+    Args:
+        mailbox: Mailbox (header fields suffice) the records belong to.
+        mail_records: Encrypted mail records.
+        passphrase: Passphrase for decryption.
+        workers: Maximum worker processes (1 decrypts serially, 0 uses
+            the CPU count).
+        memory_budget: Bytes available for concurrent KDF runs.
+    
+    Yields:
+        Decrypted message dictionaries.
+    
+    Raises:
+        ValueError: If decryption fails.
+    """
+    salted_records = [r for r in mail_records if "wrapped_key" not in r]
+    pool_size = get_decrypt_workers(workers, len(salted_records), memory_budget)
+    
+    executor = None
+    pool_results = iter(())
+    
+    if pool_size > 1:
+        executor = ProcessPoolExecutor(max_workers=pool_size)
+        pool_results = executor.map(
+            _decrypt_record_worker,
+            [passphrase] * len(salted_records),
+            [r["salt"] for r in salted_records],
+            [r["iv"] for r in salted_records],
+            [r["enc_body"] for r in salted_records]
+        )
+    
+    kek = None
+    
+    try:
+        for mail_record in mail_records:
+            try:
+                if executor is not None and "wrapped_key" not in mail_record:
+                    plaintext = next(pool_results)
+                else:
+                    # Derive the mailbox KEK once for all wrapped-key records
+                    if kek is None and "wrapped_key" in mail_record:
+                        kek = get_mailbox_kek(mailbox, passphrase)
+                    
+                    # Decrypt the body
+                    plaintext = decrypt_mail_record(
+                        mailbox, mail_record, passphrase, kek
+                    )
+                
+            except ValueError as e:
+                # Re-raise with message ID for debugging
+                raise ValueError(
+                    f"Failed to decrypt message {mail_record.get('id', 'unknown')}: {e}"
+                ) from e
+            
+            yield decrypted_message(mail_record, plaintext)
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+def decrypt_mail_records(
+    mailbox: dict[str, Any],
+    mail_records: list[dict[str, Any]],
+    passphrase: str,
+    workers: int = 1,
+    memory_budget: int = DEFAULT_DECRYPT_MEMORY_BUDGET
+) -> list[dict[str, Any]]:
+    """
+    Decrypt a list of mail records belonging to a mailbox.
+    
+    See iter_mail_records() for ordering, parallelism and errors.
+    
+    Returns:
+        List of decrypted message dictionaries.
+    
+    Raises:
+        ValueError: If decryption fails.
+    """
+    return list(
+        iter_mail_records(mailbox, mail_records, passphrase, workers, memory_budget)
+    )
+
+
+def _normalize_timestamp(value: datetime | str) -> str:
+    """Normalize a datetime or ISO 8601 string to a UTC ISO string."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).isoformat()
+
+
+def select_mail_records(
+    mail_records: list[dict[str, Any]],
+    since: datetime | str | None = None,
+    limit: int | None = None,
+    newest_first: bool = False,
+    unread_only: bool = False
+) -> list[dict[str, Any]]:
+    """
+    Filter and page mail records using only their plaintext fields.
+    
+    Args:
+        mail_records: Records in mailbox (oldest first) order.
+        since: Only records sent at or after this time.
+        limit: Maximum number of records to return.
+        newest_first: Return the newest records first.
+        unread_only: Only records without a read marker.
+    
+    Returns:
+        Selected records.
+    """
+    selected = mail_records
+    
+    if since is not None:
+        since_iso = _normalize_timestamp(since)
+        selected = [
+            r for r in selected
+            if _normalize_timestamp(r["sent_at"]) >= since_iso
+        ]
+    
+    if unread_only:
+        selected = [r for r in selected if not r.get("read_at")]
+    
+    if newest_first:
+        selected = list(reversed(selected))
+    
+    if limit is not None:
+        selected = selected[:limit]
+    
+    return selected
+
+
+def migrate_mail_records(mailbox: dict[str, Any], passphrase: str) -> int:
+    """
+    Upgrade a loaded version 1 mailbox to the current format in memory.
+    
+    Every per-message-salt record is decrypted and re-encrypted under a
+    fresh data key wrapped by the mailbox KEK, and a key-check value is
+    added if the mailbox lacks one. Message IDs, timestamps, senders and
+    metadata are preserved. The mailbox is only modified once every
+    record has been decrypted successfully.
+    
+    Args:
+        mailbox: Full mailbox dictionary (modified in place).
+        passphrase: Mailbox passphrase.
+    
+    Returns:
+        Number of records re-encrypted (0 if already current).
+    
+    Raises:
+        ValueError: If any record fails to decrypt.
+    """
+    if mailbox.get("version", 1) >= MAILBOX_VERSION and mailbox.get("check"):
+        return 0
+    
+    upgraded = {k: v for k, v in mailbox.items() if k != "mail"}
+    
+    if not upgraded.get("salt"):
+        salt = mailbox_crypto.generate_salt()
+        upgraded["salt"] = mailbox_crypto.base64.b64encode(salt).decode("ascii")
+    
+    # Prove the passphrase on an existing wrapped-key record before
+    # recording a key-check value for it
+    wrapped = [r for r in mailbox.get("mail", []) if "wrapped_key" in r]
+    if wrapped:
+        try:
+            decrypt_mail_record(mailbox, wrapped[0], passphrase)
+        except ValueError:
+            raise ValueError("Incorrect passphrase")
+    
+    salt = mailbox_crypto.base64.b64decode(upgraded["salt"])
+    check = mailbox_crypto.compute_key_check(passphrase, salt)
+    
+    upgraded["version"] = MAILBOX_VERSION
+    upgraded["cipher"] = mailbox_crypto.get_cipher_name()
+    upgraded["kdf"] = mailbox_crypto.get_kdf_name()
+    upgraded["check"] = mailbox_crypto.base64.b64encode(check).decode("ascii")
+    kek = get_mailbox_kek(upgraded, passphrase)
+    
+    migrated_mail = []
+    migrated_count = 0
+    
+    for mail_record in mailbox.get("mail", []):
+        if "wrapped_key" in mail_record:
+            migrated_mail.append(mail_record)
+            continue
+        
+        try:
+            plaintext = decrypt_mail_record(mailbox, mail_record, passphrase)
+        except ValueError as e:
+            raise ValueError(
+                f"Failed to decrypt message {mail_record.get('id', 'unknown')}: {e}"
+            ) from e
+        
+        encrypted = encrypt_mail_body(
+            upgraded, mail_record["id"], plaintext, passphrase, kek
+        )
+        upgraded_record = {
+            "id": mail_record["id"],
+            **encrypted,
+            "sent_at": mail_record["sent_at"],
+            "from": mail_record["from"],
+            "metadata": mail_record.get("metadata", {})
+        }
+        if mail_record.get("read_at"):
+            upgraded_record["read_at"] = mail_record["read_at"]
+        migrated_mail.append(upgraded_record)
+        migrated_count += 1
+    
+    mailbox.update(upgraded)
+    mailbox["mail"] = migrated_mail
+    
+    return migrated_count
+
+
+class MailboxStore:
+    """
+    Base class for mailbox storage backends.
+    
+    Backends implement the storage primitives (load, append, remove, ...)
+    keyed by recipient ID; the encrypted mailbox operations are shared and
+    never see how records are stored.
+    """
+    
+    name = "base"
+    
+    def location(self, recipient_id: str) -> str:
+        """Describe where a recipient's mailbox is stored."""
+        raise NotImplementedError
+    
+    def exists(self, recipient_id: str) -> bool:
+        """Check whether a recipient has a mailbox."""
+        raise NotImplementedError
+    
+    def list_recipients(self) -> list[str]:
+        """List all recipient IDs that have mailboxes, sorted."""
+        raise NotImplementedError
+    
+    def load(self, recipient_id: str) -> dict[str, Any]:
+        """
+        Load a full mailbox (header fields plus 'mail' list).
+        
+        Raises:
+            FileNotFoundError: If the mailbox doesn't exist.
+        """
+        raise NotImplementedError
+    
+    def load_header(self, recipient_id: str) -> dict[str, Any]:
+        """
+        Load only the mailbox header fields.
+        
+        Raises:
+            FileNotFoundError: If the mailbox doesn't exist.
+        """
+        raise NotImplementedError
+    
+    def replace(self, recipient_id: str, mailbox: dict[str, Any]) -> None:
+        """Create or overwrite a mailbox with the given contents."""
+        raise NotImplementedError
+    
+    def append(
+        self,
+        recipient_id: str,
+        mail_record: dict[str, Any],
+        header: dict[str, Any]
+    ) -> None:
+        """
+        Append one mail record, creating the mailbox from ``header`` if
+        it doesn't exist yet.
+        """
+        raise NotImplementedError
+    
+    def remove(self, recipient_id: str, message_id: str) -> bool:
+        """Remove one mail record. Returns False if it wasn't found."""
+        raise NotImplementedError
+    
+    def info(self, recipient_id: str) -> dict[str, Any] | None:
+        """
+        Return mailbox metadata without decrypting, or None.
+        
+        The dictionary has version, cipher, kdf, message_count,
+        unread_count, last_sent_at, bytes and path.
+        """
+        raise NotImplementedError
+    
+    def list_info(self) -> dict[str, dict[str, Any] | None]:
+        """Return info() for every recipient, keyed by recipient ID."""
+        return {rid: self.info(rid) for rid in self.list_recipients()}
+    
+    def mark_read(self, recipient_id: str, message_ids: list[str]) -> int:
+        """Mark messages as read. Returns how many were newly marked."""
+        raise NotImplementedError
+    
+    def select(
+        self,
+        recipient_id: str,
+        since: datetime | str | None = None,
+        limit: int | None = None,
+        newest_first: bool = False,
+        unread_only: bool = False
+    ) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+        """
+        Select encrypted records by their plaintext fields.
+        
+        Backends with an index override this to avoid loading every record.
+        
+        Returns:
+            Tuple of (mailbox header, selected records).
+        
+        Raises:
+            FileNotFoundError: If the mailbox doesn't exist.
+        """
+        mailbox = self.load(recipient_id)
+        records = select_mail_records(
+            mailbox.pop("mail", []), since, limit, newest_first, unread_only
+        )
+        return mailbox, records
+    
+    def compact(
+        self,
+        recipient_id: str,
+        expire: bool = False,
+        now: datetime | None = None
+    ) -> int:
+        """
+        Reclaim space held by removed records, optionally dropping
+        messages whose TTL has passed. Returns bytes reclaimed.
+        """
+        return 0
+    
+    def state_path(self, name: str) -> Path:
+        """Path for a small maintenance state file kept with the mailboxes."""
+        raise NotImplementedError
+    
+    def locked(self, recipient_id: str):
+        """
+        Context manager holding the writer lock for a mailbox.
+        
+        Read-modify-write operations run inside it so concurrent writers
+        cannot interleave. Must be re-entrant within a thread.
+        """
+        return nullcontext()
+    
+    def close(self) -> None:
+        """Release any resources held by the backend."""
+    
+    def verify_passphrase(self, recipient_id: str, passphrase: str) -> bool:
+        """
+        Check a passphrase against a mailbox.
+        
+        Uses the stored key-check value (one cached KDF run). Mailboxes
+        that predate key-check values fall back to decrypting their first
+        message; an empty one of those accepts any passphrase until it is
+        migrated.
+        
+        Raises:
+            FileNotFoundError: If mailbox doesn't exist.
+        """
+        verdict = check_header_passphrase(self.load_header(recipient_id), passphrase)
+        if verdict is not None:
+            return verdict
+        
+        mailbox = self.load(recipient_id)
+        mail_list = mailbox.get("mail", [])
+        
+        if not mail_list:
+            return True
+        
+        try:
+            decrypt_mail_record(mailbox, mail_list[0], passphrase)
+            return True
+        except ValueError:
+            return False
+    
+    def append_message(
+        self,
+        recipient_id: str,
+        message_dict: dict[str, Any],
+        passphrase: str
+    ) -> str:
+        """
+        Append an encrypted message, creating the mailbox if needed.
+        
+        Returns:
+            The message ID assigned to the new message.
+        """
+        # Warm the key cache outside the lock so concurrent writers don't
+        # queue behind each other's KDF runs
+        if self.exists(recipient_id):
+            header = self.load_header(recipient_id)
+            if header.get("version", 1) >= 2 and header.get("salt"):
+                get_mailbox_kek(header, passphrase)
+        
+        with self.locked(recipient_id):
+            if self.exists(recipient_id):
+                header = self.load_header(recipient_id)
+            else:
+                header = create_empty_mailbox(passphrase)
+            
+            if check_header_passphrase(header, passphrase) is False:
+                raise ValueError("Incorrect passphrase")
+            
+            mail_record = build_mail_record(header, message_dict, passphrase)
+            self.append(recipient_id, mail_record, header)
+        
+        return mail_record["id"]
+    
+    def iter_messages(
+        self,
+        recipient_id: str,
+        passphrase: str,
+        since: datetime | str | None = None,
+        limit: int | None = None,
+        newest_first: bool = False,
+        unread_only: bool = False,
+        workers: int = 1,
+        memory_budget: int = DEFAULT_DECRYPT_MEMORY_BUDGET
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Lazily decrypt the messages selected by the given filters.
+        
+        Filtering and paging happen on plaintext fields before anything is
+        decrypted, and each message is decrypted only when iterated.
+        
+        Raises:
+            FileNotFoundError: If mailbox doesn't exist.
+            ValueError: If the passphrase is wrong or decryption fails.
+        """
+        header, records = self.select(
+            recipient_id, since, limit, newest_first, unread_only
+        )
+        
+        if check_header_passphrase(header, passphrase) is False:
+            raise ValueError("Incorrect passphrase")
+        
+        yield from iter_mail_records(
+            header, records, passphrase, workers, memory_budget
+        )
+    
+    def decrypt(
+        self,
+        recipient_id: str,
+        passphrase: str,
+        workers: int = 1,
+        memory_budget: int = DEFAULT_DECRYPT_MEMORY_BUDGET
+    ) -> list[dict[str, Any]]:
+        """Decrypt all messages in a recipient's mailbox."""
+        return list(self.iter_messages(
+            recipient_id,
+            passphrase,
+            workers=workers,
+            memory_budget=memory_budget
+        ))
+    
+    def delete_message(
+        self,
+        recipient_id: str,
+        message_id: str,
+        passphrase: str
+    ) -> bool:
+        """
+        Delete a message after verifying the passphrase.
+        
+        Raises:
+            FileNotFoundError: If mailbox doesn't exist.
+            ValueError: If passphrase is incorrect.
+        """
+        with self.locked(recipient_id):
+            if not self.verify_passphrase(recipient_id, passphrase):
+                raise ValueError("Incorrect passphrase")
+            
+            return self.remove(recipient_id, message_id)
+    
+    def migrate(self, recipient_id: str, passphrase: str) -> int:
+        """Upgrade a recipient's mailbox to the current format."""
+        with self.locked(recipient_id):
+            mailbox = self.load(recipient_id)
+            
+            if mailbox.get("version", 1) >= MAILBOX_VERSION and mailbox.get("check"):
+                return 0
+            
+            migrated = migrate_mail_records(mailbox, passphrase)
+            self.replace(recipient_id, mailbox)
+        
+        return migrated
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+
+class JsonFileStore(MailboxStore):
+    """
+    Mailbox backend storing one journal file per recipient.
+    
+    Files live at <mailbox_dir>/<recipient_id>.json (see the module
+    docstring for the journal layout). This is the default backend.
+    """
+    
+    name = "json"
+    
+    def __init__(self, mailbox_dir: Path | None = None):
+        self.mailbox_dir = Path(mailbox_dir) if mailbox_dir else DEFAULT_MAILBOX_DIR
+    
+    def path_for(self, recipient_id: str) -> Path:
+        """Get the mailbox file path for a recipient."""
+        return get_mailbox_path(recipient_id, self.mailbox_dir)
+    
+    def location(self, recipient_id: str) -> str:
+        return str(self.path_for(recipient_id))
+    
+    def exists(self, recipient_id: str) -> bool:
+        return self.path_for(recipient_id).exists()
+    
+    def list_recipients(self) -> list[str]:
+        if not self.mailbox_dir.exists():
+            return []
+        
+        # Remove .json extension to get recipient ID
+        return sorted(file.stem for file in self.mailbox_dir.glob("*.json"))
+    
+    def load(self, recipient_id: str) -> dict[str, Any]:
+        return load_mailbox(self.path_for(recipient_id))
+    
+    def load_header(self, recipient_id: str) -> dict[str, Any]:
+        mailbox_path = self.path_for(recipient_id)
+        header = read_mailbox_header(mailbox_path)
+        
+        if header is None:
+            # Legacy single-document mailbox
+            header = load_mailbox(mailbox_path)
+            header.pop("mail", None)
+        else:
+            header.pop("format", None)
+        
+        return header
+    
+    def replace(self, recipient_id: str, mailbox: dict[str, Any]) -> None:
+        with self.locked(recipient_id):
+            save_mailbox(self.path_for(recipient_id), mailbox)
+    
+    def append(
+        self,
+        recipient_id: str,
+        mail_record: dict[str, Any],
+        header: dict[str, Any]
+    ) -> None:
+        mailbox_path = self.path_for(recipient_id)
+        
+        with self.locked(recipient_id):
+            # Missing and legacy mailboxes are written out as journals first
+            if not mailbox_path.exists():
+                save_mailbox(mailbox_path, {**header, "mail": [mail_record]})
+                return
+            
+            if read_mailbox_header(mailbox_path) is None:
+                save_mailbox(mailbox_path, load_mailbox(mailbox_path))
+            
+            summary = read_mailbox_index(mailbox_path)
+            append_journal_entry(mailbox_path, {"op": "add", "mail": mail_record})
+            
+            if summary is None:
+                summary = summarize_mailbox(load_mailbox(mailbox_path))
+            else:
+                sent_at = _normalize_timestamp(mail_record["sent_at"])
+                summary["message_count"] += 1
+                summary["unread_count"] += 1
+                summary["last_sent_at"] = max(filter(None, [
+                    summary["last_sent_at"], sent_at
+                ]))
+            
+            write_mailbox_index(mailbox_path, summary)
+    
+    def remove(self, recipient_id: str, message_id: str) -> bool:
+        mailbox_path = self.path_for(recipient_id)
+        
+        with self.locked(recipient_id):
+            mailbox, garbage = _load_mailbox_with_garbage(mailbox_path)
+            mail_list = mailbox.get("mail", [])
+            
+            if not any(m.get("id") == message_id for m in mail_list):
+                return False
+            
+            if read_mailbox_header(mailbox_path) is None:
+                save_mailbox(mailbox_path, mailbox)
+            
+            append_journal_entry(mailbox_path, {"op": "del", "id": message_id})
+            
+            mailbox["mail"] = [m for m in mail_list if m.get("id") != message_id]
+            write_mailbox_index(mailbox_path, summarize_mailbox(mailbox))
+            
+            # Compact once dead entries (the deleted add plus its tombstone)
+            # outweigh the live messages
+            garbage += 2
+            live_count = len(mailbox["mail"])
+            if garbage >= COMPACTION_MIN_GARBAGE and garbage > live_count:
+                compact_mailbox(mailbox_path)
+        
+        return True
+    
+    def info(self, recipient_id: str) -> dict[str, Any] | None:
+        mailbox_path = self.path_for(recipient_id)
+        
+        if not mailbox_path.exists():
+            return None
+        
+        index = read_mailbox_index(mailbox_path)
+        
+        if index is None:
+            # Missing or stale index: rebuild it from the journal
+            with self.locked(recipient_id):
+                write_mailbox_index(
+                    mailbox_path, summarize_mailbox(load_mailbox(mailbox_path))
+                )
+                index = read_mailbox_index(mailbox_path)
+        
+        return {
+            "version": index["version"],
+            "cipher": index["cipher"],
+            "kdf": index["kdf"],
+            "message_count": index["message_count"],
+            "unread_count": index["unread_count"],
+            "last_sent_at": index["last_sent_at"],
+            "bytes": index["bytes"],
+            "path": str(mailbox_path)
+        }
+    
+    def mark_read(self, recipient_id: str, message_ids: list[str]) -> int:
+        mailbox_path = self.path_for(recipient_id)
+        
+        with self.locked(recipient_id):
+            mailbox = load_mailbox(mailbox_path)
+            wanted = set(message_ids)
+            unread = [
+                m["id"] for m in mailbox.get("mail", [])
+                if m["id"] in wanted and not m.get("read_at")
+            ]
+            
+            if not unread:
+                return 0
+            
+            if read_mailbox_header(mailbox_path) is None:
+                save_mailbox(mailbox_path, mailbox)
+            
+            read_at = datetime.now(timezone.utc).isoformat()
+            append_journal_entry(mailbox_path, {
+                "op": "read",
+                "ids": unread,
+                "at": read_at
+            })
+            
+            for mail_record in mailbox["mail"]:
+                if mail_record["id"] in unread:
+                    mail_record["read_at"] = read_at
+            write_mailbox_index(mailbox_path, summarize_mailbox(mailbox))
+        
+        return len(unread)
+    
+    def compact(
+        self,
+        recipient_id: str,
+        expire: bool = False,
+        now: datetime | None = None
+    ) -> int:
+        return compact_mailbox(self.path_for(recipient_id), expire, now)
+    
+    def state_path(self, name: str) -> Path:
+        return self.mailbox_dir / name
+    
+    def locked(self, recipient_id: str):
+        return mailbox_lock(self.path_for(recipient_id))
+
+
+class SQLiteMailboxStore(MailboxStore):
+    """
+    Mailbox backend storing every recipient in one SQLite database.
+    
+    Suited to deployments with thousands of recipients: listing and
+    counting are indexed queries instead of a directory scan and a full
+    parse per mailbox. The database runs in WAL mode so readers don't
+    block the writer.
+    """
+    
+    name = "sqlite"
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS mailboxes (
+            recipient_id TEXT PRIMARY KEY,
+            header TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS mail (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            recipient_id TEXT NOT NULL
+                REFERENCES mailboxes(recipient_id) ON DELETE CASCADE,
+            id TEXT NOT NULL,
+            sent_at TEXT NOT NULL,
+            record TEXT NOT NULL,
+            read_at TEXT
+        );
+        CREATE UNIQUE INDEX IF NOT EXISTS mail_recipient_id
+            ON mail(recipient_id, id);
+        CREATE INDEX IF NOT EXISTS mail_recipient_sent_at
+            ON mail(recipient_id, sent_at);
+    """
+    
+    # Aggregates over the mail table that make up the info() statistics
+    STATS_COLUMNS = (
+        "COUNT(id), COUNT(id) - COUNT(read_at), MAX(sent_at), "
+        "COALESCE(SUM(LENGTH(record)), 0)"
+    )
+    
+    def __init__(self, db_path: Path | None = None, timeout: float = 30.0):
+        self.db_path = Path(db_path) if db_path else DEFAULT_SQLITE_PATH
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        # Autocommit mode; transactions are opened explicitly by locked()
+        self.conn = sqlite3.connect(
+            self.db_path, timeout=timeout, isolation_level=None
+        )
+        self._lock_depth = 0
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(self.SCHEMA)
+        
+        # Databases created before read tracking lack the read_at column
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(mail)")}
+        if "read_at" not in columns:
+            self.conn.execute("ALTER TABLE mail ADD COLUMN read_at TEXT")
+    
+    def location(self, recipient_id: str) -> str:
+        return f"{self.db_path}#{sanitize_recipient_id(recipient_id)}"
+    
+    @contextmanager
+    def locked(self, recipient_id: str | None = None) -> Iterator[None]:
+        """
+        Run the enclosed operations in one write transaction.
+        
+        BEGIN IMMEDIATE takes the database write lock up front, so
+        concurrent writers queue (up to the connection timeout) instead of
+        failing on lock upgrade. Nested use joins the outer transaction.
+        """
+        if self._lock_depth == 0:
+            self.conn.execute("BEGIN IMMEDIATE")
+        self._lock_depth += 1
+        
+        try:
+            yield
+        except BaseException:
+            self._lock_depth -= 1
+            if self._lock_depth == 0:
+                self.conn.execute("ROLLBACK")
+            raise
+        
+        self._lock_depth -= 1
+        if self._lock_depth == 0:
+            self.conn.execute("COMMIT")
+    
+    def exists(self, recipient_id: str) -> bool:
+        row = self.conn.execute(
+            "SELECT 1 FROM mailboxes WHERE recipient_id = ?",
+            (sanitize_recipient_id(recipient_id),)
+        ).fetchone()
+        return row is not None
+    
+    def list_recipients(self) -> list[str]:
+        rows = self.conn.execute(
+            "SELECT recipient_id FROM mailboxes ORDER BY recipient_id"
+        ).fetchall()
+        return [row[0] for row in rows]
+    
+    def load_header(self, recipient_id: str) -> dict[str, Any]:
+        row = self.conn.execute(
+            "SELECT header FROM mailboxes WHERE recipient_id = ?",
+            (sanitize_recipient_id(recipient_id),)
+        ).fetchone()
+        
+        if row is None:
+            raise FileNotFoundError(f"No mailbox for {recipient_id}")
+        
+        return json.loads(row[0])
+    
+    @staticmethod
+    def _row_to_record(record_json: str, read_at: str | None) -> dict[str, Any]:
+        record = json.loads(record_json)
+        if read_at:
+            record["read_at"] = read_at
+        return record
+    
+    def load(self, recipient_id: str) -> dict[str, Any]:
+        mailbox = self.load_header(recipient_id)
+        rows = self.conn.execute(
+            "SELECT record, read_at FROM mail WHERE recipient_id = ? ORDER BY seq",
+            (sanitize_recipient_id(recipient_id),)
+        ).fetchall()
+        mailbox["mail"] = [self._row_to_record(*row) for row in rows]
+        return mailbox
     
+    def select(
+        self,
+        recipient_id: str,
+        since: datetime | str | None = None,
+        limit: int | None = None,
+        newest_first: bool = False,
+        unread_only: bool = False
+    ) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+        header = self.load_header(recipient_id)
+        
+        query = "SELECT record, read_at FROM mail WHERE recipient_id = ?"
+        params: list[Any] = [sanitize_recipient_id(recipient_id)]
+        
+        if since is not None:
+            query += " AND sent_at >= ?"
+            params.append(_normalize_timestamp(since))
+        if unread_only:
+            query += " AND read_at IS NULL"
+        
+        query += " ORDER BY seq DESC" if newest_first else " ORDER BY seq"
+        
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        
+        rows = self.conn.execute(query, params).fetchall()
+        return header, [self._row_to_record(*row) for row in rows]
+    
+    def mark_read(self, recipient_id: str, message_ids: list[str]) -> int:
+        if not message_ids:
+            return 0
+        
+        placeholders = ", ".join("?" for _ in message_ids)
+        with self.locked(recipient_id):
+            cursor = self.conn.execute(
+                f"UPDATE mail SET read_at = ? WHERE recipient_id = ? "
+                f"AND read_at IS NULL AND id IN ({placeholders})",
+                [
+                    datetime.now(timezone.utc).isoformat(),
+                    sanitize_recipient_id(recipient_id),
+                    *message_ids
+                ]
+            )
+        return cursor.rowcount
+    
+    def _insert_records(
+        self,
+        safe_id: str,
+        mail_records: list[dict[str, Any]]
+    ) -> None:
+        self.conn.executemany(
+            "INSERT INTO mail (recipient_id, id, sent_at, record, read_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [
+                (
+                    safe_id,
+                    r["id"],
+                    _normalize_timestamp(r["sent_at"]),
+                    json.dumps(
+                        {k: v for k, v in r.items() if k != "read_at"},
+                        separators=(",", ":")
+                    ),
+                    r.get("read_at")
+                )
+                for r in mail_records
+            ]
+        )
+    
+    def _upsert_header(self, safe_id: str, header: dict[str, Any]) -> None:
+        header_json = json.dumps(
+            {k: v for k, v in header.items() if k != "mail"},
+            separators=(",", ":")
+        )
+        self.conn.execute(
+            "INSERT INTO mailboxes (recipient_id, header) VALUES (?, ?) "
+            "ON CONFLICT(recipient_id) DO UPDATE SET header = excluded.header",
+            (safe_id, header_json)
+        )
+    
+    def replace(self, recipient_id: str, mailbox: dict[str, Any]) -> None:
+        safe_id = sanitize_recipient_id(recipient_id)
+        
+        with self.locked(safe_id):
+            self._upsert_header(safe_id, mailbox)
+            self.conn.execute("DELETE FROM mail WHERE recipient_id = ?", (safe_id,))
+            self._insert_records(safe_id, mailbox.get("mail", []))
+    
+    def append(
+        self,
+        recipient_id: str,
+        mail_record: dict[str, Any],
+        header: dict[str, Any]
+    ) -> None:
+        safe_id = sanitize_recipient_id(recipient_id)
+        
+        with self.locked(safe_id):
+            if not self.exists(safe_id):
+                self._upsert_header(safe_id, header)
+            self._insert_records(safe_id, [mail_record])
+    
+    def remove(self, recipient_id: str, message_id: str) -> bool:
+        with self.locked(recipient_id):
+            cursor = self.conn.execute(
+                "DELETE FROM mail WHERE recipient_id = ? AND id = ?",
+                (sanitize_recipient_id(recipient_id), message_id)
+            )
+        return cursor.rowcount > 0
+    
+    def info(self, recipient_id: str) -> dict[str, Any] | None:
+        try:
+            header = self.load_header(recipient_id)
+        except FileNotFoundError:
+            return None
+        
+        row = self.conn.execute(
+            f"SELECT {self.STATS_COLUMNS} FROM mail WHERE recipient_id = ?",
+            (sanitize_recipient_id(recipient_id),)
+        ).fetchone()
+        
+        return self._info_from_row(recipient_id, header, row)
+    
+    def _info_from_row(
+        self,
+        recipient_id: str,
+        header: dict[str, Any],
+        row: tuple
+    ) -> dict[str, Any]:
+        count, unread, last_sent_at, size = row
+        return {
+            "version": header.get("version"),
+            "cipher": header.get("cipher"),
+            "kdf": header.get("kdf"),
+            "message_count": count,
+            "unread_count": unread,
+            "last_sent_at": last_sent_at,
+            "bytes": size,
+            "path": self.location(recipient_id)
+        }
+    
+    def list_info(self) -> dict[str, dict[str, Any] | None]:
+        rows = self.conn.execute(
+            f"SELECT m.recipient_id, m.header, {self.STATS_COLUMNS} "
+            "FROM mailboxes m LEFT JOIN mail USING (recipient_id) "
+            "GROUP BY m.recipient_id ORDER BY m.recipient_id"
+        ).fetchall()
+        
+        return {
+            row[0]: self._info_from_row(row[0], json.loads(row[1]), row[2:])
+            for row in rows
+        }
+    
+    def compact(
+        self,
+        recipient_id: str,
+        expire: bool = False,
+        now: datetime | None = None
+    ) -> int:
+        # Deleted rows are already gone; only expiry has work to do
+        if not expire:
+            return 0
+        
+        with self.locked(recipient_id):
+            rows = self.conn.execute(
+                "SELECT seq, record FROM mail WHERE recipient_id = ? "
+                "AND json_extract(record, '$.metadata.ttl') > 0",
+                (sanitize_recipient_id(recipient_id),)
+            ).fetchall()
+            
+            expired = [
+                (seq, len(record)) for seq, record in rows
+                if is_expired(json.loads(record), now)
+            ]
+            self.conn.executemany(
+                "DELETE FROM mail WHERE seq = ?",
+                [(seq,) for seq, _ in expired]
+            )
+        
+        return sum(size for _, size in expired)
+    
+    def state_path(self, name: str) -> Path:
+        return self.db_path.with_name(f"{self.db_path.name}{name}")
+    
+    def close(self) -> None:
+        self.conn.close()
+
+
+# Registered storage backends, selectable by name
+STORE_BACKENDS = {
+    JsonFileStore.name: JsonFileStore,
+    SQLiteMailboxStore.name: SQLiteMailboxStore,
+}
+
+
+def open_store(backend: str = "json", location: Path | None = None) -> MailboxStore:
+    """
+    Open a mailbox storage backend by name.
+    
+    Args:
+        backend: Backend name ('json' or 'sqlite').
+        location: Mailbox directory (json) or database file (sqlite).
+            Defaults to the backend's standard location.
+    
+    Returns:
+        MailboxStore instance.
+    
+    Raises:
+        ValueError: If the backend name is unknown.
+    """
+    if backend not in STORE_BACKENDS:
+        raise ValueError(
+            f"Unknown mailbox backend: {backend} "
+            f"(choose from {', '.join(sorted(STORE_BACKENDS))})"
+        )
+    
+    return STORE_BACKENDS[backend](location)
+
+
+def copy_mailboxes(
+    source: MailboxStore,
+    dest: MailboxStore,
+    recipients: list[str] | None = None
+) -> int:
+    """
+    Copy mailboxes between storage backends.
+    
+    Records are copied still encrypted, so no passphrases are needed.
+    Existing mailboxes in the destination are overwritten.
+    
+    Args:
+        source: Store to read from.
+        dest: Store to write to.
+        recipients: Recipient IDs to copy (default: all).
+    
+    Returns:
+        Number of mailboxes copied.
+    """
+    if recipients is None:
+        recipients = source.list_recipients()
+    
+    copied = 0
+    for recipient_id in recipients:
+        if not source.exists(recipient_id):
+            continue
+        dest.replace(recipient_id, source.load(recipient_id))
+        copied += 1
+    
+    return copied
+
+
+def compact_all(
+    store: MailboxStore,
+    time_budget: float | None = None,
+    now: datetime | None = None
+) -> dict[str, Any]:
+    """
+    Compact and expire mailboxes incrementally within a time budget.
+    
+    Mailboxes are visited in recipient order starting after the one the
+    previous run stopped at (kept in a cursor file next to the mailboxes),
+    wrapping around, so repeated short runs from cron or the bot cover
+    every mailbox. At least one mailbox is processed per run.
+    
+    Args:
+        store: Storage backend to compact.
+        time_budget: Seconds to spend before stopping (None = no limit).
+        now: Reference time for expiry (defaults to the current time).
+    
+    Returns:
+        Dictionary with processed, remaining, expired (messages dropped)
+        and bytes_reclaimed.
+    """
+    started = time.monotonic()
+    cursor_path = store.state_path(COMPACTION_CURSOR_NAME)
+    recipients = store.list_recipients()
+    
+    try:
+        last = json.loads(cursor_path.read_text()).get("last")
+    except (OSError, json.JSONDecodeError):
+        last = None
+    
+    # Resume after the last mailbox processed, wrapping around
+    start = sum(1 for rid in recipients if last is not None and rid <= last)
+    order = recipients[start:] + recipients[:start]
+    
+    result = {"processed": 0, "remaining": len(order), "expired": 0, "bytes_reclaimed": 0}
+    
+    for recipient_id in order:
+        if (
+            time_budget is not None
+            and result["processed"]
+            and time.monotonic() - started >= time_budget
+        ):
+            break
+        
+        count_before = (store.info(recipient_id) or {}).get("message_count", 0)
+        result["bytes_reclaimed"] += store.compact(recipient_id, expire=True, now=now)
+        count_after = (store.info(recipient_id) or {}).get("message_count", 0)
+        
+        result["expired"] += count_before - count_after
+        result["processed"] += 1
+        result["remaining"] -= 1
+        
+        cursor_path.parent.mkdir(parents=True, exist_ok=True)
+        cursor_path.write_text(json.dumps({"last": recipient_id}))
+    
+    return result
+
+
+class _SingleFileStore(JsonFileStore):
+    """JSON store pinned to one mailbox file, whatever its name."""
+    
+    def __init__(self, mailbox_path: Path):
+        super().__init__(mailbox_path.parent)
+        self.mailbox_path = mailbox_path
+    
+    def path_for(self, recipient_id: str) -> Path:
+        # The caller chose the file; don't sanitize or re-suffix its name
+        return self.mailbox_path
+    
+    def list_recipients(self) -> list[str]:
+        return [self.mailbox_path.stem] if self.mailbox_path.exists() else []
+
+
+def _file_store(mailbox_path: Path) -> tuple[JsonFileStore, str]:
+    """Resolve a mailbox file path to a store on exactly that file and its recipient ID."""
+    mailbox_path = Path(mailbox_path)
+    return _SingleFileStore(mailbox_path), mailbox_path.stem
+
+
+def append_encrypted_message(
+    mailbox_path: Path,
+    message_dict: dict[str, Any],
+    passphrase: str
+) -> str:
+    """
+    Append an encrypted message to a mailbox.
+    
+    If the mailbox doesn't exist, it will be created.
+    The message body is encrypted using the provided passphrase.
+    
+    Args:
+        mailbox_path: Path to the mailbox file.
+        message_dict: Message to add. Must contain:
+            - body: The message body (will be encrypted)
+            - from: Sender identifier
+            Optionally:
+            - metadata: Additional metadata dict
+        passphrase: Passphrase for encryption.
+    
+    Returns:
+        The message ID assigned to the new message.
+    
+    Raises:
+        ValueError: If message_dict is missing required fields.
+    """
+    store, recipient_id = _file_store(mailbox_path)
+    return store.append_message(recipient_id, message_dict, passphrase)
+
+
+def decrypt_mailbox(
+    mailbox_path: Path,
+    passphrase: str,
+    workers: int = 1,
+    memory_budget: int = DEFAULT_DECRYPT_MEMORY_BUDGET
+) -> list[dict[str, Any]]:
+    """
+    Decrypt all messages in a mailbox.
+    
+    See decrypt_mail_records() for how ``workers`` parallelizes version 1
+    records.
+    
+    Args:
+        mailbox_path: Path to the mailbox file.
+        passphrase: Passphrase for decryption.
+        workers: Maximum worker processes (1 decrypts serially, 0 uses
+            the CPU count).
+        memory_budget: Bytes available for concurrent KDF runs.
+    
+    Returns:
+        List of decrypted message dictionaries.
+        Each message includes all original fields with 'body' decrypted.
+    
+    Raises:
+        FileNotFoundError: If mailbox doesn't exist.
+        ValueError: If decryption fails.
+    """
+    store, recipient_id = _file_store(mailbox_path)
+    return store.decrypt(recipient_id, passphrase, workers, memory_budget)
+
+
+def iter_mailbox(
+    mailbox_path: Path,
+    passphrase: str,
+    since: datetime | str | None = None,
+    limit: int | None = None,
+    newest_first: bool = False,
+    unread_only: bool = False,
+    workers: int = 1
+) -> Iterator[dict[str, Any]]:
+    """
+    Lazily decrypt a page of messages from a mailbox.
+    
+    Records are filtered by sent_at and read state and paged before any
+    decryption; each message is decrypted only when iterated, so reading
+    the latest few messages of a large mailbox costs only those messages.
+    
+    Args:
+        mailbox_path: Path to the mailbox file.
+        passphrase: Passphrase for decryption.
+        since: Only messages sent at or after this time (datetime or
+            ISO 8601 string).
+        limit: Maximum number of messages to yield.
+        newest_first: Yield the newest messages first.
+        unread_only: Only messages not yet marked read.
+        workers: Worker processes for version 1 records.
+    
+    Yields:
+        Decrypted message dictionaries.
+    
+    Raises:
+        FileNotFoundError: If mailbox doesn't exist.
+        ValueError: If the passphrase is wrong or decryption fails.
+    """
+    store, recipient_id = _file_store(mailbox_path)
+    yield from store.iter_messages(
+        recipient_id,
+        passphrase,
+        since=since,
+        limit=limit,
+        newest_first=newest_first,
+        unread_only=unread_only,
+        workers=workers
+    )
+
+
+def mark_messages_read(mailbox_path: Path, message_ids: list[str]) -> int:
+    """
+    Mark messages in a mailbox as read.
+    
+    Args:
+        mailbox_path: Path to the mailbox file.
+        message_ids: IDs of the messages to mark.
+    
+    Returns:
+        Number of messages newly marked read.
+    """
+    store, recipient_id = _file_store(mailbox_path)
+    return store.mark_read(recipient_id, message_ids)
+
+
+def get_mailbox_info(mailbox_path: Path) -> dict[str, Any] | None:
+    """
+    Get metadata about a mailbox without decrypting.
+    
+    Args:
+        mailbox_path: Path to the mailbox file.
+    
+    Returns:
+        Dictionary with mailbox info, or None if not found.
+    """
+    store, recipient_id = _file_store(mailbox_path)
+    return store.info(recipient_id)
+
+
+def list_mailboxes(mailbox_dir: Path | None = None) -> list[str]:
+    """
+    List all recipient IDs that have mailboxes.
+    
+    Args:
+        mailbox_dir: Optional override for mailbox directory.
+    
+    Returns:
+        List of recipient IDs.
+    """
+    return JsonFileStore(mailbox_dir).list_recipients()
+
+
+def delete_message(
+    mailbox_path: Path,
+    message_id: str,
+    passphrase: str
+) -> bool:
+    """
+    Delete a message from a mailbox.
+    
+    Requires passphrase to verify access before deletion.
+    
+    Args:
+        mailbox_path: Path to the mailbox file.
+        message_id: ID of the message to delete.
+        passphrase: Passphrase to verify access.
+    
+    Returns:
+        True if message was deleted, False if not found.
+    
+    Raises:
+        FileNotFoundError: If mailbox doesn't exist.
+        ValueError: If passphrase is incorrect.
+    """
+    store, recipient_id = _file_store(mailbox_path)
+    return store.delete_message(recipient_id, message_id, passphrase)
+
+
+def verify_passphrase(mailbox_path: Path, passphrase: str) -> bool:
+    """
+    Check a passphrase against a mailbox without decrypting messages.
+    
+    Args:
+        mailbox_path: Path to the mailbox file.
+        passphrase: Passphrase to verify.
+    
+    Returns:
+        True if the passphrase opens the mailbox.
+    
+    Raises:
+        FileNotFoundError: If mailbox doesn't exist.
+    """
+    store, recipient_id = _file_store(mailbox_path)
+    return store.verify_passphrase(recipient_id, passphrase)
+
+
+def migrate_mailbox(mailbox_path: Path, passphrase: str) -> int:
+    """
+    Upgrade a version 1 mailbox to the current format in place.
+    
+    See migrate_mail_records() for details.
+    
+    Args:
+        mailbox_path: Path to the mailbox file.
+        passphrase: Mailbox passphrase.
+    
+    Returns:
+        Number of records re-encrypted (0 if already current).
+    
+    Raises:
+        FileNotFoundError: If mailbox doesn't exist.
+        ValueError: If any record fails to decrypt.
+    """
+    store, recipient_id = _file_store(mailbox_path)
+    return store.migrate(recipient_id, passphrase)
+
+
+# For testing when run directly
+if __name__ == "__main__":
     print("Mailbox Operations Module")
     print(f"  Default mailbox dir: {DEFAULT_MAILBOX_DIR}")
     
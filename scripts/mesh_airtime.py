@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Mesh Airtime Module
+
+Estimates LoRa time-on-air for Meshtastic packets from the channel's
+modem preset and paces transmissions so each channel stays inside a
+configurable duty-cycle budget, instead of handing the firmware a burst
+of frames it will drop.
+
+Time-on-air follows the Semtech SX127x/SX126x formula (explicit header,
+CRC on, 16 preamble symbols as used by Meshtastic). Payload sizes are
+padded with an estimate of the Meshtastic packet overhead, so results
+are approximations suited to pacing and planning, not regulatory proof.
+"""
+
+import math
+import time
+from collections import deque
+from typing import Callable
+
+
+# Meshtastic modem presets: name -> (spreading factor, bandwidth Hz,
+# coding rate denominator 4/x)
+MODEM_PRESETS = {
+    "ShortTurbo": (7, 500_000, 5),
+    "ShortFast": (7, 250_000, 5),
+    "ShortSlow": (8, 250_000, 5),
+    "MediumFast": (9, 250_000, 5),
+    "MediumSlow": (10, 250_000, 5),
+    "LongFast": (11, 250_000, 5),
+    "LongModerate": (11, 125_000, 8),
+    "LongSlow": (12, 125_000, 8),
+    "VeryLongSlow": (12, 62_500, 8),
+}
+
+# Preset assumed for channels without one configured
+DEFAULT_MODEM_PRESET = "LongFast"
+
+# Preamble length Meshtastic configures on the radio
+PREAMBLE_SYMBOLS = 16
+
+# Approximate bytes added to the text by the Meshtastic packet header,
+# protobuf envelope and encryption
+MESH_OVERHEAD_BYTES = 32
+
+# Default airtime budget: fraction of each window a channel may transmit
+DEFAULT_DUTY_CYCLE = 0.10
+DEFAULT_DUTY_CYCLE_WINDOW = 600.0
+
+
+def get_preset(preset: str | None) -> tuple[int, int, int]:
+    """
+    Look up a modem preset's radio parameters.
+    
+    Args:
+        preset: Preset name (e.g. "LongFast"); None uses the default.
+    
+    Returns:
+        Tuple of (spreading factor, bandwidth Hz, coding rate denominator).
+    
+    Raises:
+        ValueError: If the preset is unknown.
+    """
+    name = preset or DEFAULT_MODEM_PRESET
+    
+    if name not in MODEM_PRESETS:
+        raise ValueError(
+            f"Unknown modem preset: {name} (expected one of {', '.join(MODEM_PRESETS)})"
+        )
+    
+    return MODEM_PRESETS[name]
+
+
+def time_on_air(payload_bytes: int, preset: str | None = None) -> float:
+    """
+    Estimate the time-on-air of one Meshtastic packet.
+    
+    Args:
+        payload_bytes: Size of the text or data payload in bytes.
+        preset: Modem preset name.
+    
+    Returns:
+        Time-on-air in seconds.
+    """
+    spreading_factor, bandwidth, coding_rate = get_preset(preset)
+    
+    symbol_time = (2 ** spreading_factor) / bandwidth
+    # Low data rate optimization is enabled for symbols longer than 16 ms
+    low_data_rate = 1 if symbol_time > 0.016 else 0
+    
+    packet_bytes = payload_bytes + MESH_OVERHEAD_BYTES
+    payload_symbols = 8 + max(
+        math.ceil(
+            (8 * packet_bytes - 4 * spreading_factor + 28 + 16)
+            / (4 * (spreading_factor - 2 * low_data_rate))
+        ) * coding_rate,
+        0
+    )
+    
+    return (PREAMBLE_SYMBOLS + 4.25 + payload_symbols) * symbol_time
+
+
+class TransmitScheduler:
+    """
+    Paces transmissions to respect per-channel airtime budgets.
+    
+    Before each frame, wait() blocks until the previous frame on the
+    channel has finished transmitting and the frame fits in the channel's
+    duty-cycle budget (at most duty_cycle * window seconds of airtime in
+    any sliding window).
+    """
+    
+    def __init__(
+        self,
+        channel_presets: dict[int, str] | None = None,
+        default_preset: str = DEFAULT_MODEM_PRESET,
+        duty_cycle: float = DEFAULT_DUTY_CYCLE,
+        window: float = DEFAULT_DUTY_CYCLE_WINDOW,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        """
+        Initialize the scheduler.
+        
+        Args:
+            channel_presets: Modem preset per channel index.
+            default_preset: Preset for channels not in channel_presets.
+            duty_cycle: Fraction of the window a channel may transmit (0-1].
+            window: Sliding window length in seconds.
+            clock: Time source (monotonic seconds).
+            sleep: Function used to wait.
+        
+        Raises:
+            ValueError: If a preset is unknown or duty_cycle is out of range.
+        """
+        if not 0 < duty_cycle <= 1:
+            raise ValueError(f"duty_cycle must be in (0, 1], got {duty_cycle}")
+        
+        self.channel_presets = dict(channel_presets or {})
+        self.default_preset = default_preset
+        self.duty_cycle = duty_cycle
+        self.window = window
+        self._clock = clock
+        self._sleep = sleep
+        
+        for preset in [default_preset, *self.channel_presets.values()]:
+            get_preset(preset)
+        
+        # channel -> deque of (start time, airtime) inside the window
+        self._history: dict[int, deque] = {}
+        # channel -> time the last frame finishes transmitting
+        self._busy_until: dict[int, float] = {}
+        
+        self.frames_sent = 0
+        self.total_airtime = 0.0
+        self.total_wait = 0.0
+    
+    def preset_for(self, channel: int) -> str:
+        """Get the modem preset used on a channel."""
+        return self.channel_presets.get(channel, self.default_preset)
+    
+    def airtime(self, channel: int, payload_bytes: int) -> float:
+        """Estimate a frame's time-on-air on a channel."""
+        return time_on_air(payload_bytes, self.preset_for(channel))
+    
+    def delay_for(self, channel: int, airtime: float, now: float | None = None) -> float:
+        """
+        Compute how long a frame must wait before it may be sent.
+        
+        Args:
+            channel: Channel index.
+            airtime: Frame time-on-air in seconds.
+            now: Current time (defaults to the scheduler clock).
+        
+        Returns:
+            Seconds to wait (0 if the frame can go now).
+        """
+        if now is None:
+            now = self._clock()
+        
+        start = max(now, self._busy_until.get(channel, now))
+        budget = self.duty_cycle * self.window
+        history = [
+            entry for entry in self._history.get(channel, ())
+            if entry[0] > start - self.window
+        ]
+        
+        # Slide forward until enough old airtime has left the window; a frame
+        # larger than the whole budget goes once the window is empty
+        while history and sum(a for _, a in history) + airtime > budget:
+            start = max(start, history[0][0] + self.window)
+            # The oldest entry has left the window by definition; dropping it
+            # explicitly guards against float rounding in the comparison
+            history = [entry for entry in history[1:] if entry[0] > start - self.window]
+        
+        return start - now
+    
+    def wait(self, channel: int, payload_bytes: int) -> float:
+        """
+        Block until a frame may be sent, then record its airtime.
+        
+        Args:
+            channel: Channel index.
+            payload_bytes: Frame size in bytes.
+        
+        Returns:
+            Seconds waited.
+        """
+        airtime = self.airtime(channel, payload_bytes)
+        delay = self.delay_for(channel, airtime)
+        
+        if delay > 0:
+            self._sleep(delay)
+        
+        start = self._clock()
+        history = self._history.setdefault(channel, deque())
+        while history and history[0][0] <= start - self.window:
+            history.popleft()
+        history.append((start, airtime))
+        self._busy_until[channel] = start + airtime
+        
+        self.frames_sent += 1
+        self.total_airtime += airtime
+        self.total_wait += delay
+        return delay
+    
+    def plan(self, frames: list[tuple[int, int]]) -> dict[str, float]:
+        """
+        Predict the airtime and duration of a transmission without sending.
+        
+        Args:
+            frames: (channel, payload bytes) for each frame, in send order.
+        
+        Returns:
+            Dictionary with frames, airtime (total seconds on air) and
+            duration (seconds from the first frame to the last frame
+            finishing, including pacing).
+        """
+        now = [0.0]
+        
+        def advance(seconds: float) -> None:
+            now[0] += seconds
+        
+        simulation = TransmitScheduler(
+            self.channel_presets,
+            self.default_preset,
+            self.duty_cycle,
+            self.window,
+            clock=lambda: now[0],
+            sleep=advance
+        )
+        
+        end = 0.0
+        for channel, payload_bytes in frames:
+            simulation.wait(channel, payload_bytes)
+            end = max(end, simulation._busy_until[channel])
+        
+        return {
+            "frames": simulation.frames_sent,
+            "airtime": simulation.total_airtime,
+            "duration": end
+        }
+
+
+def format_plan(plan: dict[str, float], duty_cycle: float) -> str:
+    """Format a plan() result for dry-run output."""
+    return (
+        f"Predicted airtime: {plan['airtime']:.1f}s for {plan['frames']} frame(s); "
+        f"about {plan['duration']:.0f}s to send at a {duty_cycle:.0%} duty cycle"
+    )
@@ -0,0 +1,445 @@
+#!/usr/bin/env python3
+"""
+Mesh Payload Compression Module
+
+An optional compressed wire format for text sent over the mesh. Bulletin
+text and JSON payloads are deflated against a preset dictionary trained
+on the BBS content in data/, then Base85-encoded so the result is still
+a valid Meshtastic text message (and still fragments, queues and relays
+like any other text).
+
+Wire format:
+    <header byte><Base85 of raw DEFLATE data>
+
+The header byte names the dictionary the sender used (\\x1a = v1), so a
+receiver decodes only formats it knows and passes everything else
+through as plain text. Messages are only sent compressed when that is
+smaller; plain text that happens to start with a header byte is always
+compressed, so it cannot be misread.
+
+Usage:
+    python scripts/mesh_compress.py bench
+    python scripts/mesh_compress.py train --output config/mesh_dictionary_v1.txt
+"""
+
+import argparse
+import base64
+import json
+import re
+import sys
+import zlib
+from collections import Counter
+from pathlib import Path
+from typing import Any
+
+# Handle both package and standalone execution
+try:
+    from . import mesh_fragment
+except ImportError:
+    import mesh_fragment
+
+
+# Repository root (corpus and dictionary paths are relative to it)
+REPO_ROOT = Path(__file__).parent.parent
+
+# Header byte -> preset dictionary file. Never change a shipped file:
+# train a new one and give it a new header byte instead
+DICTIONARY_FILES = {
+    "\x1a": REPO_ROOT / "config" / "mesh_dictionary_v1.txt",
+}
+
+# Header byte used for new messages
+CURRENT_HEADER = "\x1a"
+
+# Default preset dictionary size in bytes (DEFLATE uses at most 32 KiB)
+DEFAULT_DICTIONARY_SIZE = 4096
+
+# Every HOLDOUT_EVERY-th source item (by a hash of its ID) is left out of
+# training so bench measures content the dictionary has not seen
+HOLDOUT_EVERY = 4
+
+# ISO 8601 timestamps; they differ per message and per run, so training
+# never learns them
+TIMESTAMP_PATTERN = re.compile(
+    r"\d{4}-\d{2}-\d{2}(?:[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?)?"
+)
+
+# Loaded dictionaries by header byte
+_dictionaries: dict[str, bytes] = {}
+
+
+def load_dictionary(header: str = CURRENT_HEADER) -> bytes:
+    """
+    Load (once) the preset dictionary for a header byte.
+    
+    Lines starting with "#" at the top of the file are comments.
+    
+    Raises:
+        KeyError: If the header byte is unknown.
+        OSError: If the dictionary file cannot be read.
+    """
+    if header not in _dictionaries:
+        lines = DICTIONARY_FILES[header].read_text(encoding="utf-8").splitlines(keepends=True)
+        while lines and lines[0].startswith("#"):
+            lines.pop(0)
+        _dictionaries[header] = "".join(lines).encode("utf-8")
+    return _dictionaries[header]
+
+
+def is_compressed(text: str) -> bool:
+    """Check whether text starts with a known header byte."""
+    return text[:1] in DICTIONARY_FILES
+
+
+def compress_bytes(data: bytes, header: str = CURRENT_HEADER) -> bytes:
+    """
+    Deflate data against the preset dictionary for a header byte.
+    
+    Args:
+        data: Data to compress.
+        header: Header byte selecting the dictionary.
+    
+    Returns:
+        Raw DEFLATE data (without the header byte).
+    """
+    compressor = zlib.compressobj(
+        level=9, wbits=-15, memLevel=9, zdict=load_dictionary(header)
+    )
+    return compressor.compress(data) + compressor.flush()
+
+
+def decompress_bytes(data: bytes, header: str = CURRENT_HEADER) -> bytes:
+    """
+    Inflate data from compress_bytes().
+    
+    Raises:
+        ValueError: If the data is not complete DEFLATE data.
+    """
+    decompressor = zlib.decompressobj(wbits=-15, zdict=load_dictionary(header))
+    try:
+        result = decompressor.decompress(data) + decompressor.flush()
+    except zlib.error as e:
+        raise ValueError(f"Invalid compressed data: {e}") from e
+    if not decompressor.eof:
+        raise ValueError("Truncated compressed data")
+    return result
+
+
+def compress_text(text: str, header: str = CURRENT_HEADER) -> str:
+    """
+    Compress text into the wire format, unconditionally.
+    
+    Args:
+        text: Text to compress.
+        header: Header byte selecting the dictionary.
+    
+    Returns:
+        Wire-format text.
+    """
+    data = compress_bytes(text.encode("utf-8"), header)
+    return header + base64.b85encode(data).decode("ascii")
+
+
+def encode_text(text: str, header: str = CURRENT_HEADER) -> str:
+    """
+    Encode text for sending, compressing only when it helps.
+    
+    Args:
+        text: Message text.
+        header: Header byte selecting the dictionary.
+    
+    Returns:
+        Wire-format text, or the original text if that is not larger.
+    """
+    compressed = compress_text(text, header)
+    
+    if is_compressed(text):
+        return compressed
+    if len(compressed.encode("utf-8")) < len(text.encode("utf-8")):
+        return compressed
+    return text
+
+
+def decode_text(text: str) -> str:
+    """
+    Decode received text, passing plain text through unchanged.
+    
+    Args:
+        text: Received (reassembled) message text.
+    
+    Returns:
+        Decompressed text, or text itself if it is not in a known
+        compressed format or does not decode.
+    """
+    if not is_compressed(text):
+        return text
+    
+    try:
+        return decompress_bytes(base64.b85decode(text[1:]), text[0]).decode("utf-8")
+    except (ValueError, OSError):
+        return text
+
+
+def train_dictionary(
+    samples: list[str],
+    size: int = DEFAULT_DICTIONARY_SIZE,
+    max_words: int = 8
+) -> str:
+    """
+    Build a preset dictionary from sample messages.
+    
+    Word n-grams (with their following whitespace) are scored by how many
+    bytes they would save across the samples; the best are kept, without
+    repeats of strings already covered, until the size is reached. The
+    most valuable strings go last, nearest the data, where DEFLATE
+    back-references are cheapest. Timestamps are cut out of the samples
+    first (n-grams stop at them), since they change from run to run.
+    
+    Args:
+        samples: Representative messages.
+        size: Maximum dictionary size in bytes.
+        max_words: Longest n-gram considered, in words.
+    
+    Returns:
+        Dictionary text.
+    """
+    counts: Counter[str] = Counter()
+    
+    for segment in (part for sample in samples for part in TIMESTAMP_PATTERN.split(sample)):
+        # Keep each word's trailing separator so n-grams join naturally
+        tokens = []
+        word = ""
+        for char in segment:
+            word += char
+            if char in " \n\t,:":
+                tokens.append(word)
+                word = ""
+        if word:
+            tokens.append(word)
+        
+        for n in range(1, max_words + 1):
+            for i in range(len(tokens) - n + 1):
+                counts["".join(tokens[i:i + n])] += 1
+    
+    # A string is only worth including if it recurs
+    scored = sorted(
+        ((count - 1) * len(gram.encode("utf-8")), gram)
+        for gram, count in counts.items()
+        if count > 1 and len(gram.strip()) > 2
+    )
+    
+    chosen: list[str] = []
+    used = 0
+    for _, gram in reversed(scored):
+        gram_size = len(gram.encode("utf-8"))
+        if used + gram_size > size or any(gram in other for other in chosen):
+            continue
+        chosen = [other for other in chosen if other not in gram]
+        chosen.append(gram)
+        used = sum(len(other.encode("utf-8")) for other in chosen)
+    
+    return "".join(reversed(chosen))
+
+
+def is_held_out(item_id: str) -> bool:
+    """Check whether a bulletin or channel item is held out of training."""
+    return zlib.crc32(item_id.encode("utf-8")) % HOLDOUT_EVERY == 0
+
+
+def load_corpus(repo_root: Path | None = None, split: str = "all") -> list[tuple[str, str]]:
+    """
+    Build the over-the-air messages for the content in data/.
+    
+    Uses the generators to load bulletins and channel items and the tx
+    scripts' formatting, plus each compact JSON payload send_json would
+    send.
+    
+    Args:
+        repo_root: Repository root.
+        split: "all", "train" (items not held out) or "test" (held-out
+            items only). JSON payloads are built from the split's items.
+    
+    Returns:
+        List of (label, message text).
+    
+    Raises:
+        ValueError: If split is unknown.
+    """
+    if split not in ("all", "train", "test"):
+        raise ValueError(f"Unknown corpus split: {split}")
+    
+    def in_split(item: dict[str, Any]) -> bool:
+        return split == "all" or is_held_out(str(item["id"])) == (split == "test")
+
+    # Imported here: the tx scripts import meshtastic_client, which
+    # imports this module
+    try:
+        from . import (
+            pr_cybr_bbs_generate, pr_cybr_bbs_tx, pr_mesh_bbs_generate, pr_mesh_bbs_tx
+        )
+    except ImportError:
+        import pr_cybr_bbs_generate
+        import pr_cybr_bbs_tx
+        import pr_mesh_bbs_generate
+        import pr_mesh_bbs_tx
+    
+    repo_root = Path(repo_root) if repo_root else REPO_ROOT
+    corpus = []
+    
+    mesh_config = pr_mesh_bbs_generate.load_config(repo_root / "config" / "pr_mesh_bbs.yml")
+    bulletins = []
+    for name, source in mesh_config.get("sources", {}).items():
+        bulletins.extend(pr_mesh_bbs_generate.load_bulletins_from_directory(
+            repo_root / source.get("path", f"data/pr-mesh-bbs/{name}"),
+            source.get("category", "INFO"),
+            source.get("default_priority", "normal")
+        ))
+    bulletins = [bulletin for bulletin in bulletins if in_split(bulletin)]
+    for bulletin in bulletins:
+        corpus.append((bulletin["id"], pr_mesh_bbs_tx.format_bulletin_for_tx(bulletin)))
+    if bulletins:
+        payload = pr_mesh_bbs_generate.generate_bbs_payload(bulletins, mesh_config)
+        corpus.append(("pr-mesh-bbs json", json.dumps(payload, separators=(",", ":"))))
+    
+    cybr_config = pr_cybr_bbs_generate.load_config(
+        repo_root / "config" / "pr_cybr_bbs_channels.yml"
+    )
+    for channel_num, channel in sorted(cybr_config.get("channels", {}).items()):
+        name = channel.get("name", f"CHANNEL-{channel_num}")
+        items = pr_cybr_bbs_generate.load_items_from_directory(
+            repo_root / channel.get("source_path", f"data/pr-cybr-bbs/channel-{channel_num}")
+        )
+        if channel.get("status_file"):
+            items.extend(pr_cybr_bbs_generate.load_node_status(repo_root / channel["status_file"]))
+        items = [item for item in items if in_split(item)]
+        
+        for item in items:
+            corpus.append((item["id"], pr_cybr_bbs_tx.format_item_for_tx(item, name)))
+        if items:
+            payload = pr_cybr_bbs_generate.generate_channel_payload(
+                channel_num, channel, items, cybr_config.get("schedule", [])
+            )
+            corpus.append((f"channel-{channel_num} json", json.dumps(payload, separators=(",", ":"))))
+    
+    return corpus
+
+
+def benchmark(corpus: list[tuple[str, str]], max_size: int) -> list[dict[str, Any]]:
+    """
+    Compare plain and compressed sizes and frame counts.
+    
+    Args:
+        corpus: (label, message) pairs.
+        max_size: Maximum bytes per frame.
+    
+    Returns:
+        One row per message with label, plain/compressed bytes and
+        plain/compressed frames.
+    """
+    rows = []
+    for label, message in corpus:
+        encoded = encode_text(message)
+        rows.append({
+            "label": label,
+            "plain_bytes": len(message.encode("utf-8")),
+            "compressed_bytes": len(encoded.encode("utf-8")),
+            "plain_frames": len(mesh_fragment.fragment_text(message, max_size)),
+            "compressed_frames": len(mesh_fragment.fragment_text(encoded, max_size))
+        })
+    return rows
+
+
+def print_benchmark(rows: list[dict[str, Any]]) -> None:
+    """Print benchmark() rows with totals."""
+    print(f"{'Message':<28} {'Bytes':>7} {'Comp.':>7} {'Frames':>7} {'Comp.':>6}")
+    for row in rows:
+        print(
+            f"{row['label'][:28]:<28} {row['plain_bytes']:>7} {row['compressed_bytes']:>7} "
+            f"{row['plain_frames']:>7} {row['compressed_frames']:>6}"
+        )
+    
+    plain_bytes = sum(r["plain_bytes"] for r in rows)
+    compressed_bytes = sum(r["compressed_bytes"] for r in rows)
+    plain_frames = sum(r["plain_frames"] for r in rows)
+    compressed_frames = sum(r["compressed_frames"] for r in rows)
+    print(
+        f"{'Total':<28} {plain_bytes:>7} {compressed_bytes:>7} "
+        f"{plain_frames:>7} {compressed_frames:>6}"
+    )
+    if rows:
+        print(
+            f"\nBytes: {compressed_bytes / plain_bytes:.0%} of plain; "
+            f"frames per message: {plain_frames / len(rows):.2f} -> "
+            f"{compressed_frames / len(rows):.2f}"
+        )
+
+
+def main():
+    """Main entry point."""
+    # Imported here: meshtastic_client imports this module
+    try:
+        from . import meshtastic_client
+    except ImportError:
+        import meshtastic_client
+    
+    parser = argparse.ArgumentParser(
+        description="Compressed wire format for mesh payloads"
+    )
+    subparsers = parser.add_subparsers(dest="command", help="Command to run")
+    
+    bench_parser = subparsers.add_parser(
+        "bench", help="Compare frames per message on held-out content in data/"
+    )
+    bench_parser.add_argument(
+        "--all",
+        action="store_true",
+        help="Include the content the dictionary was trained on"
+    )
+    
+    train_parser = subparsers.add_parser("train", help="Train a preset dictionary on data/")
+    train_parser.add_argument(
+        "--output",
+        type=Path,
+        required=True,
+        help="Dictionary file to write (use a new file for a new header byte)"
+    )
+    train_parser.add_argument(
+        "--size",
+        type=int,
+        default=DEFAULT_DICTIONARY_SIZE,
+        help="Dictionary size in bytes"
+    )
+    
+    args = parser.parse_args()
+    
+    if not args.command:
+        parser.print_help()
+        return 1
+    
+    if args.command == "train":
+        split = "train"
+    else:
+        split = "all" if args.all else "test"
+    
+    corpus = load_corpus(split=split)
+    if not corpus:
+        print("Error: No content found in data/", file=sys.stderr)
+        return 1
+    
+    if args.command == "train":
+        dictionary = train_dictionary([message for _, message in corpus], args.size)
+        args.output.write_text(
+            "# Preset dictionary for mesh_compress; do not edit a shipped file\n" + dictionary,
+            encoding="utf-8"
+        )
+        print(f"Wrote {len(dictionary.encode('utf-8'))} byte dictionary to {args.output}")
+        return 0
+    
+    max_size = meshtastic_client.get_max_message_size()
+    print(f"{len(corpus)} {'' if args.all else 'held-out '}message(s), {max_size}-byte frames\n")
+    print_benchmark(benchmark(corpus, max_size))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Mesh Message Fragmentation Module
+
+Splits text payloads that exceed the Meshtastic message size into
+numbered frames and reassembles them on the receive side, so bulletins
+and JSON payloads arrive byte-for-byte instead of being truncated.
+
+Frame format (all ASCII header, UTF-8 data):
+    ~IIIISSTTCCCCCCCC:<data>
+    
+    ~         frame marker
+    IIII      message ID (16-bit, hex)
+    SS        frame sequence number, 0-based (hex)
+    TT        total frames in the message (hex)
+    CCCCCCCC  CRC-32 of the complete UTF-8 message (hex)
+    :         header terminator
+
+Messages that fit in a single packet are sent as-is without a header, so
+ordinary Meshtastic apps still display short bulletins normally. Frames
+are split on character boundaries, so every frame is valid UTF-8 text.
+
+Several short messages can also be packed into one message (joined by
+PACK_SEPARATOR) when that takes fewer frames than sending them apart.
+"""
+
+import os
+import re
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Callable
+
+
+# Frame marker and header layout
+FRAME_MARKER = "~"
+HEADER_SIZE = 18
+MAX_FRAMES = 0xFF
+
+# Seconds to keep incomplete messages before discarding them
+DEFAULT_REASSEMBLY_TIMEOUT = 300.0
+
+# Incomplete messages held at once; the oldest is dropped beyond this
+DEFAULT_MAX_PENDING = 64
+
+# Joins packed messages: a blank line holding the visible record
+# separator symbol (U+241E), which formatted bulletins never contain
+PACK_SEPARATOR = "\n\u241e\n"
+
+_FRAME_RE = re.compile(
+    r"~(?P<id>[0-9a-f]{4})(?P<seq>[0-9a-f]{2})(?P<total>[0-9a-f]{2})"
+    r"(?P<crc>[0-9a-f]{8}):",
+    re.DOTALL
+)
+
+
+@dataclass(frozen=True)
+class Frame:
+    """
+    One fragment of a larger message.
+    
+    Attributes:
+        message_id: 16-bit ID shared by all frames of a message.
+        seq: 0-based position of this frame.
+        total: Number of frames in the message.
+        crc: CRC-32 of the complete UTF-8 encoded message.
+        data: This frame's slice of the message text.
+    """
+    
+    message_id: int
+    seq: int
+    total: int
+    crc: int
+    data: str
+    
+    def encode(self) -> str:
+        """Serialize the frame to its on-air text form."""
+        return (
+            f"{FRAME_MARKER}{self.message_id:04x}{self.seq:02x}"
+            f"{self.total:02x}{self.crc:08x}:{self.data}"
+        )
+    
+    @classmethod
+    def decode(cls, text: str) -> "Frame | None":
+        """
+        Parse on-air text as a frame.
+        
+        Returns:
+            Frame, or None if the text is not a well-formed frame.
+        """
+        match = _FRAME_RE.match(text)
+        if not match:
+            return None
+        
+        seq = int(match["seq"], 16)
+        total = int(match["total"], 16)
+        if total == 0 or seq >= total:
+            return None
+        
+        return cls(
+            message_id=int(match["id"], 16),
+            seq=seq,
+            total=total,
+            crc=int(match["crc"], 16),
+            data=text[HEADER_SIZE:]
+        )
+
+
+def message_crc(text: str) -> int:
+    """CRC-32 of a message's UTF-8 encoding."""
+    return zlib.crc32(text.encode("utf-8")) & 0xFFFFFFFF
+
+
+def new_message_id() -> int:
+    """Generate a random 16-bit message ID."""
+    return int.from_bytes(os.urandom(2), "big")
+
+
+def _split_utf8(text: str, max_bytes: int) -> list[str]:
+    """Split text into chunks of at most max_bytes UTF-8 bytes each."""
+    chunks = []
+    current = []
+    current_size = 0
+    
+    for char in text:
+        char_size = len(char.encode("utf-8"))
+        if current and current_size + char_size > max_bytes:
+            chunks.append("".join(current))
+            current = []
+            current_size = 0
+        current.append(char)
+        current_size += char_size
+    
+    if current or not chunks:
+        chunks.append("".join(current))
+    
+    return chunks
+
+
+def needs_fragmentation(text: str, max_size: int) -> bool:
+    """
+    Check whether a message must be fragmented.
+    
+    Text that starts like a frame is always framed, so the receiver
+    cannot mistake it for one.
+    """
+    return len(text.encode("utf-8")) > max_size or _FRAME_RE.match(text) is not None
+
+
+def fragment_text(
+    text: str,
+    max_size: int,
+    message_id: int | None = None
+) -> list[str]:
+    """
+    Split a message into on-air frames.
+    
+    Args:
+        text: Message to send.
+        max_size: Maximum bytes per packet (header included).
+        message_id: Message ID to use (random if None).
+    
+    Returns:
+        List of frame strings, or [text] if the message fits in one packet.
+    
+    Raises:
+        ValueError: If max_size leaves no room for data, or the message
+            would need more than MAX_FRAMES frames.
+    """
+    if not needs_fragmentation(text, max_size):
+        return [text]
+    
+    # Room for the largest UTF-8 character after the header
+    if max_size < HEADER_SIZE + 4:
+        raise ValueError(f"max_size {max_size} too small for fragment frames")
+    
+    chunks = _split_utf8(text, max_size - HEADER_SIZE)
+    if len(chunks) > MAX_FRAMES:
+        raise ValueError(
+            f"Message needs {len(chunks)} frames (max {MAX_FRAMES})"
+        )
+    
+    if message_id is None:
+        message_id = new_message_id()
+    
+    crc = message_crc(text)
+    
+    return [
+        Frame(message_id, seq, len(chunks), crc, chunk).encode()
+        for seq, chunk in enumerate(chunks)
+    ]
+
+
+def frame_count(text: str, max_size: int) -> int:
+    """Number of frames fragment_text() would split a message into."""
+    if not needs_fragmentation(text, max_size):
+        return 1
+    return len(_split_utf8(text, max_size - HEADER_SIZE))
+
+
+def pack_messages(
+    messages: list[str],
+    max_size: int,
+    max_frames: int = 1
+) -> list[str]:
+    """
+    Pack messages together into as few frames as possible.
+    
+    First fit: each message joins the earliest packed message it fits in
+    (at most max_frames frames) if that saves frames, otherwise it starts
+    a new one. Packed messages keep the order of their first message, so
+    callers pack each priority level separately to keep priority order.
+    
+    Args:
+        messages: Messages in send order.
+        max_size: Maximum bytes per packet.
+        max_frames: Most frames a packed message may take (1 packs only
+            messages that fit in a single packet together).
+    
+    Returns:
+        Packed messages; unpack_message() splits one back up.
+    """
+    bins: list[list[str]] = []
+    
+    for message in messages:
+        if PACK_SEPARATOR not in message:
+            message_frames = frame_count(message, max_size)
+            for packed in bins:
+                if PACK_SEPARATOR in packed[0]:
+                    continue
+                combined = frame_count(PACK_SEPARATOR.join(packed + [message]), max_size)
+                current = frame_count(PACK_SEPARATOR.join(packed), max_size)
+                if combined <= max_frames and combined < current + message_frames:
+                    packed.append(message)
+                    break
+            else:
+                bins.append([message])
+        else:
+            # Could not be unpacked again; always sent alone
+            bins.append([message])
+    
+    return [PACK_SEPARATOR.join(packed) for packed in bins]
+
+
+def unpack_message(text: str) -> list[str]:
+    """Split a message from pack_messages() into the original messages."""
+    return text.split(PACK_SEPARATOR)
+
+
+class Reassembler:
+    """
+    Rebuilds fragmented messages from received frames.
+    
+    Frames may arrive out of order or more than once. Messages are keyed
+    by sender and message ID, verified against the CRC once complete, and
+    discarded if they stay incomplete past the timeout. Repeats of a
+    completed message's frames are ignored for the same period.
+    """
+    
+    def __init__(
+        self,
+        timeout: float = DEFAULT_REASSEMBLY_TIMEOUT,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize the reassembler.
+        
+        Args:
+            timeout: Seconds to wait for the rest of a message.
+            max_pending: Maximum incomplete messages held at once.
+            clock: Time source (monotonic seconds).
+        """
+        self.timeout = timeout
+        self.max_pending = max_pending
+        self._clock = clock
+        # (sender, message_id) -> (first_seen, total, crc, {seq: data})
+        self._pending: dict[tuple, tuple[float, int, int, dict[int, str]]] = {}
+        # (sender, message_id, crc) -> completion time, to ignore late duplicates
+        self._recent: dict[tuple, float] = {}
+        self.completed = 0
+        self.dropped = 0
+    
+    @property
+    def pending(self) -> int:
+        """Number of incomplete messages held."""
+        return len(self._pending)
+    
+    def expire(self) -> int:
+        """
+        Discard incomplete messages older than the timeout.
+        
+        Returns:
+            Number of messages discarded.
+        """
+        now = self._clock()
+        stale = [
+            key for key, (first_seen, *_) in self._pending.items()
+            if now - first_seen > self.timeout
+        ]
+        for key in stale:
+            del self._pending[key]
+        self.dropped += len(stale)
+        
+        for key in [k for k, done in self._recent.items() if now - done > self.timeout]:
+            del self._recent[key]
+        
+        return len(stale)
+    
+    def feed(self, text: str, sender: str | None = None) -> str | None:
+        """
+        Process one received text packet.
+        
+        Args:
+            text: Received packet text.
+            sender: Sending node ID (frames are grouped per sender).
+        
+        Returns:
+            The complete message if this packet finished one (or was not a
+            frame at all), otherwise None.
+        """
+        frame = Frame.decode(text)
+        if frame is None:
+            return text
+        
+        self.expire()
+        
+        key = (sender, frame.message_id)
+        if (*key, frame.crc) in self._recent:
+            return None
+        
+        entry = self._pending.get(key)
+        
+        # A reused ID with a different shape starts a new message
+        if entry is not None and (entry[1], entry[2]) != (frame.total, frame.crc):
+            del self._pending[key]
+            self.dropped += 1
+            entry = None
+        
+        if entry is None:
+            if len(self._pending) >= self.max_pending:
+                oldest = min(self._pending, key=lambda k: self._pending[k][0])
+                del self._pending[oldest]
+                self.dropped += 1
+            entry = (self._clock(), frame.total, frame.crc, {})
+            self._pending[key] = entry
+        
+        chunks = entry[3]
+        chunks[frame.seq] = frame.data
+        
+        if len(chunks) < frame.total:
+            return None
+        
+        del self._pending[key]
+        message = "".join(chunks[seq] for seq in range(frame.total))
+        
+        if message_crc(message) != frame.crc:
+            self.dropped += 1
+            return None
+        
+        self._recent[(*key, frame.crc)] = self._clock()
+        self.completed += 1
+        return message
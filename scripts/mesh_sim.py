@@ -0,0 +1,614 @@
+#!/usr/bin/env python3
+"""
+Simulated Mesh Module
+
+An in-process stand-in for a Meshtastic radio and the mesh around it, so
+the tx scripts, fragmentation and airtime pacing can be exercised and
+benchmarked without hardware.
+
+The simulation runs on a virtual clock. Each sendText() is queued on the
+simulated radio, which transmits one packet at a time for its LoRa
+time-on-air (see mesh_airtime) and drops packets when its transmit queue
+is full, as the firmware does. Every simulated node sits a number of
+hops from the local radio; it receives a packet after the rebroadcasts
+needed to reach it, if the hop limit allows and no hop loses it.
+
+Events happen as the clock advances: through sleep() (which pacing and
+retry backoff use when wired to the mesh), while waiting for a want-ack
+response, or through flush(). With time_scale > 0 the clock also
+sleeps in real time (1.0 = real speed), otherwise it jumps instantly.
+
+Select it with device.interface: sim in config/hardware.yml or
+MESH_INTERFACE=sim; the simulation section configures the mesh.
+
+Usage:
+    python scripts/mesh_sim.py bench [--messages N] [--size BYTES] [--loss P]
+"""
+
+import argparse
+import heapq
+import itertools
+import random
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable
+
+# Handle both package and standalone execution
+try:
+    from . import mesh_airtime, mesh_fragment, meshtastic_client
+except ImportError:
+    import mesh_airtime
+    import mesh_fragment
+    import meshtastic_client
+
+# pypubsub ships with meshtastic; received packets are published on it
+# like the real interface does when it is available
+try:
+    from pubsub import pub
+except ImportError:
+    pub = None
+
+
+# Simulated nodes' hop distances used when none are configured
+DEFAULT_NODE_HOPS = (1, 1, 2)
+
+# Per-hop delivery latency in seconds (processing and rebroadcast delay)
+DEFAULT_LATENCY = 0.05
+
+# Packets the simulated radio holds before dropping new ones
+DEFAULT_RADIO_QUEUE_SIZE = 16
+
+# Node ID of the local (sending) radio
+LOCAL_NODE_ID = "!sim00000"
+
+# Hop limit remote nodes send with (send_from)
+SENDER_HOP_LIMIT = 3
+
+
+@dataclass(frozen=True)
+class SimulatedPacket:
+    """Stand-in for the MeshPacket returned by sendText()."""
+    
+    id: int
+
+
+class SimulatedInterface:
+    """
+    Meshtastic interface backed by a SimulatedMesh.
+    
+    Implements the parts of meshtastic's SerialInterface that
+    MeshtasticClient uses.
+    """
+    
+    def __init__(self, mesh: "SimulatedMesh", node_id: str = LOCAL_NODE_ID):
+        self.mesh = mesh
+        self.node_id = node_id
+        self.received: list[dict[str, Any]] = []
+        self.closed = False
+        # Called with (packet, interface) on receipt when pypubsub is missing
+        self.on_receive: Callable[[dict[str, Any], Any], None] | None = None
+    
+    def sendText(
+        self,
+        text: str,
+        channelIndex: int = 0,
+        hopLimit: int | None = None,
+        wantAck: bool = False,
+        onResponse: Callable[[dict[str, Any]], None] | None = None
+    ) -> SimulatedPacket:
+        """Queue a text packet on the simulated radio."""
+        if self.closed:
+            raise OSError("interface closed")
+        return self.mesh.transmit(self, text, channelIndex, hopLimit, wantAck, onResponse)
+    
+    def getMyNodeInfo(self) -> dict[str, Any]:
+        """Describe the simulated local node."""
+        return {
+            "user": {
+                "id": self.node_id,
+                "longName": "Simulated Node",
+                "shortName": "SIM",
+                "hwModel": "SIMULATED"
+            }
+        }
+    
+    def close(self) -> None:
+        """Detach from the mesh."""
+        self.closed = True
+
+
+class SimulatedMesh:
+    """A local radio plus remote nodes at fixed hop distances."""
+    
+    def __init__(
+        self,
+        nodes: list[int] | tuple[int, ...] = DEFAULT_NODE_HOPS,
+        latency: float = DEFAULT_LATENCY,
+        loss: float = 0.0,
+        channel_presets: dict[int, str] | None = None,
+        default_preset: str = mesh_airtime.DEFAULT_MODEM_PRESET,
+        radio_queue_size: int = DEFAULT_RADIO_QUEUE_SIZE,
+        time_scale: float = 0.0,
+        seed: int | None = None
+    ):
+        """
+        Initialize the mesh.
+        
+        Args:
+            nodes: Hop distance (1 = direct) of each remote node.
+            latency: Seconds added per hop.
+            loss: Probability each hop loses a packet.
+            channel_presets: Modem preset per channel index.
+            default_preset: Preset for channels not in channel_presets.
+            radio_queue_size: Packets the local radio queues before dropping.
+            time_scale: Real seconds slept per virtual second (0 = instant).
+            seed: Random seed for reproducible loss.
+        
+        Raises:
+            ValueError: If a preset is unknown or a parameter is out of range.
+        """
+        if not 0 <= loss <= 1:
+            raise ValueError(f"loss must be in [0, 1], got {loss}")
+        if any(hops < 1 for hops in nodes):
+            raise ValueError("node hop distances must be at least 1")
+        
+        self.nodes = {f"!sim{i:05x}": hops for i, hops in enumerate(nodes, 1)}
+        self.latency = latency
+        self.loss = loss
+        self.channel_presets = dict(channel_presets or {})
+        self.default_preset = default_preset
+        self.radio_queue_size = radio_queue_size
+        self.time_scale = time_scale
+        self._rng = random.Random(seed)
+        
+        for preset in [default_preset, *self.channel_presets.values()]:
+            mesh_airtime.get_preset(preset)
+        
+        self._lock = threading.RLock()
+        self._now = 0.0
+        self._events: list[tuple[float, int, Callable[[], None]]] = []
+        self._seq = itertools.count()
+        self._packet_ids = itertools.count(1)
+        # Local radio: end time of every queued or in-flight transmission
+        self._radio_queue: list[float] = []
+        self._interfaces: list[SimulatedInterface] = []
+        
+        self.received: dict[str, list[dict[str, Any]]] = {node: [] for node in self.nodes}
+        self.packets_sent = 0
+        self.bytes_sent = 0
+        self.airtime = 0.0
+        self.dropped_queue_full = 0
+        self.lost = 0
+        self.delivered = 0
+    
+    @classmethod
+    def from_config(cls, settings: dict[str, Any] | None) -> "SimulatedMesh":
+        """Build a mesh from the simulation section of hardware.yml."""
+        settings = settings or {}
+        return cls(
+            nodes=settings.get("nodes") or DEFAULT_NODE_HOPS,
+            latency=settings.get("latency", DEFAULT_LATENCY),
+            loss=settings.get("loss", 0.0),
+            channel_presets=settings.get("channel_presets"),
+            radio_queue_size=settings.get("radio_queue_size", DEFAULT_RADIO_QUEUE_SIZE),
+            time_scale=settings.get("time_scale", 0.0),
+            seed=settings.get("seed")
+        )
+    
+    def clock(self) -> float:
+        """Current virtual time in seconds."""
+        return self._now
+    
+    def sleep(self, seconds: float) -> None:
+        """Advance the virtual clock, delivering packets due meanwhile."""
+        if seconds > 0:
+            self.advance_to(self._now + seconds)
+    
+    def advance_to(self, when: float) -> None:
+        """Run every event due up to a virtual time."""
+        if self.time_scale > 0 and when > self._now:
+            time.sleep((when - self._now) * self.time_scale)
+        
+        with self._lock:
+            while self._events and self._events[0][0] <= when:
+                due, _, action = heapq.heappop(self._events)
+                self._now = max(self._now, due)
+                action()
+            self._now = max(self._now, when)
+    
+    def flush(self) -> float:
+        """
+        Deliver everything still in flight.
+        
+        Returns:
+            Virtual time when the last event happened.
+        """
+        while self._events:
+            self.advance_to(self._events[0][0])
+        return self._now
+    
+    def _schedule(self, when: float, action: Callable[[], None]) -> None:
+        heapq.heappush(self._events, (when, next(self._seq), action))
+    
+    def preset_for(self, channel: int) -> str:
+        """Get the modem preset used on a channel."""
+        return self.channel_presets.get(channel, self.default_preset)
+    
+    def interface(self, node_id: str = LOCAL_NODE_ID) -> SimulatedInterface:
+        """Create an interface to the local radio."""
+        interface = SimulatedInterface(self, node_id)
+        self._interfaces.append(interface)
+        return interface
+    
+    def interface_factory(self, client: "meshtastic_client.MeshtasticClient") -> SimulatedInterface:
+        """
+        MeshtasticClient interface factory using this mesh.
+        
+        Also puts the client's retry backoff, and its scheduler if it has
+        one, on the virtual clock, and adopts the scheduler's channel
+        presets for channels the mesh has none for.
+        """
+        client._sleep = self.sleep
+        
+        scheduler = client.scheduler
+        if scheduler is not None:
+            scheduler._clock = self.clock
+            scheduler._sleep = self.sleep
+            for channel, preset in scheduler.channel_presets.items():
+                self.channel_presets.setdefault(channel, preset)
+        
+        return self.interface()
+    
+    def transmit(
+        self,
+        interface: SimulatedInterface,
+        text: str,
+        channel: int,
+        hop_limit: int | None,
+        want_ack: bool,
+        on_response: Callable[[dict[str, Any]], None] | None
+    ) -> SimulatedPacket:
+        """
+        Queue a packet on the local radio and schedule its deliveries.
+        
+        With want_ack, the clock runs until the mesh answers and
+        on_response is called before returning, since the caller blocks
+        on the answer anyway.
+        """
+        with self._lock:
+            packet_id = next(self._packet_ids)
+            payload = text.encode("utf-8")
+            hop_limit = 3 if hop_limit is None else hop_limit
+            
+            self._radio_queue = [end for end in self._radio_queue if end > self._now]
+            if len(self._radio_queue) >= self.radio_queue_size:
+                self.dropped_queue_full += 1
+                if want_ack and on_response:
+                    on_response(self._routing(packet_id, "RATE_LIMIT_EXCEEDED"))
+                return SimulatedPacket(packet_id)
+            
+            airtime = mesh_airtime.time_on_air(len(payload), self.preset_for(channel))
+            start = max([self._now, *self._radio_queue])
+            end = start + airtime
+            self._radio_queue.append(end)
+            
+            self.packets_sent += 1
+            self.bytes_sent += len(payload)
+            self.airtime += airtime
+            
+            heard_directly = False
+            for node_id, hops in self.nodes.items():
+                if hops - 1 > hop_limit:
+                    continue
+                if any(self._rng.random() < self.loss for _ in range(hops)):
+                    self.lost += 1
+                    continue
+                
+                arrival = end + hops * self.latency + (hops - 1) * airtime
+                packet = {
+                    "id": packet_id,
+                    "fromId": interface.node_id,
+                    "toId": "^all",
+                    "channel": channel,
+                    "hopStart": hop_limit,
+                    "hopLimit": hop_limit - (hops - 1),
+                    "decoded": {
+                        "portnum": "TEXT_MESSAGE_APP",
+                        "payload": payload,
+                        "text": text
+                    }
+                }
+                self._schedule(arrival, lambda n=node_id, p=packet: self._deliver(n, p))
+                heard_directly = heard_directly or hops == 1
+            
+            if not want_ack or on_response is None:
+                return SimulatedPacket(packet_id)
+            
+            # An ACK is a direct neighbour's rebroadcast; without one the
+            # firmware retransmits before giving up
+            if heard_directly:
+                answer_at = end + 2 * self.latency
+                reason = "NONE"
+            else:
+                answer_at = end + 3 * (airtime + self.latency)
+                reason = "MAX_RETRANSMIT"
+        
+        self.advance_to(answer_at)
+        on_response(self._routing(packet_id, reason))
+        return SimulatedPacket(packet_id)
+    
+    def _routing(self, packet_id: int, reason: str) -> dict[str, Any]:
+        """Build a routing (ACK/NAK) packet for on_response."""
+        return {
+            "decoded": {
+                "portnum": "ROUTING_APP",
+                "requestId": packet_id,
+                "routing": {"errorReason": reason}
+            }
+        }
+    
+    def _deliver(self, node_id: str, packet: dict[str, Any]) -> None:
+        """Hand a packet to a remote node."""
+        packet = {**packet, "rxTime": int(self._now)}
+        self.received[node_id].append(packet)
+        self.delivered += 1
+    
+    def send_from(self, node_id: str, text: str, channel: int = 0) -> None:
+        """
+        Have a remote node send a text packet to the local radio.
+        
+        It arrives after the node's hop distance worth of airtime and
+        latency, on every open interface (and on the meshtastic.receive
+        pubsub topic, if pypubsub is installed).
+        
+        Raises:
+            KeyError: If the node does not exist.
+        """
+        with self._lock:
+            hops = self.nodes[node_id]
+            airtime = mesh_airtime.time_on_air(len(text.encode("utf-8")), self.preset_for(channel))
+            packet = {
+                "id": next(self._packet_ids),
+                "fromId": node_id,
+                "toId": "^all",
+                "channel": channel,
+                "hopStart": SENDER_HOP_LIMIT,
+                "hopLimit": max(0, SENDER_HOP_LIMIT - (hops - 1)),
+                # Signal of the last hop, weaker the further away the sender
+                "rxSnr": round(10.0 - 3.5 * hops, 1),
+                "rxRssi": -60 - 12 * hops,
+                "decoded": {
+                    "portnum": "TEXT_MESSAGE_APP",
+                    "payload": text.encode("utf-8"),
+                    "text": text
+                }
+            }
+            self._schedule(
+                self._now + hops * (airtime + self.latency),
+                lambda: self._deliver_local(packet)
+            )
+    
+    def _deliver_local(self, packet: dict[str, Any]) -> None:
+        """Hand a packet to every open local interface."""
+        packet = {**packet, "rxTime": int(self._now)}
+        for interface in self._interfaces:
+            if interface.closed:
+                continue
+            interface.received.append(packet)
+            if pub is not None:
+                pub.sendMessage("meshtastic.receive.text", packet=packet, interface=interface)
+            elif interface.on_receive is not None:
+                interface.on_receive(packet, interface)
+    
+    def stats(self) -> dict[str, Any]:
+        """
+        Summarize traffic so far.
+        
+        Returns:
+            Dictionary with packets_sent, bytes_sent, airtime, elapsed
+            (virtual seconds), dropped_queue_full, lost, delivered and
+            delivery_ratio (deliveries over packet/node pairs in range).
+        """
+        attempted = self.delivered + self.lost
+        return {
+            "packets_sent": self.packets_sent,
+            "bytes_sent": self.bytes_sent,
+            "airtime": self.airtime,
+            "elapsed": self._now,
+            "dropped_queue_full": self.dropped_queue_full,
+            "lost": self.lost,
+            "delivered": self.delivered,
+            "delivery_ratio": self.delivered / attempted if attempted else 0.0
+        }
+
+
+# Mesh shared by clients created with interface "sim"
+_default_mesh: SimulatedMesh | None = None
+_default_mesh_lock = threading.Lock()
+
+
+def get_default_mesh(
+    config: "meshtastic_client.HardwareConfig | None" = None
+) -> SimulatedMesh:
+    """
+    Get the process-wide simulated mesh, creating it on first use.
+    
+    Args:
+        config: Hardware configuration whose simulation section sets up
+            the mesh (defaults to the cached one).
+    
+    Returns:
+        SimulatedMesh instance.
+    """
+    global _default_mesh
+    
+    with _default_mesh_lock:
+        if _default_mesh is None:
+            config = config or meshtastic_client.get_hardware_config()
+            _default_mesh = SimulatedMesh.from_config(config.raw.get("simulation"))
+        return _default_mesh
+
+
+def run_benchmark(
+    mesh: SimulatedMesh,
+    messages: list[str],
+    config: "meshtastic_client.HardwareConfig",
+    pacing: bool = True,
+    want_ack: bool = False,
+    channel: int = 0
+) -> dict[str, Any]:
+    """
+    Send messages through a MeshtasticClient over the simulated mesh.
+    
+    Args:
+        mesh: Mesh to send over.
+        messages: Message texts.
+        config: Hardware configuration (size, retries, duty cycle).
+        pacing: Pace frames with a TransmitScheduler.
+        want_ack: Request acknowledgements.
+        channel: Channel index.
+    
+    Returns:
+        mesh.stats() plus messages, sent (client-side successes),
+        reassembled (messages rebuilt intact per node, averaged) and
+        goodput (message bytes rebuilt per virtual second, averaged).
+    """
+    scheduler = meshtastic_client.create_scheduler(
+        {channel: mesh.preset_for(channel)}, config
+    ) if pacing else None
+    client = meshtastic_client.MeshtasticClient(
+        config=config,
+        scheduler=scheduler,
+        interface_factory=mesh.interface_factory
+    )
+    
+    start = mesh.clock()
+    client.connect()
+    sent = sum(
+        client.send_message(message, channel, want_ack=want_ack).ok
+        for message in messages
+    )
+    mesh.flush()
+    client.disconnect()
+    
+    expected = set(messages)
+    rebuilt = []
+    for packets in mesh.received.values():
+        reassembler = mesh_fragment.Reassembler(timeout=float("inf"))
+        texts = [reassembler.feed(p["decoded"]["text"], p["fromId"]) for p in packets]
+        rebuilt.append([text for text in texts if text in expected])
+    
+    elapsed = mesh.clock() - start
+    nodes = max(len(rebuilt), 1)
+    rebuilt_bytes = sum(len(t.encode("utf-8")) for texts in rebuilt for t in texts)
+    
+    return {
+        **mesh.stats(),
+        "messages": len(messages),
+        "sent": sent,
+        "reassembled": sum(len(texts) for texts in rebuilt) / nodes,
+        "goodput": rebuilt_bytes / nodes / elapsed if elapsed else 0.0
+    }
+
+
+def print_benchmark(result: dict[str, Any]) -> None:
+    """Print a run_benchmark() result."""
+    print(f"Messages: {result['messages']} ({result['sent']} sent by client)")
+    print(
+        f"Packets: {result['packets_sent']} ({result['bytes_sent']} bytes), "
+        f"{result['dropped_queue_full']} dropped by a full radio queue"
+    )
+    print(
+        f"Elapsed: {result['elapsed']:.1f}s virtual, airtime {result['airtime']:.1f}s "
+        f"({result['airtime'] / result['elapsed']:.0%} utilization)"
+        if result["elapsed"] else "Elapsed: 0s"
+    )
+    print(
+        f"Delivery: {result['delivery_ratio']:.1%} of packets per node, "
+        f"{result['reassembled']:.1f} message(s) reassembled per node"
+    )
+    print(f"Goodput: {result['goodput']:.1f} bytes/s per node")
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Simulated Meshtastic mesh for offline testing"
+    )
+    subparsers = parser.add_subparsers(dest="command", help="Command to run")
+    
+    bench_parser = subparsers.add_parser("bench", help="Benchmark sending over the simulated mesh")
+    bench_parser.add_argument("--messages", type=int, default=20, help="Messages to send")
+    bench_parser.add_argument("--size", type=int, default=600, help="Bytes per message")
+    bench_parser.add_argument(
+        "--preset",
+        choices=list(mesh_airtime.MODEM_PRESETS),
+        default=mesh_airtime.DEFAULT_MODEM_PRESET,
+        help="Modem preset"
+    )
+    bench_parser.add_argument(
+        "--nodes",
+        default=",".join(str(h) for h in DEFAULT_NODE_HOPS),
+        help="Comma-separated hop distance of each node"
+    )
+    bench_parser.add_argument("--loss", type=float, default=0.0, help="Per-hop loss probability")
+    bench_parser.add_argument("--latency", type=float, default=DEFAULT_LATENCY, help="Per-hop latency")
+    bench_parser.add_argument("--hop-limit", type=int, default=3, help="Hop limit")
+    bench_parser.add_argument("--duty-cycle", type=float, default=None, help="Duty cycle override")
+    bench_parser.add_argument("--no-pacing", action="store_true", help="Send without the scheduler")
+    bench_parser.add_argument("--want-ack", action="store_true", help="Request acknowledgements")
+    bench_parser.add_argument(
+        "--time-scale",
+        type=float,
+        default=0.0,
+        help="Real seconds per virtual second (0 = as fast as possible)"
+    )
+    bench_parser.add_argument("--seed", type=int, default=1, help="Random seed")
+    
+    args = parser.parse_args()
+    
+    if not args.command:
+        parser.print_help()
+        return 1
+    
+    try:
+        mesh = SimulatedMesh(
+            nodes=[int(h) for h in args.nodes.split(",")],
+            latency=args.latency,
+            loss=args.loss,
+            default_preset=args.preset,
+            time_scale=args.time_scale,
+            seed=args.seed
+        )
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    
+    base = meshtastic_client.get_hardware_config()
+    config = meshtastic_client.HardwareConfig(
+        max_message_size=base.max_message_size,
+        default_hop_limit=args.hop_limit,
+        retry_count=base.retry_count,
+        retry_delay=base.retry_delay,
+        duty_cycle=args.duty_cycle or base.duty_cycle,
+        duty_cycle_window=base.duty_cycle_window,
+        ack_timeout=base.ack_timeout
+    )
+    
+    messages = [
+        f"{i:04d} " + "x" * max(args.size - 5, 0)
+        for i in range(args.messages)
+    ]
+    
+    print(
+        f"Simulated mesh: {len(mesh.nodes)} node(s), {args.preset}, "
+        f"loss {args.loss:.0%}, hop limit {args.hop_limit}"
+    )
+    print_benchmark(run_benchmark(mesh, messages, config, not args.no_pacing, args.want_ack))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
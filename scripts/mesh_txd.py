@@ -0,0 +1,853 @@
+#!/usr/bin/env python3
+"""
+Mesh Transmit Daemon
+
+A long-running process that owns the Meshtastic serial connections, so
+the tx scripts, the CLI and cron jobs no longer pay for a full node DB
+and config download from the radio on every run.
+
+Jobs arrive over a local Unix socket and are written to the persistent
+transmit queue (see tx_queue). Each radio in hardware.yml (radios) gets
+its own connection and worker thread, which drains only the channels
+mapped to that radio. If a radio drops off, its queued messages stay
+pending while its worker reconnects with backoff.
+
+Protocol: one JSON request per line, answered by one JSON line.
+    {"op": "send", "text": "...", "channel": 0, "priority": "normal",
+     "hop_limit": null}             -> {"ok": true, "id": 12, "depth": 3}
+    {"op": "status", "ids": [12]}   -> {"ok": true, "status": {"12": "sent"}}
+    {"op": "health"}                -> {"ok": true, "connected": true, ...}
+    {"op": "ping"}                  -> {"ok": true, "radios": ["default"]}
+
+A status is pending, sending, sent, failed, or null for an unknown ID.
+The tx scripts poll it to record messages as broadcast only once the
+daemon has actually sent them.
+
+Usage:
+    python scripts/mesh_txd.py run [--want-ack]
+    python scripts/mesh_txd.py send --channel N --priority high --text "..."
+    python scripts/mesh_txd.py health
+"""
+
+import argparse
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Collection
+
+import yaml
+
+# Handle both package and standalone execution
+try:
+    from . import mesh_airtime, meshtastic_client, rx_store, tx_queue
+except ImportError:
+    import mesh_airtime
+    import meshtastic_client
+    import rx_store
+    import tx_queue
+
+# pypubsub ships with meshtastic; without it, lost connections are only
+# detected when a send fails
+try:
+    from pubsub import pub
+except ImportError:
+    pub = None
+
+
+# Default socket path (override with MESH_TXD_SOCKET)
+DEFAULT_SOCKET_PATH = Path(__file__).parent.parent / "data" / "mesh_txd.sock"
+
+# Channel configs whose modem presets the daemon paces by
+CONFIG_DIR = Path(__file__).parent.parent / "config"
+
+# Largest request line accepted, in bytes
+MAX_REQUEST_BYTES = 256 * 1024
+
+# Seconds between queue polls when idle (catches jobs queued directly
+# with tx_queue.py rather than over the socket)
+DEFAULT_POLL_INTERVAL = 5.0
+
+# First delay before reconnecting to the radio, in seconds
+DEFAULT_RECONNECT_DELAY = 5.0
+
+# Seconds the tx scripts wait for the daemon to send their messages
+DEFAULT_WAIT_SECONDS = 900.0
+
+# Seconds between status polls while waiting
+DEFAULT_WAIT_POLL_INTERVAL = 2.0
+
+
+def get_socket_path() -> Path:
+    """Get the daemon socket path from MESH_TXD_SOCKET or the default."""
+    return Path(os.environ.get("MESH_TXD_SOCKET") or DEFAULT_SOCKET_PATH)
+
+
+def load_channel_presets(config_dir: Path | None = None) -> dict[int, str]:
+    """
+    Collect the modem preset of every configured BBS channel.
+    
+    Args:
+        config_dir: Directory holding pr_mesh_bbs.yml and
+            pr_cybr_bbs_channels.yml.
+    
+    Returns:
+        Dictionary mapping channel index to modem preset.
+    """
+    config_dir = Path(config_dir) if config_dir else CONFIG_DIR
+    presets = {}
+    
+    mesh_path = config_dir / "pr_mesh_bbs.yml"
+    if mesh_path.exists():
+        with open(mesh_path, "r") as f:
+            bbs = (yaml.safe_load(f) or {}).get("bbs", {})
+        presets[bbs.get("channel", 0)] = bbs.get(
+            "modem_preset", mesh_airtime.DEFAULT_MODEM_PRESET
+        )
+    
+    cybr_path = config_dir / "pr_cybr_bbs_channels.yml"
+    if cybr_path.exists():
+        with open(cybr_path, "r") as f:
+            channels = (yaml.safe_load(f) or {}).get("channels", {})
+        for channel_num, channel_config in channels.items():
+            presets[channel_num] = channel_config.get(
+                "modem_preset", mesh_airtime.DEFAULT_MODEM_PRESET
+            )
+    
+    return presets
+
+
+class RadioWorker:
+    """
+    Keeps one radio connected and sends its channels from the queue.
+    
+    The daemon runs one worker thread per radio, each claiming only the
+    channels the hardware configuration maps to its radio.
+    """
+    
+    def __init__(
+        self,
+        client: meshtastic_client.MeshtasticClient,
+        name: str = "default",
+        channels: Collection[int] | None = None,
+        exclude_channels: Collection[int] = (),
+        want_ack: bool = False,
+        reconnect_delay: float = DEFAULT_RECONNECT_DELAY
+    ):
+        """
+        Initialize the worker.
+        
+        Args:
+            client: Client for this radio (not yet connected).
+            name: Radio name used in health reports.
+            channels: Only send these channels (default: all).
+            exclude_channels: Leave these channels to other radios.
+            want_ack: Request acknowledgements for every message.
+            reconnect_delay: First delay before reconnecting, in seconds.
+        """
+        self.client = client
+        self.name = name
+        self.channels = channels
+        self.exclude_channels = exclude_channels
+        self.want_ack = want_ack
+        self.reconnect_delay = reconnect_delay
+        
+        # Set when a job arrives or the link is lost
+        self.wake = threading.Event()
+        self._lock = threading.Lock()
+        # Consecutive connect failures or lost links, for reconnect backoff
+        self._backoff_attempt = 0
+        
+        self.connects = 0
+        self.connect_failures = 0
+        self.last_error = None
+        self.last_sent_at = None
+        self.node_info = None
+        self.sent = 0
+        self.failed = 0
+    
+    def connect(self) -> bool:
+        """(Re)open the radio connection, recording the outcome."""
+        self.client.disconnect()
+        
+        if not self.client.connect():
+            self._backoff_attempt += 1
+            with self._lock:
+                self.connect_failures += 1
+                self.last_error = "connect failed"
+            return False
+        
+        with self._lock:
+            self.connects += 1
+            self.connect_failures = 0
+            self.node_info = self.client.get_node_info()
+        return True
+    
+    def on_connection_lost(self, interface=None) -> None:
+        """pubsub listener for meshtastic.connection.lost."""
+        if interface is None or interface is self.client.interface:
+            with self._lock:
+                self.last_error = "connection lost"
+            self.client._connected = False
+            self.wake.set()
+    
+    def _link_alive(self) -> bool:
+        """Probe the radio after a failed send."""
+        return self.client.is_connected and self.client.get_node_info() is not None
+    
+    def process_one(self, queue: tx_queue.TransmitQueue) -> bool:
+        """
+        Send the best queued message for this radio, if any.
+        
+        The message is claimed first, so other drainers sharing the queue
+        do not send it too. A message that fails because the radio is gone
+        is released back to the queue and the connection is dropped, so it
+        is resent after reconnecting.
+        
+        Args:
+            queue: Worker's queue connection.
+        
+        Returns:
+            True if a message was taken from the queue.
+        """
+        item = queue.claim(self.channels, self.exclude_channels)
+        if item is None:
+            return False
+        
+        try:
+            record = self.client.send_message(
+                item.message, item.channel, item.hop_limit, self.want_ack
+            )
+        except BaseException:
+            queue.release(item.id)
+            raise
+        
+        if not record.ok and not self._link_alive():
+            queue.release(item.id)
+            with self._lock:
+                self.last_error = "radio unreachable; message kept in queue"
+            self._backoff_attempt += 1
+            self.client.disconnect()
+            return True
+        
+        self._backoff_attempt = 0
+        queue.complete(item.id, record.ok, record.status)
+        with self._lock:
+            self.last_sent_at = time.time()
+            if record.ok:
+                self.sent += 1
+            else:
+                self.failed += 1
+        return True
+    
+    def run(self, queue_path: Path, stop: threading.Event, poll_interval: float) -> None:
+        """Worker thread: keep connected and drain the queue until stop is set."""
+        with tx_queue.TransmitQueue(queue_path) as queue:
+            while not stop.is_set():
+                if not self.client.is_connected:
+                    if self._backoff_attempt:
+                        stop.wait(meshtastic_client.backoff_delay(
+                            self._backoff_attempt, self.reconnect_delay
+                        ))
+                    if stop.is_set() or not self.connect():
+                        continue
+                
+                if not self.process_one(queue):
+                    self._backoff_attempt = 0
+                    self.wake.wait(poll_interval)
+                    self.wake.clear()
+    
+    def health(self) -> dict[str, Any]:
+        """Report this radio's connection and send counts (see TransmitDaemon.health())."""
+        scheduler = self.client.scheduler
+        with self._lock:
+            return {
+                "name": self.name,
+                "connected": self.client.is_connected,
+                "serial_port": self.client.serial_port,
+                "channels": sorted(self.channels) if self.channels is not None else None,
+                "node": self.node_info,
+                "connects": self.connects,
+                "connect_failures": self.connect_failures,
+                "last_error": self.last_error,
+                "last_sent_at": self.last_sent_at,
+                "sent": self.sent,
+                "failed": self.failed,
+                "airtime": scheduler.total_airtime if scheduler else None
+            }
+
+
+class TransmitDaemon:
+    """
+    Owns the Meshtastic radio connections and drains the transmit queue.
+    
+    serve_forever() accepts socket requests until stop() is called; one
+    worker thread per radio sends that radio's queued messages in
+    priority order, reconnecting with backoff whenever the radio is lost.
+    """
+    
+    def __init__(
+        self,
+        client: meshtastic_client.MeshtasticClient | dict[
+            meshtastic_client.RadioConfig, meshtastic_client.MeshtasticClient
+        ],
+        socket_path: Path | None = None,
+        queue_path: Path | None = None,
+        want_ack: bool = False,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        reconnect_delay: float = DEFAULT_RECONNECT_DELAY,
+        config: meshtastic_client.HardwareConfig | None = None
+    ):
+        """
+        Initialize the daemon.
+        
+        Args:
+            client: Client used for every transmission (not yet connected),
+                or a client per radio, each sending only its channels.
+            socket_path: Unix socket to listen on.
+            queue_path: Transmit queue database.
+            want_ack: Request acknowledgements for every message.
+            poll_interval: Seconds between queue polls when idle.
+            reconnect_delay: First delay before reconnecting, in seconds.
+            config: Hardware configuration holding the channel mapping for
+                a client per radio (defaults to the cached one).
+        """
+        if isinstance(client, dict):
+            config = config or meshtastic_client.get_hardware_config()
+            self.workers = [
+                RadioWorker(
+                    radio_client, radio.name, *config.channel_filter(radio),
+                    want_ack=want_ack, reconnect_delay=reconnect_delay
+                )
+                for radio, radio_client in client.items()
+            ]
+        else:
+            self.workers = [
+                RadioWorker(client, want_ack=want_ack, reconnect_delay=reconnect_delay)
+            ]
+        
+        self.socket_path = Path(socket_path) if socket_path else get_socket_path()
+        self.queue_path = Path(queue_path) if queue_path else tx_queue.DEFAULT_QUEUE_PATH
+        self.want_ack = want_ack
+        self.poll_interval = poll_interval
+        
+        self._stop = threading.Event()
+        self._server = None
+        self._threads: list[threading.Thread] = []
+        self.started_at = time.time()
+    
+    def _wake_workers(self) -> None:
+        for worker in self.workers:
+            worker.wake.set()
+    
+    def health(self) -> dict[str, Any]:
+        """
+        Report connection and queue health.
+        
+        Returns:
+            Dictionary with connected (every radio), serial_port and node
+            (of the first radio), uptime, connects (successful connections;
+            more than one per radio means reconnects), connect_failures
+            (consecutive), last_error, last_sent_at, sent/failed counts
+            since start and airtime, all over every radio, plus radios
+            (per-radio reports) and queue metrics.
+        """
+        with tx_queue.TransmitQueue(self.queue_path) as queue:
+            metrics = queue.metrics()
+        
+        radios = [worker.health() for worker in self.workers]
+        airtimes = [radio["airtime"] for radio in radios if radio["airtime"] is not None]
+        sent_times = [radio["last_sent_at"] for radio in radios if radio["last_sent_at"]]
+        return {
+            "connected": all(radio["connected"] for radio in radios),
+            "serial_port": radios[0]["serial_port"],
+            "node": radios[0]["node"],
+            "uptime": time.time() - self.started_at,
+            "connects": sum(radio["connects"] for radio in radios),
+            "connect_failures": sum(radio["connect_failures"] for radio in radios),
+            "last_error": next(
+                (radio["last_error"] for radio in radios if radio["last_error"]), None
+            ),
+            "last_sent_at": max(sent_times, default=None),
+            "sent": sum(radio["sent"] for radio in radios),
+            "failed": sum(radio["failed"] for radio in radios),
+            "airtime": sum(airtimes) if airtimes else None,
+            "radios": radios,
+            "queue": metrics
+        }
+    
+    def handle_request(self, request: dict[str, Any]) -> dict[str, Any]:
+        """
+        Answer one socket request.
+        
+        Args:
+            request: Decoded request object.
+        
+        Returns:
+            Response object; {"ok": false, "error": ...} on bad requests.
+        """
+        op = request.get("op")
+        
+        if op == "ping":
+            return {"ok": True, "radios": [worker.name for worker in self.workers]}
+        
+        if op == "health":
+            return {"ok": True, **self.health()}
+        
+        if op == "send":
+            text = request.get("text")
+            if not isinstance(text, str) or not text:
+                return {"ok": False, "error": "send requires non-empty text"}
+            
+            try:
+                with tx_queue.TransmitQueue(self.queue_path) as queue:
+                    item_id = queue.enqueue(
+                        text,
+                        int(request.get("channel", 0)),
+                        request.get("priority", "normal"),
+                        request.get("hop_limit")
+                    )
+                    depth = queue.depth()
+            except (TypeError, ValueError) as e:
+                return {"ok": False, "error": str(e)}
+            
+            self._wake_workers()
+            return {"ok": True, "id": item_id, "depth": depth}
+        
+        if op == "status":
+            ids = request.get("ids")
+            if not isinstance(ids, list) or not all(
+                isinstance(item_id, int) and not isinstance(item_id, bool) for item_id in ids
+            ):
+                return {"ok": False, "error": "status requires a list of integer ids"}
+            
+            with tx_queue.TransmitQueue(self.queue_path) as queue:
+                return {"ok": True, "status": {str(i): queue.status(i) for i in ids}}
+        
+        return {"ok": False, "error": f"unknown op: {op}"}
+    
+    def _make_server(self) -> socketserver.ThreadingUnixStreamServer:
+        """Bind the Unix socket, replacing a stale one."""
+        if self.socket_path.exists():
+            if daemon_available(self.socket_path):
+                raise RuntimeError(f"A daemon is already listening on {self.socket_path}")
+            self.socket_path.unlink()
+        
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        daemon = self
+        
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in iter(lambda: self.rfile.readline(MAX_REQUEST_BYTES + 1), b""):
+                    if len(line) > MAX_REQUEST_BYTES:
+                        self.reply({"ok": False, "error": "request too large"})
+                        return
+                    
+                    try:
+                        request = json.loads(line)
+                        if not isinstance(request, dict):
+                            raise ValueError("request must be a JSON object")
+                    except ValueError as e:
+                        self.reply({"ok": False, "error": f"bad request: {e}"})
+                    else:
+                        self.reply(daemon.handle_request(request))
+            
+            def reply(self, response):
+                self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+        
+        server = socketserver.ThreadingUnixStreamServer(str(self.socket_path), Handler)
+        server.daemon_threads = True
+        os.chmod(self.socket_path, 0o660)
+        return server
+    
+    def serve_forever(self) -> None:
+        """Listen on the socket and run the workers until stop() is called."""
+        self._server = self._make_server()
+        
+        for worker in self.workers:
+            if pub is not None:
+                pub.subscribe(worker.on_connection_lost, "meshtastic.connection.lost")
+            thread = threading.Thread(
+                target=worker.run,
+                args=(self.queue_path, self._stop, self.poll_interval),
+                name=f"mesh-txd-{worker.name}"
+            )
+            thread.start()
+            self._threads.append(thread)
+        
+        try:
+            self._server.serve_forever(poll_interval=0.2)
+        finally:
+            self._stop.set()
+            self._wake_workers()
+            for thread in self._threads:
+                thread.join()
+            self._server.server_close()
+            for worker in self.workers:
+                worker.client.disconnect()
+            self.socket_path.unlink(missing_ok=True)
+    
+    def stop(self) -> None:
+        """Ask serve_forever() to return (safe from any thread)."""
+        self._stop.set()
+        if self._server is not None:
+            threading.Thread(target=self._server.shutdown).start()
+
+
+def request(
+    payload: dict[str, Any],
+    socket_path: Path | None = None,
+    timeout: float = 10.0
+) -> dict[str, Any]:
+    """
+    Send one request to a running daemon.
+    
+    Args:
+        payload: Request object.
+        socket_path: Daemon socket (defaults to get_socket_path()).
+        timeout: Socket timeout in seconds.
+    
+    Returns:
+        Response object.
+    
+    Raises:
+        OSError: If the daemon cannot be reached.
+    """
+    socket_path = Path(socket_path) if socket_path else get_socket_path()
+    
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(str(socket_path))
+        sock.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+        with sock.makefile("rb") as stream:
+            line = stream.readline()
+    
+    if not line:
+        raise ConnectionError("daemon closed the connection")
+    return json.loads(line)
+
+
+def daemon_available(socket_path: Path | None = None) -> bool:
+    """Check whether a daemon answers on the socket."""
+    return daemon_radios(socket_path) is not None
+
+
+def daemon_radios(socket_path: Path | None = None) -> list[str] | None:
+    """
+    Ask a daemon which radios it drives.
+    
+    Returns:
+        Radio names, or None if no daemon answers on the socket.
+    """
+    try:
+        response = request({"op": "ping"}, socket_path, timeout=2.0)
+    except (OSError, ValueError):
+        return None
+    return response.get("radios", ["default"]) if response.get("ok") else None
+
+
+def use_daemon(
+    socket_path: Path | None = None,
+    config: meshtastic_client.HardwareConfig | None = None
+) -> bool:
+    """
+    Decide whether a tx script should hand its messages to the daemon.
+    
+    A daemon started before radios were added to (or removed from)
+    hardware.yml would send every channel through the wrong radios, so
+    it is only used when it drives exactly the configured radios;
+    otherwise a warning is printed.
+    
+    Args:
+        socket_path: Daemon socket (defaults to get_socket_path()).
+        config: Hardware configuration (defaults to the cached one).
+    
+    Returns:
+        True if a matching daemon is running.
+    """
+    radios = daemon_radios(socket_path)
+    if radios is None:
+        return False
+    
+    config = config or meshtastic_client.get_hardware_config()
+    configured = [radio.name for radio in config.radio_list()]
+    if sorted(radios) != sorted(configured):
+        print(
+            f"Warning: The transmit daemon drives radio(s) {', '.join(radios)} but "
+            f"hardware.yml configures {', '.join(configured)}; restart it to pick up the "
+            "radios. Opening the radios directly (this fails for any radio the daemon holds).",
+            file=sys.stderr
+        )
+        return False
+    return True
+
+
+class DaemonQueue:
+    """
+    Submits messages to a running daemon.
+    
+    Provides the enqueue()/status()/depth() subset of TransmitQueue, so
+    the tx scripts can hand their messages to the daemon instead of
+    opening the radio themselves, then wait() for the daemon to send
+    them.
+    """
+    
+    def __init__(self, socket_path: Path | None = None):
+        """
+        Args:
+            socket_path: Daemon socket (defaults to get_socket_path()).
+        """
+        self.socket_path = socket_path
+        self.queued = 0
+        self.items: dict[int, tx_queue.QueueItem] = {}
+        self._depth = 0
+    
+    def enqueue(
+        self,
+        message: str,
+        channel: int = 0,
+        priority: str = "normal",
+        hop_limit: int | None = None
+    ) -> int:
+        """
+        Queue a message with the daemon.
+        
+        Returns:
+            Queue entry ID.
+        
+        Raises:
+            OSError: If the daemon cannot be reached.
+            ValueError: If the daemon rejects the message.
+        """
+        response = request(
+            {
+                "op": "send",
+                "text": message,
+                "channel": channel,
+                "priority": priority,
+                "hop_limit": hop_limit
+            },
+            self.socket_path
+        )
+        if not response.get("ok"):
+            raise ValueError(response.get("error", "daemon rejected the message"))
+        
+        self.queued += 1
+        self._depth = response["depth"]
+        self.items[response["id"]] = tx_queue.QueueItem(
+            response["id"], channel, priority, message, time.time(), hop_limit
+        )
+        return response["id"]
+    
+    def statuses(self, item_ids: list[int]) -> dict[int, str | None]:
+        """
+        Ask the daemon for the status of queue entries.
+        
+        Returns:
+            Status (pending, sending, sent, failed or None) by entry ID.
+        
+        Raises:
+            OSError: If the daemon cannot be reached.
+            ValueError: If the daemon rejects the request.
+        """
+        response = request({"op": "status", "ids": list(item_ids)}, self.socket_path)
+        if not response.get("ok"):
+            raise ValueError(response.get("error", "daemon rejected the request"))
+        return {int(item_id): status for item_id, status in response["status"].items()}
+    
+    def status(self, item_id: int) -> str | None:
+        """Status of one queue entry (see statuses())."""
+        return self.statuses([item_id]).get(item_id)
+    
+    def depth(self) -> int:
+        """Queue depth reported by the daemon after the last enqueue."""
+        return self._depth
+    
+    def wait(
+        self,
+        on_sent: Callable[[tx_queue.QueueItem], None] | None = None,
+        timeout: float = DEFAULT_WAIT_SECONDS,
+        poll_interval: float = DEFAULT_WAIT_POLL_INTERVAL
+    ) -> tuple[int, int, int]:
+        """
+        Wait for the daemon to send the messages queued through this object.
+        
+        Args:
+            on_sent: Called with each message as the daemon reports it sent.
+            timeout: Stop waiting after this many seconds; messages not yet
+                sent stay queued with the daemon.
+            poll_interval: Seconds between status requests.
+        
+        Returns:
+            Tuple of (messages sent, messages failed, messages still queued).
+        
+        Raises:
+            OSError: If the daemon cannot be reached.
+            ValueError: If the daemon rejects the request.
+        """
+        waiting = dict(self.items)
+        sent = failed = 0
+        deadline = time.monotonic() + timeout
+        
+        while waiting:
+            for item_id, status in self.statuses(list(waiting)).items():
+                if status == "sent":
+                    sent += 1
+                    if on_sent:
+                        on_sent(waiting[item_id])
+                elif status in ("pending", "sending"):
+                    continue
+                else:
+                    failed += 1
+                waiting.pop(item_id)
+            
+            if not waiting or time.monotonic() >= deadline:
+                break
+            time.sleep(min(poll_interval, max(0.0, deadline - time.monotonic())))
+        
+        return sent, failed, len(waiting)
+
+
+def print_health(health: dict[str, Any]) -> None:
+    """Print a health response."""
+    for radio in health.get("radios") or [health]:
+        node = radio.get("node") or {}
+        status = "connected" if radio["connected"] else "DISCONNECTED"
+        name = f" {radio['name']}" if len(health.get("radios") or ()) > 1 else ""
+        
+        print(f"Radio{name}: {status} ({radio.get('serial_port') or 'auto'})")
+        if node:
+            print(f"Node: {node.get('name', 'unknown')} {node.get('node_id', '')}")
+        if radio.get("last_error"):
+            print(f"Last error: {radio['last_error']}")
+    print(f"Uptime: {health['uptime']:.0f}s, connections: {health['connects']}")
+    print(f"Sent: {health['sent']}, failed: {health['failed']}")
+    tx_queue.print_metrics(health["queue"])
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Resident Meshtastic transmit daemon"
+    )
+    parser.add_argument(
+        "--socket",
+        type=Path,
+        default=None,
+        help="Unix socket path (default: $MESH_TXD_SOCKET or data/mesh_txd.sock)"
+    )
+    subparsers = parser.add_subparsers(dest="command", help="Command to run")
+    
+    run_parser = subparsers.add_parser("run", help="Run the daemon")
+    run_parser.add_argument(
+        "--queue",
+        type=Path,
+        default=tx_queue.DEFAULT_QUEUE_PATH,
+        help="Transmit queue database"
+    )
+    run_parser.add_argument(
+        "--want-ack",
+        action="store_true",
+        help="Request acknowledgements for every message"
+    )
+    
+    send_parser = subparsers.add_parser("send", help="Queue a message with the daemon")
+    send_parser.add_argument("--channel", type=int, default=0, help="Channel index")
+    send_parser.add_argument(
+        "--priority",
+        choices=list(tx_queue.PRIORITY_RANKS),
+        default="normal",
+        help="Message priority"
+    )
+    send_parser.add_argument("--text", required=True, help="Message text")
+    send_parser.add_argument("--hop-limit", type=int, default=None, help="Hop limit")
+    
+    subparsers.add_parser("health", help="Show daemon health (exit 1 if disconnected)")
+    
+    args = parser.parse_args()
+    
+    if not args.command:
+        parser.print_help()
+        return 1
+    
+    if args.command == "run":
+        # One connection and worker per radio in hardware.yml, each
+        # sending only the channels mapped to it
+        hardware = meshtastic_client.get_hardware_config()
+        presets = load_channel_presets()
+        clients = {
+            radio: meshtastic_client.create_client(
+                serial_port=radio.serial_port,
+                config=hardware,
+                scheduler=meshtastic_client.create_scheduler(presets, hardware)
+            )
+            for radio in hardware.radio_list()
+        }
+        daemon = TransmitDaemon(
+            clients, args.socket, args.queue, args.want_ack, config=hardware
+        )
+        if len(clients) > 1:
+            for worker in daemon.workers:
+                channels = (
+                    ", ".join(map(str, sorted(worker.channels)))
+                    if worker.channels is not None else "all others"
+                )
+                port = worker.client.serial_port or "auto"
+                print(f"Radio {worker.name} ({port}): channels {channels}")
+        
+        # The daemon holds the radios, so it also records what they hear
+        receive = hardware.raw.get("receive") or {}
+        store = rx_store.ReceiveStore.from_config(receive) if receive.get("enabled") else None
+        if store is not None:
+            for client in clients.values():
+                rx_store.attach_recorder(client, store)
+            print(f"Recording received traffic to {store.db_path}")
+        
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, lambda *_: daemon.stop())
+        
+        print(f"Listening on {daemon.socket_path}")
+        try:
+            daemon.serve_forever()
+        except RuntimeError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+        finally:
+            if store is not None:
+                store.close()
+        return 0
+    
+    try:
+        if args.command == "send":
+            response = request(
+                {
+                    "op": "send",
+                    "text": args.text,
+                    "channel": args.channel,
+                    "priority": args.priority,
+                    "hop_limit": args.hop_limit
+                },
+                args.socket
+            )
+            if not response.get("ok"):
+                print(f"Error: {response.get('error')}", file=sys.stderr)
+                return 1
+            print(f"Queued message {response['id']} ({args.priority}, depth {response['depth']})")
+            return 0
+        
+        health = request({"op": "health"}, args.socket)
+    except OSError as e:
+        print(f"Error: Cannot reach daemon: {e}", file=sys.stderr)
+        return 1
+    
+    print_health(health)
+    return 0 if health["connected"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,481 @@
+#!/usr/bin/env python3
+"""
+Mesh Wire Schema Module
+
+A compact, versioned binary encoding for the BBS payloads built by
+generate_bbs_payload() and generate_channel_payload(), for sending whole
+payloads over LoRa instead of JSON.
+
+Encoding (version 1):
+    <version byte><kind byte><fields>
+
+Fields are protobuf-style: a varint key (tag << 3 | wire type) followed
+by a varint (wire type 0) or a length-prefixed value (wire type 2).
+Timestamps are epoch seconds, schedule times are minutes after midnight,
+and categories and priorities are enum numbers. Values that do not fit
+(a non-ISO timestamp, an unknown or differently cased category) are sent
+as strings instead, so every payload round-trips. Lists are a single
+length-prefixed field, so an empty list survives. Decoders skip tags
+they do not know; a change that older decoders cannot skip needs a new
+version byte.
+
+Decoded timestamps are UTC ISO 8601 with whole seconds, so they compare
+equal as instants, not always as strings.
+
+Over the air the encoding is wrapped as text: a header byte, then the
+Base85 of the encoding, deflated against mesh_compress's preset
+dictionary when that is smaller. Being text, it passes through
+fragmentation, the transmit queue and the daemon like any other message.
+
+Usage:
+    python scripts/mesh_wire.py compare [PAYLOAD.json ...]
+"""
+
+import argparse
+import base64
+import json
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+# Handle both package and standalone execution
+try:
+    from . import mesh_compress, mesh_fragment
+except ImportError:
+    import mesh_compress
+    import mesh_fragment
+
+
+# Schema version written by encode()
+WIRE_VERSION = 1
+
+# Header bytes marking wire-encoded text -> mesh_compress dictionary
+# header the encoding is deflated with (None: not deflated)
+WIRE_HEADERS = {
+    "\x1b": None,
+    "\x1c": "\x1a",
+}
+
+# Wire types
+VARINT = 0
+LENGTH = 2
+
+# Payload kinds, by the key holding the payload's entries
+PAYLOAD_KINDS = {"bulletins": 1, "items": 2}
+
+# Enum values; append only (numbers are positions in these lists)
+CATEGORIES = [
+    "INFO", "ANNOUNCEMENT", "SITREP", "OPS", "INTEL", "PLANS",
+    "M3SH", "LOGISTICS", "MAILBOX", "NODE_STATUS", "ALERT"
+]
+PRIORITIES = ["normal", "high", "low"]
+
+# name -> (tag, value type, is list)
+PAYLOAD_FIELDS = {
+    "bbs": (1, "str", False),
+    "channel": (2, "uint", False),
+    "name": (3, "str", False),
+    "generated_at": (4, "time", False),
+    "schedule": (5, "clock", True),
+    "bulletins": (6, "entry", True),
+    "items": (7, "entry", True),
+}
+ENTRY_FIELDS = {
+    "id": (1, "str", False),
+    "category": (2, "category", False),
+    "title": (3, "str", False),
+    "body": (4, "str", False),
+    "tags": (5, "str", True),
+    "valid_from": (6, "time", False),
+    "valid_until": (7, "time", False),
+    "priority": (8, "priority", False),
+}
+
+# Default directories of generated payloads, for compare
+REPO_ROOT = Path(__file__).parent.parent
+DEFAULT_PAYLOAD_GLOBS = ["out/pr-mesh-bbs/*.json", "out/pr-cybr-bbs/*.json"]
+
+
+def _varint(value: int) -> bytes:
+    """Encode a non-negative integer as a varint."""
+    out = bytearray()
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _read_varint(data: bytes, pos: int) -> tuple[int, int]:
+    """
+    Read a varint.
+    
+    Returns:
+        Tuple of (value, position after the varint).
+    
+    Raises:
+        ValueError: If the data ends mid-varint.
+    """
+    value = 0
+    shift = 0
+    while True:
+        if pos >= len(data):
+            raise ValueError("Truncated varint")
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, pos
+        shift += 7
+
+
+def _length_prefixed(data: bytes) -> bytes:
+    return _varint(len(data)) + data
+
+
+def _encode_value(kind: str, value: Any) -> tuple[int, bytes]:
+    """
+    Encode one value of a schema type.
+    
+    Returns:
+        Tuple of (wire type, encoded bytes).
+    
+    Raises:
+        ValueError: If the value cannot be encoded as its type.
+    """
+    if kind == "entry":
+        return LENGTH, _length_prefixed(_encode_fields(value, ENTRY_FIELDS))
+    
+    if kind == "uint":
+        if not isinstance(value, int) or value < 0:
+            raise ValueError(f"Expected a non-negative integer, got {value!r}")
+        return VARINT, _varint(value)
+    
+    if kind == "time":
+        try:
+            parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+            if parsed.tzinfo is None:
+                parsed = parsed.replace(tzinfo=timezone.utc)
+            seconds = int(parsed.timestamp())
+            if seconds >= 0:
+                return VARINT, _varint(seconds)
+        except ValueError:
+            pass
+    elif kind == "clock":
+        hours, _, minutes = str(value).partition(":")
+        # Only the HH:MM form the decoder writes back
+        if hours.isdigit() and minutes.isdigit() and len(hours) == len(minutes) == 2:
+            return VARINT, _varint(int(hours) * 60 + int(minutes))
+    elif kind == "category" and value in CATEGORIES:
+        return VARINT, _varint(CATEGORIES.index(value))
+    elif kind == "priority" and value in PRIORITIES:
+        return VARINT, _varint(PRIORITIES.index(value))
+    
+    # Strings, and values that do not fit their compact form
+    if not isinstance(value, str):
+        raise ValueError(f"Expected a string, got {value!r}")
+    return LENGTH, _length_prefixed(value.encode("utf-8"))
+
+
+def _encode_fields(obj: dict[str, Any], fields: dict[str, tuple[str, str, bool]]) -> bytes:
+    """Encode a dict's fields in schema order."""
+    out = bytearray()
+    
+    for name, value in obj.items():
+        if name not in fields:
+            raise ValueError(f"No wire tag for field: {name}")
+    
+    for name, (tag, kind, is_list) in fields.items():
+        if name not in obj:
+            continue
+        value = obj[name]
+        
+        if is_list:
+            if not isinstance(value, list):
+                raise ValueError(f"{name}: Expected a list, got {type(value).__name__}")
+            # Each element keeps its own key so compact and fallback
+            # values can be mixed in one list
+            body = bytearray()
+            for element in value:
+                wire_type, data = _encode_value(kind, element)
+                body += _varint(wire_type) + data
+            out += _varint(tag << 3 | LENGTH) + _length_prefixed(bytes(body))
+        else:
+            wire_type, data = _encode_value(kind, value)
+            out += _varint(tag << 3 | wire_type) + data
+    
+    return bytes(out)
+
+
+def encode(payload: dict[str, Any]) -> bytes:
+    """
+    Encode a BBS payload.
+    
+    Args:
+        payload: Payload from generate_bbs_payload() or
+            generate_channel_payload().
+    
+    Returns:
+        Encoded bytes.
+    
+    Raises:
+        ValueError: If the payload has fields or values outside the schema.
+    """
+    kinds = [key for key in PAYLOAD_KINDS if key in payload]
+    if len(kinds) != 1:
+        raise ValueError("Payload must have exactly one of: bulletins, items")
+    
+    return bytes([WIRE_VERSION, PAYLOAD_KINDS[kinds[0]]]) + _encode_fields(payload, PAYLOAD_FIELDS)
+
+
+def _read_value(kind: str, wire_type: int, data: bytes, pos: int) -> tuple[Any, int]:
+    """
+    Read one value of a schema type.
+    
+    Returns:
+        Tuple of (value, position after the value).
+    """
+    if wire_type == VARINT:
+        number, pos = _read_varint(data, pos)
+        
+        if kind == "time":
+            return datetime.fromtimestamp(number, timezone.utc).isoformat(), pos
+        if kind == "clock":
+            return f"{number // 60:02d}:{number % 60:02d}", pos
+        if kind in ("category", "priority"):
+            names = CATEGORIES if kind == "category" else PRIORITIES
+            if number >= len(names):
+                raise ValueError(f"Unknown {kind} number: {number}")
+            return names[number], pos
+        return number, pos
+    
+    if wire_type == LENGTH:
+        length, pos = _read_varint(data, pos)
+        if pos + length > len(data):
+            raise ValueError("Truncated field")
+        raw = data[pos:pos + length]
+        
+        if kind == "entry":
+            return _decode_fields(raw, ENTRY_FIELDS), pos + length
+        return raw.decode("utf-8"), pos + length
+    
+    raise ValueError(f"Unknown wire type: {wire_type}")
+
+
+def _skip(wire_type: int, data: bytes, pos: int) -> int:
+    """Skip a field with an unknown tag."""
+    if wire_type == VARINT:
+        return _read_varint(data, pos)[1]
+    if wire_type == LENGTH:
+        length, pos = _read_varint(data, pos)
+        return pos + length
+    raise ValueError(f"Unknown wire type: {wire_type}")
+
+
+def _decode_fields(data: bytes, fields: dict[str, tuple[str, str, bool]]) -> dict[str, Any]:
+    """Decode fields into a dict, skipping unknown tags."""
+    by_tag = {tag: (name, kind, is_list) for name, (tag, kind, is_list) in fields.items()}
+    obj = {}
+    pos = 0
+    
+    while pos < len(data):
+        key, pos = _read_varint(data, pos)
+        tag, wire_type = key >> 3, key & 0x7
+        
+        if tag not in by_tag:
+            pos = _skip(wire_type, data, pos)
+            continue
+        
+        name, kind, is_list = by_tag[tag]
+        if not is_list:
+            obj[name], pos = _read_value(kind, wire_type, data, pos)
+            continue
+        
+        if wire_type != LENGTH:
+            raise ValueError(f"{name}: Expected a list")
+        length, pos = _read_varint(data, pos)
+        end = pos + length
+        if end > len(data):
+            raise ValueError("Truncated field")
+        
+        values = []
+        while pos < end:
+            element_type, pos = _read_varint(data, pos)
+            value, pos = _read_value(kind, element_type, data, pos)
+            values.append(value)
+        obj[name] = values
+    
+    if pos != len(data):
+        raise ValueError("Truncated field")
+    return obj
+
+
+def decode(data: bytes) -> dict[str, Any]:
+    """
+    Decode bytes from encode().
+    
+    Args:
+        data: Encoded payload.
+    
+    Returns:
+        Payload dictionary.
+    
+    Raises:
+        ValueError: If the data is malformed or from an unknown version.
+    """
+    if len(data) < 2:
+        raise ValueError("Wire payload too short")
+    if data[0] != WIRE_VERSION:
+        raise ValueError(f"Unsupported wire version: {data[0]}")
+    if data[1] not in PAYLOAD_KINDS.values():
+        raise ValueError(f"Unknown payload kind: {data[1]}")
+    
+    try:
+        return _decode_fields(data[2:], PAYLOAD_FIELDS)
+    except (IndexError, UnicodeDecodeError, OverflowError) as e:
+        raise ValueError(f"Malformed wire payload: {e}") from e
+
+
+def is_wire_text(text: str) -> bool:
+    """Check whether a received message is a wire-encoded payload."""
+    return text[:1] in WIRE_HEADERS
+
+
+def encode_text(payload: dict[str, Any], compress: bool = True) -> str:
+    """
+    Encode a payload as a text message.
+    
+    Args:
+        payload: BBS payload.
+        compress: Deflate the encoding when that makes it smaller.
+    
+    Returns:
+        Header byte followed by Base85 text.
+    
+    Raises:
+        ValueError: If the payload has fields or values outside the schema.
+    """
+    data = encode(payload)
+    candidates = [(None, data)]
+    if compress:
+        candidates.append((mesh_compress.CURRENT_HEADER, mesh_compress.compress_bytes(data)))
+    
+    dictionary, data = min(candidates, key=lambda candidate: len(candidate[1]))
+    header = next(h for h, d in WIRE_HEADERS.items() if d == dictionary)
+    return header + base64.b85encode(data).decode("ascii")
+
+
+def decode_text(text: str) -> dict[str, Any]:
+    """
+    Decode a text message from encode_text().
+    
+    Raises:
+        ValueError: If the text is not a valid wire-encoded payload.
+    """
+    if not is_wire_text(text):
+        raise ValueError("Not a wire-encoded payload")
+    
+    data = base64.b85decode(text[1:])
+    dictionary = WIRE_HEADERS[text[0]]
+    if dictionary is not None:
+        data = mesh_compress.decompress_bytes(data, dictionary)
+    return decode(data)
+
+
+def compare(payload: dict[str, Any], max_size: int) -> dict[str, int]:
+    """
+    Compare the sizes of a payload as JSON and in the wire format.
+    
+    Args:
+        payload: BBS payload.
+        max_size: Maximum bytes per frame.
+    
+    Returns:
+        Dictionary of bytes and frames for compact JSON, compressed
+        JSON (mesh_compress), the binary encoding and its (deflated)
+        text form.
+    """
+    json_text = json.dumps(payload, separators=(",", ":"))
+    forms = {
+        "json": json_text,
+        "json_compressed": mesh_compress.encode_text(json_text),
+        "wire": encode_text(payload),
+    }
+    
+    sizes = {"binary_bytes": len(encode(payload))}
+    for name, text in forms.items():
+        sizes[f"{name}_bytes"] = len(text.encode("utf-8"))
+        sizes[f"{name}_frames"] = len(mesh_fragment.fragment_text(text, max_size))
+    return sizes
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Compact binary wire schema for BBS payloads"
+    )
+    subparsers = parser.add_subparsers(dest="command", help="Command to run")
+    
+    compare_parser = subparsers.add_parser(
+        "compare", help="Compare JSON and wire sizes of generated payloads"
+    )
+    compare_parser.add_argument(
+        "payloads",
+        type=Path,
+        nargs="*",
+        help="Payload JSON files (default: everything under out/)"
+    )
+    compare_parser.add_argument(
+        "--max-size",
+        type=int,
+        default=228,
+        help="Maximum bytes per frame"
+    )
+    
+    args = parser.parse_args()
+    
+    if not args.command:
+        parser.print_help()
+        return 1
+    
+    paths = args.payloads or sorted(
+        path for pattern in DEFAULT_PAYLOAD_GLOBS for path in REPO_ROOT.glob(pattern)
+    )
+    if not paths:
+        print("Error: No payloads found; run the generators first", file=sys.stderr)
+        return 1
+    
+    print(
+        f"{'Payload':<24} {'JSON':>6} {'Zlib':>6} {'Binary':>6} {'Wire':>6}   "
+        f"{'Frames (JSON/Zlib/Wire)':>23}"
+    )
+    totals: dict[str, int] = {}
+    
+    for path in paths:
+        try:
+            with open(path, "r") as f:
+                sizes = compare(json.load(f), args.max_size)
+        except (OSError, ValueError) as e:
+            print(f"Warning: Skipping {path}: {e}", file=sys.stderr)
+            continue
+        
+        for key, value in sizes.items():
+            totals[key] = totals.get(key, 0) + value
+        print(
+            f"{path.name[:24]:<24} {sizes['json_bytes']:>6} {sizes['json_compressed_bytes']:>6} "
+            f"{sizes['binary_bytes']:>6} {sizes['wire_bytes']:>6}   "
+            f"{sizes['json_frames']:>7}/{sizes['json_compressed_frames']}/{sizes['wire_frames']}"
+        )
+    
+    if totals:
+        print(
+            f"{'Total':<24} {totals['json_bytes']:>6} {totals['json_compressed_bytes']:>6} "
+            f"{totals['binary_bytes']:>6} {totals['wire_bytes']:>6}   "
+            f"{totals['json_frames']:>7}/{totals['json_compressed_frames']}/{totals['wire_frames']}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
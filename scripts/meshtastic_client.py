@@ -5,63 +5,458 @@ Meshtastic Client Helper Module
 Provides a unified interface for connecting to Meshtastic devices
 and transmitting JSON payloads over specified channels.
 
-Configuration is read from config/hardware.yml and environment variables.
+AsyncMeshtasticClient wraps the client for asyncio programs that send
+and receive concurrently. Blocking programs receive through
+MeshtasticClient.add_receive_handler() (see rx_store).
+
+Configuration is read from config/hardware.yml and environment variables
+once per process and cached as a HardwareConfig; pass reload=True (or
+check_mtime=True to reload only when the file changed) to
+get_hardware_config() to pick up edits.
+
+Several radios can be declared under ``radios:`` in hardware.yml, each
+serving a set of channels, so channels on different radios transmit
+concurrently (see tx_queue.drain_radios()).
 """
 
+import asyncio
 import json
 import os
+import random
 import sys
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any
+from typing import Any, AsyncIterator, Callable, Mapping
 
 import yaml
 
+# Handle both package and standalone execution
+try:
+    from . import mesh_airtime, mesh_compress, mesh_fragment, mesh_wire
+except ImportError:
+    import mesh_airtime
+    import mesh_compress
+    import mesh_fragment
+    import mesh_wire
+
+# pypubsub ships with meshtastic and carries its receive events
+try:
+    from pubsub import pub
+except ImportError:
+    pub = None
+
+
+# Default hardware configuration file
+HARDWARE_CONFIG_PATH = Path(__file__).parent.parent / "config" / "hardware.yml"
 
-def load_hardware_config() -> dict[str, Any]:
-    """Load hardware configuration from YAML file."""
-    config_path = Path(__file__).parent.parent / "config" / "hardware.yml"
+# Configuration used when config/hardware.yml is missing
+DEFAULT_HARDWARE_CONFIG = {
+    "serial": {"port": None, "baud": 115200, "timeout": 10},
+    "runtime": {"default_hop_limit": 3, "max_message_size": 228}
+}
+
+
+def load_hardware_config(config_path: Path | None = None) -> dict[str, Any]:
+    """
+    Load the raw hardware configuration from YAML file.
+    
+    This always reads the file; use get_hardware_config() for the cached,
+    typed configuration.
+    """
+    config_path = config_path or HARDWARE_CONFIG_PATH
     
     if not config_path.exists():
-        return {
-            "serial": {"port": None, "baud": 115200, "timeout": 10},
-            "runtime": {"default_hop_limit": 3, "max_message_size": 228}
-        }
+        return DEFAULT_HARDWARE_CONFIG
     
     with open(config_path, "r") as f:
-        return yaml.safe_load(f)
+        return yaml.safe_load(f) or {}
+
+
+@dataclass(frozen=True)
+class RadioConfig:
+    """
+    One radio (serial device) and the channels it transmits.
+    
+    Attributes:
+        name: Name used in logs.
+        serial_port: Serial port path, or None to auto-detect.
+        channels: Channel indexes sent through this radio. The first radio
+            without channels (or the first radio, if all list channels)
+            also sends every channel no radio lists.
+    """
+    
+    name: str = "default"
+    serial_port: str | None = None
+    channels: tuple[int, ...] = ()
+    
+    @classmethod
+    def from_dict(cls, data: dict[str, Any], index: int = 0) -> "RadioConfig":
+        """Build a radio from one entry of hardware.yml's radios list."""
+        return cls(
+            name=str(data.get("name") or f"radio{index}"),
+            serial_port=data.get("port"),
+            channels=tuple(int(channel) for channel in data.get("channels") or ())
+        )
+
+
+@dataclass(frozen=True)
+class HardwareConfig:
+    """
+    Typed hardware configuration with environment overrides applied.
+    
+    Attributes:
+        serial_port: Serial port path, or None to auto-detect.
+        baud_rate: Serial baud rate.
+        timeout: Connection timeout in seconds.
+        device_type: Expected device type.
+        region: LoRa region.
+        default_hop_limit: Hop limit for transmitted messages.
+        max_message_size: Maximum message size in bytes.
+        retry_count: Retry count for failed transmissions.
+        retry_delay: Delay between retries in seconds.
+        duty_cycle: Fraction of duty_cycle_window a channel may transmit.
+        duty_cycle_window: Airtime budget window in seconds.
+        ack_timeout: Seconds to wait for a want-ack acknowledgement.
+        interface: Interface factory name ("serial", or "sim" for the
+            simulated mesh).
+        compression: Send messages in the compressed wire format (see
+            mesh_compress) when that is smaller.
+        radios: Radios from the radios list; empty means a single radio
+            on serial_port.
+        raw: The parsed YAML document.
+    """
+    
+    serial_port: str | None = None
+    baud_rate: int = 115200
+    timeout: int = 10
+    device_type: str | None = None
+    region: str | None = None
+    default_hop_limit: int = 3
+    max_message_size: int = 228
+    retry_count: int = 3
+    retry_delay: float = 5
+    duty_cycle: float = 0.10
+    duty_cycle_window: float = 600
+    ack_timeout: float = 30
+    interface: str = "serial"
+    compression: bool = False
+    radios: tuple[RadioConfig, ...] = ()
+    raw: dict[str, Any] = field(default_factory=dict, repr=False, compare=False)
+    
+    @classmethod
+    def from_dict(
+        cls,
+        data: dict[str, Any],
+        environ: Mapping[str, str] | None = None
+    ) -> "HardwareConfig":
+        """
+        Build a configuration from a parsed hardware.yml document.
+        
+        MESH_SERIAL_PORT, MESH_BAUD and MESH_INTERFACE in ``environ``
+        (default os.environ) take precedence over the file.
+        
+        Raises:
+            ValueError: If two radios list the same channel.
+        """
+        if environ is None:
+            environ = os.environ
+        
+        serial = data.get("serial") or {}
+        device = data.get("device") or {}
+        runtime = data.get("runtime") or {}
+        
+        radios = tuple(
+            RadioConfig.from_dict(radio, index)
+            for index, radio in enumerate(data.get("radios") or [])
+        )
+        owners: dict[int, str] = {}
+        for radio in radios:
+            for channel in radio.channels:
+                if channel in owners:
+                    raise ValueError(
+                        f"Channel {channel} is mapped to both {owners[channel]} and {radio.name}"
+                    )
+                owners[channel] = radio.name
+        
+        return cls(
+            serial_port=environ.get("MESH_SERIAL_PORT") or serial.get("port"),
+            baud_rate=int(environ.get("MESH_BAUD") or serial.get("baud", 115200)),
+            timeout=serial.get("timeout", 10),
+            device_type=device.get("type"),
+            region=device.get("region"),
+            default_hop_limit=runtime.get("default_hop_limit", 3),
+            max_message_size=runtime.get("max_message_size", 228),
+            retry_count=runtime.get("retry_count", 3),
+            retry_delay=runtime.get("retry_delay", 5),
+            duty_cycle=runtime.get("duty_cycle", 0.10),
+            duty_cycle_window=runtime.get("duty_cycle_window", 600),
+            ack_timeout=runtime.get("ack_timeout", 30),
+            interface=environ.get("MESH_INTERFACE") or device.get("interface", "serial"),
+            compression=bool(runtime.get("compression", False)),
+            radios=radios,
+            raw=data
+        )
+    
+    def radio_list(self) -> tuple[RadioConfig, ...]:
+        """The configured radios, or a single default radio on serial_port."""
+        return self.radios or (RadioConfig(serial_port=self.serial_port),)
+    
+    def _catch_all_radio(self) -> RadioConfig:
+        radios = self.radio_list()
+        return next((radio for radio in radios if not radio.channels), radios[0])
+    
+    def radio_for_channel(self, channel: int) -> RadioConfig:
+        """Get the radio that transmits a channel."""
+        for radio in self.radio_list():
+            if channel in radio.channels:
+                return radio
+        return self._catch_all_radio()
+    
+    def channel_filter(
+        self,
+        radio: RadioConfig
+    ) -> tuple[frozenset[int] | None, frozenset[int]]:
+        """
+        Describe the channels a radio transmits, for filtering a queue.
+        
+        Returns:
+            Tuple of (channels to include, or None for any; channels to
+            exclude).
+        """
+        if radio != self._catch_all_radio():
+            return frozenset(radio.channels), frozenset()
+        
+        others = frozenset(
+            channel
+            for other in self.radio_list() if other != radio
+            for channel in other.channels
+        )
+        return None, others
+
+
+# Cached configuration: path -> (mtime_ns or None, HardwareConfig)
+_config_cache: dict[Path, tuple[int | None, HardwareConfig]] = {}
+_config_lock = threading.Lock()
+
+
+def _config_mtime(config_path: Path) -> int | None:
+    try:
+        return config_path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def get_hardware_config(
+    config_path: Path | None = None,
+    reload: bool = False,
+    check_mtime: bool = False
+) -> HardwareConfig:
+    """
+    Get the cached hardware configuration, loading it on first use.
+    
+    Args:
+        config_path: Configuration file (defaults to config/hardware.yml).
+        reload: Always re-read the file and environment.
+        check_mtime: Re-read only if the file's mtime changed.
+    
+    Returns:
+        HardwareConfig instance.
+    """
+    config_path = Path(config_path) if config_path else HARDWARE_CONFIG_PATH
+    
+    with _config_lock:
+        cached = _config_cache.get(config_path)
+        
+        if cached is not None and not reload:
+            if not check_mtime or cached[0] == _config_mtime(config_path):
+                return cached[1]
+        
+        mtime = _config_mtime(config_path)
+        config = HardwareConfig.from_dict(load_hardware_config(config_path))
+        _config_cache[config_path] = (mtime, config)
+        return config
 
 
 def get_serial_port() -> str | None:
     """Get the serial port from environment or config."""
-    # Environment variable takes precedence
-    port = os.environ.get("MESH_SERIAL_PORT")
-    if port:
-        return port
-    
-    config = load_hardware_config()
-    return config.get("serial", {}).get("port")
+    return get_hardware_config().serial_port
 
 
 def get_baud_rate() -> int:
     """Get the baud rate from environment or config."""
-    baud = os.environ.get("MESH_BAUD")
-    if baud:
-        return int(baud)
-    
-    config = load_hardware_config()
-    return config.get("serial", {}).get("baud", 115200)
+    return get_hardware_config().baud_rate
 
 
 def get_default_hop_limit() -> int:
     """Get the default hop limit from config."""
-    config = load_hardware_config()
-    return config.get("runtime", {}).get("default_hop_limit", 3)
+    return get_hardware_config().default_hop_limit
 
 
 def get_max_message_size() -> int:
     """Get the maximum message size from config."""
-    config = load_hardware_config()
-    return config.get("runtime", {}).get("max_message_size", 228)
+    return get_hardware_config().max_message_size
+
+
+def frame_message(message: str, config: HardwareConfig | None = None) -> list[str]:
+    """
+    Split a message into the frames that would go over the air.
+    
+    The message is compressed first if runtime.compression is enabled.
+    
+    Args:
+        message: Text message.
+        config: Hardware configuration (default: get_hardware_config()).
+    
+    Returns:
+        List of frame texts.
+    
+    Raises:
+        ValueError: If the message needs more frames than the format allows.
+    """
+    config = config or get_hardware_config()
+    
+    if config.compression:
+        message = mesh_compress.encode_text(message)
+    return mesh_fragment.fragment_text(message, config.max_message_size)
+
+
+# Upper bound for a single retry backoff delay, in seconds
+MAX_RETRY_BACKOFF = 60.0
+
+# Delivery records kept per client (oldest are forgotten first)
+MAX_DELIVERY_RECORDS = 256
+
+# Received packets buffered for AsyncMeshtasticClient (oldest dropped beyond)
+DEFAULT_RECEIVE_QUEUE_SIZE = 256
+
+
+def backoff_delay(
+    attempt: int,
+    base_delay: float,
+    rng: random.Random | None = None
+) -> float:
+    """
+    Jittered exponential backoff before a retry.
+    
+    The nominal delay doubles per attempt (capped at MAX_RETRY_BACKOFF);
+    the actual delay is drawn from its upper half so concurrent senders
+    spread out without retrying immediately.
+    
+    Args:
+        attempt: 1 for the first retry, 2 for the second, ...
+        base_delay: Delay before the first retry (runtime.retry_delay).
+        rng: Random source (defaults to the random module).
+    
+    Returns:
+        Seconds to wait.
+    """
+    delay = min(base_delay * 2 ** (attempt - 1), MAX_RETRY_BACKOFF)
+    return delay / 2 + (rng or random).uniform(0, delay / 2)
+
+
+@dataclass
+class FrameDelivery:
+    """
+    Delivery state of one frame of a message.
+    
+    Attributes:
+        packet_id: Radio packet ID of the last attempt, if known.
+        attempts: Transmission attempts made.
+        status: pending, sent (handed to the radio, no ack requested),
+            acked, nak or failed.
+        error: Last error or NAK reason.
+    """
+    
+    packet_id: int | None = None
+    attempts: int = 0
+    status: str = "pending"
+    error: str | None = None
+
+
+@dataclass
+class DeliveryRecord:
+    """
+    Delivery status of one message sent by MeshtasticClient.
+    
+    Attributes:
+        message_id: Local ID of the message.
+        channel_index: Channel the message was sent on.
+        want_ack: Whether acknowledgements were requested.
+        frames: Per-frame delivery state.
+        created_at: Unix time the send started.
+    """
+    
+    message_id: str
+    channel_index: int
+    want_ack: bool
+    frames: list[FrameDelivery] = field(default_factory=list)
+    created_at: float = field(default_factory=time.time)
+    
+    @property
+    def status(self) -> str:
+        """
+        Overall status: failed or nak if any frame was, acked or sent if
+        every frame was, otherwise pending.
+        """
+        statuses = {frame.status for frame in self.frames}
+        for status in ("failed", "nak", "pending"):
+            if status in statuses:
+                return status
+        return "acked" if self.want_ack else "sent"
+    
+    @property
+    def ok(self) -> bool:
+        """True if every frame left the radio (and was acked, if requested)."""
+        return self.status in ("sent", "acked")
+
+
+def _serial_interface(client: "MeshtasticClient") -> Any:
+    """Open a meshtastic SerialInterface on the client's port."""
+    # Import here to allow module to load without meshtastic installed
+    import meshtastic.serial_interface
+    
+    if client.serial_port:
+        return meshtastic.serial_interface.SerialInterface(devPath=client.serial_port)
+    
+    # Auto-detect if no port specified
+    return meshtastic.serial_interface.SerialInterface()
+
+
+def _simulated_interface(client: "MeshtasticClient") -> Any:
+    """Attach to the process-wide simulated mesh (see mesh_sim)."""
+    # Imported here: mesh_sim imports this module
+    try:
+        from . import mesh_sim
+    except ImportError:
+        import mesh_sim
+    
+    return mesh_sim.get_default_mesh(client.config).interface_factory(client)
+
+
+# Interface factories by name: factory(client) -> meshtastic interface
+INTERFACE_FACTORIES: dict[str, Callable[["MeshtasticClient"], Any]] = {
+    "serial": _serial_interface,
+    "sim": _simulated_interface,
+}
+
+
+def register_interface(
+    name: str,
+    factory: Callable[["MeshtasticClient"], Any]
+) -> None:
+    """
+    Register an interface factory selectable by name.
+    
+    Args:
+        name: Name used in device.interface / MESH_INTERFACE.
+        factory: Callable taking the MeshtasticClient and returning an
+            object with the meshtastic interface methods used here
+            (sendText, getMyNodeInfo, close).
+    """
+    INTERFACE_FACTORIES[name] = factory
 
 
 class MeshtasticClient:
@@ -72,18 +467,39 @@ class MeshtasticClient:
     a simplified interface for BBS operations.
     """
     
-    def __init__(self, serial_port: str | None = None, baud_rate: int | None = None):
+    def __init__(
+        self,
+        serial_port: str | None = None,
+        baud_rate: int | None = None,
+        config: HardwareConfig | None = None,
+        scheduler: mesh_airtime.TransmitScheduler | None = None,
+        interface_factory: str | Callable[["MeshtasticClient"], Any] | None = None
+    ):
         """
         Initialize the Meshtastic client.
         
         Args:
             serial_port: Serial port path. If None, uses config/env.
             baud_rate: Baud rate. If None, uses config/env.
+            config: Hardware configuration. If None, uses the cached
+                configuration from get_hardware_config().
+            scheduler: Airtime scheduler pacing every frame sent. If None,
+                frames are sent back-to-back.
+            interface_factory: Name in INTERFACE_FACTORIES or a factory
+                callable. If None, uses the configured interface.
         """
-        self.serial_port = serial_port or get_serial_port()
-        self.baud_rate = baud_rate or get_baud_rate()
+        self.config = config or get_hardware_config()
+        self.scheduler = scheduler
+        self.deliveries: dict[str, DeliveryRecord] = {}
+        self._sleep = time.sleep
+        self._rng = random.Random()
+        self.serial_port = serial_port or self.config.serial_port
+        self.baud_rate = baud_rate or self.config.baud_rate
+        self.interface_factory = interface_factory or self.config.interface
         self.interface = None
         self._connected = False
+        self._receive_handlers: list[Callable[[dict[str, Any]], None]] = []
+        self._subscribed = False
     
     def connect(self) -> bool:
         """
@@ -92,19 +508,18 @@ class MeshtasticClient:
         Returns:
             True if connection successful, False otherwise.
         """
+        factory = self.interface_factory
+        if isinstance(factory, str):
+            if factory not in INTERFACE_FACTORIES:
+                print(f"Error: Unknown interface: {factory}", file=sys.stderr)
+                return False
+            factory = INTERFACE_FACTORIES[factory]
+        
         try:
-            # Import here to allow module to load without meshtastic installed
-            import meshtastic.serial_interface
-            
-            if self.serial_port:
-                self.interface = meshtastic.serial_interface.SerialInterface(
-                    devPath=self.serial_port
-                )
-            else:
-                # Auto-detect if no port specified
-                self.interface = meshtastic.serial_interface.SerialInterface()
-            
+            self.interface = factory(self)
             self._connected = True
+            if self._receive_handlers:
+                self._start_receiving()
             return True
             
         except ImportError:
@@ -117,6 +532,7 @@ class MeshtasticClient:
     
     def disconnect(self) -> None:
         """Disconnect from the Meshtastic device."""
+        self._stop_receiving()
         if self.interface:
             try:
                 self.interface.close()
@@ -130,58 +546,245 @@ class MeshtasticClient:
         """Check if currently connected."""
         return self._connected and self.interface is not None
     
-    def send_text(
+    def add_receive_handler(self, handler: Callable[[dict[str, Any]], None]) -> None:
+        """
+        Call a function with every packet this client's radio receives.
+        
+        Packets arrive on the meshtastic reader thread (via the
+        meshtastic.receive pubsub topic), or, for interfaces with an
+        on_receive attribute such as the simulated mesh, from the
+        interface when pypubsub is not installed. Exceptions raised by
+        the handler are reported and do not stop reception.
+        
+        Args:
+            handler: Called with each packet dictionary.
+        """
+        self._receive_handlers.append(handler)
+        if self.is_connected:
+            self._start_receiving()
+    
+    def remove_receive_handler(self, handler: Callable[[dict[str, Any]], None]) -> None:
+        """Stop calling a handler added with add_receive_handler()."""
+        self._receive_handlers.remove(handler)
+        if not self._receive_handlers:
+            self._stop_receiving()
+    
+    def _start_receiving(self) -> None:
+        if self._subscribed:
+            return
+        if pub is not None:
+            pub.subscribe(self._on_receive, "meshtastic.receive")
+        elif hasattr(self.interface, "on_receive"):
+            self.interface.on_receive = self._on_receive
+        self._subscribed = True
+    
+    def _stop_receiving(self) -> None:
+        if not self._subscribed:
+            return
+        if pub is not None:
+            pub.unsubscribe(self._on_receive, "meshtastic.receive")
+        elif hasattr(self.interface, "on_receive"):
+            self.interface.on_receive = None
+        self._subscribed = False
+    
+    def _on_receive(self, packet: dict[str, Any], interface: Any = None) -> None:
+        """pubsub listener; runs on the meshtastic reader thread."""
+        if interface is not None and interface is not self.interface:
+            return
+        for handler in list(self._receive_handlers):
+            try:
+                handler(packet)
+            except Exception as e:
+                print(f"Error handling received packet: {e}", file=sys.stderr)
+    
+    def _ack_callback(self, frame: FrameDelivery, done: threading.Event):
+        """Build the onResponse callback recording a frame's ACK/NAK."""
+        def onAckNak(packet: dict[str, Any]) -> None:
+            # Named onAckNak: the meshtastic interface only passes routing
+            # (ACK/NAK) packets to response handlers with this name
+            routing = packet.get("decoded", {}).get("routing", {})
+            reason = routing.get("errorReason", "NONE")
+            
+            if reason == "NONE":
+                frame.status = "acked"
+            else:
+                frame.status = "nak"
+                frame.error = reason
+            done.set()
+        
+        return onAckNak
+    
+    def _send_frame(
+        self,
+        text: str,
+        frame: FrameDelivery,
+        channel_index: int,
+        hop_limit: int,
+        want_ack: bool
+    ) -> None:
+        """
+        Send one frame, retrying with backoff until it succeeds.
+        
+        A frame is retried when the interface raises and, with want_ack,
+        when it is NAKed or no ACK arrives within ack_timeout.
+        """
+        max_attempts = 1 + max(self.config.retry_count, 0)
+        
+        while frame.attempts < max_attempts:
+            if frame.attempts:
+                self._sleep(backoff_delay(frame.attempts, self.config.retry_delay, self._rng))
+            
+            if self.scheduler is not None:
+                self.scheduler.wait(channel_index, len(text.encode("utf-8")))
+            
+            frame.attempts += 1
+            frame.status = "pending"
+            done = threading.Event()
+            kwargs = {}
+            if want_ack:
+                kwargs = {"wantAck": True, "onResponse": self._ack_callback(frame, done)}
+            
+            try:
+                packet = self.interface.sendText(
+                    text=text,
+                    channelIndex=channel_index,
+                    hopLimit=hop_limit,
+                    **kwargs
+                )
+            except Exception as e:
+                frame.status = "failed"
+                frame.error = str(e)
+                continue
+            
+            frame.packet_id = getattr(packet, "id", None)
+            
+            if not want_ack:
+                frame.status = "sent"
+                return
+            
+            if not done.wait(self.config.ack_timeout):
+                frame.status = "failed"
+                frame.error = "no ACK received"
+                continue
+            
+            if frame.status == "acked":
+                return
+        
+        # Out of attempts: a NAK stays a NAK, anything else is a failure
+        if frame.status == "pending":
+            frame.status = "failed"
+    
+    def send_message(
         self,
         message: str,
         channel_index: int = 0,
-        hop_limit: int | None = None
-    ) -> bool:
+        hop_limit: int | None = None,
+        want_ack: bool = False
+    ) -> DeliveryRecord:
         """
-        Send a text message on a specified channel.
+        Send a text message and return its delivery record.
+        
+        Messages larger than the configured max_message_size are split
+        into numbered frames (see mesh_fragment) rather than truncated,
+        after compression if runtime.compression is enabled.
+        With a scheduler, each frame waits for its airtime budget. Frames
+        are retried up to runtime.retry_count times with jittered
+        exponential backoff; with want_ack, a frame only counts as
+        delivered once the mesh acknowledges it.
         
         Args:
             message: Text message to send.
             channel_index: Channel index (0-7).
             hop_limit: Hop limit for the message.
+            want_ack: Request and wait for acknowledgements.
         
         Returns:
-            True if sent successfully, False otherwise.
+            DeliveryRecord (also kept in self.deliveries).
         """
+        record = DeliveryRecord(uuid.uuid4().hex[:12], channel_index, want_ack)
+        
+        self.deliveries[record.message_id] = record
+        while len(self.deliveries) > MAX_DELIVERY_RECORDS:
+            del self.deliveries[next(iter(self.deliveries))]
+        
         if not self.is_connected:
             print("Error: Not connected to Meshtastic device", file=sys.stderr)
-            return False
+            record.frames.append(FrameDelivery(status="failed", error="not connected"))
+            return record
         
         if hop_limit is None:
-            hop_limit = get_default_hop_limit()
+            hop_limit = self.config.default_hop_limit
         
         try:
-            self.interface.sendText(
-                text=message,
-                channelIndex=channel_index,
-                hopLimit=hop_limit
-            )
-            return True
-        except Exception as e:
+            frames = frame_message(message, self.config)
+        except ValueError as e:
             print(f"Error sending message: {e}", file=sys.stderr)
-            return False
+            record.frames.append(FrameDelivery(status="failed", error=str(e)))
+            return record
+        
+        record.frames = [FrameDelivery() for _ in frames]
+        
+        for text, frame in zip(frames, record.frames):
+            self._send_frame(text, frame, channel_index, hop_limit, want_ack)
+            
+            if frame.status in ("failed", "nak"):
+                print(
+                    f"Error sending message: frame {record.frames.index(frame) + 1}/"
+                    f"{len(frames)} {frame.status} after {frame.attempts} attempt(s)"
+                    f" ({frame.error})",
+                    file=sys.stderr
+                )
+                # The receiver cannot reassemble without it; skip the rest
+                for remaining in record.frames:
+                    if remaining.status == "pending":
+                        remaining.status = "failed"
+                        remaining.error = "earlier frame failed"
+                break
+        
+        return record
+    
+    def send_text(
+        self,
+        message: str,
+        channel_index: int = 0,
+        hop_limit: int | None = None,
+        want_ack: bool = False
+    ) -> bool:
+        """
+        Send a text message on a specified channel.
+        
+        See send_message() for fragmentation, pacing and retries.
+        
+        Args:
+            message: Text message to send.
+            channel_index: Channel index (0-7).
+            hop_limit: Hop limit for the message.
+            want_ack: Request and wait for acknowledgements.
+        
+        Returns:
+            True if every frame was sent (and acked, with want_ack).
+        """
+        return self.send_message(message, channel_index, hop_limit, want_ack).ok
     
     def send_json(
         self,
         json_obj: dict[str, Any],
         channel_index: int = 0,
-        hop_limit: int | None = None
+        hop_limit: int | None = None,
+        want_ack: bool = False
     ) -> bool:
         """
         Send a JSON payload on a specified channel.
         
         The JSON is serialized to a compact string before transmission.
-        If the payload exceeds the maximum message size, it will be
-        truncated with a warning.
+        Payloads larger than the maximum message size are fragmented by
+        send_text() and reassembled intact by the receiver.
         
         Args:
             json_obj: Dictionary to serialize and send.
             channel_index: Channel index (0-7).
             hop_limit: Hop limit for the message.
+            want_ack: Request and wait for acknowledgements.
         
         Returns:
             True if sent successfully, False otherwise.
@@ -189,21 +792,40 @@ class MeshtasticClient:
         try:
             # Serialize to compact JSON
             message = json.dumps(json_obj, separators=(",", ":"))
-            
-            max_size = get_max_message_size()
-            if len(message) > max_size:
-                print(
-                    f"Warning: Message size ({len(message)}) exceeds max ({max_size})",
-                    file=sys.stderr
-                )
-                # Truncate with indicator
-                message = message[:max_size - 3] + "..."
-            
-            return self.send_text(message, channel_index, hop_limit)
-            
-        except json.JSONEncodeError as e:
+        except (TypeError, ValueError) as e:
             print(f"Error serializing JSON: {e}", file=sys.stderr)
             return False
+        
+        return self.send_text(message, channel_index, hop_limit, want_ack)
+    
+    def send_wire(
+        self,
+        payload: dict[str, Any],
+        channel_index: int = 0,
+        hop_limit: int | None = None,
+        want_ack: bool = False
+    ) -> bool:
+        """
+        Send a BBS payload in the compact wire format (see mesh_wire).
+        
+        Receivers decode it with mesh_wire.decode_text().
+        
+        Args:
+            payload: Payload from one of the generators.
+            channel_index: Channel index (0-7).
+            hop_limit: Hop limit for the message.
+            want_ack: Request and wait for acknowledgements.
+        
+        Returns:
+            True if sent successfully, False otherwise.
+        """
+        try:
+            message = mesh_wire.encode_text(payload)
+        except ValueError as e:
+            print(f"Error encoding payload: {e}", file=sys.stderr)
+            return False
+        
+        return self.send_text(message, channel_index, hop_limit, want_ack)
     
     def get_node_info(self) -> dict[str, Any] | None:
         """
@@ -237,9 +859,214 @@ class MeshtasticClient:
         return False
 
 
+class AsyncMeshtasticClient:
+    """
+    Asyncio front end for MeshtasticClient.
+    
+    Blocking serial work (connecting, sending, airtime pacing and retry
+    backoff) runs in worker threads, so one event loop can transmit,
+    handle received messages and run the mailbox bot concurrently.
+    Sends are serialized, since the radio takes one packet at a time.
+    
+    Received packets arrive on the meshtastic reader thread (via the
+    meshtastic.receive pubsub topic) and are handed to the event loop
+    with call_soon_threadsafe; iterate them with packets() or, for
+    reassembled text, messages().
+    """
+    
+    def __init__(
+        self,
+        client: MeshtasticClient | None = None,
+        max_queue: int = DEFAULT_RECEIVE_QUEUE_SIZE,
+        **kwargs: Any
+    ):
+        """
+        Initialize the async client.
+        
+        Args:
+            client: Blocking client to wrap. If None, one is created from
+                kwargs (serial_port, baud_rate, config, scheduler).
+            max_queue: Received packets buffered before the oldest are
+                dropped.
+        """
+        self.client = client or MeshtasticClient(**kwargs)
+        self.max_queue = max_queue
+        self.dropped = 0
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._queues: list[asyncio.Queue] = []
+        self._send_lock = asyncio.Lock()
+        self._subscribed = False
+    
+    @property
+    def is_connected(self) -> bool:
+        """Check if currently connected."""
+        return self.client.is_connected
+    
+    async def connect(self) -> bool:
+        """
+        Connect to the device (if not already) and start receiving.
+        
+        Returns:
+            True if connected, False otherwise.
+        """
+        self._loop = asyncio.get_running_loop()
+        
+        if not self.client.is_connected:
+            if not await asyncio.to_thread(self.client.connect):
+                return False
+        
+        if pub is not None and not self._subscribed:
+            pub.subscribe(self._on_receive, "meshtastic.receive")
+            self._subscribed = True
+        return True
+    
+    async def disconnect(self) -> None:
+        """Stop receiving, end open iterators and close the connection."""
+        if self._subscribed:
+            pub.unsubscribe(self._on_receive, "meshtastic.receive")
+            self._subscribed = False
+        
+        for queue in self._queues:
+            self._put(queue, None)
+        
+        await asyncio.to_thread(self.client.disconnect)
+    
+    def _on_receive(self, packet: dict[str, Any], interface: Any = None) -> None:
+        """pubsub listener; runs on the meshtastic reader thread."""
+        if interface is not None and interface is not self.client.interface:
+            return
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._dispatch, packet)
+    
+    def _dispatch(self, packet: dict[str, Any]) -> None:
+        """Fan a received packet out to every open iterator (loop thread)."""
+        for queue in self._queues:
+            self._put(queue, packet)
+    
+    def _put(self, queue: asyncio.Queue, item: Any) -> None:
+        """Queue an item, dropping the oldest if the consumer fell behind."""
+        if queue.full():
+            queue.get_nowait()
+            self.dropped += 1
+        queue.put_nowait(item)
+    
+    async def packets(self) -> AsyncIterator[dict[str, Any]]:
+        """
+        Iterate over received packets until disconnect().
+        
+        Each iterator gets every packet received after it starts.
+        
+        Yields:
+            Packet dictionaries as delivered by the meshtastic library.
+        """
+        queue: asyncio.Queue = asyncio.Queue(self.max_queue)
+        self._queues.append(queue)
+        
+        try:
+            while (packet := await queue.get()) is not None:
+                yield packet
+        finally:
+            self._queues.remove(queue)
+    
+    async def messages(
+        self,
+        reassembler: mesh_fragment.Reassembler | None = None
+    ) -> AsyncIterator[tuple[str | None, int, str]]:
+        """
+        Iterate over received text messages, reassembling fragments.
+        
+        Compressed messages (see mesh_compress) are decompressed, whether
+        or not this client sends compressed.
+        
+        Args:
+            reassembler: Reassembler to use (a new one if None).
+        
+        Yields:
+            Tuples of (sender node ID, channel index, message text).
+        """
+        reassembler = reassembler or mesh_fragment.Reassembler()
+        
+        async for packet in self.packets():
+            decoded = packet.get("decoded", {})
+            if decoded.get("portnum") != "TEXT_MESSAGE_APP" or "text" not in decoded:
+                continue
+            
+            sender = packet.get("fromId")
+            message = reassembler.feed(decoded["text"], sender)
+            if message is not None:
+                yield sender, packet.get("channel", 0), mesh_compress.decode_text(message)
+    
+    async def send_message(
+        self,
+        message: str,
+        channel_index: int = 0,
+        hop_limit: int | None = None,
+        want_ack: bool = False
+    ) -> DeliveryRecord:
+        """Send a text message; see MeshtasticClient.send_message()."""
+        async with self._send_lock:
+            return await asyncio.to_thread(
+                self.client.send_message, message, channel_index, hop_limit, want_ack
+            )
+    
+    async def send_text(
+        self,
+        message: str,
+        channel_index: int = 0,
+        hop_limit: int | None = None,
+        want_ack: bool = False
+    ) -> bool:
+        """Send a text message; see MeshtasticClient.send_text()."""
+        record = await self.send_message(message, channel_index, hop_limit, want_ack)
+        return record.ok
+    
+    async def send_json(
+        self,
+        json_obj: dict[str, Any],
+        channel_index: int = 0,
+        hop_limit: int | None = None,
+        want_ack: bool = False
+    ) -> bool:
+        """Send a JSON payload; see MeshtasticClient.send_json()."""
+        async with self._send_lock:
+            return await asyncio.to_thread(
+                self.client.send_json, json_obj, channel_index, hop_limit, want_ack
+            )
+    
+    async def send_wire(
+        self,
+        payload: dict[str, Any],
+        channel_index: int = 0,
+        hop_limit: int | None = None,
+        want_ack: bool = False
+    ) -> bool:
+        """Send a payload in the wire format; see MeshtasticClient.send_wire()."""
+        async with self._send_lock:
+            return await asyncio.to_thread(
+                self.client.send_wire, payload, channel_index, hop_limit, want_ack
+            )
+    
+    async def get_node_info(self) -> dict[str, Any] | None:
+        """Get information about the connected node."""
+        return await asyncio.to_thread(self.client.get_node_info)
+    
+    async def __aenter__(self):
+        """Async context manager entry."""
+        await self.connect()
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Async context manager exit."""
+        await self.disconnect()
+        return False
+
+
 def create_client(
     serial_port: str | None = None,
-    baud_rate: int | None = None
+    baud_rate: int | None = None,
+    config: HardwareConfig | None = None,
+    scheduler: mesh_airtime.TransmitScheduler | None = None,
+    interface_factory: str | Callable[[MeshtasticClient], Any] | None = None
 ) -> MeshtasticClient:
     """
     Factory function to create a MeshtasticClient.
@@ -247,20 +1074,51 @@ def create_client(
     Args:
         serial_port: Optional serial port override.
         baud_rate: Optional baud rate override.
+        config: Optional hardware configuration override.
+        scheduler: Optional airtime scheduler.
+        interface_factory: Optional interface factory override.
     
     Returns:
         Configured MeshtasticClient instance.
     """
-    return MeshtasticClient(serial_port, baud_rate)
+    return MeshtasticClient(serial_port, baud_rate, config, scheduler, interface_factory)
+
+
+def create_scheduler(
+    channel_presets: dict[int, str],
+    config: HardwareConfig | None = None
+) -> mesh_airtime.TransmitScheduler:
+    """
+    Create an airtime scheduler using the configured duty-cycle budget.
+    
+    Args:
+        channel_presets: Modem preset per channel index.
+        config: Hardware configuration (defaults to the cached one).
+    
+    Returns:
+        TransmitScheduler instance.
+    """
+    config = config or get_hardware_config()
+    return mesh_airtime.TransmitScheduler(
+        channel_presets,
+        duty_cycle=config.duty_cycle,
+        window=config.duty_cycle_window
+    )
 
 
 # For testing/verification when run directly
 if __name__ == "__main__":
+    config = get_hardware_config()
     print("Meshtastic Client Configuration:")
-    print(f"  Serial Port: {get_serial_port() or 'auto-detect'}")
-    print(f"  Baud Rate: {get_baud_rate()}")
-    print(f"  Default Hop Limit: {get_default_hop_limit()}")
-    print(f"  Max Message Size: {get_max_message_size()}")
+    print(f"  Interface: {config.interface}")
+    print(f"  Serial Port: {config.serial_port or 'auto-detect'}")
+    print(f"  Baud Rate: {config.baud_rate}")
+    print(f"  Default Hop Limit: {config.default_hop_limit}")
+    print(f"  Max Message Size: {config.max_message_size}")
+    print(f"  Compression: {'on' if config.compression else 'off'}")
+    for radio in config.radios:
+        channels = ", ".join(map(str, radio.channels)) or "unmapped"
+        print(f"  Radio {radio.name}: {radio.serial_port or 'auto-detect'} (channels {channels})")
     
     print("\nTo test connection, use:")
     print("  client = MeshtasticClient()")
@@ -20,6 +20,12 @@ from typing import Any
 
 import yaml
 
+# Handle both package and standalone execution
+try:
+    from . import mesh_wire
+except ImportError:
+    import mesh_wire
+
 
 def load_config(config_path: Path) -> dict[str, Any]:
     """Load BBS configuration from YAML file."""
@@ -284,6 +290,12 @@ def main():
         
         total_items += len(items)
         print(f"  Channel {channel_num}: {len(items)} item(s) -> {output_path}")
+        
+        if args.verbose:
+            print(
+                f"  Over the air: {len(json.dumps(payload, separators=(',', ':')))} bytes "
+                f"as JSON, {len(mesh_wire.encode_text(payload))} in the wire format"
+            )
     
     print(f"\nTotal: {total_items} item(s) across {len(channel_nums)} channel(s)")
     
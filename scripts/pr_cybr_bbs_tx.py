@@ -5,9 +5,24 @@ PR-CYBR-BBS Transmission Script
 Transmits generated BBS payloads over Meshtastic Channels 1-6.
 Designed to run on a Raspberry Pi connected to a Meshtastic device.
 
+If the transmit daemon (mesh_txd.py) is running, messages are handed to
+it instead of opening the radio, and the script waits for the daemon to
+send them (--daemon-wait). Otherwise each radio declared in
+config/hardware.yml (radios) sends its own channels concurrently.
+
+Items already broadcast unchanged within the re-broadcast interval
+(bbs.rebroadcast_hours) are skipped; see tx_ledger.py. Short items of
+the same priority are packed into shared messages when that saves frames
+(bbs.pack_max_frames); receivers split them with
+mesh_fragment.unpack_message().
+
+Progress is checkpointed per item (see tx_checkpoint.py); after a reboot
+or a dropped link, --resume continues the same payload where it stopped.
+
 Usage:
     python scripts/pr_cybr_bbs_tx.py --channel N [--dry-run]
-    python scripts/pr_cybr_bbs_tx.py --all-channels [--dry-run]
+    python scripts/pr_cybr_bbs_tx.py --all-channels [--dry-run] [--wire]
+    python scripts/pr_cybr_bbs_tx.py --all-channels --resume
 """
 
 import argparse
@@ -20,9 +35,19 @@ import yaml
 
 # Handle both package and standalone execution
 try:
-    from . import meshtastic_client
+    from . import (
+        mesh_airtime, mesh_fragment, mesh_txd, mesh_wire, meshtastic_client,
+        tx_checkpoint, tx_ledger, tx_queue
+    )
 except ImportError:
+    import mesh_airtime
+    import mesh_fragment
+    import mesh_txd
+    import mesh_wire
     import meshtastic_client
+    import tx_checkpoint
+    import tx_ledger
+    import tx_queue
 
 
 def load_config(config_path: Path) -> dict[str, Any]:
@@ -55,7 +80,8 @@ def format_item_for_tx(item: dict[str, Any], channel_name: str) -> str:
     """
     Format an item for transmission.
     
-    Creates a compact text representation suitable for Meshtastic.
+    Creates a compact text representation suitable for Meshtastic. The
+    body is kept whole; the client fragments oversized messages.
     
     Args:
         item: Item dictionary.
@@ -68,11 +94,6 @@ def format_item_for_tx(item: dict[str, Any], channel_name: str) -> str:
     title = item.get("title", "")
     body = item.get("body", "")
     
-    # Truncate body if too long
-    max_body_len = 120
-    if len(body) > max_body_len:
-        body = body[:max_body_len - 3] + "..."
-    
     # Include tags if present
     tags = item.get("tags", [])
     tag_str = ""
@@ -82,26 +103,128 @@ def format_item_for_tx(item: dict[str, Any], channel_name: str) -> str:
     return f"[{channel_name}:{category}] {title}{tag_str}\n{body}"
 
 
+def get_channel_presets(channels: dict[int, Any]) -> dict[int, str]:
+    """Map channel numbers to their configured modem presets."""
+    return {
+        channel_num: channel_config.get("modem_preset", mesh_airtime.DEFAULT_MODEM_PRESET)
+        for channel_num, channel_config in channels.items()
+    }
+
+
+def channel_messages(
+    payload: dict[str, Any],
+    channel_name: str,
+    send_full_json: bool = False,
+    wire: bool = False
+) -> list[str]:
+    """
+    List the messages transmit_channel() would send for a payload.
+    
+    Raises:
+        ValueError: If wire is set and the payload does not fit the schema.
+    """
+    if wire:
+        return [mesh_wire.encode_text(payload)]
+    if send_full_json:
+        return [json.dumps(payload, separators=(",", ":"))]
+    return [format_item_for_tx(item, channel_name) for item in payload.get("items", [])]
+
+
+def pack_channel_messages(
+    pending: list[tuple[str, str]],
+    max_size: int,
+    max_frames: int
+) -> tuple[list[tuple[str, str]], dict[str, int]]:
+    """
+    Pack short messages together into fewer frames (see mesh_fragment).
+    
+    Each priority level is packed separately and levels keep their order,
+    so packing never sends a normal item ahead of a high one.
+    
+    Args:
+        pending: (message, priority) tuples in send order.
+        max_size: Maximum bytes per packet.
+        max_frames: Most frames a packed message may take.
+    
+    Returns:
+        Tuple of (packed (message, priority) tuples, stats) where stats
+        has items, messages, frames_before, frames_after and frames_saved.
+    """
+    packed = []
+    for priority in sorted({p for _, p in pending}, key=tx_queue.PRIORITY_RANKS.get):
+        group = [message for message, p in pending if p == priority]
+        packed.extend(
+            (message, priority)
+            for message in mesh_fragment.pack_messages(group, max_size, max_frames)
+        )
+    
+    frames_before = sum(mesh_fragment.frame_count(m, max_size) for m, _ in pending)
+    frames_after = sum(mesh_fragment.frame_count(m, max_size) for m, _ in packed)
+    return packed, {
+        "items": len(pending),
+        "messages": len(packed),
+        "frames_before": frames_before,
+        "frames_after": frames_after,
+        "frames_saved": frames_before - frames_after
+    }
+
+
+def format_pack_stats(stats: dict[str, int]) -> str:
+    """Describe pack_channel_messages() stats."""
+    return (
+        f"packed {stats['items']} item(s) into {stats['messages']} message(s), "
+        f"{stats['frames_before']} -> {stats['frames_after']} frame(s) "
+        f"({stats['frames_saved']} saved)"
+    )
+
+
 def transmit_channel(
-    client: meshtastic_client.MeshtasticClient,
+    client: meshtastic_client.MeshtasticClient | None,
     channel_num: int,
     channel_name: str,
     payload: dict[str, Any],
     send_full_json: bool = False,
     hop_limit: int | None = None,
-    verbose: bool = False
+    verbose: bool = False,
+    queue: tx_queue.TransmitQueue | mesh_txd.DaemonQueue | None = None,
+    wire: bool = False,
+    ledger: tx_ledger.SentLedger | None = None,
+    rebroadcast_interval: float = 0,
+    pack_max_frames: int = 0,
+    checkpoint: tx_checkpoint.TransmitCheckpoint | None = None,
+    resume: bool = False
 ) -> bool:
     """
     Transmit payload for a single channel.
     
     Args:
-        client: Connected Meshtastic client.
+        client: Connected Meshtastic client (unused when queueing).
         channel_num: Channel number.
         channel_name: Channel name.
         payload: Payload dictionary.
         send_full_json: Send full JSON instead of formatted text.
         hop_limit: Override hop limit.
         verbose: Verbose output.
+        queue: If given, messages are queued by priority for a later
+            drain (or handed to the transmit daemon) instead of being
+            sent immediately.
+        wire: Send the full payload in the compact wire format (see
+            mesh_wire) instead of formatted text or JSON.
+        ledger: If given, messages broadcast unchanged within
+            rebroadcast_interval are skipped, and messages sent are
+            recorded. Queued messages are recorded once the drain or the
+            daemon has sent them (see transmit_payloads()).
+        rebroadcast_interval: Seconds before an unchanged message is
+            sent again.
+        pack_max_frames: If non-zero, items are packed together into
+            messages of at most this many frames where that saves frames.
+        checkpoint: If given, progress is recorded per item as messages
+            are queued and sent. Queued messages are marked sent once the
+            drain or the daemon has sent them (see transmit_payloads()).
+            Items an earlier run queued that are still waiting in the
+            queue are never queued again.
+        resume: Skip items the checkpoint shows as sent for this payload;
+            otherwise its progress on this channel is cleared first.
     
     Returns:
         True if successful, False otherwise.
@@ -112,32 +235,112 @@ def transmit_channel(
         print(f"  Channel {channel_num} ({channel_name}): No items to transmit")
         return True
     
-    if send_full_json:
-        print(f"  Channel {channel_num} ({channel_name}): Sending full JSON...")
-        if client.send_json(payload, channel_index=channel_num, hop_limit=hop_limit):
-            print(f"    Sent successfully")
-            return True
+    messages = channel_messages(payload, channel_name, send_full_json, wire)
+    priorities = (
+        ["normal"] if send_full_json or wire
+        else [tx_queue.normalize_priority(item.get("priority")) for item in items]
+    )
+    pending = list(zip(messages, priorities))
+    
+    # Item indexes carried by each (possibly packed) message
+    message_indexes: dict[str, list[int]] = {}
+    for index, message in enumerate(messages):
+        message_indexes.setdefault(message, []).append(index)
+    
+    def indexes_of(message: str) -> list[int]:
+        return [
+            index
+            for part in mesh_fragment.unpack_message(message)
+            for index in message_indexes.get(part, [])
+        ]
+    
+    run = tx_checkpoint.run_key(payload)
+    if checkpoint is not None:
+        # Catch up with what an earlier run queued: sent since, or still
+        # waiting in the queue (and not to be queued again either way)
+        waiting: dict[int, int] = {}
+        if queue is not None:
+            for index, queue_id in checkpoint.queued_items(run, channel_num).items():
+                status = queue.status(queue_id)
+                if status == "sent":
+                    checkpoint.mark_queue_item_sent(run, channel_num, queue_id)
+                elif status in ("pending", "sending"):
+                    waiting[index] = queue_id
+        
+        if resume:
+            done = checkpoint.sent_items(run, channel_num) | set(waiting)
         else:
-            print(f"    Failed to send", file=sys.stderr)
-            return False
-    else:
-        print(f"  Channel {channel_num} ({channel_name}): Sending {len(items)} item(s)...")
+            checkpoint.clear(run, channel_num)
+            for index, queue_id in waiting.items():
+                checkpoint.mark_queued(run, channel_num, [index], queue_id)
+            done = set(waiting)
         
-        success = True
-        for i, item in enumerate(items, 1):
-            formatted = format_item_for_tx(item, channel_name)
-            
-            if verbose:
-                print(f"    --- Item {i} ---")
-                print(f"    {formatted}")
-            
-            if client.send_text(formatted, channel_index=channel_num, hop_limit=hop_limit):
-                print(f"    Item {i}/{len(items)} sent")
-            else:
-                print(f"    Item {i}/{len(items)} FAILED", file=sys.stderr)
-                success = False
+        pending = [entry for index, entry in enumerate(pending) if index not in done]
+        if len(pending) < len(messages):
+            print(
+                f"  Channel {channel_num} ({channel_name}): "
+                f"{'resuming, ' if resume else ''}"
+                f"{len(messages) - len(pending)} message(s) already "
+                f"{'sent or queued' if resume else 'queued'}"
+            )
+        if not pending:
+            return True
+    
+    if ledger is not None:
+        due = pending
+        pending = [
+            (message, priority) for message, priority in due
+            if ledger.is_due(message, channel_num, rebroadcast_interval)
+        ]
+        if len(pending) < len(due):
+            print(
+                f"  Channel {channel_num} ({channel_name}): "
+                f"{len(due) - len(pending)} unchanged message(s) skipped"
+            )
+        if not pending:
+            return True
+    
+    if pack_max_frames and not (send_full_json or wire):
+        pending, stats = pack_channel_messages(
+            pending, meshtastic_client.get_max_message_size(), pack_max_frames
+        )
+        if stats["frames_saved"]:
+            print(f"  Channel {channel_num} ({channel_name}): {format_pack_stats(stats)}")
+    
+    if queue is not None:
+        for message, priority in pending:
+            queue_id = queue.enqueue(message, channel_num, priority, hop_limit)
+            if checkpoint is not None:
+                checkpoint.mark_queued(run, channel_num, indexes_of(message), queue_id)
+        print(f"  Channel {channel_num} ({channel_name}): Queued {len(pending)} message(s)")
+        return True
+    
+    if send_full_json or wire:
+        print(
+            f"  Channel {channel_num} ({channel_name}): "
+            f"Sending full {'wire-encoded payload' if wire else 'JSON'}..."
+        )
+    else:
+        print(f"  Channel {channel_num} ({channel_name}): Sending {len(pending)} item(s)...")
+    
+    success = True
+    for i, (message, _) in enumerate(pending, 1):
+        if verbose:
+            print(f"    --- Message {i} ---")
+            print(f"    {message}")
         
-        return success
+        if client.send_text(message, channel_index=channel_num, hop_limit=hop_limit):
+            print(f"    Message {i}/{len(pending)} sent")
+            if ledger is not None:
+                for part in mesh_fragment.unpack_message(message):
+                    ledger.record(part, channel_num, channel_name)
+            if checkpoint is not None:
+                checkpoint.mark_sent(run, channel_num, indexes_of(message))
+        else:
+            print(f"    Message {i}/{len(pending)} FAILED", file=sys.stderr)
+            success = False
+    
+    return success
 
 
 def main():
@@ -182,12 +385,84 @@ def main():
         action="store_true",
         help="Send the full JSON payload instead of formatted text"
     )
+    parser.add_argument(
+        "--wire",
+        action="store_true",
+        help="Send the full payload in the compact binary wire format (see mesh_wire.py)"
+    )
     parser.add_argument(
         "--hop-limit",
         type=int,
         default=None,
         help="Override hop limit for transmission"
     )
+    parser.add_argument(
+        "--want-ack",
+        action="store_true",
+        help="Request acknowledgements; unacknowledged messages count as failed"
+    )
+    parser.add_argument(
+        "--queue",
+        type=Path,
+        default=tx_queue.DEFAULT_QUEUE_PATH,
+        help="Transmit queue database (items are queued by priority)"
+    )
+    parser.add_argument(
+        "--ledger",
+        type=Path,
+        default=tx_ledger.DEFAULT_LEDGER_PATH,
+        help="Ledger of broadcast messages (unchanged items are skipped)"
+    )
+    parser.add_argument(
+        "--rebroadcast-hours",
+        type=float,
+        default=None,
+        help="Resend unchanged items after this many hours (default: bbs.rebroadcast_hours)"
+    )
+    parser.add_argument(
+        "--send-all",
+        action="store_true",
+        help="Send every item, even if unchanged since the last broadcast"
+    )
+    parser.add_argument(
+        "--checkpoint",
+        type=Path,
+        default=tx_checkpoint.DEFAULT_CHECKPOINT_PATH,
+        help="Checkpoint database recording each item as it is sent"
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted run: skip items of the same payload already sent"
+    )
+    parser.add_argument(
+        "--pack-max-frames",
+        type=int,
+        default=None,
+        help="Pack short items into messages of up to N frames (default: bbs.pack_max_frames)"
+    )
+    parser.add_argument(
+        "--no-pack",
+        action="store_true",
+        help="Send every item as its own message"
+    )
+    parser.add_argument(
+        "--daemon-socket",
+        type=Path,
+        default=None,
+        help="Transmit daemon socket (default: $MESH_TXD_SOCKET or data/mesh_txd.sock)"
+    )
+    parser.add_argument(
+        "--no-daemon",
+        action="store_true",
+        help="Open the radio directly even if a transmit daemon is running"
+    )
+    parser.add_argument(
+        "--daemon-wait",
+        type=float,
+        default=mesh_txd.DEFAULT_WAIT_SECONDS,
+        help="Seconds to wait for the transmit daemon to send the queued messages"
+    )
     parser.add_argument(
         "--verbose",
         "-v",
@@ -231,8 +506,50 @@ def main():
         print("No payloads to transmit.")
         return 0
     
+    # Only send what is new, changed, or due for re-broadcast
+    interval = 0.0 if args.send_all else tx_ledger.rebroadcast_interval(
+        config, args.rebroadcast_hours
+    )
+    pack_max_frames = 0 if args.no_pack else (
+        args.pack_max_frames if args.pack_max_frames is not None
+        else (config.get("bbs") or {}).get("pack_max_frames", 0)
+    )
+    with tx_ledger.SentLedger(args.ledger) as ledger, \
+            tx_checkpoint.TransmitCheckpoint(args.checkpoint) as checkpoint:
+        return transmit_payloads(
+            args, payloads, channels, ledger, interval, pack_max_frames, checkpoint
+        )
+
+
+def transmit_payloads(
+    args: argparse.Namespace,
+    payloads: dict[int, dict[str, Any]],
+    channels: dict[int, Any],
+    ledger: tx_ledger.SentLedger,
+    interval: float,
+    pack_max_frames: int = 0,
+    checkpoint: tx_checkpoint.TransmitCheckpoint | None = None
+) -> int:
+    """
+    Send (or with --dry-run, show) channel payloads.
+    
+    Args:
+        args: Parsed command-line arguments.
+        payloads: Payload by channel number.
+        channels: Channel configuration.
+        ledger: Ledger of broadcast messages.
+        interval: Seconds before an unchanged message is sent again.
+        pack_max_frames: Most frames a packed message may take (0: no packing).
+        checkpoint: Progress record for --resume.
+    
+    Returns:
+        Exit code.
+    """
     if args.dry_run:
         print("\n=== DRY RUN - No actual transmission ===\n")
+        scheduler = meshtastic_client.create_scheduler(get_channel_presets(channels))
+        planned_frames = []
+        frames_saved = 0
         
         for channel_num, payload in payloads.items():
             channel_config = channels.get(channel_num, {})
@@ -241,55 +558,211 @@ def main():
             
             print(f"Channel {channel_num} ({channel_name}): {len(items)} item(s)")
             
-            if args.send_full_json:
-                print(f"  Would send full JSON payload ({len(json.dumps(payload))} bytes)")
+            messages = channel_messages(payload, channel_name, args.send_full_json, args.wire)
+            due = messages
+            if checkpoint is not None and args.resume:
+                done = checkpoint.sent_items(tx_checkpoint.run_key(payload), channel_num)
+                due = [m for index, m in enumerate(messages) if index not in done]
+                if len(due) < len(messages):
+                    print(f"  {len(messages) - len(due)} message(s) already sent would be skipped")
+            
+            checked = len(due)
+            due = [m for m in due if ledger.is_due(m, channel_num, interval)]
+            if len(due) < checked:
+                print(f"  {checked - len(due)} unchanged message(s) would be skipped")
+            
+            if pack_max_frames and not (args.send_full_json or args.wire) and due:
+                pending = [
+                    (message, tx_queue.normalize_priority(item.get("priority")))
+                    for message, item in zip(messages, items)
+                    if message in due
+                ]
+                packed, stats = pack_channel_messages(
+                    pending, meshtastic_client.get_max_message_size(), pack_max_frames
+                )
+                due = [message for message, _ in packed]
+                frames_saved += stats["frames_saved"]
+                if stats["frames_saved"]:
+                    print(f"  Would send {format_pack_stats(stats)}")
+            
+            channel_frames = [
+                (channel_num, len(frame.encode("utf-8")))
+                for message in due
+                for frame in meshtastic_client.frame_message(message)
+            ]
+            planned_frames.extend(channel_frames)
+            print(
+                f"  {scheduler.preset_for(channel_num)}: "
+                f"{mesh_airtime.format_plan(scheduler.plan(channel_frames), scheduler.duty_cycle)}"
+            )
+            
+            if args.send_full_json or args.wire:
+                (message,) = channel_messages(
+                    payload, channel_name, args.send_full_json, args.wire
+                )
+                frames = meshtastic_client.frame_message(message)
+                print(
+                    f"  Would send full {'wire-encoded' if args.wire else 'JSON'} payload "
+                    f"({len(message.encode('utf-8'))} bytes, {len(frames)} frame(s))"
+                )
             else:
                 for i, item in enumerate(items[:3], 1):  # Show first 3 items
                     formatted = format_item_for_tx(item, channel_name)
-                    print(f"  --- Item {i} ---")
+                    frames = meshtastic_client.frame_message(formatted)
+                    print(f"  --- Item {i} ({len(frames)} frame(s)) ---")
                     print(f"  {formatted[:200]}...")
                 if len(items) > 3:
                     print(f"  ... and {len(items) - 3} more item(s)")
             print()
         
+        print(mesh_airtime.format_plan(scheduler.plan(planned_frames), scheduler.duty_cycle))
+        if frames_saved:
+            print(f"Frame packing saves {frames_saved} frame(s)")
         return 0
     
-    # Connect to Meshtastic
-    client = meshtastic_client.create_client()
+    def record_sent(item: tx_queue.QueueItem) -> None:
+        """Record a queued message once it has actually been sent."""
+        channel_name = channels.get(item.channel, {}).get("name")
+        for part in mesh_fragment.unpack_message(item.message):
+            ledger.record(part, item.channel, channel_name)
+        if checkpoint is not None and item.channel in payloads:
+            checkpoint.mark_queue_item_sent(
+                tx_checkpoint.run_key(payloads[item.channel]), item.channel, item.id
+            )
     
-    if not client.connect():
-        print("Error: Failed to connect to Meshtastic device", file=sys.stderr)
-        return 1
+    # A running transmit daemon already holds the radio; hand it the messages
+    # and record them as the daemon confirms each one sent
+    if not args.no_daemon and mesh_txd.use_daemon(args.daemon_socket):
+        daemon_queue = mesh_txd.DaemonQueue(args.daemon_socket)
+        print("\nQueueing with the transmit daemon...")
+        
+        try:
+            for channel_num, payload in payloads.items():
+                channel_config = channels.get(channel_num, {})
+                channel_name = channel_config.get("name", f"CHANNEL-{channel_num}")
+                
+                transmit_channel(
+                    None,
+                    channel_num,
+                    channel_name,
+                    payload,
+                    send_full_json=args.send_full_json,
+                    hop_limit=args.hop_limit,
+                    verbose=args.verbose,
+                    queue=daemon_queue,
+                    wire=args.wire,
+                    ledger=ledger,
+                    rebroadcast_interval=interval,
+                    pack_max_frames=pack_max_frames,
+                    checkpoint=checkpoint,
+                    resume=args.resume
+                )
+            
+            print(
+                f"\nQueued {daemon_queue.queued} message(s) with the transmit daemon "
+                f"(depth {daemon_queue.depth()}); waiting for it to send them..."
+            )
+            if args.want_ack:
+                print("  Note: acknowledgements follow the daemon's --want-ack setting")
+            sent, failed, waiting = daemon_queue.wait(record_sent, args.daemon_wait)
+        except (OSError, ValueError) as e:
+            print(f"Error: Transmit daemon failed: {e}", file=sys.stderr)
+            return 1
+        
+        print(f"\nTransmission complete: {sent} sent, {failed} failed.")
+        if waiting:
+            print(
+                f"  {waiting} message(s) still queued with the daemon; "
+                "they are not recorded as sent, so a later run queues them again if needed"
+            )
+        return 0 if failed == 0 else 1
+    
+    # Connect to every radio the channels map to; each radio paces its
+    # frames to its channels' airtime budgets and transmits concurrently
+    hardware = meshtastic_client.get_hardware_config()
+    radios = {hardware.radio_for_channel(channel_num) for channel_num in payloads}
+    clients = {}
     
     try:
-        node_info = client.get_node_info()
-        if node_info and args.verbose:
-            print(f"  Connected to: {node_info.get('name', 'unknown')}")
-            print(f"  Node ID: {node_info.get('node_id', 'unknown')}")
+        for radio in hardware.radio_list():
+            if radio not in radios:
+                continue
+            client = meshtastic_client.create_client(
+                serial_port=radio.serial_port,
+                config=hardware,
+                scheduler=meshtastic_client.create_scheduler(get_channel_presets(channels), hardware)
+            )
+            if not client.connect():
+                print(
+                    f"Error: Failed to connect to Meshtastic device ({radio.name})",
+                    file=sys.stderr
+                )
+                return 1
+            clients[radio] = client
+            
+            node_info = client.get_node_info()
+            if node_info and args.verbose:
+                print(f"  Connected to: {node_info.get('name', 'unknown')} ({radio.name})")
+                print(f"  Node ID: {node_info.get('node_id', 'unknown')}")
         
-        print("\nTransmitting...")
-        success = True
+        print("\nQueueing...")
         
-        for channel_num, payload in payloads.items():
-            channel_config = channels.get(channel_num, {})
-            channel_name = channel_config.get("name", f"CHANNEL-{channel_num}")
+        with tx_queue.TransmitQueue(args.queue) as queue:
+            for channel_num, payload in payloads.items():
+                channel_config = channels.get(channel_num, {})
+                channel_name = channel_config.get("name", f"CHANNEL-{channel_num}")
+                
+                transmit_channel(
+                    clients[hardware.radio_for_channel(channel_num)],
+                    channel_num,
+                    channel_name,
+                    payload,
+                    send_full_json=args.send_full_json,
+                    hop_limit=args.hop_limit,
+                    verbose=args.verbose,
+                    queue=queue,
+                    wire=args.wire,
+                    ledger=ledger,
+                    rebroadcast_interval=interval,
+                    pack_max_frames=pack_max_frames,
+                    checkpoint=checkpoint,
+                    resume=args.resume
+                )
             
-            if not transmit_channel(
-                client,
-                channel_num,
-                channel_name,
-                payload,
-                send_full_json=args.send_full_json,
-                hop_limit=args.hop_limit,
-                verbose=args.verbose
-            ):
-                success = False
-        
-        print("\nTransmission complete.")
+            print(
+                f"\nTransmitting {queue.depth(channels=set(payloads))} queued message(s)"
+                f"{f' on {len(clients)} radios' if len(clients) > 1 else ''}..."
+            )
+            results = tx_queue.drain_radios(
+                clients,
+                args.queue,
+                hardware,
+                verbose=args.verbose,
+                want_ack=args.want_ack,
+                on_sent=record_sent,
+                channels=set(payloads)
+            )
+            sent = sum(radio_sent for radio_sent, _ in results.values())
+            failed = sum(radio_failed for _, radio_failed in results.values())
+            success = failed == 0
+            
+            print(f"\nTransmission complete: {sent} sent, {failed} failed.")
+            if len(clients) > 1:
+                for name, (radio_sent, radio_failed) in results.items():
+                    print(f"  {name}: {radio_sent} sent, {radio_failed} failed")
+            if args.verbose:
+                tx_queue.print_metrics(queue.metrics())
+        if args.verbose:
+            for radio, client in clients.items():
+                print(
+                    f"  Airtime ({radio.name}): {client.scheduler.total_airtime:.1f}s, "
+                    f"paced for {client.scheduler.total_wait:.1f}s"
+                )
         return 0 if success else 1
     
     finally:
-        client.disconnect()
+        for client in clients.values():
+            client.disconnect()
 
 
 if __name__ == "__main__":
@@ -20,6 +20,12 @@ from typing import Any
 
 import yaml
 
+# Handle both package and standalone execution
+try:
+    from . import mesh_wire
+except ImportError:
+    import mesh_wire
+
 
 def load_config(config_path: Path) -> dict[str, Any]:
     """Load BBS configuration from YAML file."""
@@ -285,6 +291,12 @@ def main():
     
     print(f"Generated {len(payload['bulletins'])} bulletin(s) -> {output_path}")
     
+    if args.verbose:
+        print(
+            f"  Over the air: {len(json.dumps(payload, separators=(',', ':')))} bytes as JSON, "
+            f"{len(mesh_wire.encode_text(payload))} in the wire format"
+        )
+    
     return 0
 
 
@@ -5,8 +5,16 @@ PR-MESH-BBS Transmission Script
 Transmits generated BBS bulletins over Meshtastic Channel-0 (LongFast).
 Designed to run on a Raspberry Pi connected to a Meshtastic device.
 
+If the transmit daemon (mesh_txd.py) is running, bulletins are handed to
+it instead of opening the radio, and the script waits for the daemon to
+send them (--daemon-wait).
+
+Bulletins already broadcast unchanged within the re-broadcast interval
+(bbs.rebroadcast_hours) are skipped; see tx_ledger.py.
+
 Usage:
-    python scripts/pr_mesh_bbs_tx.py [--input INPUT] [--dry-run]
+    python scripts/pr_mesh_bbs_tx.py [--input INPUT] [--dry-run] [--no-daemon]
+    python scripts/pr_mesh_bbs_tx.py --wire [--dry-run]
 """
 
 import argparse
@@ -19,9 +27,14 @@ import yaml
 
 # Handle both package and standalone execution
 try:
-    from . import meshtastic_client
+    from . import mesh_airtime, mesh_txd, mesh_wire, meshtastic_client, tx_ledger, tx_queue
 except ImportError:
+    import mesh_airtime
+    import mesh_txd
+    import mesh_wire
     import meshtastic_client
+    import tx_ledger
+    import tx_queue
 
 
 def load_config(config_path: Path) -> dict[str, Any]:
@@ -47,7 +60,8 @@ def format_bulletin_for_tx(bulletin: dict[str, Any]) -> str:
     """
     Format a bulletin for transmission.
     
-    Creates a compact text representation suitable for Meshtastic.
+    Creates a compact text representation suitable for Meshtastic. The
+    body is kept whole; the client fragments oversized messages.
     
     Args:
         bulletin: Bulletin dictionary.
@@ -65,11 +79,6 @@ def format_bulletin_for_tx(bulletin: dict[str, Any]) -> str:
     title = bulletin.get("title", "")
     body = bulletin.get("body", "")
     
-    # Truncate body if too long
-    max_body_len = 150
-    if len(body) > max_body_len:
-        body = body[:max_body_len - 3] + "..."
-    
     return f"[{priority_marker}{category}] {title}\n{body}"
 
 
@@ -103,12 +112,62 @@ def main():
         action="store_true",
         help="Send the full JSON payload instead of formatted text"
     )
+    parser.add_argument(
+        "--wire",
+        action="store_true",
+        help="Send the full payload in the compact binary wire format (see mesh_wire.py)"
+    )
     parser.add_argument(
         "--hop-limit",
         type=int,
         default=None,
         help="Override hop limit for transmission"
     )
+    parser.add_argument(
+        "--want-ack",
+        action="store_true",
+        help="Request acknowledgements; unacknowledged messages count as failed"
+    )
+    parser.add_argument(
+        "--queue",
+        type=Path,
+        default=tx_queue.DEFAULT_QUEUE_PATH,
+        help="Transmit queue database (bulletins are queued by priority)"
+    )
+    parser.add_argument(
+        "--ledger",
+        type=Path,
+        default=tx_ledger.DEFAULT_LEDGER_PATH,
+        help="Ledger of broadcast messages (unchanged bulletins are skipped)"
+    )
+    parser.add_argument(
+        "--rebroadcast-hours",
+        type=float,
+        default=None,
+        help="Resend unchanged bulletins after this many hours (default: bbs.rebroadcast_hours)"
+    )
+    parser.add_argument(
+        "--send-all",
+        action="store_true",
+        help="Send every bulletin, even if unchanged since the last broadcast"
+    )
+    parser.add_argument(
+        "--daemon-socket",
+        type=Path,
+        default=None,
+        help="Transmit daemon socket (default: $MESH_TXD_SOCKET or data/mesh_txd.sock)"
+    )
+    parser.add_argument(
+        "--no-daemon",
+        action="store_true",
+        help="Open the radio directly even if a transmit daemon is running"
+    )
+    parser.add_argument(
+        "--daemon-wait",
+        type=float,
+        default=mesh_txd.DEFAULT_WAIT_SECONDS,
+        help="Seconds to wait for the transmit daemon to send the queued bulletins"
+    )
     parser.add_argument(
         "--verbose",
         "-v",
@@ -121,6 +180,8 @@ def main():
     # Load configuration
     config = load_config(args.config)
     channel = config.get("bbs", {}).get("channel", 0)
+    modem_preset = config.get("bbs", {}).get("modem_preset", mesh_airtime.DEFAULT_MODEM_PRESET)
+    scheduler = meshtastic_client.create_scheduler({channel: modem_preset})
     
     # Load bulletins
     payload = load_bulletins(args.input)
@@ -128,7 +189,7 @@ def main():
     
     print(f"PR-MESH-BBS Transmission")
     print(f"  Input: {args.input}")
-    print(f"  Channel: {channel}")
+    print(f"  Channel: {channel} ({modem_preset})")
     print(f"  Bulletins: {len(bulletins)}")
     print(f"  Generated: {payload.get('generated_at', 'unknown')}")
     
@@ -136,23 +197,127 @@ def main():
         print("No bulletins to transmit.")
         return 0
     
+    # The whole payload as one message, as JSON or in the wire format
+    if args.send_full_json or args.wire:
+        try:
+            if args.wire:
+                full_message = mesh_wire.encode_text(payload)
+            else:
+                full_message = json.dumps(payload, separators=(",", ":"))
+        except (TypeError, ValueError) as e:
+            print(f"Error: Cannot encode payload: {e}", file=sys.stderr)
+            return 1
+        messages = [(full_message, "normal", "full payload")]
+    else:
+        messages = [
+            (
+                format_bulletin_for_tx(b),
+                tx_queue.normalize_priority(b.get("priority")),
+                b.get("title")
+            )
+            for b in bulletins
+        ]
+    
+    # Only send what is new, changed, or due for re-broadcast
+    interval = tx_ledger.rebroadcast_interval(config, args.rebroadcast_hours)
+    ledger = tx_ledger.SentLedger(args.ledger)
+    try:
+        if not args.send_all:
+            due = [m for m in messages if ledger.is_due(m[0], channel, interval)]
+            if len(due) < len(messages):
+                print(
+                    f"  Unchanged: {len(messages) - len(due)} message(s) sent within "
+                    f"{interval / 3600:g}h skipped (--send-all to resend)"
+                )
+            messages = due
+        
+        if not messages:
+            print("Nothing new to transmit.")
+            return 0
+        
+        return transmit(args, messages, channel, scheduler, ledger)
+    finally:
+        ledger.close()
+
+
+def transmit(
+    args: argparse.Namespace,
+    messages: list[tuple[str, str, str | None]],
+    channel: int,
+    scheduler: mesh_airtime.TransmitScheduler,
+    ledger: tx_ledger.SentLedger
+) -> int:
+    """
+    Send (or with --dry-run, show) messages and record them in the ledger.
+    
+    Args:
+        args: Parsed command-line arguments.
+        messages: (text, priority, label) tuples to send.
+        channel: Channel index.
+        scheduler: Airtime scheduler for the channel.
+        ledger: Ledger of broadcast messages.
+    
+    Returns:
+        Exit code.
+    """
+    full_payload = args.send_full_json or args.wire
+    
     if args.dry_run:
         print("\n=== DRY RUN - No actual transmission ===\n")
+        frames = []
         
-        if args.send_full_json:
-            print("Would send full JSON payload:")
-            print(json.dumps(payload, indent=2)[:500] + "...")
-        else:
-            for i, bulletin in enumerate(bulletins, 1):
-                formatted = format_bulletin_for_tx(bulletin)
-                print(f"--- Bulletin {i} ---")
-                print(formatted)
+        for i, (message, priority, label) in enumerate(messages, 1):
+            message_frames = meshtastic_client.frame_message(message)
+            frames.extend(message_frames)
+            if full_payload:
+                print(f"Would send full {'wire-encoded' if args.wire else 'JSON'} payload")
+                print(f"({len(message.encode('utf-8'))} bytes, {len(message_frames)} frame(s))\n")
+            else:
+                print(f"--- Bulletin {i} ({len(message_frames)} frame(s)) ---")
+                print(message)
                 print()
         
+        plan = scheduler.plan([(channel, len(f.encode("utf-8"))) for f in frames])
+        print(mesh_airtime.format_plan(plan, scheduler.duty_cycle))
         return 0
     
-    # Connect to Meshtastic
-    client = meshtastic_client.create_client()
+    labels = {message: label for message, _, label in messages}
+    
+    def record_sent(item: tx_queue.QueueItem) -> None:
+        """Record a queued message once it has actually been sent."""
+        ledger.record(item.message, item.channel, labels.get(item.message))
+    
+    # A running transmit daemon already holds the radio; hand it the messages
+    # and record them as the daemon confirms each one sent
+    if not args.no_daemon and mesh_txd.use_daemon(args.daemon_socket):
+        daemon_queue = mesh_txd.DaemonQueue(args.daemon_socket)
+        try:
+            for message, priority, _ in messages:
+                daemon_queue.enqueue(message, channel, priority, args.hop_limit)
+            
+            print(
+                f"\nQueued {daemon_queue.queued} message(s) with the transmit daemon "
+                f"(depth {daemon_queue.depth()}); waiting for it to send them..."
+            )
+            if args.want_ack:
+                print("  Note: acknowledgements follow the daemon's --want-ack setting")
+            sent, failed, waiting = daemon_queue.wait(record_sent, args.daemon_wait)
+        except (OSError, ValueError) as e:
+            print(f"Error: Transmit daemon failed: {e}", file=sys.stderr)
+            return 1
+        
+        print(f"\nTransmission complete: {sent} sent, {failed} failed.")
+        if waiting:
+            print(
+                f"  {waiting} message(s) still queued with the daemon; "
+                "they are not recorded as sent, so a later run queues them again if needed"
+            )
+        return 0 if failed == 0 else 1
+    
+    # Connect to the radio mapped to the channel; frames are paced to the
+    # channel's airtime budget
+    radio = meshtastic_client.get_hardware_config().radio_for_channel(channel)
+    client = meshtastic_client.create_client(serial_port=radio.serial_port, scheduler=scheduler)
     
     if not client.connect():
         print("Error: Failed to connect to Meshtastic device", file=sys.stderr)
@@ -164,31 +329,55 @@ def main():
             print(f"  Connected to: {node_info.get('name', 'unknown')}")
             print(f"  Node ID: {node_info.get('node_id', 'unknown')}")
         
-        if args.send_full_json:
-            # Send full JSON payload
-            print("\nSending full JSON payload...")
-            if client.send_json(payload, channel_index=channel, hop_limit=args.hop_limit):
+        if full_payload:
+            # Send the full payload
+            ((message, _, label),) = messages
+            print("\nSending full payload...")
+            if client.send_text(
+                message,
+                channel_index=channel,
+                hop_limit=args.hop_limit,
+                want_ack=args.want_ack
+            ):
+                ledger.record(message, channel, label)
                 print("Payload sent successfully.")
             else:
                 print("Error: Failed to send payload", file=sys.stderr)
                 return 1
         else:
-            # Send individual bulletins as formatted text
-            print(f"\nSending {len(bulletins)} bulletin(s)...")
-            
-            for i, bulletin in enumerate(bulletins, 1):
-                formatted = format_bulletin_for_tx(bulletin)
+            # Queue bulletins by priority; anything queued while draining
+            # (e.g. a new high-priority SITREP) is sent ahead of the rest.
+            # Only this channel is drained: other channels in the shared
+            # queue may belong to pr_cybr_bbs_tx.py or another radio
+            with tx_queue.TransmitQueue(args.queue) as queue:
+                for message, priority, _ in messages:
+                    queue.enqueue(
+                        message,
+                        channel=channel,
+                        priority=priority,
+                        hop_limit=args.hop_limit
+                    )
                 
-                if args.verbose:
-                    print(f"\n--- Bulletin {i} ---")
-                    print(formatted)
+                print(f"\nSending {queue.depth(channels={channel})} queued message(s)...")
+                sent, failed = queue.drain(
+                    client,
+                    verbose=args.verbose,
+                    want_ack=args.want_ack,
+                    on_sent=record_sent,
+                    channels={channel}
+                )
                 
-                if client.send_text(formatted, channel_index=channel, hop_limit=args.hop_limit):
-                    print(f"Bulletin {i}/{len(bulletins)} sent.")
-                else:
-                    print(f"Error: Failed to send bulletin {i}", file=sys.stderr)
+                print(f"\nTransmission complete: {sent} sent, {failed} failed.")
+                if args.verbose:
+                    tx_queue.print_metrics(queue.metrics())
             
-            print("\nTransmission complete.")
+            if args.verbose:
+                print(
+                    f"  Airtime: {scheduler.total_airtime:.1f}s, "
+                    f"paced for {scheduler.total_wait:.1f}s"
+                )
+            if failed:
+                return 1
     
     finally:
         client.disconnect()
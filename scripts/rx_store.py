@@ -0,0 +1,552 @@
+#!/usr/bin/env python3
+"""
+Receive Store Module
+
+Records what arrives on the mesh. A PacketRecorder attached to a
+MeshtasticClient (add_receive_handler) normalizes each received packet
+into a ReceivedMessage (sender, channel, receive time, SNR/RSSI, hop
+count), reassembling fragmented and decompressing compressed text, and
+appends it to a ReceiveStore: an append-only SQLite table indexed by
+time, channel and sender.
+
+Retention is bounded by age and by row count (the receive: section of
+config/hardware.yml), enforced as records are added. The dashboard
+export and reports read the store with recent() and summary().
+
+Usage:
+    python scripts/rx_store.py listen [--channel N]
+    python scripts/rx_store.py list [--channel N] [--limit 20]
+    python scripts/rx_store.py stats [--hours 24]
+    python scripts/rx_store.py prune
+"""
+
+import argparse
+import signal
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, replace
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+# Handle both package and standalone execution
+try:
+    from . import mesh_compress, mesh_fragment, meshtastic_client
+except ImportError:
+    import mesh_compress
+    import mesh_fragment
+    import meshtastic_client
+
+
+# Default receive store database
+DEFAULT_STORE_PATH = Path(__file__).parent.parent / "data" / "rx_store.db"
+
+# Default retention: records older than this many days are deleted...
+DEFAULT_RETENTION_DAYS = 30
+
+# ...and only this many of the newest records are kept
+DEFAULT_MAX_RECORDS = 100_000
+
+# Records added between retention passes
+RETENTION_EVERY = 100
+
+# Packets remembered to drop duplicates heard via several relays
+DEFAULT_DEDUP_SIZE = 512
+
+# Packet types not worth recording (acks and naks)
+IGNORED_PORTS = {"ROUTING_APP"}
+
+
+@dataclass(frozen=True)
+class ReceivedMessage:
+    """
+    One received packet (or reassembled message), normalized.
+    
+    Attributes:
+        rx_time: Receive time (Unix seconds).
+        from_id: Sender node ID (e.g. "!a1b2c3d4").
+        to_id: Destination node ID ("^all" for broadcasts).
+        channel: Channel index.
+        portnum: Meshtastic port (TEXT_MESSAGE_APP, POSITION_APP, ...).
+        text: Message text for text packets, otherwise None.
+        snr: Signal-to-noise ratio of the last hop in dB.
+        rssi: Signal strength of the last hop in dBm.
+        hop_limit: Hops the packet had left on arrival.
+        hops: Hops taken (hop start minus hop limit), if known.
+        packet_id: Mesh packet ID.
+        id: Store row ID (None until stored).
+    """
+    
+    rx_time: float
+    from_id: str | None
+    to_id: str | None
+    channel: int
+    portnum: str | None
+    text: str | None = None
+    snr: float | None = None
+    rssi: int | None = None
+    hop_limit: int | None = None
+    hops: int | None = None
+    packet_id: int | None = None
+    id: int | None = None
+    
+    @classmethod
+    def from_packet(
+        cls,
+        packet: dict[str, Any],
+        text: str | None = None,
+        clock: Callable[[], float] = time.time
+    ) -> "ReceivedMessage":
+        """
+        Normalize a packet dictionary from the meshtastic library.
+        
+        Args:
+            packet: Received packet.
+            text: Text to record (default: the packet's decoded text).
+            clock: Time source used when the packet has no rxTime.
+        """
+        decoded = packet.get("decoded") or {}
+        hop_limit = packet.get("hopLimit")
+        hop_start = packet.get("hopStart")
+        hops = hop_start - hop_limit if hop_start is not None and hop_limit is not None else None
+        
+        return cls(
+            rx_time=float(packet.get("rxTime") or clock()),
+            from_id=packet.get("fromId"),
+            to_id=packet.get("toId"),
+            channel=int(packet.get("channel", 0)),
+            portnum=decoded.get("portnum"),
+            text=text if text is not None else decoded.get("text"),
+            snr=packet.get("rxSnr"),
+            rssi=packet.get("rxRssi"),
+            hop_limit=hop_limit,
+            hops=hops,
+            packet_id=packet.get("id")
+        )
+    
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to a JSON-ready dictionary with an ISO 8601 rx_at."""
+        data = asdict(self)
+        data["rx_at"] = datetime.fromtimestamp(self.rx_time, timezone.utc).isoformat()
+        return data
+
+
+class ReceiveStore:
+    """Append-only, indexed store of received messages with bounded retention."""
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS received (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            rx_time REAL NOT NULL,
+            from_id TEXT,
+            to_id TEXT,
+            channel INTEGER NOT NULL,
+            portnum TEXT,
+            text TEXT,
+            snr REAL,
+            rssi INTEGER,
+            hop_limit INTEGER,
+            hops INTEGER,
+            packet_id INTEGER
+        );
+        CREATE INDEX IF NOT EXISTS received_time ON received(rx_time);
+        CREATE INDEX IF NOT EXISTS received_channel ON received(channel, rx_time);
+        CREATE INDEX IF NOT EXISTS received_sender ON received(from_id, rx_time);
+    """
+    
+    COLUMNS = (
+        "rx_time", "from_id", "to_id", "channel", "portnum", "text",
+        "snr", "rssi", "hop_limit", "hops", "packet_id"
+    )
+    
+    def __init__(
+        self,
+        db_path: Path | None = None,
+        retention_days: float = DEFAULT_RETENTION_DAYS,
+        max_records: int = DEFAULT_MAX_RECORDS,
+        clock: Callable[[], float] = time.time,
+        timeout: float = 30.0
+    ):
+        """
+        Open (creating if needed) a receive store.
+        
+        Args:
+            db_path: SQLite database path.
+            retention_days: Delete records older than this (0 keeps all).
+            max_records: Keep at most this many records (0: no limit).
+            clock: Time source (Unix seconds).
+            timeout: Seconds to wait for another process's write lock.
+        """
+        self.db_path = Path(db_path) if db_path else DEFAULT_STORE_PATH
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.retention_days = retention_days
+        self.max_records = max_records
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._since_retention = 0
+        
+        # Packets arrive on the meshtastic reader thread
+        self.conn = sqlite3.connect(
+            self.db_path, timeout=timeout, isolation_level=None, check_same_thread=False
+        )
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+    
+    @classmethod
+    def from_config(
+        cls,
+        settings: dict[str, Any] | None,
+        db_path: Path | None = None
+    ) -> "ReceiveStore":
+        """
+        Open the store described by hardware.yml's receive: section.
+        
+        Args:
+            settings: The receive: section (may be None).
+            db_path: Overrides the configured path.
+        """
+        settings = settings or {}
+        path = db_path or settings.get("store")
+        if path and not Path(path).is_absolute():
+            path = Path(__file__).parent.parent / path
+        return cls(
+            path,
+            retention_days=settings.get("retention_days", DEFAULT_RETENTION_DAYS),
+            max_records=settings.get("max_records", DEFAULT_MAX_RECORDS)
+        )
+    
+    def append(self, message: ReceivedMessage) -> int:
+        """
+        Add a received message.
+        
+        Returns:
+            Row ID of the new record.
+        """
+        values = tuple(getattr(message, column) for column in self.COLUMNS)
+        with self._lock:
+            cursor = self.conn.execute(
+                f"INSERT INTO received ({', '.join(self.COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(self.COLUMNS))})",
+                values
+            )
+            self._since_retention += 1
+            if self._since_retention >= RETENTION_EVERY:
+                self._enforce_retention()
+            return cursor.lastrowid
+    
+    def enforce_retention(self) -> int:
+        """
+        Delete records beyond the age and count limits.
+        
+        Returns:
+            Number of records deleted.
+        """
+        with self._lock:
+            return self._enforce_retention()
+    
+    def _enforce_retention(self) -> int:
+        self._since_retention = 0
+        deleted = 0
+        if self.retention_days:
+            deleted += self.conn.execute(
+                "DELETE FROM received WHERE rx_time < ?",
+                (self._clock() - self.retention_days * 86400,)
+            ).rowcount
+        if self.max_records:
+            deleted += self.conn.execute(
+                "DELETE FROM received WHERE id <= "
+                "(SELECT id FROM received ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                (self.max_records,)
+            ).rowcount
+        return deleted
+    
+    def recent(
+        self,
+        limit: int = 50,
+        channel: int | None = None,
+        from_id: str | None = None,
+        since: float | None = None,
+        text_only: bool = False
+    ) -> list[ReceivedMessage]:
+        """
+        List records, newest first.
+        
+        Args:
+            limit: Most records to return.
+            channel: Only this channel.
+            from_id: Only this sender.
+            since: Only records received at or after this time.
+            text_only: Only text messages.
+        
+        Returns:
+            List of ReceivedMessage.
+        """
+        query = f"SELECT {', '.join(self.COLUMNS)}, id FROM received WHERE 1 = 1"
+        params: tuple = ()
+        if channel is not None:
+            query += " AND channel = ?"
+            params += (channel,)
+        if from_id is not None:
+            query += " AND from_id = ?"
+            params += (from_id,)
+        if since is not None:
+            query += " AND rx_time >= ?"
+            params += (since,)
+        if text_only:
+            query += " AND text IS NOT NULL"
+        
+        rows = self.conn.execute(query + " ORDER BY rx_time DESC, id DESC LIMIT ?", params + (limit,))
+        return [ReceivedMessage(*row) for row in rows]
+    
+    def summary(self, since: float | None = None) -> dict[str, Any]:
+        """
+        Summarize traffic.
+        
+        Args:
+            since: Only count records received at or after this time.
+        
+        Returns:
+            Dictionary with total, last_rx (Unix seconds or None),
+            channels (count by channel) and senders (list of dictionaries
+            with from_id, count, last_rx, avg_snr, avg_rssi and min_hops,
+            most active first).
+        """
+        where, params = ("WHERE rx_time >= ?", (since,)) if since is not None else ("", ())
+        
+        total, last_rx = self.conn.execute(
+            f"SELECT COUNT(*), MAX(rx_time) FROM received {where}", params
+        ).fetchone()
+        channels = dict(self.conn.execute(
+            f"SELECT channel, COUNT(*) FROM received {where} GROUP BY channel ORDER BY channel",
+            params
+        ))
+        columns = ["from_id", "count", "last_rx", "avg_snr", "avg_rssi", "min_hops"]
+        senders = [
+            dict(zip(columns, row))
+            for row in self.conn.execute(
+                "SELECT from_id, COUNT(*), MAX(rx_time), AVG(snr), AVG(rssi), MIN(hops) "
+                f"FROM received {where} GROUP BY from_id ORDER BY COUNT(*) DESC, from_id",
+                params
+            )
+        ]
+        return {"total": total, "last_rx": last_rx, "channels": channels, "senders": senders}
+    
+    def close(self) -> None:
+        """Close the database connection."""
+        self.conn.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+
+class PacketRecorder:
+    """
+    Receive handler that writes packets to a ReceiveStore.
+    
+    Fragments are held until their message is complete; the message is
+    then recorded with the metadata of its last fragment. Compressed text
+    is decompressed, and packed messages (see mesh_fragment.pack_messages)
+    are recorded as one record per message. A packet heard again through
+    another relay is recorded once.
+    """
+    
+    def __init__(
+        self,
+        store: ReceiveStore,
+        channels: set[int] | None = None,
+        reassembler: mesh_fragment.Reassembler | None = None,
+        dedup_size: int = DEFAULT_DEDUP_SIZE,
+        on_record: Callable[[ReceivedMessage], None] | None = None
+    ):
+        """
+        Initialize the recorder.
+        
+        Args:
+            store: Store to append to.
+            channels: Only record these channels (default: all).
+            reassembler: Reassembler for fragmented text (a new one if None).
+            dedup_size: Recent (sender, packet ID) pairs remembered.
+            on_record: Called with each record after it is stored.
+        """
+        self.store = store
+        self.channels = channels
+        self.reassembler = reassembler or mesh_fragment.Reassembler()
+        self.dedup_size = dedup_size
+        self.on_record = on_record
+        self.recorded = 0
+        self.duplicates = 0
+        self._seen: OrderedDict[tuple, None] = OrderedDict()
+    
+    def _is_duplicate(self, packet: dict[str, Any]) -> bool:
+        if packet.get("id") is None:
+            return False
+        key = (packet.get("fromId"), packet["id"])
+        if key in self._seen:
+            self._seen.move_to_end(key)
+            return True
+        self._seen[key] = None
+        if len(self._seen) > self.dedup_size:
+            self._seen.popitem(last=False)
+        return False
+    
+    def __call__(self, packet: dict[str, Any]) -> list[ReceivedMessage]:
+        """
+        Handle one received packet.
+        
+        Returns:
+            The records stored (none for duplicates, ignored packets and
+            fragments of incomplete messages).
+        """
+        decoded = packet.get("decoded") or {}
+        if decoded.get("portnum") in IGNORED_PORTS:
+            return []
+        if self.channels is not None and packet.get("channel", 0) not in self.channels:
+            return []
+        if self._is_duplicate(packet):
+            self.duplicates += 1
+            return []
+        
+        texts: list[str | None] = [None]
+        if "text" in decoded:
+            message = self.reassembler.feed(decoded["text"], packet.get("fromId"))
+            if message is None:
+                return []
+            texts = mesh_fragment.unpack_message(mesh_compress.decode_text(message))
+        
+        records = []
+        for text in texts:
+            record = ReceivedMessage.from_packet(packet, text)
+            record = replace(record, id=self.store.append(record))
+            records.append(record)
+            self.recorded += 1
+            if self.on_record:
+                self.on_record(record)
+        return records
+
+
+def attach_recorder(
+    client: meshtastic_client.MeshtasticClient,
+    store: ReceiveStore,
+    **kwargs: Any
+) -> PacketRecorder:
+    """
+    Record everything a client's radio receives.
+    
+    Args:
+        client: Meshtastic client (connected or not yet).
+        store: Store to append to.
+        **kwargs: PacketRecorder options.
+    
+    Returns:
+        The attached recorder (pass it to client.remove_receive_handler()
+        to stop recording).
+    """
+    recorder = PacketRecorder(store, **kwargs)
+    client.add_receive_handler(recorder)
+    return recorder
+
+
+def format_record(record: ReceivedMessage) -> str:
+    """Format a record as one line."""
+    rx_at = datetime.fromtimestamp(record.rx_time, timezone.utc)
+    quality = f"snr {record.snr:g} rssi {record.rssi}" if record.snr is not None else "no signal info"
+    hops = f"{record.hops} hop(s)" if record.hops is not None else "hops unknown"
+    body = record.text if record.text is not None else f"<{record.portnum}>"
+    return (
+        f"{rx_at:%Y-%m-%d %H:%M:%S}Z ch{record.channel} {record.from_id} "
+        f"({quality}, {hops}): {body[:80]}"
+    )
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Record and query received mesh traffic")
+    parser.add_argument(
+        "--db",
+        type=Path,
+        default=None,
+        help="Receive store path (default: receive.store or data/rx_store.db)"
+    )
+    subparsers = parser.add_subparsers(dest="command", help="Command to run")
+    
+    listen_parser = subparsers.add_parser("listen", help="Record received packets until stopped")
+    listen_parser.add_argument(
+        "--channel", type=int, action="append", default=None, help="Only record channel N"
+    )
+    
+    list_parser = subparsers.add_parser("list", help="Show recent messages")
+    list_parser.add_argument("--channel", type=int, default=None, help="Channel index")
+    list_parser.add_argument("--from", dest="from_id", default=None, help="Sender node ID")
+    list_parser.add_argument("--limit", type=int, default=20, help="Most messages to show")
+    
+    stats_parser = subparsers.add_parser("stats", help="Traffic by channel and sender")
+    stats_parser.add_argument(
+        "--hours", type=float, default=24, help="Only count the last N hours (0: all)"
+    )
+    
+    subparsers.add_parser("prune", help="Apply the retention limits now")
+    
+    args = parser.parse_args()
+    
+    if not args.command:
+        parser.print_help()
+        return 1
+    
+    config = meshtastic_client.get_hardware_config()
+    with ReceiveStore.from_config(config.raw.get("receive"), args.db) as store:
+        if args.command == "list":
+            records = store.recent(args.limit, args.channel, args.from_id)
+            for record in reversed(records):
+                print(format_record(record))
+            print(f"{len(records)} record(s)")
+            return 0
+        
+        if args.command == "stats":
+            since = time.time() - args.hours * 3600 if args.hours else None
+            summary = store.summary(since)
+            print(f"Records: {summary['total']}")
+            for channel, count in summary["channels"].items():
+                print(f"  ch{channel}: {count}")
+            for sender in summary["senders"]:
+                snr = f"{sender['avg_snr']:.1f}" if sender["avg_snr"] is not None else "-"
+                print(f"  {sender['from_id']}: {sender['count']} (avg snr {snr})")
+            return 0
+        
+        if args.command == "prune":
+            print(f"Pruned {store.enforce_retention()} record(s)")
+            return 0
+        
+        client = meshtastic_client.create_client()
+        attach_recorder(
+            client,
+            store,
+            channels=set(args.channel) if args.channel else None,
+            on_record=lambda record: print(format_record(record))
+        )
+        if not client.connect():
+            print("Error: Failed to connect to Meshtastic device", file=sys.stderr)
+            return 1
+        
+        stop = threading.Event()
+        signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+        print(f"Recording to {store.db_path} (Ctrl-C to stop)...")
+        try:
+            while not stop.wait(1.0):
+                pass
+        except KeyboardInterrupt:
+            pass
+        finally:
+            client.disconnect()
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
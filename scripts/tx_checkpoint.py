@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Transmit Checkpoint Module
+
+A durable record of how far a broadcast got, so pr_cybr_bbs_tx.py
+--resume can continue after a reboot or a dropped serial link instead of
+starting over. Progress is kept per (payload generated_at, channel, item
+index) and written as each message goes out.
+
+An item is queued once it is in the transmit queue (or the transmit
+daemon's) and sent once the radio has sent it. On resume, sent items are
+skipped. Queued items still pending in the queue are never queued again,
+with or without --resume, since the next drain sends those anyway.
+
+Usage:
+    python scripts/tx_checkpoint.py list
+    python scripts/tx_checkpoint.py clear [--generated-at TIME]
+    python scripts/tx_checkpoint.py prune --older-than-hours 168
+"""
+
+import argparse
+import hashlib
+import json
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+
+# Default checkpoint database
+DEFAULT_CHECKPOINT_PATH = Path(__file__).parent.parent / "data" / "tx_checkpoint.db"
+
+
+def run_key(payload: dict[str, Any]) -> str:
+    """
+    Identify a payload for checkpointing.
+    
+    Returns:
+        The payload's generated_at, or a hash of its content if it has none.
+    """
+    generated_at = payload.get("generated_at")
+    if generated_at:
+        return str(generated_at)
+    content = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return "sha256:" + hashlib.sha256(content.encode("utf-8")).hexdigest()[:32]
+
+
+class TransmitCheckpoint:
+    """Persistent per-item progress of channel broadcasts."""
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS checkpoint (
+            generated_at TEXT NOT NULL,
+            channel INTEGER NOT NULL,
+            item_index INTEGER NOT NULL,
+            queue_id INTEGER,
+            updated_at REAL NOT NULL,
+            sent INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (generated_at, channel, item_index)
+        );
+        CREATE INDEX IF NOT EXISTS checkpoint_queue_id ON checkpoint(queue_id);
+    """
+    
+    def __init__(
+        self,
+        db_path: Path | None = None,
+        clock: Callable[[], float] = time.time,
+        timeout: float = 30.0
+    ):
+        """
+        Open (creating if needed) a checkpoint database.
+        
+        Args:
+            db_path: SQLite database path.
+            clock: Time source (Unix seconds).
+            timeout: Seconds to wait for another process's write lock.
+        """
+        self.db_path = Path(db_path) if db_path else DEFAULT_CHECKPOINT_PATH
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._clock = clock
+        
+        # Radio workers mark sends from their own threads (one at a time)
+        self.conn = sqlite3.connect(
+            self.db_path, timeout=timeout, isolation_level=None, check_same_thread=False
+        )
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+    
+    def _mark(
+        self,
+        generated_at: str,
+        channel: int,
+        indexes: Iterable[int],
+        queue_id: int | None,
+        sent: bool
+    ) -> None:
+        now = self._clock()
+        self.conn.executemany(
+            "INSERT INTO checkpoint (generated_at, channel, item_index, queue_id, updated_at, sent) "
+            "VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (generated_at, channel, item_index) DO UPDATE SET "
+            "queue_id = excluded.queue_id, updated_at = excluded.updated_at, sent = excluded.sent",
+            [(generated_at, channel, index, queue_id, now, int(sent)) for index in indexes]
+        )
+    
+    def mark_queued(
+        self,
+        generated_at: str,
+        channel: int,
+        indexes: Iterable[int],
+        queue_id: int
+    ) -> None:
+        """
+        Record that items were put in the transmit queue.
+        
+        Args:
+            generated_at: Payload key (see run_key()).
+            channel: Channel index.
+            indexes: Item indexes carried by the queued message.
+            queue_id: Transmit queue entry ID.
+        """
+        self._mark(generated_at, channel, indexes, queue_id, sent=False)
+    
+    def mark_sent(self, generated_at: str, channel: int, indexes: Iterable[int]) -> None:
+        """Record that items were sent."""
+        self._mark(generated_at, channel, indexes, None, sent=True)
+    
+    def mark_queue_item_sent(self, generated_at: str, channel: int, queue_id: int) -> int:
+        """
+        Record that a queued message was sent.
+        
+        Queue IDs are only unique within one queue database (the local
+        queue and a daemon's may both hand out the same ID), so the match
+        is scoped to the run and channel the message was queued for.
+        
+        Args:
+            generated_at: Payload key (see run_key()).
+            channel: Channel index.
+            queue_id: Transmit queue entry ID.
+        
+        Returns:
+            Number of items marked.
+        """
+        cursor = self.conn.execute(
+            "UPDATE checkpoint SET sent = 1, updated_at = ? "
+            "WHERE generated_at = ? AND channel = ? AND queue_id = ? AND sent = 0",
+            (self._clock(), generated_at, channel, queue_id)
+        )
+        return cursor.rowcount
+    
+    def sent_items(self, generated_at: str, channel: int) -> set[int]:
+        """Indexes of a channel's items already sent."""
+        return {
+            index for (index,) in self.conn.execute(
+                "SELECT item_index FROM checkpoint "
+                "WHERE generated_at = ? AND channel = ? AND sent = 1",
+                (generated_at, channel)
+            )
+        }
+    
+    def queued_items(self, generated_at: str, channel: int) -> dict[int, int]:
+        """Transmit queue entry ID by index for a channel's queued, unsent items."""
+        return dict(self.conn.execute(
+            "SELECT item_index, queue_id FROM checkpoint "
+            "WHERE generated_at = ? AND channel = ? AND sent = 0",
+            (generated_at, channel)
+        ))
+    
+    def runs(self) -> list[dict[str, Any]]:
+        """
+        Summarize checkpointed broadcasts, most recent first.
+        
+        Returns:
+            List of dictionaries with generated_at, channel, items, sent
+            and updated_at.
+        """
+        columns = ["generated_at", "channel", "items", "sent", "updated_at"]
+        return [
+            dict(zip(columns, row))
+            for row in self.conn.execute(
+                "SELECT generated_at, channel, COUNT(*), SUM(sent), MAX(updated_at) "
+                "FROM checkpoint GROUP BY generated_at, channel "
+                "ORDER BY MAX(updated_at) DESC, channel"
+            )
+        ]
+    
+    def clear(self, generated_at: str | None = None, channel: int | None = None) -> int:
+        """
+        Delete progress so the next run starts from the beginning.
+        
+        Args:
+            generated_at: Only clear this payload (default: all).
+            channel: Only clear this channel.
+        
+        Returns:
+            Number of entries deleted.
+        """
+        query, params = "DELETE FROM checkpoint WHERE 1 = 1", ()
+        if generated_at is not None:
+            query += " AND generated_at = ?"
+            params += (generated_at,)
+        if channel is not None:
+            query += " AND channel = ?"
+            params += (channel,)
+        return self.conn.execute(query, params).rowcount
+    
+    def prune(self, older_than: float) -> int:
+        """
+        Delete entries not updated for a number of seconds.
+        
+        Returns:
+            Number of entries deleted.
+        """
+        cursor = self.conn.execute(
+            "DELETE FROM checkpoint WHERE updated_at < ?",
+            (self._clock() - older_than,)
+        )
+        return cursor.rowcount
+    
+    def close(self) -> None:
+        """Close the database connection."""
+        self.conn.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Checkpoints of channel broadcasts for --resume"
+    )
+    parser.add_argument(
+        "--db",
+        type=Path,
+        default=DEFAULT_CHECKPOINT_PATH,
+        help="Checkpoint database path"
+    )
+    subparsers = parser.add_subparsers(dest="command", help="Command to run")
+    
+    subparsers.add_parser("list", help="Show progress per payload and channel")
+    
+    clear_parser = subparsers.add_parser("clear", help="Forget progress")
+    clear_parser.add_argument(
+        "--generated-at", default=None, help="Only this payload's generated_at"
+    )
+    
+    prune_parser = subparsers.add_parser("prune", help="Delete old entries")
+    prune_parser.add_argument(
+        "--older-than-hours",
+        type=float,
+        default=168,
+        help="Delete entries not updated for this many hours"
+    )
+    
+    args = parser.parse_args()
+    
+    if not args.command:
+        parser.print_help()
+        return 1
+    
+    with TransmitCheckpoint(args.db) as checkpoint:
+        if args.command == "list":
+            runs = checkpoint.runs()
+            for run in runs:
+                print(f"{run['generated_at']} ch{run['channel']}: {run['sent']}/{run['items']} sent")
+            if not runs:
+                print("No checkpoints")
+            return 0
+        
+        if args.command == "clear":
+            print(f"Cleared {checkpoint.clear(args.generated_at)} entries")
+            return 0
+        
+        print(f"Pruned {checkpoint.prune(args.older_than_hours * 3600)} entries")
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
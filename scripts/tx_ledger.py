@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Transmit Ledger Module
+
+A persistent record of what has been broadcast, keyed by channel and a
+hash of the message text, so scheduled runs of the tx scripts send only
+new or changed bulletins. An unchanged message is sent again once its
+re-broadcast interval has passed, so nodes that joined late still hear
+it; an edited bulletin hashes differently and goes out on the next run.
+
+A message counts as broadcast once the radio has sent it. Messages handed
+to the transmit daemon are recorded when the daemon reports them sent;
+a message it fails to send, or has not sent yet, stays due.
+
+Usage:
+    python scripts/tx_ledger.py list [--channel N]
+    python scripts/tx_ledger.py forget [--channel N]
+    python scripts/tx_ledger.py prune --older-than-hours 168
+"""
+
+import argparse
+import hashlib
+import sqlite3
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+
+# Default ledger database
+DEFAULT_LEDGER_PATH = Path(__file__).parent.parent / "data" / "tx_ledger.db"
+
+# Default re-broadcast interval for unchanged messages, in hours
+DEFAULT_REBROADCAST_HOURS = 24
+
+# Slack for scheduled runs that start a little earlier than last time:
+# a message is due this many seconds before its interval is up
+REBROADCAST_GRACE = 600.0
+
+
+def content_hash(message: str) -> str:
+    """Hash message text for the ledger."""
+    return hashlib.sha256(message.encode("utf-8")).hexdigest()[:32]
+
+
+class SentLedger:
+    """Persistent ledger of broadcast messages by channel and content hash."""
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS ledger (
+            channel INTEGER NOT NULL,
+            content_hash TEXT NOT NULL,
+            label TEXT,
+            first_sent REAL NOT NULL,
+            last_sent REAL NOT NULL,
+            sends INTEGER NOT NULL DEFAULT 1,
+            PRIMARY KEY (channel, content_hash)
+        );
+    """
+    
+    def __init__(
+        self,
+        db_path: Path | None = None,
+        clock: Callable[[], float] = time.time,
+        timeout: float = 30.0
+    ):
+        """
+        Open (creating if needed) a ledger database.
+        
+        Args:
+            db_path: SQLite database path.
+            clock: Time source (Unix seconds).
+            timeout: Seconds to wait for another process's write lock.
+        """
+        self.db_path = Path(db_path) if db_path else DEFAULT_LEDGER_PATH
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._clock = clock
+        
+        # Radio workers record sends from their own threads (one at a time)
+        self.conn = sqlite3.connect(
+            self.db_path, timeout=timeout, isolation_level=None, check_same_thread=False
+        )
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+    
+    def last_sent(self, message: str, channel: int) -> float | None:
+        """Time a message was last broadcast on a channel, or None."""
+        row = self.conn.execute(
+            "SELECT last_sent FROM ledger WHERE channel = ? AND content_hash = ?",
+            (channel, content_hash(message))
+        ).fetchone()
+        return row[0] if row else None
+    
+    def is_due(self, message: str, channel: int, rebroadcast_interval: float) -> bool:
+        """
+        Check whether a message should be broadcast.
+        
+        Args:
+            message: Message text.
+            channel: Channel index.
+            rebroadcast_interval: Seconds before an unchanged message is
+                sent again (0 sends it every run).
+        
+        Returns:
+            True if the message is new, changed, or due for re-broadcast.
+        """
+        last_sent = self.last_sent(message, channel)
+        if last_sent is None:
+            return True
+        return self._clock() - last_sent >= rebroadcast_interval - REBROADCAST_GRACE
+    
+    def record(self, message: str, channel: int, label: str | None = None) -> None:
+        """
+        Record that a message was broadcast.
+        
+        Args:
+            message: Message text.
+            channel: Channel index.
+            label: Optional description (e.g. the bulletin title).
+        """
+        now = self._clock()
+        self.conn.execute(
+            "INSERT INTO ledger (channel, content_hash, label, first_sent, last_sent) "
+            "VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (channel, content_hash) DO UPDATE SET "
+            "last_sent = excluded.last_sent, sends = sends + 1, "
+            "label = COALESCE(excluded.label, label)",
+            (channel, content_hash(message), label, now, now)
+        )
+    
+    def entries(self, channel: int | None = None) -> list[dict[str, Any]]:
+        """
+        List ledger entries, most recently sent first.
+        
+        Args:
+            channel: Only list this channel.
+        
+        Returns:
+            List of dictionaries with channel, content_hash, label,
+            first_sent, last_sent and sends.
+        """
+        query = "SELECT channel, content_hash, label, first_sent, last_sent, sends FROM ledger"
+        params: tuple = ()
+        if channel is not None:
+            query += " WHERE channel = ?"
+            params = (channel,)
+        
+        columns = ["channel", "content_hash", "label", "first_sent", "last_sent", "sends"]
+        return [
+            dict(zip(columns, row))
+            for row in self.conn.execute(query + " ORDER BY last_sent DESC", params)
+        ]
+    
+    def forget(self, channel: int | None = None) -> int:
+        """
+        Delete entries so their messages are sent on the next run.
+        
+        Args:
+            channel: Only forget this channel (default: all channels).
+        
+        Returns:
+            Number of entries deleted.
+        """
+        if channel is None:
+            return self.conn.execute("DELETE FROM ledger").rowcount
+        return self.conn.execute("DELETE FROM ledger WHERE channel = ?", (channel,)).rowcount
+    
+    def prune(self, older_than: float) -> int:
+        """
+        Delete entries not sent for a number of seconds.
+        
+        Returns:
+            Number of entries deleted.
+        """
+        cursor = self.conn.execute(
+            "DELETE FROM ledger WHERE last_sent < ?",
+            (self._clock() - older_than,)
+        )
+        return cursor.rowcount
+    
+    def close(self) -> None:
+        """Close the database connection."""
+        self.conn.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+
+def rebroadcast_interval(config: dict[str, Any], override_hours: float | None = None) -> float:
+    """
+    Get the re-broadcast interval in seconds from a BBS configuration.
+    
+    Args:
+        config: Parsed pr_mesh_bbs.yml or pr_cybr_bbs_channels.yml.
+        override_hours: Value from the command line, if given.
+    
+    Returns:
+        Interval in seconds.
+    """
+    hours = override_hours
+    if hours is None:
+        hours = (config.get("bbs") or {}).get("rebroadcast_hours", DEFAULT_REBROADCAST_HOURS)
+    return float(hours) * 3600
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Ledger of broadcast messages for delta transmission"
+    )
+    parser.add_argument(
+        "--db",
+        type=Path,
+        default=DEFAULT_LEDGER_PATH,
+        help="Ledger database path"
+    )
+    subparsers = parser.add_subparsers(dest="command", help="Command to run")
+    
+    list_parser = subparsers.add_parser("list", help="List broadcast messages")
+    list_parser.add_argument("--channel", type=int, default=None, help="Channel index")
+    
+    forget_parser = subparsers.add_parser(
+        "forget", help="Forget broadcasts so everything is sent on the next run"
+    )
+    forget_parser.add_argument("--channel", type=int, default=None, help="Channel index")
+    
+    prune_parser = subparsers.add_parser("prune", help="Delete old entries")
+    prune_parser.add_argument(
+        "--older-than-hours",
+        type=float,
+        default=168,
+        help="Delete entries not sent for this many hours"
+    )
+    
+    args = parser.parse_args()
+    
+    if not args.command:
+        parser.print_help()
+        return 1
+    
+    with SentLedger(args.db) as ledger:
+        if args.command == "list":
+            entries = ledger.entries(args.channel)
+            for entry in entries:
+                last_sent = datetime.fromtimestamp(entry["last_sent"], timezone.utc)
+                print(
+                    f"ch{entry['channel']} {entry['content_hash'][:12]} "
+                    f"{last_sent:%Y-%m-%d %H:%M}Z x{entry['sends']}  {entry['label'] or ''}"
+                )
+            print(f"{len(entries)} entr{'y' if len(entries) == 1 else 'ies'}")
+            return 0
+        
+        if args.command == "forget":
+            print(f"Forgot {ledger.forget(args.channel)} entries")
+            return 0
+        
+        print(f"Pruned {ledger.prune(args.older_than_hours * 3600)} entries")
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,633 @@
+#!/usr/bin/env python3
+"""
+Transmit Queue Module
+
+A persistent priority queue in front of MeshtasticClient. Messages are
+stored in SQLite until they have been handed to the radio, so a crash
+mid-broadcast loses nothing, and other processes (a new SITREP, the
+MAILB0X bot) can enqueue while a broadcast is draining: the next message
+sent is always the best one queued at that moment.
+
+Ordering:
+Each message's score is rank * aging_seconds + enqueued_at, where rank is
+0 (high), 1 (normal) or 2 (low). The lowest score goes first, so high
+priority jumps ahead of everything queued, while a message that has
+waited aging_seconds outranks a newer message one level above it, so low
+priority is never starved.
+
+Several drainers (processes, radio workers, the daemon) can share one
+queue: each message is claimed before it is sent, so it goes out once.
+A claim is a lease; if the sender crashes, the message becomes pending
+again when the lease runs out. Enqueuing a message already waiting on
+the same channel returns the waiting entry instead of adding another.
+
+With several radios (hardware.yml radios), drain_radios() runs one
+worker per radio, each sending only the channels mapped to it, so
+channels on different radios go out concurrently.
+
+Usage:
+    python scripts/tx_queue.py enqueue --channel N --priority high --text "..."
+    python scripts/tx_queue.py drain [--max N] [--want-ack]
+    python scripts/tx_queue.py stats
+"""
+
+import argparse
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Collection, Iterator
+
+# Handle both package and standalone execution
+try:
+    from . import meshtastic_client
+except ImportError:
+    import meshtastic_client
+
+
+# Default queue database
+DEFAULT_QUEUE_PATH = Path(__file__).parent.parent / "data" / "tx_queue.db"
+
+# Priority names and their ranks (lower is sent first)
+PRIORITY_RANKS = {"high": 0, "normal": 1, "low": 2}
+
+# Seconds of waiting worth one priority level
+DEFAULT_AGING_SECONDS = 600.0
+
+# Seconds a claimed message is reserved for its sender; longer than any
+# send (retries and acks included) takes
+DEFAULT_LEASE_SECONDS = 600.0
+
+# Entries not yet finished: waiting, or claimed by a sender
+UNFINISHED = "status IN ('pending', 'sending')"
+
+
+def normalize_priority(priority: str | None) -> str:
+    """Map a bulletin/item priority to a queue priority (unknown -> normal)."""
+    priority = (priority or "normal").lower()
+    return priority if priority in PRIORITY_RANKS else "normal"
+
+
+@dataclass(frozen=True)
+class QueueItem:
+    """
+    A queued message.
+    
+    Attributes:
+        id: Queue entry ID.
+        channel: Channel index to send on.
+        priority: Priority name (high, normal, low).
+        message: Text to send.
+        enqueued_at: Enqueue time (Unix seconds).
+        hop_limit: Hop limit override, or None for the default.
+    """
+    
+    id: int
+    channel: int
+    priority: str
+    message: str
+    enqueued_at: float
+    hop_limit: int | None = None
+
+
+class TransmitQueue:
+    """Persistent, aging priority queue of outgoing messages."""
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS queue (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            channel INTEGER NOT NULL,
+            priority INTEGER NOT NULL,
+            message TEXT NOT NULL,
+            hop_limit INTEGER,
+            enqueued_at REAL NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            finished_at REAL,
+            delivery TEXT,
+            lease_until REAL
+        );
+        CREATE INDEX IF NOT EXISTS queue_pending
+            ON queue(status, priority, enqueued_at);
+    """
+    
+    def __init__(
+        self,
+        db_path: Path | None = None,
+        aging_seconds: float = DEFAULT_AGING_SECONDS,
+        clock: Callable[[], float] = time.time,
+        timeout: float = 30.0,
+        lease_seconds: float = DEFAULT_LEASE_SECONDS
+    ):
+        """
+        Open (creating if needed) a queue database.
+        
+        Args:
+            db_path: SQLite database path.
+            aging_seconds: Seconds of waiting worth one priority level.
+            clock: Time source (Unix seconds).
+            timeout: Seconds to wait for another process's write lock.
+            lease_seconds: Seconds a claimed message stays reserved for
+                its sender before others may send it.
+        """
+        self.db_path = Path(db_path) if db_path else DEFAULT_QUEUE_PATH
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.aging_seconds = aging_seconds
+        self.lease_seconds = lease_seconds
+        self._clock = clock
+        
+        self.conn = sqlite3.connect(
+            self.db_path, timeout=timeout, isolation_level=None
+        )
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+        
+        # Queues created before delivery tracking and claims lack columns
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(queue)")}
+        if "delivery" not in columns:
+            self.conn.execute("ALTER TABLE queue ADD COLUMN delivery TEXT")
+        if "lease_until" not in columns:
+            self.conn.execute("ALTER TABLE queue ADD COLUMN lease_until REAL")
+    
+    @contextmanager
+    def _write_transaction(self) -> Iterator[None]:
+        """Hold the database write lock for a read-then-write."""
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+    
+    def enqueue(
+        self,
+        message: str,
+        channel: int = 0,
+        priority: str = "normal",
+        hop_limit: int | None = None
+    ) -> int:
+        """
+        Add a message to the queue, unless it is already waiting.
+        
+        Args:
+            message: Text to send.
+            channel: Channel index.
+            priority: high, normal or low.
+            hop_limit: Optional hop limit override.
+        
+        Returns:
+            Queue entry ID; the existing entry's if the same message is
+            already pending (or being sent) on the channel.
+        
+        Raises:
+            ValueError: If the priority is unknown.
+        """
+        if priority not in PRIORITY_RANKS:
+            raise ValueError(
+                f"Unknown priority: {priority} (expected one of {', '.join(PRIORITY_RANKS)})"
+            )
+        
+        with self._write_transaction():
+            row = self.conn.execute(
+                f"SELECT id FROM queue WHERE {UNFINISHED} AND channel = ? AND message = ? "
+                "ORDER BY id LIMIT 1",
+                (channel, message)
+            ).fetchone()
+            if row is not None:
+                return row[0]
+            
+            cursor = self.conn.execute(
+                "INSERT INTO queue (channel, priority, message, hop_limit, enqueued_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (channel, PRIORITY_RANKS[priority], message, hop_limit, self._clock())
+            )
+            return cursor.lastrowid
+    
+    @staticmethod
+    def _channel_clause(
+        channels: Collection[int] | None,
+        exclude_channels: Collection[int]
+    ) -> tuple[str, tuple]:
+        clause, params = "", ()
+        if channels is not None:
+            clause += f" AND channel IN ({', '.join('?' * len(channels))})"
+            params += tuple(channels)
+        if exclude_channels:
+            clause += f" AND channel NOT IN ({', '.join('?' * len(exclude_channels))})"
+            params += tuple(exclude_channels)
+        return clause, params
+    
+    def _next_query(
+        self,
+        channels: Collection[int] | None,
+        exclude_channels: Collection[int]
+    ) -> tuple[str, tuple]:
+        """Query selecting the ID of the next message to send."""
+        clause, params = self._channel_clause(channels, exclude_channels)
+        return (
+            "SELECT id FROM queue WHERE (status = 'pending' OR "
+            f"(status = 'sending' AND lease_until < ?)){clause} "
+            "ORDER BY priority * ? + enqueued_at, id LIMIT 1",
+            (self._clock(),) + params + (self.aging_seconds,)
+        )
+    
+    @staticmethod
+    def _item(row: tuple | None) -> QueueItem | None:
+        if row is None:
+            return None
+        ranks = {rank: name for name, rank in PRIORITY_RANKS.items()}
+        item_id, channel, rank, message, enqueued_at, hop_limit = row
+        return QueueItem(item_id, channel, ranks[rank], message, enqueued_at, hop_limit)
+    
+    def peek(
+        self,
+        channels: Collection[int] | None = None,
+        exclude_channels: Collection[int] = ()
+    ) -> QueueItem | None:
+        """
+        Get the message that should be sent next, without claiming it.
+        
+        Args:
+            channels: Only consider these channels (default: all).
+            exclude_channels: Ignore these channels.
+        
+        Returns:
+            QueueItem, or None if the queue is empty.
+        """
+        query, params = self._next_query(channels, exclude_channels)
+        return self._item(self.conn.execute(
+            "SELECT id, channel, priority, message, enqueued_at, hop_limit "
+            f"FROM queue WHERE id = ({query})",
+            params
+        ).fetchone())
+    
+    def claim(
+        self,
+        channels: Collection[int] | None = None,
+        exclude_channels: Collection[int] = ()
+    ) -> QueueItem | None:
+        """
+        Take the message that should be sent next, so no other drainer sends it.
+        
+        The message is leased for lease_seconds: pass it to complete()
+        once sent, or release() to give it back. If neither happens (the
+        sender crashed), it can be claimed again when the lease runs out.
+        
+        Args:
+            channels: Only consider these channels (default: all).
+            exclude_channels: Ignore these channels.
+        
+        Returns:
+            QueueItem, or None if no message is waiting.
+        """
+        with self._write_transaction():
+            query, params = self._next_query(channels, exclude_channels)
+            rows = self.conn.execute(
+                f"UPDATE queue SET status = 'sending', lease_until = ? WHERE id = ({query}) "
+                "RETURNING id, channel, priority, message, enqueued_at, hop_limit",
+                (self._clock() + self.lease_seconds,) + params
+            ).fetchall()
+        return self._item(rows[0] if rows else None)
+    
+    def release(self, item_id: int) -> None:
+        """Return a claimed message to the queue unsent."""
+        self.conn.execute(
+            "UPDATE queue SET status = 'pending', lease_until = NULL "
+            "WHERE id = ? AND status = 'sending'",
+            (item_id,)
+        )
+    
+    def complete(
+        self,
+        item_id: int,
+        sent: bool = True,
+        delivery: str | None = None
+    ) -> None:
+        """
+        Mark a claimed message as sent or failed.
+        
+        Args:
+            item_id: Queue entry ID.
+            sent: True if the message went out, False if it failed.
+            delivery: Delivery status from the client (sent, acked, nak,
+                failed).
+        """
+        self.conn.execute(
+            "UPDATE queue SET status = ?, finished_at = ?, delivery = ?, lease_until = NULL "
+            "WHERE id = ?",
+            ("sent" if sent else "failed", self._clock(), delivery, item_id)
+        )
+    
+    def status(self, item_id: int) -> str | None:
+        """Status of a queue entry (pending, sending, sent or failed), or None if unknown."""
+        row = self.conn.execute("SELECT status FROM queue WHERE id = ?", (item_id,)).fetchone()
+        return row[0] if row else None
+    
+    def depth(
+        self,
+        channels: Collection[int] | None = None,
+        exclude_channels: Collection[int] = ()
+    ) -> int:
+        """Number of messages not yet sent (on the given channels), in-flight ones included."""
+        clause, params = self._channel_clause(channels, exclude_channels)
+        (count,) = self.conn.execute(
+            f"SELECT COUNT(*) FROM queue WHERE {UNFINISHED}{clause}", params
+        ).fetchone()
+        return count
+    
+    def metrics(self) -> dict[str, Any]:
+        """
+        Report queue depth and wait times.
+        
+        Returns:
+            Dictionary with depth, depth_by_priority, oldest_wait (seconds
+            the oldest unsent message has waited), sending (messages
+            claimed by a sender), sent, failed, and avg_wait/max_wait per
+            priority over finished messages.
+        """
+        now = self._clock()
+        ranks = {rank: name for name, rank in PRIORITY_RANKS.items()}
+        
+        depth_by_priority = {name: 0 for name in PRIORITY_RANKS}
+        oldest = None
+        for rank, count, first in self.conn.execute(
+            "SELECT priority, COUNT(*), MIN(enqueued_at) FROM queue "
+            f"WHERE {UNFINISHED} GROUP BY priority"
+        ):
+            depth_by_priority[ranks[rank]] = count
+            oldest = first if oldest is None else min(oldest, first)
+        
+        wait_by_priority = {}
+        for rank, avg_wait, max_wait in self.conn.execute(
+            "SELECT priority, AVG(finished_at - enqueued_at), "
+            "MAX(finished_at - enqueued_at) FROM queue "
+            "WHERE status = 'sent' GROUP BY priority"
+        ):
+            wait_by_priority[ranks[rank]] = {"avg_wait": avg_wait, "max_wait": max_wait}
+        
+        totals = dict(self.conn.execute(
+            "SELECT status, COUNT(*) FROM queue GROUP BY status"
+        ).fetchall())
+        
+        return {
+            "depth": sum(depth_by_priority.values()),
+            "depth_by_priority": depth_by_priority,
+            "oldest_wait": now - oldest if oldest is not None else 0.0,
+            "sending": totals.get("sending", 0),
+            "sent": totals.get("sent", 0),
+            "failed": totals.get("failed", 0),
+            "wait_by_priority": wait_by_priority
+        }
+    
+    def drain(
+        self,
+        client: meshtastic_client.MeshtasticClient,
+        max_items: int | None = None,
+        verbose: bool = False,
+        want_ack: bool = False,
+        on_sent: Callable[[QueueItem], None] | None = None,
+        channels: Collection[int] | None = None,
+        exclude_channels: Collection[int] = ()
+    ) -> tuple[int, int]:
+        """
+        Send queued messages until the queue is empty.
+        
+        The queue is re-read before every message, so anything enqueued
+        meanwhile (by this or another process) is sent in priority order.
+        Each message is claimed first, so other drainers sharing the queue
+        never send it too.
+        
+        Args:
+            client: Connected Meshtastic client.
+            max_items: Stop after this many messages.
+            verbose: Print each message as it is sent.
+            want_ack: Only count messages the mesh acknowledged as sent.
+            on_sent: Called with each message that was sent.
+            channels: Only send these channels (default: all).
+            exclude_channels: Leave these channels queued.
+        
+        Returns:
+            Tuple of (messages sent, messages failed).
+        """
+        sent = failed = 0
+        
+        while max_items is None or sent + failed < max_items:
+            item = self.claim(channels, exclude_channels)
+            if item is None:
+                break
+            
+            if verbose:
+                print(f"  [{item.priority}] ch{item.channel} #{item.id}: {item.message[:60]}")
+            
+            try:
+                record = client.send_message(
+                    item.message, item.channel, item.hop_limit, want_ack
+                )
+            except BaseException:
+                self.release(item.id)
+                raise
+            self.complete(item.id, record.ok, record.status)
+            
+            if record.ok:
+                sent += 1
+                if on_sent:
+                    on_sent(item)
+            else:
+                failed += 1
+                print(
+                    f"Error: Queued message {item.id} {record.status}",
+                    file=sys.stderr
+                )
+        
+        return sent, failed
+    
+    def prune(self, older_than: float) -> int:
+        """
+        Delete finished messages older than a number of seconds.
+        
+        Returns:
+            Number of entries deleted.
+        """
+        cursor = self.conn.execute(
+            "DELETE FROM queue WHERE status IN ('sent', 'failed') AND finished_at < ?",
+            (self._clock() - older_than,)
+        )
+        return cursor.rowcount
+    
+    def close(self) -> None:
+        """Close the database connection."""
+        self.conn.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+
+def drain_radios(
+    clients: dict[meshtastic_client.RadioConfig, meshtastic_client.MeshtasticClient],
+    db_path: Path | None = None,
+    config: meshtastic_client.HardwareConfig | None = None,
+    verbose: bool = False,
+    want_ack: bool = False,
+    on_sent: Callable[[QueueItem], None] | None = None,
+    channels: Collection[int] | None = None
+) -> dict[str, tuple[int, int]]:
+    """
+    Drain the queue through several radios at once, one worker per radio.
+    
+    Each worker opens its own connection to the queue and sends only the
+    channels the hardware configuration maps to its radio (and, when
+    ``channels`` is given, only those of them).
+    
+    Args:
+        clients: Connected client per radio.
+        db_path: Queue database path.
+        config: Hardware configuration holding the channel mapping
+            (defaults to the cached one).
+        verbose: Print each message as it is sent.
+        want_ack: Only count messages the mesh acknowledged as sent.
+        on_sent: Called with each message that was sent; calls are
+            serialized, so it need not be thread-safe.
+        channels: Only send messages on these channels, leaving the rest
+            queued (None sends every channel).
+    
+    Returns:
+        (messages sent, messages failed) per radio name.
+    
+    Raises:
+        Exception: The first error raised by a worker, after all workers
+            have stopped.
+    """
+    config = config or meshtastic_client.get_hardware_config()
+    results: dict[str, tuple[int, int]] = {}
+    errors: list[BaseException] = []
+    lock = threading.Lock()
+    
+    def sent(item: QueueItem) -> None:
+        with lock:
+            on_sent(item)
+    
+    def worker(radio: meshtastic_client.RadioConfig, client) -> None:
+        radio_channels, exclude_channels = config.channel_filter(radio)
+        if channels is not None:
+            radio_channels = (
+                set(channels) if radio_channels is None else radio_channels & set(channels)
+            )
+        try:
+            with TransmitQueue(db_path) as queue:
+                results[radio.name] = queue.drain(
+                    client,
+                    verbose=verbose,
+                    want_ack=want_ack,
+                    on_sent=sent if on_sent else None,
+                    channels=radio_channels,
+                    exclude_channels=exclude_channels
+                )
+        except Exception as e:
+            errors.append(e)
+    
+    threads = [
+        threading.Thread(target=worker, args=(radio, client), name=f"tx-{radio.name}")
+        for radio, client in clients.items()
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    if errors:
+        raise errors[0]
+    return results
+
+
+def print_metrics(metrics: dict[str, Any]) -> None:
+    """Print queue metrics."""
+    by_priority = ", ".join(f"{n} {p}" for p, n in metrics["depth_by_priority"].items())
+    print(f"Queue depth: {metrics['depth']} ({by_priority})")
+    print(f"Oldest pending: {metrics['oldest_wait']:.0f}s")
+    print(f"Sending: {metrics['sending']}")
+    print(f"Sent: {metrics['sent']}, failed: {metrics['failed']}")
+    for priority, waits in metrics["wait_by_priority"].items():
+        print(
+            f"  {priority}: avg wait {waits['avg_wait']:.1f}s, "
+            f"max {waits['max_wait']:.1f}s"
+        )
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Persistent priority queue for Meshtastic transmissions"
+    )
+    parser.add_argument(
+        "--db",
+        type=Path,
+        default=DEFAULT_QUEUE_PATH,
+        help="Queue database path"
+    )
+    subparsers = parser.add_subparsers(dest="command", help="Command to run")
+    
+    enqueue_parser = subparsers.add_parser("enqueue", help="Queue a message")
+    enqueue_parser.add_argument("--channel", type=int, default=0, help="Channel index")
+    enqueue_parser.add_argument(
+        "--priority",
+        choices=list(PRIORITY_RANKS),
+        default="normal",
+        help="Message priority"
+    )
+    enqueue_parser.add_argument("--text", required=True, help="Message text")
+    enqueue_parser.add_argument("--hop-limit", type=int, default=None, help="Hop limit")
+    
+    drain_parser = subparsers.add_parser("drain", help="Send queued messages")
+    drain_parser.add_argument("--max", type=int, default=None, help="Maximum messages to send")
+    drain_parser.add_argument(
+        "--want-ack",
+        action="store_true",
+        help="Request acknowledgements and count only acked messages as sent"
+    )
+    drain_parser.add_argument("--verbose", "-v", action="store_true", help="Verbose output")
+    
+    subparsers.add_parser("stats", help="Show queue depth and wait times")
+    
+    args = parser.parse_args()
+    
+    if not args.command:
+        parser.print_help()
+        return 1
+    
+    with TransmitQueue(args.db) as queue:
+        if args.command == "enqueue":
+            item_id = queue.enqueue(args.text, args.channel, args.priority, args.hop_limit)
+            print(f"Queued message {item_id} ({args.priority}, depth {queue.depth()})")
+            return 0
+        
+        if args.command == "stats":
+            print_metrics(queue.metrics())
+            return 0
+        
+        # Channel presets are unknown here; pace everything as LongFast
+        client = meshtastic_client.create_client(
+            scheduler=meshtastic_client.create_scheduler({})
+        )
+        if not client.connect():
+            print("Error: Failed to connect to Meshtastic device", file=sys.stderr)
+            return 1
+        
+        try:
+            sent, failed = queue.drain(client, args.max, args.verbose, args.want_ack)
+        finally:
+            client.disconnect()
+        
+        print(f"Sent {sent} message(s), {failed} failed.")
+        return 0 if failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,13 +2,67 @@
 Pytest configuration for the PR-CYBR Meshtastic BBS test suite.
 
 This file automatically adds the scripts directory to the Python path
-so that test modules can import scripts without sys.path manipulation.
+so that test modules can import scripts without sys.path manipulation,
+and holds the fakes shared by the transmit tests.
 """
 
 import sys
 from pathlib import Path
 
+import pytest
+
 # Add scripts directory to path for imports
 scripts_dir = Path(__file__).parent.parent / "scripts"
 if str(scripts_dir) not in sys.path:
     sys.path.insert(0, str(scripts_dir))
+
+
+class FakeClock:
+    """Settable Unix clock."""
+    
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+    
+    def __call__(self):
+        return self.now
+
+
+class FakeRecord:
+    """Minimal stand-in for a DeliveryRecord."""
+    
+    def __init__(self, ok):
+        self.ok = ok
+        self.status = "sent" if ok else "failed"
+
+
+class FakeClient:
+    """
+    Stand-in for MeshtasticClient that records sent messages.
+    
+    Args:
+        after_send: Called with the number of messages sent after each send.
+        fail: Messages whose delivery fails.
+        crash_after: Raise after this many sends, like a dropped serial link.
+    """
+    
+    def __init__(self, after_send=None, fail=(), crash_after=None):
+        self.sent = []
+        self.after_send = after_send
+        self.fail = set(fail)
+        self.crash_after = crash_after
+    
+    def send_message(self, message, channel_index=0, hop_limit=None, want_ack=False):
+        if self.crash_after is not None and len(self.sent) >= self.crash_after:
+            raise OSError("serial link dropped")
+        self.sent.append(message)
+        if self.after_send:
+            self.after_send(len(self.sent))
+        return FakeRecord(message not in self.fail)
+    
+    def send_text(self, message, channel_index=0, hop_limit=None, want_ack=False):
+        return self.send_message(message, channel_index, hop_limit, want_ack).ok
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
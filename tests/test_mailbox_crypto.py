@@ -172,3 +172,73 @@ class TestUtilityFunctions:
         nonces = [mailbox_crypto.generate_nonce() for _ in range(10)]
         unique_nonces = set(nonces)
         assert len(unique_nonces) == 10
+
+
+class TestKeyCache:
+    """Tests for the derived-key cache."""
+    
+    def test_cache_hit_returns_same_key(self):
+        """Second lookup should hit the cache and return the same key."""
+        cache = mailbox_crypto.KeyCache()
+        salt = mailbox_crypto.generate_salt()
+        key = mailbox_crypto.derive_key_from_passphrase("passphrase", salt)
+        
+        assert cache.get("passphrase", salt) is None
+        cache.put("passphrase", salt, key)
+        
+        assert cache.get("passphrase", salt) == key
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+    
+    def test_cache_keyed_on_passphrase(self):
+        """A different passphrase should not hit another passphrase's entry."""
+        cache = mailbox_crypto.KeyCache()
+        salt = mailbox_crypto.generate_salt()
+        cache.put("passphrase", salt, b"k" * 32)
+        
+        assert cache.get("other-passphrase", salt) is None
+    
+    def test_ttl_expiry(self):
+        """Entries older than the TTL should be treated as misses."""
+        now = [0.0]
+        cache = mailbox_crypto.KeyCache(ttl=10, clock=lambda: now[0])
+        salt = mailbox_crypto.generate_salt()
+        cache.put("passphrase", salt, b"k" * 32)
+        
+        now[0] = 11.0
+        
+        assert cache.get("passphrase", salt) is None
+        assert len(cache) == 0
+    
+    def test_lru_eviction_zeroizes(self):
+        """Least recently used entry should be evicted and wiped."""
+        cache = mailbox_crypto.KeyCache(max_entries=2)
+        salts = [mailbox_crypto.generate_salt() for _ in range(3)]
+        
+        cache.put("pw", salts[0], b"a" * 32)
+        cache.put("pw", salts[1], b"b" * 32)
+        buffer = cache._entries[cache.make_key("pw", salts[0])][0]
+        
+        cache.get("pw", salts[1])
+        cache.put("pw", salts[2], b"c" * 32)
+        
+        assert cache.get("pw", salts[0]) is None
+        assert cache.get("pw", salts[1]) == b"b" * 32
+        assert buffer == bytearray(32)
+        assert cache.stats()["evictions"] == 1
+    
+    def test_decrypt_uses_cached_key(self):
+        """Decrypting a freshly encrypted message should not re-derive."""
+        mailbox_crypto.get_key_cache().clear()
+        encrypted = mailbox_crypto.encrypt_message("passphrase", "cached")
+        before = mailbox_crypto.get_key_cache().stats()["hits"]
+        
+        decrypted = mailbox_crypto.decrypt_message(
+            "passphrase",
+            encrypted.salt,
+            encrypted.nonce,
+            encrypted.ciphertext
+        )
+        
+        assert decrypted == "cached"
+        assert mailbox_crypto.get_key_cache().stats()["hits"] == before + 1
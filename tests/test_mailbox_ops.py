@@ -5,13 +5,49 @@ Tests mailbox file operations including add, read, and delete.
 """
 
 import json
+import multiprocessing
 import pytest
 import tempfile
+import time
+from datetime import datetime, timezone
 from pathlib import Path
 
+import mailbox_crypto
 import mailbox_ops
 
 
+def write_v1_mailbox(mailbox_path: Path, passphrase: str, bodies: list[str]) -> None:
+    """Write a version 1 (per-message salt) mailbox for compatibility tests."""
+    mailbox = mailbox_ops.create_empty_mailbox(passphrase)
+    mailbox["version"] = 1
+    del mailbox["check"]
+    
+    for i, body in enumerate(bodies):
+        encrypted = mailbox_crypto.encrypt_to_base64(passphrase, body)
+        mailbox["mail"].append({
+            "id": f"msg-{i}",
+            "enc_body": encrypted["enc_body"],
+            "iv": encrypted["iv"],
+            "salt": encrypted["salt"],
+            "sent_at": "2024-01-01T00:00:00+00:00",
+            "from": "sender",
+            "metadata": {"priority": "normal"}
+        })
+    
+    mailbox_ops.save_mailbox(mailbox_path, mailbox)
+
+
+def hammer_mailbox(backend: str, location: str, worker: int, count: int) -> None:
+    """Append messages from a separate process (concurrency test helper)."""
+    with mailbox_ops.open_store(backend, Path(location)) as store:
+        for i in range(count):
+            store.append_message(
+                "shared",
+                {"body": f"worker {worker} message {i}", "from": f"worker-{worker}"},
+                "password"
+            )
+
+
 class TestMailboxOperations:
     """Tests for mailbox file operations."""
     
@@ -19,7 +55,7 @@ class TestMailboxOperations:
         """Test creating an empty mailbox structure."""
         mailbox = mailbox_ops.create_empty_mailbox("passphrase")
         
-        assert mailbox["version"] == 1
+        assert mailbox["version"] == mailbox_ops.MAILBOX_VERSION
         assert mailbox["cipher"] == "aes-256-gcm"
         assert "kdf" in mailbox
         assert "salt" in mailbox
@@ -69,6 +105,22 @@ class TestMailboxOperations:
             assert messages[0]["from"] == "sender_node"
             assert messages[0]["id"] == msg_id
     
+    @pytest.mark.parametrize("name", ["alice.v2.json", "bob.mbox"])
+    def test_path_functions_use_exact_path(self, tmp_path, name):
+        """Path-based functions should work on the caller's file, whatever its name."""
+        mailbox_path = tmp_path / name
+        
+        msg_id = mailbox_ops.append_encrypted_message(
+            mailbox_path, {"body": "hi", "from": "node"}, "pw"
+        )
+        
+        assert [p.name for p in tmp_path.iterdir() if not p.name.startswith(".")] == [name]
+        assert mailbox_ops.decrypt_mailbox(mailbox_path, "pw")[0]["id"] == msg_id
+        assert mailbox_ops.mark_messages_read(mailbox_path, [msg_id]) == 1
+        assert mailbox_ops.get_mailbox_info(mailbox_path)["unread_count"] == 0
+        assert mailbox_ops.delete_message(mailbox_path, msg_id, "pw")
+        assert mailbox_ops.decrypt_mailbox(mailbox_path, "pw") == []
+    
     def test_append_multiple_messages(self):
         """Test adding multiple messages."""
         with tempfile.TemporaryDirectory() as tmpdir:
@@ -119,7 +171,7 @@ class TestMailboxOperations:
             
             info = mailbox_ops.get_mailbox_info(mailbox_path)
             
-            assert info["version"] == 1
+            assert info["version"] == mailbox_ops.MAILBOX_VERSION
             assert info["message_count"] == 5
             assert info["cipher"] == "aes-256-gcm"
     
@@ -209,3 +261,670 @@ class TestMailboxOperations:
             
             assert messages[0]["metadata"]["priority"] == "urgent"
             assert messages[0]["metadata"]["ttl"] == 3600
+
+
+class TestKeyHierarchy:
+    """Tests for the version 2 mailbox key hierarchy."""
+    
+    def test_records_use_wrapped_data_keys(self):
+        """Version 2 records should carry a wrapped key, not a salt."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            mailbox_path = Path(tmpdir) / "test_user.json"
+            
+            mailbox_ops.append_encrypted_message(
+                mailbox_path,
+                {"body": "Test", "from": "sender"},
+                "password"
+            )
+            
+            record = mailbox_ops.load_mailbox(mailbox_path)["mail"][0]
+            assert "wrapped_key" in record
+            assert "wrap_iv" in record
+            assert "salt" not in record
+    
+    def test_single_kdf_run_per_mailbox(self, monkeypatch):
+        """Appending and reading many messages should run the KDF once."""
+        calls = []
+        real_derive = mailbox_crypto.derive_key_from_passphrase
+        
+        def counting_derive(passphrase, salt):
+            calls.append(salt)
+            return real_derive(passphrase, salt)
+        
+        monkeypatch.setattr(
+            mailbox_crypto, "derive_key_from_passphrase", counting_derive
+        )
+        mailbox_crypto.get_key_cache().clear()
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            mailbox_path = Path(tmpdir) / "test_user.json"
+            
+            for i in range(5):
+                mailbox_ops.append_encrypted_message(
+                    mailbox_path,
+                    {"body": f"Message {i}", "from": "sender"},
+                    "password"
+                )
+            
+            messages = mailbox_ops.decrypt_mailbox(mailbox_path, "password")
+        
+        assert len(messages) == 5
+        assert len(calls) == 1
+    
+    def test_swapped_record_body_fails(self):
+        """Bodies are bound to their message ID."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            mailbox_path = Path(tmpdir) / "test_user.json"
+            
+            for i in range(2):
+                mailbox_ops.append_encrypted_message(
+                    mailbox_path,
+                    {"body": f"Message {i}", "from": "sender"},
+                    "password"
+                )
+            
+            mailbox = mailbox_ops.load_mailbox(mailbox_path)
+            mailbox["mail"][0]["id"], mailbox["mail"][1]["id"] = (
+                mailbox["mail"][1]["id"], mailbox["mail"][0]["id"]
+            )
+            mailbox_ops.save_mailbox(mailbox_path, mailbox)
+            
+            with pytest.raises(ValueError):
+                mailbox_ops.decrypt_mailbox(mailbox_path, "password")
+    
+    def test_migrate_version_1_mailbox(self):
+        """Version 1 mailboxes should migrate with content preserved."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            mailbox_path = Path(tmpdir) / "test_user.json"
+            
+            write_v1_mailbox(
+                mailbox_path, "password", [f"Message {i}" for i in range(3)]
+            )
+            
+            # Version 1 mailboxes remain readable before migration
+            before = mailbox_ops.decrypt_mailbox(mailbox_path, "password")
+            
+            migrated = mailbox_ops.migrate_mailbox(mailbox_path, "password")
+            
+            assert migrated == 3
+            upgraded = mailbox_ops.load_mailbox(mailbox_path)
+            assert upgraded["version"] == mailbox_ops.MAILBOX_VERSION
+            assert all("salt" not in m for m in upgraded["mail"])
+            assert mailbox_ops.decrypt_mailbox(mailbox_path, "password") == before
+            assert mailbox_ops.migrate_mailbox(mailbox_path, "password") == 0
+    
+    def test_migrate_wrong_passphrase_leaves_file(self):
+        """A failed migration should not modify the mailbox."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            mailbox_path = Path(tmpdir) / "test_user.json"
+            
+            write_v1_mailbox(mailbox_path, "password", ["Secret"])
+            original = mailbox_path.read_text()
+            
+            with pytest.raises(ValueError):
+                mailbox_ops.migrate_mailbox(mailbox_path, "wrong-password")
+            
+            assert mailbox_path.read_text() == original
+
+
+class TestParallelDecryption:
+    """Tests for process-pool decryption of version 1 mailboxes."""
+    
+    def test_parallel_matches_serial(self):
+        """Parallel decryption should return the same messages in order."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            mailbox_path = Path(tmpdir) / "test_user.json"
+            write_v1_mailbox(
+                mailbox_path, "password", [f"Message {i}" for i in range(4)]
+            )
+            
+            serial = mailbox_ops.decrypt_mailbox(mailbox_path, "password")
+            parallel = mailbox_ops.decrypt_mailbox(
+                mailbox_path, "password", workers=2
+            )
+            
+            assert parallel == serial
+            assert [m["body"] for m in parallel] == [f"Message {i}" for i in range(4)]
+    
+    def test_parallel_reports_failing_message(self):
+        """The first failing message should be named in the error."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            mailbox_path = Path(tmpdir) / "test_user.json"
+            write_v1_mailbox(mailbox_path, "password", ["A", "B", "C"])
+            
+            mailbox = mailbox_ops.load_mailbox(mailbox_path)
+            mailbox["mail"][1]["enc_body"] = mailbox["mail"][0]["enc_body"]
+            mailbox_ops.save_mailbox(mailbox_path, mailbox)
+            
+            with pytest.raises(ValueError, match="msg-1"):
+                mailbox_ops.decrypt_mailbox(mailbox_path, "password", workers=2)
+    
+    def test_workers_capped_by_memory_budget(self):
+        """Worker count should respect the KDF memory budget."""
+        kdf_memory = mailbox_crypto.get_kdf_memory_bytes()
+        if not kdf_memory:
+            pytest.skip("KDF has no fixed memory cost")
+        
+        assert mailbox_ops.get_decrypt_workers(8, 100, kdf_memory * 3) == 3
+        assert mailbox_ops.get_decrypt_workers(8, 2, kdf_memory * 3) == 2
+        assert mailbox_ops.get_decrypt_workers(8, 100, 0) == 1
+
+
+class TestJournalStorage:
+    """Tests for append-only journal mailbox files."""
+    
+    def test_append_does_not_rewrite_file(self):
+        """Appending should only add bytes to the end of the journal."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            mailbox_path = Path(tmpdir) / "test_user.json"
+            
+            mailbox_ops.append_encrypted_message(
+                mailbox_path, {"body": "First", "from": "sender"}, "password"
+            )
+            before = mailbox_path.read_text()
+            
+            mailbox_ops.append_encrypted_message(
+                mailbox_path, {"body": "Second", "from": "sender"}, "password"
+            )
+            after = mailbox_path.read_text()
+            
+            assert after.startswith(before)
+            assert len(after.splitlines()) == 3
+    
+    def test_delete_appends_tombstone(self):
+        """Deleting should append a tombstone entry."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            mailbox_path = Path(tmpdir) / "test_user.json"
+            
+            msg_id = mailbox_ops.append_encrypted_message(
+                mailbox_path, {"body": "Test", "from": "sender"}, "password"
+            )
+            mailbox_ops.append_encrypted_message(
+                mailbox_path, {"body": "Keep", "from": "sender"}, "password"
+            )
+            
+            assert mailbox_ops.delete_message(mailbox_path, msg_id, "password")
+            
+            last = json.loads(mailbox_path.read_text().splitlines()[-1])
+            assert last == {"op": "del", "id": msg_id}
+            remaining = mailbox_ops.load_mailbox(mailbox_path)["mail"]
+            assert [m["id"] for m in remaining if m["id"] == msg_id] == []
+            assert len(remaining) == 1
+    
+    def test_torn_final_line_ignored(self):
+        """A partially written final entry should not break loading."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            mailbox_path = Path(tmpdir) / "test_user.json"
+            
+            mailbox_ops.append_encrypted_message(
+                mailbox_path, {"body": "Test", "from": "sender"}, "password"
+            )
+            with open(mailbox_path, "a") as f:
+                f.write('{"op":"add","mail":{"id":"torn"')
+            
+            messages = mailbox_ops.decrypt_mailbox(mailbox_path, "password")
+            assert [m["body"] for m in messages] == ["Test"]
+    
+    def test_legacy_document_converted_on_append(self):
+        """Single-document mailboxes should be readable and converted."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            mailbox_path = Path(tmpdir) / "test_user.json"
+            
+            mailbox_ops.append_encrypted_message(
+                mailbox_path, {"body": "Old", "from": "sender"}, "password"
+            )
+            legacy = mailbox_ops.load_mailbox(mailbox_path)
+            mailbox_path.write_text(json.dumps(legacy, indent=2))
+            
+            assert mailbox_ops.read_mailbox_header(mailbox_path) is None
+            assert len(mailbox_ops.load_mailbox(mailbox_path)["mail"]) == 1
+            
+            mailbox_ops.append_encrypted_message(
+                mailbox_path, {"body": "New", "from": "sender"}, "password"
+            )
+            
+            assert mailbox_ops.read_mailbox_header(mailbox_path) is not None
+            messages = mailbox_ops.decrypt_mailbox(mailbox_path, "password")
+            assert [m["body"] for m in messages] == ["Old", "New"]
+    
+    def test_compaction_reclaims_tombstones(self):
+        """Compaction should drop deleted entries and tombstones."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            mailbox_path = Path(tmpdir) / "test_user.json"
+            
+            msg_ids = [
+                mailbox_ops.append_encrypted_message(
+                    mailbox_path, {"body": f"Message {i}", "from": "sender"}, "password"
+                )
+                for i in range(3)
+            ]
+            mailbox_ops.append_journal_entry(
+                mailbox_path, {"op": "del", "id": msg_ids[0]}
+            )
+            
+            reclaimed = mailbox_ops.compact_mailbox(mailbox_path)
+            
+            assert reclaimed > 0
+            assert len(mailbox_path.read_text().splitlines()) == 3
+            messages = mailbox_ops.decrypt_mailbox(mailbox_path, "password")
+            assert [m["body"] for m in messages] == ["Message 1", "Message 2"]
+
+
+class TestStorageBackends:
+    """Tests for the pluggable mailbox storage backends."""
+    
+    @pytest.fixture(params=["json", "sqlite"])
+    def store(self, request, tmp_path):
+        """Open each backend in a temporary location."""
+        if request.param == "json":
+            location = tmp_path / "mailboxes"
+        else:
+            location = tmp_path / "mailboxes.db"
+        store = mailbox_ops.open_store(request.param, location)
+        yield store
+        store.close()
+    
+    def test_append_and_decrypt(self, store):
+        """Messages should round-trip through every backend."""
+        for i in range(3):
+            store.append_message("alice", {"body": f"Message {i}", "from": "bob"}, "password")
+        
+        messages = store.decrypt("alice", "password")
+        
+        assert [m["body"] for m in messages] == ["Message 0", "Message 1", "Message 2"]
+        assert store.info("alice")["message_count"] == 3
+    
+    def test_list_and_delete(self, store):
+        """Listing and deleting should behave the same on every backend."""
+        msg_id = store.append_message("bob", {"body": "A", "from": "x"}, "password")
+        store.append_message("alice", {"body": "B", "from": "x"}, "password")
+        
+        assert store.list_recipients() == ["alice", "bob"]
+        assert store.delete_message("bob", msg_id, "password")
+        assert not store.delete_message("bob", msg_id, "password")
+        assert store.decrypt("bob", "password") == []
+        assert store.info("missing") is None
+    
+    def test_sqlite_uses_wal(self, tmp_path):
+        """The SQLite backend should run in WAL mode."""
+        with mailbox_ops.open_store("sqlite", tmp_path / "m.db") as store:
+            (mode,) = store.conn.execute("PRAGMA journal_mode").fetchone()
+        
+        assert mode == "wal"
+    
+    def test_unknown_backend_raises(self):
+        """Unknown backend names should be rejected."""
+        with pytest.raises(ValueError, match="Unknown mailbox backend"):
+            mailbox_ops.open_store("redis")
+    
+    def test_copy_between_backends(self, tmp_path):
+        """Mailboxes should copy between backends without passphrases."""
+        with mailbox_ops.open_store("json", tmp_path / "json") as source, \
+                mailbox_ops.open_store("sqlite", tmp_path / "m.db") as sqlite_store:
+            source.append_message("alice", {"body": "Hello", "from": "bob"}, "password")
+            source.append_message("carol", {"body": "Hi", "from": "bob"}, "other")
+            
+            assert mailbox_ops.copy_mailboxes(source, sqlite_store) == 2
+            assert sqlite_store.decrypt("alice", "password")[0]["body"] == "Hello"
+            
+            round_trip = mailbox_ops.open_store("json", tmp_path / "json2")
+            assert mailbox_ops.copy_mailboxes(sqlite_store, round_trip, ["carol"]) == 1
+            assert round_trip.list_recipients() == ["carol"]
+            assert round_trip.decrypt("carol", "other")[0]["body"] == "Hi"
+
+
+class TestMailboxIndex:
+    """Tests for header-only mailbox info."""
+    
+    def test_info_without_parsing_records(self, tmp_path, monkeypatch):
+        """Info should come from the sidecar index alone."""
+        mailbox_path = tmp_path / "user.json"
+        for i in range(3):
+            mailbox_ops.append_encrypted_message(
+                mailbox_path, {"body": f"Message {i}", "from": "sender"}, "password"
+            )
+        mailbox_ops.mark_messages_read(
+            mailbox_path,
+            [m["id"] for m in mailbox_ops.iter_mailbox(mailbox_path, "password", limit=1)]
+        )
+        
+        def fail(*args):
+            raise AssertionError("mailbox records were parsed")
+        monkeypatch.setattr(mailbox_ops, "load_mailbox", fail)
+        
+        info = mailbox_ops.get_mailbox_info(mailbox_path)
+        assert info["message_count"] == 3
+        assert info["unread_count"] == 2
+        assert info["bytes"] == mailbox_path.stat().st_size
+        assert info["last_sent_at"] is not None
+    
+    def test_stale_index_is_rebuilt(self, tmp_path):
+        """An index that no longer matches the journal should be rebuilt."""
+        mailbox_path = tmp_path / "user.json"
+        for i in range(2):
+            mailbox_ops.append_encrypted_message(
+                mailbox_path, {"body": f"Message {i}", "from": "sender"}, "password"
+            )
+        
+        # Simulate a crash between the journal append and the index update
+        index_path = mailbox_ops.get_index_path(mailbox_path)
+        stale = index_path.read_text()
+        mailbox_ops.append_encrypted_message(
+            mailbox_path, {"body": "Message 2", "from": "sender"}, "password"
+        )
+        index_path.write_text(stale)
+        
+        assert mailbox_ops.get_mailbox_info(mailbox_path)["message_count"] == 3
+        
+        index_path.unlink()
+        assert mailbox_ops.get_mailbox_info(mailbox_path)["message_count"] == 3
+    
+    @pytest.mark.parametrize("backend", ["json", "sqlite"])
+    def test_list_info(self, tmp_path, backend):
+        """Listing should report per-mailbox statistics on every backend."""
+        store = mailbox_ops.open_store(backend, tmp_path / "mailboxes.db")
+        store.append_message("alice", {
+            "body": "Hi", "from": "bob", "sent_at": "2026-01-01T00:00:00+00:00"
+        }, "password")
+        store.append_message("alice", {
+            "body": "Hi again", "from": "bob", "sent_at": "2026-01-02T00:00:00+00:00"
+        }, "password")
+        store.append_message("carol", {"body": "Hey", "from": "bob"}, "password")
+        store.delete_message("carol", store.decrypt("carol", "password")[0]["id"], "password")
+        
+        listing = store.list_info()
+        
+        assert list(listing) == ["alice", "carol"]
+        assert listing["alice"]["message_count"] == 2
+        assert listing["alice"]["unread_count"] == 2
+        assert listing["alice"]["last_sent_at"] == "2026-01-02T00:00:00+00:00"
+        assert listing["carol"]["message_count"] == 0
+        assert listing["carol"]["last_sent_at"] is None
+        store.close()
+
+
+class TestMessageExpiry:
+    """Tests for TTL expiry and incremental compaction."""
+    
+    @pytest.fixture(params=["json", "sqlite"])
+    def store(self, request, tmp_path):
+        """Open each backend with one expiring and one permanent message."""
+        if request.param == "json":
+            location = tmp_path / "mailboxes"
+        else:
+            location = tmp_path / "mailboxes.db"
+        store = mailbox_ops.open_store(request.param, location)
+        for rid in ["alice", "bob", "carol"]:
+            store.append_message(rid, {
+                "body": "Expires", "from": "sender",
+                "sent_at": "2026-01-01T00:00:00+00:00",
+                "metadata": {"ttl": 3600}
+            }, "password")
+            store.append_message(rid, {
+                "body": "Keeps", "from": "sender",
+                "sent_at": "2026-01-01T00:00:00+00:00",
+                "metadata": {"ttl": 0}
+            }, "password")
+        yield store
+        store.close()
+    
+    def test_is_expired(self):
+        """Messages expire ttl seconds after sent_at; no ttl never expires."""
+        record = {"sent_at": "2026-01-01T00:00:00+00:00", "metadata": {"ttl": 60}}
+        
+        assert not mailbox_ops.is_expired(record, datetime(2026, 1, 1, 0, 0, 59, tzinfo=timezone.utc))
+        assert mailbox_ops.is_expired(record, datetime(2026, 1, 1, 0, 1, tzinfo=timezone.utc))
+        assert not mailbox_ops.is_expired({"sent_at": "2020-01-01T00:00:00+00:00"})
+    
+    def test_compact_drops_expired(self, store):
+        """Compaction should drop expired messages without a passphrase."""
+        before_expiry = datetime(2026, 1, 1, 0, 30, tzinfo=timezone.utc)
+        assert store.compact("alice", expire=True, now=before_expiry) == 0
+        
+        reclaimed = store.compact("alice", expire=True, now=datetime(2026, 1, 2, tzinfo=timezone.utc))
+        
+        assert reclaimed > 0
+        assert [m["body"] for m in store.decrypt("alice", "password")] == ["Keeps"]
+        assert store.info("alice")["message_count"] == 1
+    
+    def test_compact_all_resumes(self, store):
+        """A budgeted run should stop early and the next one resume."""
+        now = datetime(2026, 1, 2, tzinfo=timezone.utc)
+        
+        first = mailbox_ops.compact_all(store, time_budget=0, now=now)
+        assert first["processed"] == 1
+        assert first["remaining"] == 2
+        assert first["expired"] == 1
+        
+        second = mailbox_ops.compact_all(store, now=now)
+        assert second["processed"] == 3
+        assert second["expired"] == 2
+        
+        assert all(info["message_count"] == 1 for info in store.list_info().values())
+
+
+class TestConcurrentWrites:
+    """Tests for locked, atomic mailbox writes."""
+    
+    @pytest.mark.parametrize("backend", ["json", "sqlite"])
+    def test_many_processes_lose_no_messages(self, backend, tmp_path):
+        """Concurrent writers from many processes should not lose messages."""
+        location = tmp_path / ("mailboxes" if backend == "json" else "m.db")
+        workers, per_worker = 6, 15
+        
+        # Create the mailbox first so every writer shares one salt
+        with mailbox_ops.open_store(backend, location) as store:
+            store.append_message("shared", {"body": "seed", "from": "setup"}, "password")
+        
+        started = time.monotonic()
+        processes = [
+            multiprocessing.Process(
+                target=hammer_mailbox,
+                args=(backend, str(location), w, per_worker)
+            )
+            for w in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(timeout=120)
+            assert process.exitcode == 0
+        elapsed = time.monotonic() - started
+        
+        with mailbox_ops.open_store(backend, location) as store:
+            messages = store.decrypt("shared", "password")
+        
+        bodies = {m["body"] for m in messages}
+        assert len(messages) == workers * per_worker + 1
+        assert len(bodies) == len(messages)
+        print(f"{backend}: {workers * per_worker / elapsed:.1f} appends/s")
+    
+    def test_save_is_atomic_replace(self, tmp_path):
+        """Saving should replace the file without leaving temp files."""
+        mailbox_path = tmp_path / "test_user.json"
+        mailbox_ops.append_encrypted_message(
+            mailbox_path, {"body": "Test", "from": "sender"}, "password"
+        )
+        inode_before = mailbox_path.stat().st_ino
+        
+        mailbox_ops.compact_mailbox(mailbox_path)
+        
+        assert mailbox_path.stat().st_ino != inode_before
+        assert [p.name for p in tmp_path.iterdir() if p.suffix == ".tmp"] == []
+        assert len(mailbox_ops.load_mailbox(mailbox_path)["mail"]) == 1
+    
+    def test_lock_is_reentrant(self, tmp_path):
+        """Nested locking in one thread should not deadlock."""
+        mailbox_path = tmp_path / "test_user.json"
+        
+        with mailbox_ops.mailbox_lock(mailbox_path):
+            with mailbox_ops.mailbox_lock(mailbox_path):
+                pass
+            
+            assert mailbox_ops.get_lock_path(mailbox_path).exists()
+
+
+class TestPassphraseVerifier:
+    """Tests for the stored key-check value."""
+    
+    def test_verify_passphrase(self, tmp_path):
+        """Correct and incorrect passphrases should be told apart."""
+        mailbox_path = tmp_path / "test_user.json"
+        mailbox_ops.append_encrypted_message(
+            mailbox_path, {"body": "Test", "from": "sender"}, "password"
+        )
+        
+        assert mailbox_ops.verify_passphrase(mailbox_path, "password")
+        assert not mailbox_ops.verify_passphrase(mailbox_path, "wrong")
+    
+    def test_verify_costs_one_kdf_run(self, tmp_path, monkeypatch):
+        """Verification should not decrypt messages and should be cached."""
+        mailbox_path = tmp_path / "test_user.json"
+        mailbox_ops.append_encrypted_message(
+            mailbox_path, {"body": "Test", "from": "sender"}, "password"
+        )
+        mailbox_crypto.get_key_cache().clear()
+        
+        calls = []
+        real_derive = mailbox_crypto.derive_key_from_passphrase
+        monkeypatch.setattr(
+            mailbox_crypto,
+            "derive_key_from_passphrase",
+            lambda p, s: calls.append(s) or real_derive(p, s)
+        )
+        monkeypatch.setattr(
+            mailbox_ops,
+            "decrypt_mail_record",
+            lambda *args, **kwargs: pytest.fail("message was decrypted")
+        )
+        
+        for _ in range(3):
+            assert mailbox_ops.verify_passphrase(mailbox_path, "password")
+        
+        assert len(calls) == 1
+    
+    def test_empty_mailbox_rejects_wrong_passphrase(self, tmp_path):
+        """An empty mailbox should still reject the wrong passphrase."""
+        mailbox_path = tmp_path / "test_user.json"
+        msg_id = mailbox_ops.append_encrypted_message(
+            mailbox_path, {"body": "Test", "from": "sender"}, "password"
+        )
+        mailbox_ops.delete_message(mailbox_path, msg_id, "password")
+        
+        with pytest.raises(ValueError, match="Incorrect passphrase"):
+            mailbox_ops.delete_message(mailbox_path, "any-id", "wrong")
+        with pytest.raises(ValueError, match="Incorrect passphrase"):
+            mailbox_ops.decrypt_mailbox(mailbox_path, "wrong")
+    
+    def test_append_rejects_wrong_passphrase(self, tmp_path):
+        """Appending with the wrong passphrase should be refused."""
+        mailbox_path = tmp_path / "test_user.json"
+        mailbox_ops.append_encrypted_message(
+            mailbox_path, {"body": "Test", "from": "sender"}, "password"
+        )
+        
+        with pytest.raises(ValueError, match="Incorrect passphrase"):
+            mailbox_ops.append_encrypted_message(
+                mailbox_path, {"body": "Other", "from": "sender"}, "wrong"
+            )
+    
+    def test_migrate_adds_key_check(self, tmp_path):
+        """Mailboxes without a key-check value should gain one on migrate."""
+        mailbox_path = tmp_path / "test_user.json"
+        mailbox_ops.append_encrypted_message(
+            mailbox_path, {"body": "Test", "from": "sender"}, "password"
+        )
+        mailbox = mailbox_ops.load_mailbox(mailbox_path)
+        del mailbox["check"]
+        mailbox_ops.save_mailbox(mailbox_path, mailbox)
+        
+        with pytest.raises(ValueError, match="Incorrect passphrase"):
+            mailbox_ops.migrate_mailbox(mailbox_path, "wrong")
+        
+        assert mailbox_ops.migrate_mailbox(mailbox_path, "password") == 0
+        assert "check" in mailbox_ops.load_mailbox(mailbox_path)
+        assert not mailbox_ops.verify_passphrase(mailbox_path, "wrong")
+
+
+class TestPagedReading:
+    """Tests for lazy, filtered mailbox reading."""
+    
+    @pytest.fixture(params=["json", "sqlite"])
+    def store(self, request, tmp_path):
+        """Open each backend with five messages sent a day apart."""
+        if request.param == "json":
+            location = tmp_path / "mailboxes"
+        else:
+            location = tmp_path / "mailboxes.db"
+        store = mailbox_ops.open_store(request.param, location)
+        for day in range(1, 6):
+            store.append_message("user", {
+                "body": f"Message {day}",
+                "from": "sender",
+                "sent_at": f"2026-01-0{day}T12:00:00+00:00"
+            }, "password")
+        yield store
+        store.close()
+    
+    def test_limit_and_order(self, store):
+        """Limit should page from either end of the mailbox."""
+        oldest = store.iter_messages("user", "password", limit=2)
+        newest = store.iter_messages("user", "password", limit=2, newest_first=True)
+        
+        assert [m["body"] for m in oldest] == ["Message 1", "Message 2"]
+        assert [m["body"] for m in newest] == ["Message 5", "Message 4"]
+    
+    def test_since(self, store):
+        """Since should accept ISO strings and datetimes."""
+        bodies = [
+            m["body"] for m in
+            store.iter_messages("user", "password", since="2026-01-04T00:00:00Z")
+        ]
+        assert bodies == ["Message 4", "Message 5"]
+        
+        since = datetime(2026, 1, 5, tzinfo=timezone.utc)
+        assert len(list(store.iter_messages("user", "password", since=since))) == 1
+    
+    def test_unread(self, store):
+        """Marked messages should drop out of unread reads."""
+        first = list(store.iter_messages("user", "password", limit=2))
+        assert store.mark_read("user", [m["id"] for m in first]) == 2
+        assert store.mark_read("user", [first[0]["id"]]) == 0
+        
+        unread = list(store.iter_messages("user", "password", unread_only=True))
+        assert [m["body"] for m in unread] == ["Message 3", "Message 4", "Message 5"]
+        
+        messages = store.decrypt("user", "password")
+        assert messages[0]["read_at"] is not None
+        assert messages[4]["read_at"] is None
+    
+    def test_decrypts_on_demand(self, store, monkeypatch):
+        """Only the messages actually consumed should be decrypted."""
+        calls = []
+        real_decrypt = mailbox_ops.decrypt_mail_record
+        monkeypatch.setattr(
+            mailbox_ops,
+            "decrypt_mail_record",
+            lambda *a: calls.append(a) or real_decrypt(*a)
+        )
+        
+        messages = store.iter_messages("user", "password")
+        assert next(messages)["body"] == "Message 1"
+        messages.close()
+        
+        assert len(calls) == 1
+    
+    def test_read_state_survives_compaction(self, tmp_path):
+        """Read markers should be folded into records on compaction."""
+        mailbox_path = tmp_path / "user.json"
+        for i in range(3):
+            mailbox_ops.append_encrypted_message(
+                mailbox_path, {"body": f"Message {i}", "from": "sender"}, "password"
+            )
+        
+        ids = [m["id"] for m in mailbox_ops.iter_mailbox(mailbox_path, "password", limit=1)]
+        mailbox_ops.mark_messages_read(mailbox_path, ids)
+        mailbox_ops.compact_mailbox(mailbox_path)
+        
+        unread = list(mailbox_ops.iter_mailbox(mailbox_path, "password", unread_only=True))
+        assert len(unread) == 2
@@ -0,0 +1,124 @@
+"""
+Tests for airtime estimation and transmit pacing.
+
+The scheduler is driven by a fake clock, so no test actually sleeps.
+"""
+
+import pytest
+
+import mesh_airtime
+
+
+class FakeClock:
+    """Monotonic clock advanced only by sleep()."""
+    
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+    
+    def __call__(self):
+        return self.now
+    
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def make_scheduler(clock, **kwargs):
+    """Create a scheduler on a fake clock."""
+    return mesh_airtime.TransmitScheduler(clock=clock, sleep=clock.sleep, **kwargs)
+
+
+class TestTimeOnAir:
+    """Tests for the LoRa time-on-air estimate."""
+    
+    def test_known_value(self):
+        """A full LongFast packet should take a little over two seconds."""
+        airtime = mesh_airtime.time_on_air(228, "LongFast")
+        assert 2.0 < airtime < 2.5
+    
+    def test_slower_presets_take_longer(self):
+        """Airtime should grow with spreading factor and payload size."""
+        presets = ["ShortFast", "MediumSlow", "LongFast", "LongSlow"]
+        airtimes = [mesh_airtime.time_on_air(100, p) for p in presets]
+        
+        assert airtimes == sorted(airtimes)
+        assert mesh_airtime.time_on_air(200, "ShortFast") > airtimes[0]
+    
+    def test_unknown_preset(self):
+        """Unknown presets should be rejected."""
+        with pytest.raises(ValueError, match="Unknown modem preset"):
+            mesh_airtime.time_on_air(10, "UltraFast")
+
+
+class TestTransmitScheduler:
+    """Tests for duty-cycle pacing."""
+    
+    def test_frames_wait_for_previous_airtime(self):
+        """Back-to-back frames should be spaced by their airtime."""
+        clock = FakeClock()
+        scheduler = make_scheduler(clock, duty_cycle=1.0)
+        airtime = scheduler.airtime(0, 200)
+        
+        assert scheduler.wait(0, 200) == 0
+        assert scheduler.wait(0, 200) == pytest.approx(airtime)
+    
+    def test_budget_enforced(self):
+        """Airtime in any window should stay within the duty cycle."""
+        clock = FakeClock()
+        scheduler = make_scheduler(clock, duty_cycle=0.1, window=60)
+        airtime = scheduler.airtime(0, 200)
+        
+        starts = []
+        for _ in range(12):
+            scheduler.wait(0, 200)
+            starts.append(clock.now)
+        
+        for start in starts:
+            in_window = [s for s in starts if start - 60 < s <= start]
+            assert len(in_window) * airtime <= 6.0 + 1e-9
+        assert scheduler.total_wait > 0
+    
+    def test_channels_budgeted_separately(self):
+        """A busy channel should not delay another channel."""
+        clock = FakeClock()
+        scheduler = make_scheduler(
+            clock, channel_presets={1: "ShortFast", 3: "MediumSlow"}, duty_cycle=0.1, window=60
+        )
+        
+        for _ in range(5):
+            scheduler.wait(3, 200)
+        
+        assert scheduler.delay_for(1, scheduler.airtime(1, 200)) == 0
+    
+    def test_plan_matches_transmission(self):
+        """plan() should predict what wait() later does, without sleeping."""
+        clock = FakeClock()
+        scheduler = make_scheduler(clock, duty_cycle=0.1, window=60)
+        frames = [(0, 228)] * 8
+        
+        plan = scheduler.plan(frames)
+        assert clock.sleeps == []
+        
+        for channel, size in frames:
+            scheduler.wait(channel, size)
+        
+        assert plan["frames"] == 8
+        assert plan["airtime"] == pytest.approx(scheduler.total_airtime)
+        assert plan["duration"] == pytest.approx(clock.now + scheduler.airtime(0, 228))
+    
+    def test_window_edge_rounding(self):
+        """A full window should not spin when start - window rounds low."""
+        clock = FakeClock()
+        clock.now = 10.006
+        scheduler = make_scheduler(clock, duty_cycle=0.001, window=600)
+        airtime = scheduler.airtime(0, 200)
+        
+        scheduler.wait(0, 200)
+        
+        assert scheduler.delay_for(0, airtime) == pytest.approx(600)
+    
+    def test_invalid_duty_cycle(self):
+        """Duty cycles outside (0, 1] should be rejected."""
+        with pytest.raises(ValueError):
+            mesh_airtime.TransmitScheduler(duty_cycle=0)
@@ -0,0 +1,116 @@
+"""
+Tests for the compressed mesh wire format.
+"""
+
+import pytest
+
+import mesh_compress
+import mesh_fragment
+import meshtastic_client
+
+
+BULLETIN = (
+    "[INFO] Weekly Net Reminder\n"
+    "The weekly net runs Sunday at 19:00 on channel 0. Check in with your node ID, "
+    "location and battery status. Valid until 2024-01-22T00:00:00+00:00"
+)
+
+
+class TestWireFormat:
+    """Tests for encoding and decoding."""
+    
+    def test_round_trip(self):
+        """Bulletin text should compress and decode back exactly."""
+        encoded = mesh_compress.encode_text(BULLETIN)
+        
+        assert mesh_compress.is_compressed(encoded)
+        assert len(encoded.encode("utf-8")) < len(BULLETIN.encode("utf-8"))
+        assert mesh_compress.decode_text(encoded) == BULLETIN
+    
+    def test_unicode_round_trip(self):
+        """Non-ASCII text should survive compression."""
+        text = "Boletín de emergencia: señal débil en Mayagüez. " * 4
+        
+        assert mesh_compress.decode_text(mesh_compress.encode_text(text)) == text
+    
+    def test_short_text_stays_plain(self):
+        """Text that would not shrink should be sent as is."""
+        assert mesh_compress.encode_text("ok") == "ok"
+        assert mesh_compress.decode_text("ok") == "ok"
+    
+    def test_header_byte_in_plain_text(self):
+        """Plain text starting with a header byte should not be misread."""
+        text = mesh_compress.CURRENT_HEADER + "x"
+        
+        assert mesh_compress.decode_text(mesh_compress.encode_text(text)) == text
+    
+    def test_corrupt_data_passes_through(self):
+        """Undecodable data should be returned unchanged, not raise."""
+        text = mesh_compress.CURRENT_HEADER + "not base85 ~~~"
+        
+        assert mesh_compress.decode_text(text) == text
+        truncated = mesh_compress.compress_text(BULLETIN)[:20]
+        assert mesh_compress.decode_text(truncated) == truncated
+    
+    def test_train_dictionary(self):
+        """Recurring phrases should end up in the dictionary, within size."""
+        samples = [f"[ALERT] Road closed near node {i}. Stay tuned to channel 0." for i in range(20)]
+        
+        dictionary = mesh_compress.train_dictionary(samples, size=64)
+        
+        assert len(dictionary.encode("utf-8")) <= 64
+        assert "Stay tuned to channel 0." in dictionary
+    
+    def test_train_dictionary_skips_timestamps(self):
+        """Timestamps should never be learned; n-grams should stop at them."""
+        samples = [
+            f'{{"generated_at":"2026-10-18T20:36:0{i}+00:00","schedule":["09:00"]}}'
+            for i in range(5)
+        ]
+        
+        dictionary = mesh_compress.train_dictionary(samples, size=256)
+        
+        assert "2026" not in dictionary
+        assert '","schedule":' in dictionary
+
+
+class TestClientCompression:
+    """Tests for compression in the client."""
+    
+    def test_frame_message(self):
+        """frame_message() should compress only when enabled."""
+        plain = meshtastic_client.HardwareConfig(max_message_size=100)
+        compressed = meshtastic_client.HardwareConfig(max_message_size=100, compression=True)
+        
+        plain_frames = meshtastic_client.frame_message(BULLETIN, plain)
+        compressed_frames = meshtastic_client.frame_message(BULLETIN, compressed)
+        
+        assert len(compressed_frames) < len(plain_frames)
+        reassembler = mesh_fragment.Reassembler()
+        message = [reassembler.feed(frame) for frame in compressed_frames][-1]
+        assert mesh_compress.decode_text(message) == BULLETIN
+    
+    def test_from_dict(self):
+        """runtime.compression should be read from hardware.yml."""
+        config = meshtastic_client.HardwareConfig.from_dict(
+            {"runtime": {"compression": True}}, environ={}
+        )
+        assert config.compression
+        assert not meshtastic_client.HardwareConfig.from_dict({}, environ={}).compression
+
+
+def test_benchmark_on_repository_content():
+    """Compression should cut the frames needed for held-out content in data/."""
+    corpus = mesh_compress.load_corpus(split="test")
+    if not corpus:
+        pytest.skip("no content in data/")
+    
+    training = mesh_compress.load_corpus(split="train")
+    assert not {label for label, _ in corpus if "json" not in label} & {
+        label for label, _ in training
+    }
+    
+    rows = mesh_compress.benchmark(corpus, 228)
+    
+    assert sum(r["compressed_frames"] for r in rows) < sum(r["plain_frames"] for r in rows)
+    assert all(r["compressed_bytes"] <= r["plain_bytes"] for r in rows)
@@ -0,0 +1,168 @@
+"""
+Tests for mesh message fragmentation and reassembly.
+
+A pure-Python loopback: frames produced by the sender are fed straight
+into a Reassembler, with reordering, duplication and corruption.
+"""
+
+import json
+import random
+import pytest
+
+import mesh_fragment
+
+
+MAX_SIZE = 228
+
+
+def make_bulletin_payload(count: int = 20) -> str:
+    """Build a multi-KB JSON bulletin payload with non-ASCII text."""
+    bulletins = [
+        {
+            "id": f"bulletin-{i}",
+            "title": f"Aviso {i}: Boletín de la comunidad",
+            "body": "Información para la isla — señal débil en Utuado. 📡 " * 4,
+            "priority": "normal"
+        }
+        for i in range(count)
+    ]
+    return json.dumps({"bulletins": bulletins}, ensure_ascii=False, separators=(",", ":"))
+
+
+class TestFragmentText:
+    """Tests for splitting messages into frames."""
+    
+    def test_short_message_unframed(self):
+        """Messages that fit in one packet should be sent as-is."""
+        assert mesh_fragment.fragment_text("hello mesh", MAX_SIZE) == ["hello mesh"]
+    
+    def test_frames_fit_packet(self):
+        """Every frame should fit the packet size and be valid UTF-8."""
+        payload = make_bulletin_payload()
+        frames = mesh_fragment.fragment_text(payload, MAX_SIZE)
+        
+        assert len(payload.encode("utf-8")) > 4096
+        assert len(frames) > 1
+        for frame in frames:
+            assert len(frame.encode("utf-8")) <= MAX_SIZE
+            assert mesh_fragment.Frame.decode(frame) is not None
+    
+    def test_frame_lookalike_is_framed(self):
+        """Text that looks like a frame header should be wrapped."""
+        lookalike = mesh_fragment.Frame(1, 0, 1, 0, "x").encode()
+        frames = mesh_fragment.fragment_text(lookalike, MAX_SIZE)
+        
+        assert frames != [lookalike]
+        assert mesh_fragment.Reassembler().feed(frames[0]) == lookalike
+    
+    def test_too_many_frames(self):
+        """Messages beyond MAX_FRAMES frames should be rejected."""
+        with pytest.raises(ValueError):
+            mesh_fragment.fragment_text("x" * 100_000, MAX_SIZE)
+
+
+class TestReassembler:
+    """Tests for rebuilding messages from frames."""
+    
+    def test_loopback_round_trip(self):
+        """A multi-KB bulletin should round-trip byte for byte."""
+        payload = make_bulletin_payload()
+        reassembler = mesh_fragment.Reassembler()
+        
+        results = [reassembler.feed(f) for f in mesh_fragment.fragment_text(payload, MAX_SIZE)]
+        
+        assert results[-1].encode("utf-8") == payload.encode("utf-8")
+        assert all(r is None for r in results[:-1])
+        assert reassembler.pending == 0
+    
+    def test_out_of_order_and_duplicates(self):
+        """Reordered and repeated frames should still reassemble once."""
+        payload = make_bulletin_payload(8)
+        frames = mesh_fragment.fragment_text(payload, MAX_SIZE)
+        shuffled = frames + frames[:3]
+        random.Random(7).shuffle(shuffled)
+        
+        reassembler = mesh_fragment.Reassembler()
+        completed = [m for m in (reassembler.feed(f) for f in shuffled) if m is not None]
+        
+        assert completed == [payload]
+        assert reassembler.pending == 0
+    
+    def test_interleaved_senders(self):
+        """Frames from different senders should not mix."""
+        first = mesh_fragment.fragment_text("A" * 500, MAX_SIZE, message_id=1)
+        second = mesh_fragment.fragment_text("B" * 500, MAX_SIZE, message_id=1)
+        reassembler = mesh_fragment.Reassembler()
+        
+        completed = []
+        for a, b in zip(first, second):
+            completed.append(reassembler.feed(a, sender="!node-a"))
+            completed.append(reassembler.feed(b, sender="!node-b"))
+        
+        assert [m for m in completed if m] == ["A" * 500, "B" * 500]
+    
+    def test_corrupted_frame_dropped(self):
+        """A message whose CRC does not match should be discarded."""
+        frames = mesh_fragment.fragment_text("C" * 500, MAX_SIZE)
+        frames[1] = frames[1][:-1] + "X"
+        reassembler = mesh_fragment.Reassembler()
+        
+        assert all(reassembler.feed(f) is None for f in frames)
+        assert reassembler.dropped == 1
+    
+    def test_incomplete_messages_expire(self):
+        """Messages missing frames should be dropped after the timeout."""
+        now = [0.0]
+        reassembler = mesh_fragment.Reassembler(timeout=60, clock=lambda: now[0])
+        frames = mesh_fragment.fragment_text("D" * 500, MAX_SIZE)
+        
+        reassembler.feed(frames[0])
+        assert reassembler.pending == 1
+        
+        now[0] = 61.0
+        assert reassembler.expire() == 1
+        assert reassembler.pending == 0
+    
+    def test_plain_text_passes_through(self):
+        """Unframed packets should be returned unchanged."""
+        assert mesh_fragment.Reassembler().feed("plain text") == "plain text"
+
+
+class TestPackMessages:
+    """Tests for packing short messages into shared frames."""
+    
+    def test_short_messages_share_a_frame(self):
+        """Messages that fit one packet together should be packed."""
+        messages = ["alpha " * 10, "bravo " * 10, "charlie " * 20]
+        
+        packed = mesh_fragment.pack_messages(messages, MAX_SIZE)
+        
+        assert len(packed) == 2
+        assert [p for m in packed for p in mesh_fragment.unpack_message(m)] == messages
+        assert all(mesh_fragment.frame_count(m, MAX_SIZE) == 1 for m in packed)
+    
+    def test_no_pack_without_saving(self):
+        """Messages should stay apart when packing saves no frames."""
+        messages = ["x" * 200, "y" * 200]
+        assert mesh_fragment.pack_messages(messages, MAX_SIZE, max_frames=3) == messages
+    
+    def test_multi_frame_bins(self):
+        """Larger bins should pack messages that each need two frames."""
+        messages = ["z" * 300, "w" * 300]
+        
+        (packed,) = mesh_fragment.pack_messages(messages, MAX_SIZE, max_frames=3)
+        
+        assert mesh_fragment.frame_count(packed, MAX_SIZE) == 3
+        assert mesh_fragment.unpack_message(packed) == messages
+    
+    def test_priority_order_kept(self):
+        """pack_channel_messages() should never move a level ahead of another."""
+        import pr_cybr_bbs_tx
+        
+        pending = [("low", "low"), ("high a", "high"), ("normal", "normal"), ("high b", "high")]
+        
+        packed, stats = pr_cybr_bbs_tx.pack_channel_messages(pending, MAX_SIZE, 1)
+        
+        assert [p for _, p in packed] == ["high", "normal", "low"]
+        assert mesh_fragment.unpack_message(packed[0][0]) == ["high a", "high b"]
+        assert (stats["frames_before"], stats["frames_after"], stats["frames_saved"]) == (4, 3, 1)
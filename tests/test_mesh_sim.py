@@ -0,0 +1,165 @@
+"""
+Tests for the simulated mesh interface.
+
+Everything runs on the simulation's virtual clock, so no test sleeps.
+"""
+
+import pytest
+
+import mesh_airtime
+import mesh_fragment
+import mesh_sim
+import meshtastic_client
+
+
+@pytest.fixture
+def config():
+    return meshtastic_client.HardwareConfig(
+        max_message_size=228, retry_count=1, retry_delay=1, ack_timeout=1
+    )
+
+
+def sim_client(mesh, config, pacing=True):
+    """Create a client connected to a mesh."""
+    scheduler = meshtastic_client.create_scheduler({}, config) if pacing else None
+    client = meshtastic_client.MeshtasticClient(
+        config=config, scheduler=scheduler, interface_factory=mesh.interface_factory
+    )
+    assert client.connect()
+    return client
+
+
+class TestInterfaceFactory:
+    """Tests for selecting the interface by name."""
+    
+    def test_sim_by_name(self, config, monkeypatch):
+        """interface "sim" should connect to the shared simulated mesh."""
+        mesh = mesh_sim.SimulatedMesh(nodes=[1], seed=1)
+        monkeypatch.setattr(mesh_sim, "_default_mesh", mesh)
+        sim_config = meshtastic_client.HardwareConfig(interface="sim")
+        
+        client = meshtastic_client.MeshtasticClient(config=sim_config)
+        
+        assert client.connect()
+        assert client.get_node_info()["hardware"] == "SIMULATED"
+        assert client.send_text("hello")
+        mesh.flush()
+        assert [p["decoded"]["text"] for p in mesh.received["!sim00001"]] == ["hello"]
+    
+    def test_environment_selects_interface(self):
+        """MESH_INTERFACE should override device.interface."""
+        config = meshtastic_client.HardwareConfig.from_dict(
+            {"device": {"interface": "serial"}}, environ={"MESH_INTERFACE": "sim"}
+        )
+        assert config.interface == "sim"
+    
+    def test_unknown_interface(self, config):
+        """An unknown interface name should fail to connect."""
+        client = meshtastic_client.MeshtasticClient(config=config, interface_factory="nope")
+        assert not client.connect()
+    
+    def test_registered_factory(self, config, monkeypatch):
+        """register_interface() should make a factory selectable by name."""
+        mesh = mesh_sim.SimulatedMesh(nodes=[1])
+        monkeypatch.setattr(
+            meshtastic_client, "INTERFACE_FACTORIES", dict(meshtastic_client.INTERFACE_FACTORIES)
+        )
+        meshtastic_client.register_interface("bench", mesh.interface_factory)
+        
+        client = meshtastic_client.MeshtasticClient(config=config, interface_factory="bench")
+        
+        assert client.connect()
+        assert isinstance(client.interface, mesh_sim.SimulatedInterface)
+
+
+class TestSimulatedMesh:
+    """Tests for delivery, loss, timing and the radio queue."""
+    
+    def test_fragments_reassemble_at_every_node(self, config):
+        """A long message should arrive intact at every node in range."""
+        mesh = mesh_sim.SimulatedMesh(nodes=[1, 2, 3], seed=1)
+        client = sim_client(mesh, config)
+        message = "Boletín " * 120
+        
+        assert client.send_text(message, hop_limit=3)
+        mesh.flush()
+        
+        for packets in mesh.received.values():
+            reassembler = mesh_fragment.Reassembler()
+            assert [reassembler.feed(p["decoded"]["text"]) for p in packets][-1] == message
+    
+    def test_hop_limit(self, config):
+        """Nodes beyond the hop limit should hear nothing."""
+        mesh = mesh_sim.SimulatedMesh(nodes=[1, 2, 3])
+        client = sim_client(mesh, config)
+        
+        client.send_text("short range", hop_limit=1)
+        mesh.flush()
+        
+        assert [len(p) for p in mesh.received.values()] == [1, 1, 0]
+        assert mesh.received["!sim00002"][0]["hopLimit"] == 0
+    
+    def test_timing_follows_airtime(self, config):
+        """Packets should take at least their airtime to arrive."""
+        mesh = mesh_sim.SimulatedMesh(nodes=[1], latency=0.1)
+        client = sim_client(mesh, config, pacing=False)
+        
+        client.send_text("x" * 200)
+        mesh.flush()
+        
+        airtime = mesh_airtime.time_on_air(200, mesh.preset_for(0))
+        assert mesh.clock() == pytest.approx(airtime + 0.1)
+    
+    def test_loss_fails_want_ack(self, config):
+        """With every packet lost, want-ack sends should fail after retries."""
+        mesh = mesh_sim.SimulatedMesh(nodes=[1], loss=1.0)
+        client = sim_client(mesh, config)
+        
+        record = client.send_message("lost", want_ack=True)
+        
+        assert record.status == "nak"
+        assert record.frames[0].attempts == 2
+        assert mesh.stats()["delivered"] == 0
+        assert mesh.clock() > 0
+    
+    def test_want_ack_delivered(self, config):
+        """A delivered frame should be acked."""
+        mesh = mesh_sim.SimulatedMesh(nodes=[1])
+        client = sim_client(mesh, config)
+        
+        assert client.send_message("hello", want_ack=True).status == "acked"
+    
+    def test_unpaced_burst_overflows_radio_queue(self, config):
+        """Without pacing, a burst should overflow the radio's queue."""
+        mesh = mesh_sim.SimulatedMesh(nodes=[1], radio_queue_size=4)
+        client = sim_client(mesh, config, pacing=False)
+        
+        for i in range(8):
+            client.send_text(f"burst {i}")
+        
+        assert mesh.stats()["dropped_queue_full"] == 4
+    
+    def test_benchmark_with_pacing(self, config):
+        """Paced sends should never overflow the queue and all reassemble."""
+        mesh = mesh_sim.SimulatedMesh(nodes=[1, 2], radio_queue_size=4, seed=3)
+        messages = [f"{i} " + "y" * 500 for i in range(6)]
+        
+        result = mesh_sim.run_benchmark(mesh, messages, config)
+        
+        assert result["dropped_queue_full"] == 0
+        assert result["reassembled"] == 6
+        assert result["goodput"] > 0
+        assert result["airtime"] <= config.duty_cycle * config.duty_cycle_window
+    
+    def test_send_from_reaches_local_interface(self, config):
+        """Packets from a remote node should arrive on the local interface."""
+        mesh = mesh_sim.SimulatedMesh(nodes=[1, 2])
+        client = sim_client(mesh, config)
+        
+        mesh.send_from("!sim00002", "ping", channel=1)
+        mesh.flush()
+        
+        (packet,) = client.interface.received
+        assert (packet["fromId"], packet["channel"]) == ("!sim00002", 1)
+        assert packet["decoded"]["text"] == "ping"
+
@@ -0,0 +1,316 @@
+"""
+Tests for the resident transmit daemon.
+
+The daemon runs in a thread against a fake radio client; requests go
+over a real Unix socket in a temporary directory.
+"""
+
+import threading
+import time
+import pytest
+
+import mesh_txd
+import meshtastic_client
+import pr_cybr_bbs_tx
+import tx_checkpoint
+import tx_ledger
+import tx_queue
+
+from .conftest import FakeRecord
+
+
+class FakeRadioClient:
+    """
+    Stand-in for MeshtasticClient.
+    
+    ``connect_results`` lists the outcome of successive connect() calls
+    (True once exhausted); sends fail while ``radio_up`` is False.
+    """
+    
+    def __init__(self, connect_results=()):
+        self.connect_results = list(connect_results)
+        self.connect_calls = 0
+        self.radio_up = True
+        self.sent = []
+        self.interface = None
+        self.serial_port = "/dev/ttyFAKE"
+        self.scheduler = None
+        self._connected = False
+    
+    @property
+    def is_connected(self):
+        return self._connected
+    
+    def connect(self):
+        self.connect_calls += 1
+        ok = self.connect_results.pop(0) if self.connect_results else True
+        self._connected = ok
+        self.interface = object() if ok else None
+        return ok
+    
+    def disconnect(self):
+        self._connected = False
+        self.interface = None
+    
+    def get_node_info(self):
+        if not self.radio_up:
+            return None
+        return {"node_id": "!fake", "name": "Fake Node"}
+    
+    def send_message(self, message, channel_index=0, hop_limit=None, want_ack=False):
+        if not self.radio_up:
+            return FakeRecord(False)
+        self.sent.append((message, channel_index))
+        return FakeRecord(True)
+
+
+def wait_for(condition, timeout=5.0):
+    """Poll until condition() is true."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@pytest.fixture
+def run_daemon(tmp_path):
+    """Start a daemon in a thread; stop it after the test."""
+    started = []
+    
+    def start(client, config=None):
+        daemon = mesh_txd.TransmitDaemon(
+            client,
+            socket_path=tmp_path / "txd.sock",
+            queue_path=tmp_path / "queue.db",
+            poll_interval=0.05,
+            reconnect_delay=0.01,
+            config=config
+        )
+        thread = threading.Thread(target=daemon.serve_forever)
+        thread.start()
+        assert wait_for(lambda: mesh_txd.daemon_available(daemon.socket_path))
+        started.append((daemon, thread))
+        return daemon
+    
+    yield start
+    
+    for daemon, thread in started:
+        daemon.stop()
+        thread.join(5)
+        assert not daemon.socket_path.exists()
+
+
+class TestTransmitDaemon:
+    """Tests for the daemon's socket protocol and radio handling."""
+    
+    def test_send_jobs_share_one_connection(self, run_daemon):
+        """Jobs from several submitters should go out over one connection."""
+        client = FakeRadioClient()
+        daemon = run_daemon(client)
+        
+        for i in range(3):
+            queue = mesh_txd.DaemonQueue(daemon.socket_path)
+            queue.enqueue(f"job {i}", channel=i, priority="high")
+        
+        assert wait_for(lambda: len(client.sent) == 3)
+        assert client.sent == [("job 0", 0), ("job 1", 1), ("job 2", 2)]
+        assert client.connect_calls == 1
+        
+        health = mesh_txd.request({"op": "health"}, daemon.socket_path)
+        assert health["connected"]
+        assert health["sent"] == 3
+        assert health["node"]["name"] == "Fake Node"
+        assert health["queue"]["depth"] == 0
+    
+    def test_bad_requests(self, run_daemon):
+        """Malformed requests should get an error, not kill the daemon."""
+        daemon = run_daemon(FakeRadioClient())
+        
+        assert not mesh_txd.request({"op": "nope"}, daemon.socket_path)["ok"]
+        assert not mesh_txd.request({"op": "send"}, daemon.socket_path)["ok"]
+        response = mesh_txd.request(
+            {"op": "send", "text": "x", "priority": "urgent"}, daemon.socket_path
+        )
+        assert "Unknown priority" in response["error"]
+        assert mesh_txd.daemon_available(daemon.socket_path)
+    
+    def test_reconnects_with_backoff(self, run_daemon):
+        """Failed connects should be retried until the radio comes up."""
+        client = FakeRadioClient(connect_results=[False, False, True])
+        daemon = run_daemon(client)
+        
+        mesh_txd.DaemonQueue(daemon.socket_path).enqueue("after reconnect")
+        
+        assert wait_for(lambda: client.sent)
+        assert client.connect_calls == 3
+        assert daemon.health()["connect_failures"] == 0
+    
+    def test_lost_radio_keeps_message_queued(self, run_daemon):
+        """A send that fails because the radio is gone should be retried."""
+        client = FakeRadioClient()
+        daemon = run_daemon(client)
+        assert wait_for(lambda: client.is_connected)
+        
+        client.radio_up = False
+        mesh_txd.DaemonQueue(daemon.socket_path).enqueue("survives")
+        assert wait_for(lambda: daemon.health()["last_error"] is not None)
+        assert daemon.health()["queue"]["depth"] == 1
+        
+        client.radio_up = True
+        assert wait_for(lambda: client.sent == [("survives", 0)])
+        assert client.connect_calls >= 2
+    
+    def test_jobs_queued_directly_are_drained(self, run_daemon, tmp_path):
+        """Messages put in the queue database by tx_queue.py should be sent."""
+        client = FakeRadioClient()
+        run_daemon(client)
+        
+        with tx_queue.TransmitQueue(tmp_path / "queue.db") as queue:
+            queue.enqueue("from cron", channel=2)
+        
+        assert wait_for(lambda: client.sent == [("from cron", 2)])
+    
+    def test_wait_for_sent_messages(self, run_daemon):
+        """wait() should report each message once the daemon has sent it."""
+        client = FakeRadioClient()
+        daemon = run_daemon(client)
+        queue = mesh_txd.DaemonQueue(daemon.socket_path)
+        
+        ids = [queue.enqueue("one"), queue.enqueue("two", channel=1)]
+        sent = []
+        
+        assert queue.wait(sent.append, timeout=5, poll_interval=0.01) == (2, 0, 0)
+        assert [(item.id, item.message, item.channel) for item in sent] == [
+            (ids[0], "one", 0), (ids[1], "two", 1)
+        ]
+        assert queue.status(ids[0]) == "sent"
+        assert queue.status(999) is None
+        assert not mesh_txd.request({"op": "status", "ids": "1"}, daemon.socket_path)["ok"]
+    
+    def test_wait_times_out_while_radio_down(self, run_daemon):
+        """Messages the daemon has not sent should not be reported as sent."""
+        client = FakeRadioClient()
+        daemon = run_daemon(client)
+        assert wait_for(lambda: client.is_connected)
+        client.radio_up = False
+        
+        queue = mesh_txd.DaemonQueue(daemon.socket_path)
+        queue.enqueue("held")
+        sent = []
+        
+        assert queue.wait(sent.append, timeout=0.2, poll_interval=0.01) == (0, 0, 1)
+        assert sent == []
+    
+    def test_handoff_not_recorded_until_sent(self, run_daemon, tmp_path):
+        """Messages handed to the daemon should stay due until it sends them."""
+        client = FakeRadioClient()
+        daemon = run_daemon(client)
+        assert wait_for(lambda: client.is_connected)
+        client.radio_up = False
+        
+        payload = {"items": [{"id": "a", "category": "OPS", "title": "A", "body": "alpha"}]}
+        (message,) = pr_cybr_bbs_tx.channel_messages(payload, "OPS")
+        queue = mesh_txd.DaemonQueue(daemon.socket_path)
+        
+        with tx_ledger.SentLedger(tmp_path / "ledger.db") as ledger:
+            assert pr_cybr_bbs_tx.transmit_channel(
+                None, 1, "OPS", payload, queue=queue, ledger=ledger, rebroadcast_interval=3600
+            )
+            assert ledger.is_due(message, 1, 3600)
+            
+            client.radio_up = True
+            queue.wait(
+                lambda item: ledger.record(item.message, item.channel),
+                timeout=5, poll_interval=0.01
+            )
+            assert not ledger.is_due(message, 1, 3600)
+    
+    def test_handoff_checkpointed_as_queued(self, run_daemon, tmp_path):
+        """Items handed to the daemon should be checkpointed as queued, then sent."""
+        client = FakeRadioClient()
+        daemon = run_daemon(client)
+        assert wait_for(lambda: client.is_connected)
+        client.radio_up = False
+        
+        payload = {"items": [{"id": "a", "category": "OPS", "title": "A", "body": "alpha"}]}
+        queue = mesh_txd.DaemonQueue(daemon.socket_path)
+        
+        with tx_checkpoint.TransmitCheckpoint(tmp_path / "checkpoint.db") as checkpoint:
+            pr_cybr_bbs_tx.transmit_channel(
+                None, 1, "OPS", payload, queue=queue, checkpoint=checkpoint
+            )
+            run = tx_checkpoint.run_key(payload)
+            assert checkpoint.sent_items(run, 1) == set()
+            assert list(checkpoint.queued_items(run, 1).values()) == list(queue.items)
+            
+            # Queued again without --resume while the radio is still down
+            pr_cybr_bbs_tx.transmit_channel(
+                None, 1, "OPS", payload, queue=queue, checkpoint=checkpoint
+            )
+            assert queue.queued == 1
+            
+            client.radio_up = True
+            queue.wait(
+                lambda item: checkpoint.mark_queue_item_sent(run, item.channel, item.id),
+                timeout=5, poll_interval=0.01
+            )
+            assert checkpoint.sent_items(run, 1) == {0}
+    
+    def test_radios_send_their_channels(self, run_daemon):
+        """With several radios, each channel should go out through its own radio."""
+        config = meshtastic_client.HardwareConfig.from_dict(
+            {"radios": [{"name": "a", "channels": [1, 2]}, {"name": "b", "channels": [3]}]},
+            environ={}
+        )
+        a, b = config.radios
+        clients = {a: FakeRadioClient(), b: FakeRadioClient()}
+        daemon = run_daemon(clients, config=config)
+        
+        queue = mesh_txd.DaemonQueue(daemon.socket_path)
+        for channel in (1, 3, 6):
+            queue.enqueue(f"ch{channel}", channel=channel)
+        
+        assert queue.wait(timeout=5, poll_interval=0.01) == (3, 0, 0)
+        assert clients[a].sent == [("ch1", 1), ("ch6", 6)]
+        assert clients[b].sent == [("ch3", 3)]
+        
+        health = daemon.health()
+        assert [radio["name"] for radio in health["radios"]] == ["a", "b"]
+        assert health["sent"] == 3
+        assert mesh_txd.daemon_radios(daemon.socket_path) == ["a", "b"]
+        assert mesh_txd.use_daemon(daemon.socket_path, config)
+    
+    def test_daemon_not_used_for_other_radios(self, run_daemon, capsys):
+        """The tx scripts should bypass a daemon that drives other radios, with a warning."""
+        daemon = run_daemon(FakeRadioClient())
+        single = meshtastic_client.HardwareConfig.from_dict({}, environ={})
+        several = meshtastic_client.HardwareConfig.from_dict(
+            {"radios": [{"name": "a", "channels": [1]}, {"name": "b"}]}, environ={}
+        )
+        
+        assert mesh_txd.use_daemon(daemon.socket_path, single)
+        assert not mesh_txd.use_daemon(daemon.socket_path, several)
+        assert "restart it" in capsys.readouterr().err
+    
+    def test_refuses_second_daemon(self, run_daemon, tmp_path):
+        """A second daemon on the same socket should refuse to start."""
+        run_daemon(FakeRadioClient())
+        
+        second = mesh_txd.TransmitDaemon(FakeRadioClient(), socket_path=tmp_path / "txd.sock")
+        with pytest.raises(RuntimeError):
+            second.serve_forever()
+    
+    def test_stale_socket_replaced(self, run_daemon, tmp_path):
+        """A leftover socket file with no listener should be replaced."""
+        (tmp_path / "txd.sock").touch()
+        
+        daemon = run_daemon(FakeRadioClient())
+        
+        assert mesh_txd.daemon_available(daemon.socket_path)
+
+
+def test_daemon_unavailable(tmp_path):
+    """No listener means the tx scripts fall back to the radio."""
+    assert not mesh_txd.daemon_available(tmp_path / "missing.sock")
@@ -0,0 +1,165 @@
+"""
+Tests for the compact binary wire schema.
+"""
+
+import json
+from datetime import datetime
+
+import pytest
+
+import mesh_fragment
+import mesh_sim
+import mesh_wire
+import meshtastic_client
+from pr_cybr_bbs_generate import generate_channel_payload
+
+
+def channel_payload():
+    """Build a channel payload the way the generator does."""
+    items = [
+        {
+            "id": "ops-001",
+            "category": "OPS",
+            "title": "Net check-in",
+            "body": "Check in on channel 1 at 19:00. Señal débil en el oeste.",
+            "tags": ["ops", "net"],
+            "valid_from": "2024-01-15T09:00:00Z",
+            "valid_until": "2024-01-22T09:00:00-04:00"
+        },
+        {
+            "id": "ops-002",
+            "category": "OPS",
+            "title": "No tags",
+            "body": "",
+            "tags": [],
+            "valid_from": "2024-01-15T09:00:00+00:00",
+            "valid_until": "2024-01-16T09:00:00+00:00"
+        }
+    ]
+    return generate_channel_payload(1, {"name": "OPS-SITREP"}, items, ["09:00", "18:30"])
+
+
+def same_instant(a, b):
+    return datetime.fromisoformat(a.replace("Z", "+00:00")) == datetime.fromisoformat(
+        b.replace("Z", "+00:00")
+    ).replace(microsecond=0)
+
+
+class TestEncoding:
+    """Tests for encode() and decode()."""
+    
+    def test_round_trip(self):
+        """Every field should survive; timestamps as the same instant."""
+        payload = channel_payload()
+        
+        decoded = mesh_wire.decode(mesh_wire.encode(payload))
+        
+        assert decoded.keys() == payload.keys()
+        assert same_instant(decoded["generated_at"], payload["generated_at"])
+        assert decoded["schedule"] == ["09:00", "18:30"]
+        for original, item in zip(payload["items"], decoded["items"]):
+            for key in ("id", "category", "title", "body", "tags"):
+                assert item[key] == original[key]
+            assert same_instant(item["valid_from"], original["valid_from"])
+            assert same_instant(item["valid_until"], original["valid_until"])
+    
+    def test_smaller_than_json(self):
+        """The encoding should be well under compact JSON."""
+        payload = channel_payload()
+        
+        assert len(mesh_wire.encode(payload)) < len(json.dumps(payload, separators=(",", ":"))) * 0.7
+    
+    def test_values_outside_compact_forms(self):
+        """Unknown enums and free-form timestamps should fall back to strings."""
+        payload = {
+            "bbs": "PR-MESH-BBS",
+            "channel": 0,
+            "schedule": ["noon"],
+            "bulletins": [{
+                "id": "x",
+                "category": "WEATHER",
+                "priority": "urgent",
+                "valid_from": "tomorrow",
+                "valid_until": "1969-12-31T00:00:00+00:00"
+            }]
+        }
+        
+        assert mesh_wire.decode(mesh_wire.encode(payload)) == payload
+    
+    def test_mixed_case_values_round_trip(self):
+        """Enums and times should only use compact forms for an exact match."""
+        payload = {
+            "bbs": "PR-MESH-BBS",
+            "channel": 0,
+            "schedule": ["9:05", "09:05"],
+            "bulletins": [
+                {"id": "a", "category": "sitrep", "priority": "HIGH"},
+                {"id": "b", "category": "SITREP", "priority": "high"}
+            ]
+        }
+        
+        encoded = mesh_wire.encode(payload)
+        
+        assert mesh_wire.decode(encoded) == payload
+        assert b"sitrep" in encoded and b"HIGH" in encoded and b"SITREP" not in encoded
+    
+    def test_unknown_field_rejected(self):
+        """Fields outside the schema should not be silently dropped."""
+        payload = channel_payload()
+        payload["items"][0]["source_file"] = "ops.md"
+        
+        with pytest.raises(ValueError, match="source_file"):
+            mesh_wire.encode(payload)
+    
+    def test_unknown_tags_skipped(self):
+        """A decoder should skip fields added by a newer encoder."""
+        payload = {"bbs": "PR-CYBR-BBS", "items": []}
+        extra = mesh_wire._varint(15 << 3 | mesh_wire.LENGTH) + b"\x03abc"
+        extra += mesh_wire._varint(16 << 3 | mesh_wire.VARINT) + mesh_wire._varint(300)
+        
+        assert mesh_wire.decode(mesh_wire.encode(payload) + extra) == payload
+    
+    def test_malformed_data(self):
+        """Bad versions and truncated data should raise ValueError."""
+        data = mesh_wire.encode(channel_payload())
+        
+        with pytest.raises(ValueError, match="version"):
+            mesh_wire.decode(b"\x09" + data[1:])
+        for cut in (3, len(data) // 2, len(data) - 1):
+            with pytest.raises(ValueError):
+                mesh_wire.decode(data[:cut])
+
+
+class TestWireText:
+    """Tests for the text form sent over the air."""
+    
+    def test_text_round_trip(self):
+        """Both the plain and deflated text forms should decode."""
+        payload = channel_payload()
+        plain = mesh_wire.encode_text(payload, compress=False)
+        deflated = mesh_wire.encode_text(payload)
+        
+        assert plain[0] != deflated[0]
+        assert len(deflated) < len(plain)
+        assert mesh_wire.decode_text(plain) == mesh_wire.decode_text(deflated)
+        with pytest.raises(ValueError):
+            mesh_wire.decode_text("plain text")
+    
+    def test_send_wire_over_simulated_mesh(self):
+        """send_wire() should deliver a payload that decodes at the receiver."""
+        config = meshtastic_client.HardwareConfig(max_message_size=100)
+        mesh = mesh_sim.SimulatedMesh(nodes=[1], seed=1)
+        client = meshtastic_client.MeshtasticClient(
+            config=config, interface_factory=mesh.interface_factory
+        )
+        assert client.connect()
+        payload = channel_payload()
+        
+        assert client.send_wire(payload, channel_index=1)
+        mesh.flush()
+        
+        reassembler = mesh_fragment.Reassembler()
+        (packets,) = mesh.received.values()
+        text = [reassembler.feed(p["decoded"]["text"]) for p in packets][-1]
+        assert mesh_wire.decode_text(text)["items"][0]["title"] == "Net check-in"
+        assert not client.send_wire({"bbs": "no entries"})
@@ -0,0 +1,385 @@
+"""
+Tests for the Meshtastic client helper.
+
+Covers hardware configuration loading and caching, delivery tracking
+and the asyncio front end. No device or meshtastic package is needed:
+sends go to a recording fake interface.
+"""
+
+import asyncio
+import os
+import threading
+import time
+import pytest
+
+import meshtastic_client
+
+
+class FakePacket:
+    """Stand-in for the MeshPacket returned by sendText."""
+    
+    def __init__(self, packet_id):
+        self.id = packet_id
+
+
+class FakeInterface:
+    """
+    Records sendText calls in place of a serial interface.
+    
+    ``script`` lists per-call outcomes: "ok", "raise", or a routing
+    errorReason ("NONE" acks, anything else NAKs, None never answers)
+    delivered to onResponse when want-ack is requested.
+    """
+    
+    def __init__(self, script=None):
+        self.sent = []
+        self.script = list(script or [])
+    
+    def sendText(self, text, channelIndex=0, hopLimit=None, wantAck=False, onResponse=None):
+        self.sent.append((text, channelIndex, hopLimit))
+        outcome = self.script.pop(0) if self.script else "NONE"
+        
+        if outcome == "raise":
+            raise OSError("serial write failed")
+        if wantAck and outcome not in ("ok", None):
+            onResponse({"decoded": {"routing": {"errorReason": outcome}}})
+        return FakePacket(len(self.sent))
+    
+    def close(self):
+        pass
+
+
+def connected_client(config, script=None):
+    """Create a client wired to a FakeInterface that never sleeps."""
+    client = meshtastic_client.MeshtasticClient(config=config)
+    client.interface = FakeInterface(script)
+    client._connected = True
+    client.sleeps = []
+    client._sleep = client.sleeps.append
+    return client
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    """Write a small hardware.yml."""
+    path = tmp_path / "hardware.yml"
+    path.write_text(
+        "serial:\n"
+        "  port: /dev/ttyUSB0\n"
+        "  baud: 115200\n"
+        "runtime:\n"
+        "  default_hop_limit: 5\n"
+        "  max_message_size: 200\n"
+    )
+    return path
+
+
+class TestHardwareConfig:
+    """Tests for the typed, cached hardware configuration."""
+    
+    def test_from_dict(self):
+        """Fields should be read from the YAML sections."""
+        config = meshtastic_client.HardwareConfig.from_dict(
+            {"serial": {"port": "/dev/ttyACM0", "baud": 9600},
+             "device": {"region": "US"},
+             "runtime": {"default_hop_limit": 2}},
+            environ={}
+        )
+        
+        assert config.serial_port == "/dev/ttyACM0"
+        assert config.baud_rate == 9600
+        assert config.region == "US"
+        assert config.default_hop_limit == 2
+        assert config.max_message_size == 228
+    
+    def test_environment_overrides(self):
+        """MESH_SERIAL_PORT and MESH_BAUD should win over the file."""
+        config = meshtastic_client.HardwareConfig.from_dict(
+            {"serial": {"port": "/dev/ttyACM0", "baud": 9600}},
+            environ={"MESH_SERIAL_PORT": "/dev/ttyUSB1", "MESH_BAUD": "57600"}
+        )
+        
+        assert config.serial_port == "/dev/ttyUSB1"
+        assert config.baud_rate == 57600
+    
+    def test_radio_mapping(self):
+        """Channels should map to their radio; unmapped ones to the catch-all."""
+        config = meshtastic_client.HardwareConfig.from_dict(
+            {"radios": [
+                {"name": "a", "port": "/dev/ttyUSB0", "channels": [1, 2]},
+                {"name": "b", "port": "/dev/ttyUSB1", "channels": [3]}
+            ]},
+            environ={}
+        )
+        a, b = config.radios
+        
+        assert [config.radio_for_channel(n).name for n in (1, 3, 6)] == ["a", "b", "a"]
+        assert config.channel_filter(a) == (None, {3})
+        assert config.channel_filter(b) == ({3}, set())
+        
+        with pytest.raises(ValueError):
+            meshtastic_client.HardwareConfig.from_dict(
+                {"radios": [{"channels": [1]}, {"channels": [1]}]}, environ={}
+            )
+    
+    def test_loaded_once(self, config_file, monkeypatch):
+        """Repeated lookups should not re-read the file."""
+        calls = []
+        real_load = meshtastic_client.load_hardware_config
+        monkeypatch.setattr(
+            meshtastic_client,
+            "load_hardware_config",
+            lambda path=None: calls.append(path) or real_load(path)
+        )
+        
+        first = meshtastic_client.get_hardware_config(config_file, reload=True)
+        for _ in range(10):
+            assert meshtastic_client.get_hardware_config(config_file) is first
+        
+        assert len(calls) == 1
+    
+    def test_mtime_reload(self, config_file):
+        """check_mtime should pick up edits to the file."""
+        config = meshtastic_client.get_hardware_config(config_file, reload=True)
+        assert config.default_hop_limit == 5
+        
+        config_file.write_text("runtime:\n  default_hop_limit: 1\n")
+        stat = config_file.stat()
+        os.utime(config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        
+        assert meshtastic_client.get_hardware_config(config_file).default_hop_limit == 5
+        reloaded = meshtastic_client.get_hardware_config(config_file, check_mtime=True)
+        assert reloaded.default_hop_limit == 1
+    
+    def test_client_uses_config_reference(self, config_file, monkeypatch):
+        """Sending should use the client's config without touching YAML."""
+        config = meshtastic_client.get_hardware_config(config_file, reload=True)
+        client = connected_client(config)
+        
+        monkeypatch.setattr(meshtastic_client.yaml, "safe_load", None)
+        for i in range(60):
+            assert client.send_json({"n": i}, channel_index=1)
+        
+        assert client.serial_port == "/dev/ttyUSB0"
+        assert client.interface.sent[0] == ('{"n":0}', 1, 5)
+    
+    def test_send_json_fragments_oversized_payload(self, config_file):
+        """Oversized JSON should be sent as frames, not truncated."""
+        import json
+        import mesh_fragment
+        
+        config = meshtastic_client.get_hardware_config(config_file, reload=True)
+        client = connected_client(config)
+        payload = {"bulletins": [{"id": i, "body": "x" * 100} for i in range(10)]}
+        
+        assert client.send_json(payload)
+        
+        frames = [text for text, _, _ in client.interface.sent]
+        assert len(frames) > 1
+        assert all(len(f.encode("utf-8")) <= config.max_message_size for f in frames)
+        
+        reassembler = mesh_fragment.Reassembler()
+        received = [reassembler.feed(f) for f in frames][-1]
+        assert json.loads(received) == payload
+    
+    def test_send_text_paced_by_scheduler(self, config_file):
+        """Every frame should pass through the airtime scheduler."""
+        config = meshtastic_client.get_hardware_config(config_file, reload=True)
+        waits = []
+        
+        class RecordingScheduler:
+            def wait(self, channel, payload_bytes):
+                waits.append((channel, payload_bytes))
+                return 0.0
+        
+        client = connected_client(config)
+        client.scheduler = RecordingScheduler()
+        
+        assert client.send_text("z" * 500, channel_index=2)
+        
+        assert len(waits) == len(client.interface.sent) > 1
+        assert all(channel == 2 for channel, _ in waits)
+
+
+class TestDelivery:
+    """Tests for retries, backoff and want-ack delivery tracking."""
+    
+    @pytest.fixture
+    def config(self):
+        return meshtastic_client.HardwareConfig(
+            retry_count=2, retry_delay=1, ack_timeout=0.01, max_message_size=228
+        )
+    
+    def test_backoff_delay(self):
+        """Backoff should double per attempt, with jitter and a cap."""
+        for attempt, nominal in [(1, 5), (2, 10), (3, 20), (10, 60)]:
+            delay = meshtastic_client.backoff_delay(attempt, 5)
+            assert nominal / 2 <= delay <= nominal
+    
+    def test_retries_transient_errors(self, config):
+        """A send that raises should be retried with backoff."""
+        client = connected_client(config, ["raise", "raise", "ok"])
+        
+        record = client.send_message("hello")
+        
+        assert record.status == "sent"
+        assert record.frames[0].attempts == 3
+        assert len(client.sleeps) == 2
+        assert client.sleeps[1] > client.sleeps[0] * 0.5
+        assert client.deliveries[record.message_id] is record
+    
+    def test_gives_up_after_retry_count(self, config):
+        """Persistent errors should fail the message, not report success."""
+        client = connected_client(config, ["raise"] * 3)
+        
+        assert not client.send_text("hello")
+        record = list(client.deliveries.values())[-1]
+        assert record.status == "failed"
+        assert record.frames[0].attempts == 3
+        assert "serial write failed" in record.frames[0].error
+    
+    def test_want_ack(self, config):
+        """Acked frames should be recorded as acked."""
+        client = connected_client(config)
+        
+        record = client.send_message("z" * 500, want_ack=True)
+        
+        assert record.status == "acked"
+        assert all(frame.packet_id for frame in record.frames)
+    
+    def test_nak_then_ack_is_retried(self, config):
+        """A NAKed frame should be resent."""
+        client = connected_client(config, ["MAX_RETRANSMIT", "NONE"])
+        
+        record = client.send_message("hello", want_ack=True)
+        
+        assert record.status == "acked"
+        assert record.frames[0].attempts == 2
+    
+    def test_missing_ack_fails(self, config):
+        """Frames that are never acked should fail and stop the message."""
+        client = connected_client(config, [None, None, None, "NONE"])
+        
+        record = client.send_message("z" * 500, want_ack=True)
+        
+        assert record.status == "failed"
+        assert record.frames[0].error == "no ACK received"
+        assert all(f.status == "failed" for f in record.frames[1:])
+        assert len(client.interface.sent) == 3
+
+
+class TestAsyncClient:
+    """Tests for the asyncio front end."""
+    
+    @pytest.fixture
+    def config(self):
+        return meshtastic_client.HardwareConfig(max_message_size=228)
+    
+    def test_sends_do_not_block_loop(self, config):
+        """Slow serial writes should run off the event loop, one at a time."""
+        client = connected_client(config)
+        active = []
+        
+        def slow_send(text, **kwargs):
+            active.append(text)
+            assert len(active) == 1
+            time.sleep(0.02)
+            active.remove(text)
+            return FakePacket(1)
+        
+        client.interface.sendText = slow_send
+        aclient = meshtastic_client.AsyncMeshtasticClient(client)
+        ticks = []
+        
+        async def ticker():
+            for _ in range(5):
+                ticks.append(1)
+                await asyncio.sleep(0.01)
+        
+        async def run():
+            async with aclient:
+                return await asyncio.gather(
+                    aclient.send_text("one"),
+                    aclient.send_json({"two": 2}),
+                    ticker()
+                )
+        
+        results = asyncio.run(run())
+        
+        assert results[:2] == [True, True]
+        assert len(ticks) == 5
+    
+    def test_receives_from_reader_thread(self, config):
+        """Packets from the meshtastic thread should reach async iterators."""
+        import mesh_fragment
+        
+        aclient = meshtastic_client.AsyncMeshtasticClient(connected_client(config))
+        long_text = "señal " * 100
+        packets = [{"decoded": {"portnum": "POSITION_APP"}, "fromId": "!a"}] + [
+            {"decoded": {"portnum": "TEXT_MESSAGE_APP", "text": frame},
+             "fromId": "!a", "channel": 3}
+            for frame in mesh_fragment.fragment_text(long_text, 228)
+        ] + [{"decoded": {"portnum": "TEXT_MESSAGE_APP", "text": "hi"}, "fromId": "!b"}]
+        
+        async def run():
+            await aclient.connect()
+            received = []
+            
+            async def consume():
+                async for message in aclient.messages():
+                    received.append(message)
+                    if len(received) == 2:
+                        break
+            
+            consumer = asyncio.create_task(consume())
+            await asyncio.sleep(0)
+            
+            reader = threading.Thread(
+                target=lambda: [aclient._on_receive(p) for p in packets]
+            )
+            reader.start()
+            await asyncio.wait_for(consumer, 5)
+            reader.join()
+            return received
+        
+        assert asyncio.run(run()) == [("!a", 3, long_text), ("!b", 0, "hi")]
+    
+    def test_disconnect_ends_iteration(self, config):
+        """disconnect() should end open packet iterators."""
+        aclient = meshtastic_client.AsyncMeshtasticClient(connected_client(config))
+        
+        async def run():
+            await aclient.connect()
+            
+            async def consume():
+                return [packet async for packet in aclient.packets()]
+            
+            consumer = asyncio.create_task(consume())
+            await asyncio.sleep(0)
+            aclient._on_receive({"id": 1})
+            await asyncio.sleep(0.01)
+            await aclient.disconnect()
+            return await asyncio.wait_for(consumer, 5)
+        
+        assert asyncio.run(run()) == [{"id": 1}]
+        assert not aclient.is_connected
+    
+    def test_slow_consumer_drops_oldest(self, config):
+        """A full receive buffer should drop the oldest packets."""
+        aclient = meshtastic_client.AsyncMeshtasticClient(
+            connected_client(config), max_queue=2
+        )
+        
+        async def run():
+            await aclient.connect()
+            iterator = aclient.packets()
+            first = asyncio.create_task(iterator.__anext__())
+            await asyncio.sleep(0)
+            
+            for i in range(4):
+                aclient._dispatch({"id": i})
+            await asyncio.sleep(0)
+            return [(await first)["id"], (await iterator.__anext__())["id"]]
+        
+        assert asyncio.run(run()) == [2, 3]
+        assert aclient.dropped == 2
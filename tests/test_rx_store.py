@@ -0,0 +1,109 @@
+"""
+Tests for the receive pipeline and its persistent store.
+"""
+
+import json
+import pytest
+
+import export_dashboard_state
+import mesh_compress
+import mesh_fragment
+import mesh_sim
+import meshtastic_client
+import rx_store
+
+
+def text_packet(text, packet_id, sender="!a1b2c3d4", channel=1, **fields):
+    """Build a received text packet like the meshtastic library's."""
+    return {
+        "id": packet_id,
+        "fromId": sender,
+        "toId": "^all",
+        "channel": channel,
+        "rxTime": 1_000_000,
+        "decoded": {"portnum": "TEXT_MESSAGE_APP", "text": text},
+        **fields
+    }
+
+
+@pytest.fixture
+def store(tmp_path, clock):
+    store = rx_store.ReceiveStore(tmp_path / "rx.db", clock=clock)
+    yield store
+    store.close()
+
+
+class TestReceiveStore:
+    """Tests for normalizing, storing and querying received packets."""
+    
+    def test_normalize_packet(self):
+        """Signal and hop fields should be normalized."""
+        record = rx_store.ReceivedMessage.from_packet(text_packet(
+            "hello", 7, rxSnr=6.25, rxRssi=-92, hopStart=3, hopLimit=1
+        ))
+        
+        assert (record.from_id, record.channel, record.text) == ("!a1b2c3d4", 1, "hello")
+        assert (record.snr, record.rssi, record.hop_limit, record.hops) == (6.25, -92, 1, 2)
+        assert record.to_dict()["rx_at"].startswith("1970-01-12T13:46:40")
+    
+    def test_recorder_reassembles_and_dedups(self, store):
+        """Fragments, compressed and packed text should become whole records, once."""
+        recorder = rx_store.PacketRecorder(store)
+        frames = mesh_fragment.fragment_text("Boletín " * 60, 228)
+        packed = mesh_fragment.pack_messages(["alpha", "bravo"], 228)[0]
+        
+        for i, frame in enumerate(frames, 1):
+            recorder(text_packet(frame, i))
+        recorder(text_packet(frames[0], 1))  # heard again via another relay
+        recorder(text_packet(mesh_compress.compress_text("compressed " * 20), 50))
+        recorder(text_packet(packed, 51, channel=2))
+        recorder({"id": 52, "fromId": "!a1b2c3d4", "decoded": {"portnum": "ROUTING_APP"}})
+        recorder({"id": 53, "fromId": "!a1b2c3d4", "decoded": {"portnum": "POSITION_APP"}})
+        
+        texts = [r.text for r in reversed(store.recent())]
+        assert texts == ["Boletín " * 60, "compressed " * 20, "alpha", "bravo", None]
+        assert recorder.duplicates == 1
+        assert store.summary()["channels"] == {0: 1, 1: 2, 2: 2}
+    
+    def test_retention(self, store, clock):
+        """Old records and records beyond max_records should be deleted."""
+        store.max_records = 3
+        for i in range(5):
+            store.append(rx_store.ReceivedMessage.from_packet(text_packet(f"m{i}", i)))
+        store.append(rx_store.ReceivedMessage.from_packet(
+            text_packet("old", 9, rxTime=clock() - 31 * 86400)
+        ))
+        
+        assert store.enforce_retention() == 3
+        assert [r.text for r in store.recent()] == ["m4", "m3", "m2"]
+    
+    def test_records_from_simulated_mesh(self, store):
+        """A client with a recorder attached should store what the mesh delivers."""
+        mesh = mesh_sim.SimulatedMesh(nodes=[1, 2])
+        config = meshtastic_client.HardwareConfig(max_message_size=228)
+        client = meshtastic_client.MeshtasticClient(
+            config=config, interface_factory=mesh.interface_factory
+        )
+        rx_store.attach_recorder(client, store)
+        assert client.connect()
+        
+        mesh.send_from("!sim00002", "SITREP: all quiet", channel=1)
+        mesh.flush()
+        client.disconnect()
+        mesh.send_from("!sim00001", "after disconnect")
+        mesh.flush()
+        
+        (record,) = store.recent()
+        assert (record.from_id, record.channel, record.hops) == ("!sim00002", 1, 1)
+        assert record.text == "SITREP: all quiet"
+        assert record.snr is not None
+    
+    def test_dashboard_export(self, store, tmp_path):
+        """The exporter should summarize traffic and write received.json."""
+        store.append(rx_store.ReceivedMessage.from_packet(text_packet("hello", 1)))
+        
+        summary = export_dashboard_state.export_received(store.db_path, tmp_path / "received.json")
+        
+        assert summary["total"] == 1
+        exported = json.loads((tmp_path / "received.json").read_text())
+        assert exported["messages"][0]["text"] == "hello"
@@ -0,0 +1,114 @@
+"""
+Tests for transmit checkpoints and resumable broadcasts.
+"""
+
+import pytest
+
+import pr_cybr_bbs_tx
+import tx_checkpoint
+import tx_queue
+
+from .conftest import FakeClient
+
+
+@pytest.fixture
+def checkpoint(tmp_path):
+    checkpoint = tx_checkpoint.TransmitCheckpoint(tmp_path / "checkpoint.db")
+    yield checkpoint
+    checkpoint.close()
+
+
+@pytest.fixture
+def payload():
+    return {
+        "generated_at": "2026-10-18T12:00:00+00:00",
+        "items": [
+            {"id": str(i), "category": "OPS", "title": f"Item {i}", "body": f"body {i}"}
+            for i in range(4)
+        ]
+    }
+
+
+class TestTransmitCheckpoint:
+    """Tests for recording progress and resuming."""
+    
+    def test_marks(self, checkpoint):
+        """Queued items should become sent when their queue entry is sent."""
+        checkpoint.mark_sent("run", 1, [0])
+        checkpoint.mark_queued("run", 1, [1, 2], queue_id=7)
+        
+        assert checkpoint.sent_items("run", 1) == {0}
+        assert checkpoint.queued_items("run", 1) == {1: 7, 2: 7}
+        
+        # The same ID from another queue database belongs to another run
+        checkpoint.mark_queued("other", 3, [0], queue_id=7)
+        assert checkpoint.mark_queue_item_sent("run", 1, 7) == 2
+        assert checkpoint.queued_items("other", 3) == {0: 7}
+        assert checkpoint.sent_items("run", 1) == {0, 1, 2}
+        assert checkpoint.sent_items("run", 2) == set()
+        assert checkpoint.clear("run", 1) == 3
+    
+    def test_run_key(self, payload):
+        """Payloads should be keyed by generated_at, else by content."""
+        assert tx_checkpoint.run_key(payload) == payload["generated_at"]
+        del payload["generated_at"]
+        assert tx_checkpoint.run_key(payload).startswith("sha256:")
+    
+    def test_resume_after_dropped_link(self, checkpoint, payload):
+        """--resume should send only the items a crashed run did not."""
+        with pytest.raises(OSError):
+            pr_cybr_bbs_tx.transmit_channel(
+                FakeClient(crash_after=2), 1, "OPS", payload, checkpoint=checkpoint
+            )
+        
+        client = FakeClient()
+        assert pr_cybr_bbs_tx.transmit_channel(
+            client, 1, "OPS", payload, checkpoint=checkpoint, resume=True
+        )
+        
+        assert [m.split("\n")[0] for m in client.sent] == [
+            "[OPS:OPS] Item 2", "[OPS:OPS] Item 3"
+        ]
+        assert checkpoint.sent_items(payload["generated_at"], 1) == {0, 1, 2, 3}
+    
+    def test_resume_skips_still_queued(self, checkpoint, payload, tmp_path):
+        """Items left pending in the queue should not be queued twice."""
+        with tx_queue.TransmitQueue(tmp_path / "queue.db") as queue:
+            pr_cybr_bbs_tx.transmit_channel(
+                None, 1, "OPS", payload, queue=queue, checkpoint=checkpoint
+            )
+            # The drain stops after two messages (reboot)
+            queue.drain(
+                FakeClient(), max_items=2,
+                on_sent=lambda item: checkpoint.mark_queue_item_sent(
+                    payload["generated_at"], item.channel, item.id
+                )
+            )
+            
+            pr_cybr_bbs_tx.transmit_channel(
+                None, 1, "OPS", payload, queue=queue, checkpoint=checkpoint, resume=True
+            )
+            assert queue.depth() == 2
+            
+            # Without --resume the run starts over, but messages still
+            # waiting in the queue are not queued again
+            pr_cybr_bbs_tx.transmit_channel(
+                None, 1, "OPS", payload, queue=queue, checkpoint=checkpoint
+            )
+            assert queue.depth() == 4
+            assert len(checkpoint.queued_items(payload["generated_at"], 1)) == 4
+    
+    def test_catches_up_with_sends_not_marked(self, checkpoint, payload, tmp_path):
+        """Queued items sent by a drain that did not mark them should count as sent."""
+        with tx_queue.TransmitQueue(tmp_path / "queue.db") as queue:
+            pr_cybr_bbs_tx.transmit_channel(
+                None, 1, "OPS", payload, queue=queue, checkpoint=checkpoint
+            )
+            queue.drain(FakeClient())
+            
+            pr_cybr_bbs_tx.transmit_channel(
+                None, 1, "OPS", payload, queue=queue, checkpoint=checkpoint, resume=True
+            )
+            
+            assert queue.depth() == 0
+            assert checkpoint.sent_items(payload["generated_at"], 1) == {0, 1, 2, 3}
@@ -0,0 +1,112 @@
+"""
+Tests for the sent-ledger used for delta broadcasting.
+"""
+
+import pytest
+
+import pr_cybr_bbs_tx
+import tx_ledger
+import tx_queue
+
+from .conftest import FakeClient
+
+
+HOUR = 3600.0
+
+
+@pytest.fixture
+def ledger(tmp_path, clock):
+    ledger = tx_ledger.SentLedger(tmp_path / "ledger.db", clock=clock)
+    yield ledger
+    ledger.close()
+
+
+class TestSentLedger:
+    """Tests for deciding what is due."""
+    
+    def test_new_changed_and_unchanged(self, ledger, clock):
+        """Only unchanged messages inside the interval should be skipped."""
+        ledger.record("bulletin v1", channel=0)
+        clock.now += HOUR
+        
+        assert not ledger.is_due("bulletin v1", 0, 24 * HOUR)
+        assert ledger.is_due("bulletin v2", 0, 24 * HOUR)
+        assert ledger.is_due("bulletin v1", 1, 24 * HOUR)
+        assert ledger.is_due("bulletin v1", 0, 0)
+    
+    def test_rebroadcast_after_interval(self, ledger, clock):
+        """Unchanged messages should be due again once the interval passes."""
+        ledger.record("daily", channel=0)
+        
+        clock.now += 24 * HOUR - tx_ledger.REBROADCAST_GRACE - 1
+        assert not ledger.is_due("daily", 0, 24 * HOUR)
+        # A daily run that starts a few seconds early still resends
+        clock.now += 2
+        assert ledger.is_due("daily", 0, 24 * HOUR)
+        
+        ledger.record("daily", channel=0, label="Daily report")
+        (entry,) = ledger.entries()
+        assert entry["sends"] == 2
+        assert entry["label"] == "Daily report"
+        assert entry["last_sent"] == clock.now
+    
+    def test_forget_and_prune(self, ledger, clock):
+        """forget() and prune() should make messages due again."""
+        ledger.record("a", channel=1)
+        ledger.record("b", channel=2)
+        clock.now += 48 * HOUR
+        ledger.record("c", channel=2)
+        
+        assert ledger.prune(24 * HOUR) == 2
+        assert [e["content_hash"] for e in ledger.entries()] == [tx_ledger.content_hash("c")]
+        assert ledger.forget(channel=2) == 1
+        assert ledger.entries() == []
+    
+    def test_interval_from_config(self):
+        """The interval should come from bbs.rebroadcast_hours unless overridden."""
+        assert tx_ledger.rebroadcast_interval({"bbs": {"rebroadcast_hours": 6}}) == 6 * HOUR
+        assert tx_ledger.rebroadcast_interval({}, override_hours=0.5) == 0.5 * HOUR
+        assert tx_ledger.rebroadcast_interval({}) == tx_ledger.DEFAULT_REBROADCAST_HOURS * HOUR
+
+
+class TestDeltaTransmit:
+    """Tests for delta broadcasting in the tx scripts."""
+    
+    @pytest.fixture
+    def payload(self):
+        return {
+            "items": [
+                {"id": "a", "category": "OPS", "title": "A", "body": "alpha"},
+                {"id": "b", "category": "OPS", "title": "B", "body": "bravo"}
+            ]
+        }
+    
+    def test_direct_send_skips_unchanged(self, ledger, payload):
+        """A second run should send only the edited item."""
+        client = FakeClient()
+        
+        assert pr_cybr_bbs_tx.transmit_channel(
+            client, 1, "OPS", payload, ledger=ledger, rebroadcast_interval=12 * HOUR
+        )
+        payload["items"][1]["body"] = "bravo, updated"
+        assert pr_cybr_bbs_tx.transmit_channel(
+            client, 1, "OPS", payload, ledger=ledger, rebroadcast_interval=12 * HOUR
+        )
+        
+        assert len(client.sent) == 3
+        assert "bravo, updated" in client.sent[-1]
+    
+    def test_failed_send_not_recorded(self, ledger, payload, tmp_path, clock):
+        """Only messages the drain actually sent should be recorded."""
+        messages = pr_cybr_bbs_tx.channel_messages(payload, "OPS")
+        client = FakeClient(fail={messages[0]})
+        
+        with tx_queue.TransmitQueue(tmp_path / "queue.db", clock=clock) as queue:
+            pr_cybr_bbs_tx.transmit_channel(
+                None, 1, "OPS", payload,
+                queue=queue, ledger=ledger, rebroadcast_interval=12 * HOUR
+            )
+            queue.drain(client, on_sent=lambda item: ledger.record(item.message, item.channel))
+        
+        assert ledger.is_due(messages[0], 1, 12 * HOUR)
+        assert not ledger.is_due(messages[1], 1, 12 * HOUR)
@@ -0,0 +1,195 @@
+"""
+Tests for the persistent transmit priority queue.
+"""
+
+import threading
+import pytest
+
+import meshtastic_client
+import tx_queue
+
+from .conftest import FakeClient
+
+
+@pytest.fixture
+def queue(tmp_path, clock):
+    queue = tx_queue.TransmitQueue(tmp_path / "queue.db", aging_seconds=600, clock=clock)
+    yield queue
+    queue.close()
+
+
+class TestTransmitQueue:
+    """Tests for ordering, persistence and metrics."""
+    
+    def test_priority_order(self, queue, clock):
+        """High priority should go first, FIFO within a priority."""
+        queue.enqueue("low", priority="low")
+        queue.enqueue("normal-1")
+        queue.enqueue("high", priority="high")
+        queue.enqueue("normal-2")
+        
+        client = FakeClient()
+        assert queue.drain(client) == (4, 0)
+        assert client.sent == ["high", "normal-1", "normal-2", "low"]
+    
+    def test_high_priority_preempts_drain(self, queue, clock):
+        """A message queued mid-broadcast should jump the remaining queue."""
+        for i in range(5):
+            queue.enqueue(f"bulletin-{i}")
+        
+        def sitrep_arrives(sent_count):
+            clock.now += 60
+            if sent_count == 2:
+                queue.enqueue("SITREP", priority="high")
+        
+        client = FakeClient(after_send=sitrep_arrives)
+        queue.drain(client)
+        
+        assert client.sent.index("SITREP") == 2
+    
+    def test_aging_prevents_starvation(self, queue, clock):
+        """A long-waiting low message should beat fresh normal messages."""
+        queue.enqueue("old-low", priority="low")
+        clock.now += 2 * 600 + 1
+        queue.enqueue("fresh-normal")
+        
+        assert queue.peek().message == "old-low"
+    
+    def test_persistent_across_reopen(self, tmp_path, clock):
+        """Unsent messages should survive closing the queue."""
+        with tx_queue.TransmitQueue(tmp_path / "q.db", clock=clock) as queue:
+            queue.enqueue("a")
+            queue.enqueue("b", priority="high")
+            queue.drain(FakeClient(), max_items=1)
+        
+        with tx_queue.TransmitQueue(tmp_path / "q.db", clock=clock) as queue:
+            assert queue.depth() == 1
+            assert queue.peek().message == "a"
+    
+    def test_metrics(self, queue, clock):
+        """Metrics should report depth and wait times."""
+        queue.enqueue("a", priority="high")
+        queue.enqueue("b")
+        queue.enqueue("c", priority="low")
+        clock.now += 30
+        
+        queue.drain(FakeClient(fail={"b"}), max_items=2)
+        metrics = queue.metrics()
+        
+        assert metrics["depth"] == 1
+        assert metrics["depth_by_priority"] == {"high": 0, "normal": 0, "low": 1}
+        assert metrics["oldest_wait"] == 30
+        assert (metrics["sent"], metrics["failed"]) == (1, 1)
+        assert metrics["wait_by_priority"]["high"]["max_wait"] == 30
+        
+        deliveries = dict(queue.conn.execute("SELECT message, delivery FROM queue"))
+        assert deliveries == {"a": "sent", "b": "failed", "c": None}
+    
+    def test_claims_and_leases(self, queue, clock):
+        """A claimed message should go to one drainer until its lease runs out."""
+        queue.enqueue("a")
+        
+        with tx_queue.TransmitQueue(queue.db_path, clock=clock) as other:
+            item = queue.claim()
+            assert other.claim() is None
+            assert queue.status(item.id) == "sending"
+            assert queue.depth() == 1
+            
+            # The first sender crashed without completing
+            clock.now += queue.lease_seconds + 1
+            assert other.claim().id == item.id
+            other.release(item.id)
+            assert queue.status(item.id) == "pending"
+    
+    def test_enqueue_skips_waiting_duplicates(self, queue):
+        """The same message on the same channel should be queued once until sent."""
+        first = queue.enqueue("a", channel=1)
+        assert queue.enqueue("a", channel=1) == first
+        assert queue.enqueue("a", channel=2) != first
+        
+        queue.drain(FakeClient())
+        assert queue.enqueue("a", channel=1) != first
+    
+    def test_shared_queue_sends_once(self, tmp_path):
+        """Drainers sharing a queue should never send a message twice."""
+        with tx_queue.TransmitQueue(tmp_path / "queue.db") as queue:
+            for i in range(40):
+                queue.enqueue(f"m{i}")
+        
+        clients = [FakeClient() for _ in range(4)]
+        
+        def worker(client):
+            with tx_queue.TransmitQueue(tmp_path / "queue.db") as queue:
+                queue.drain(client)
+        
+        threads = [threading.Thread(target=worker, args=(client,)) for client in clients]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        sent = [message for client in clients for message in client.sent]
+        assert sorted(sent) == sorted(f"m{i}" for i in range(40))
+    
+    def test_unknown_priority(self, queue):
+        """Unknown priorities should be rejected; normalize maps them."""
+        with pytest.raises(ValueError):
+            queue.enqueue("x", priority="urgent")
+        assert tx_queue.normalize_priority("HIGH") == "high"
+        assert tx_queue.normalize_priority("urgent") == "normal"
+
+
+class TestDrainRadios:
+    """Tests for draining through several radios at once."""
+    
+    def test_radios_send_their_channels_concurrently(self, tmp_path):
+        """Each radio should send only its channels, alongside the others."""
+        config = meshtastic_client.HardwareConfig.from_dict(
+            {"radios": [{"name": "a", "channels": [1, 2]}, {"name": "b", "channels": [3]}]},
+            environ={}
+        )
+        with tx_queue.TransmitQueue(tmp_path / "queue.db") as queue:
+            for i, channel in enumerate((1, 2, 3, 3, 6)):
+                queue.enqueue(f"ch{channel}" if channel != 3 else f"ch3-{i}", channel)
+        
+        # Each radio's first send waits for the other's: fails unless concurrent
+        barrier = threading.Barrier(2, timeout=5)
+        
+        def after_send(count):
+            if count == 1:
+                barrier.wait()
+        
+        clients = {
+            radio: FakeClient(after_send=after_send) for radio in config.radios
+        }
+        recorded = []
+        
+        results = tx_queue.drain_radios(
+            clients, tmp_path / "queue.db", config, on_sent=recorded.append
+        )
+        
+        a, b = config.radios
+        assert sorted(clients[a].sent) == ["ch1", "ch2", "ch6"]
+        assert clients[b].sent == ["ch3-2", "ch3-3"]
+        assert results == {"a": (3, 0), "b": (2, 0)}
+        assert len(recorded) == 5
+    
+    def test_only_given_channels_drained(self, tmp_path):
+        """Messages on channels outside this broadcast should stay queued."""
+        config = meshtastic_client.HardwareConfig.from_dict({}, environ={})
+        with tx_queue.TransmitQueue(tmp_path / "queue.db") as queue:
+            bulletin_id = queue.enqueue("ch0 bulletin", 0)
+            queue.enqueue("ch3 report", 3)
+        
+        (radio,) = config.radio_list()
+        client = FakeClient()
+        
+        results = tx_queue.drain_radios(
+            {radio: client}, tmp_path / "queue.db", config, channels={3}
+        )
+        
+        assert client.sent == ["ch3 report"]
+        assert results == {radio.name: (1, 0)}
+        with tx_queue.TransmitQueue(tmp_path / "queue.db") as queue:
+            assert queue.status(bulletin_id) == "pending"
+            assert queue.depth(channels={3}) == 0